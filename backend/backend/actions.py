@@ -11,6 +11,8 @@ from .sign import create_user_keys, CoprKeygenRequestError
 from .createrepo import createrepo
 from .exceptions import CreateRepoError
 from .helpers import get_redis_logger, silent_remove
+from .project_settings import invalidate_project_settings
+from .dedup import remove_tree
 
 
 class Action(object):
@@ -39,6 +41,7 @@ class Action(object):
         self.destdir = self.opts.destdir
         self.front_url = self.opts.frontend_base_url
         self.results_root_url = self.opts.results_baseurl
+        self.content_store_dir = getattr(self.opts, "content_store_dir", None)
 
         self.log = get_redis_logger(self.opts, "backend.actions", "actions")
 
@@ -65,7 +68,7 @@ class Action(object):
             try:
                 createrepo(path=path, front_url=self.front_url,
                            username=username, projectname=projectname,
-                           override_acr_flag=True)
+                           override_acr_flag=True, opts=self.opts)
                 done_count += 1
             except CoprRequestException as err:
                 # fixme: dirty hack to catch case when createrepo invoked upon deleted project
@@ -109,7 +112,7 @@ class Action(object):
         path = os.path.normpath(self.destdir + '/' + project)
         if os.path.exists(path):
             self.log.info("Removing copr {0}".format(path))
-            shutil.rmtree(path)
+            remove_tree(path, self.content_store_dir, self.log)
 
     def handle_comps_update(self, result):
         self.log.debug("Action delete build")
@@ -185,7 +188,7 @@ class Action(object):
             pkg_path = os.path.join(path, chroot, target_dir)
             if os.path.isdir(pkg_path):
                 self.log.info("Removing build {0}".format(pkg_path))
-                shutil.rmtree(pkg_path)
+                remove_tree(pkg_path, self.content_store_dir, self.log)
                 altered = True
             else:
                 self.log.debug("Package {0} dir not found in chroot {1}".format(target_dir, chroot))
@@ -200,7 +203,8 @@ class Action(object):
                     createrepo(
                         path=createrepo_target,
                         front_url=self.front_url, base_url=result_base_url,
-                        username=username, projectname=projectname
+                        username=username, projectname=projectname,
+                        opts=self.opts,
                     )
                 except CreateRepoError:
                     self.log.exception("Error making local repo: {}".format(createrepo_target))
@@ -227,11 +231,18 @@ class Action(object):
             return
 
         try:
-            create_user_keys(username, projectname, self.opts)
+            # the key is generated in background, first build waits for it if needed
+            create_user_keys(username, projectname, self.opts, wait=False)
             result.result = ActionResult.SUCCESS
         except CoprKeygenRequestError:
             result.result = ActionResult.FAILURE
 
+    def handle_update_project_settings(self, result):
+        ext_data = json.loads(self.data["data"])
+        self.log.debug("Action update project settings: {}".format(ext_data))
+        invalidate_project_settings(self.opts, ext_data["username"], ext_data["projectname"])
+        result.result = ActionResult.SUCCESS
+
     def run(self):
         """ Handle action (other then builds) - like rename or delete of project """
         result = Munch()
@@ -262,6 +273,9 @@ class Action(object):
         elif action_type == ActionType.GEN_GPG_KEY:
             self.handle_generate_gpg_key(result)
 
+        elif action_type == ActionType.UPDATE_PROJECT_SETTINGS:
+            self.handle_update_project_settings(result)
+
         self.log.info("Action result: {}".format(result))
 
         if "result" in result:
@@ -279,6 +293,7 @@ class ActionType(object):
     CREATEREPO = 3
     UPDATE_COMPS = 4
     GEN_GPG_KEY = 5
+    UPDATE_PROJECT_SETTINGS = 6
 
 
 class ActionResult(object):
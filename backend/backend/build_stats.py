@@ -0,0 +1,111 @@
+# coding: utf-8
+
+"""
+Timing of the build phases and resource usage of the builder.
+
+Values are collected into ``BuildJob.build_stats``, sent to the frontend
+together with the build results and saved as ``build-stats.json`` next to
+``build.info`` in the results directory::
+
+    {
+        "phases": {"queue_wait": 35.2, "vm_acquire": 12.1, "srpm_fetch": 8.4, ...},
+        "resources": {"cpu_user": 120.5, "max_rss_kb": 524288, ...}
+    }
+
+Phase durations are in seconds, repeated phases are summed up.
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import os
+import re
+import time
+
+STATS_FILE_NAME = "build-stats.json"
+MOCK_STATE_LOG_NAME = "state.log"
+
+# 2015-11-26 12:36:59,729 - Start: build phase for foo-1.0-1.src.rpm
+STATE_LOG_RE = re.compile(r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),(\d+) - (Start|Finish): (.*)$")
+
+
+def add_phase_time(job, name, seconds):
+    phases = job.build_stats["phases"]
+    phases[name] = round(phases.get(name, 0) + seconds, 3)
+
+
+@contextmanager
+def measure_phase(job, name):
+    """
+    Adds time spent in the block to the phase ``name`` of the job
+    """
+    start = time.time()
+    try:
+        yield
+    finally:
+        add_phase_time(job, name, time.time() - start)
+
+
+def parse_mock_state_log(lines):
+    """
+    :return dict: mock state name -> duration in seconds,
+        states without finish record are omitted
+    """
+    started = {}
+    durations = {}
+    for line in lines:
+        match = STATE_LOG_RE.match(line.strip())
+        if not match:
+            continue
+
+        timestamp = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
+        timestamp = time.mktime(timestamp.timetuple()) + int(match.group(2)) / 1000
+        event, state = match.group(3), match.group(4)
+        if event == "Start":
+            started.setdefault(state, timestamp)
+        elif state in started:
+            durations[state] = timestamp - started.pop(state)
+
+    return durations
+
+
+def add_mock_phases(job, results_dir):
+    """
+    Splits mockchain run into buildroot installation and compilation using
+    mock state.log downloaded from the builder.
+    """
+    state_log_path = os.path.join(results_dir, MOCK_STATE_LOG_NAME)
+    if not os.path.exists(state_log_path):
+        return
+
+    with open(state_log_path) as handle:
+        durations = parse_mock_state_log(handle)
+
+    compile_time = sum(seconds for state, seconds in durations.items()
+                       if state.startswith("build phase"))
+    if compile_time:
+        add_phase_time(job, "compile", compile_time)
+
+    mockchain_time = job.build_stats["phases"].get("mockchain")
+    if compile_time and mockchain_time:
+        add_phase_time(job, "buildroot_install", max(mockchain_time - compile_time, 0))
+
+
+def save_build_stats(job):
+    """
+    Writes build stats of the job into the results directory.
+
+    :return str: path to the written file or None when the results directory doesn't exist
+    """
+    if not os.path.isdir(job.results_dir):
+        return None
+
+    stats_path = os.path.join(job.results_dir, STATS_FILE_NAME)
+    with open(stats_path, "w") as handle:
+        json.dump(job.build_stats, handle, indent=4, sort_keys=True)
+    return stats_path
@@ -25,6 +25,19 @@ class BuildStatus(object):
     PENDING = 4
     SKIPPED = 5
 
+    @classmethod
+    def string(cls, status):
+        """
+        :return str: name of the status as used by the frontend, e.g. "succeeded"
+        """
+        return {
+            cls.FAILURE: "failed",
+            cls.SUCCEEDED: "succeeded",
+            cls.RUNNING: "running",
+            cls.PENDING: "pending",
+            cls.SKIPPED: "skipped",
+        }.get(status, str(status))
+
 
 JOB_GRAB_TASK_END_PUBSUB = "copr:backend:daemons:job_grab:task_end:pubsub::"
 LOG_PUB_SUB = "copr:backend:log:pubsub::"
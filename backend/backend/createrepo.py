@@ -136,7 +136,7 @@ def add_appdata(path, username, projectname, lock=None):
 
 
 def createrepo(path, front_url, username, projectname,
-               override_acr_flag=False, base_url=None):
+               override_acr_flag=False, base_url=None, opts=None):
     """
         Creates repo depending on the project setting "auto_createrepo".
         When enabled creates `repodata` at the provided path, otherwise
@@ -146,6 +146,7 @@ def createrepo(path, front_url, username, projectname,
     :param username: copr project owner username
     :param projectname: copr project name
     :param base_url: base_url to access rpms independently of repomd location
+    :param Munch opts: [optional] backend config, enables cached project settings
     :param Multiprocessing.Lock lock:  [optional] global copr-backend lock
 
     :return: tuple(returncode, stdout, stderr) produced by `createrepo_c`
@@ -154,7 +155,7 @@ def createrepo(path, front_url, username, projectname,
 
     base_url = base_url or ""
 
-    acr_flag = get_auto_createrepo_status(front_url, username, projectname)
+    acr_flag = get_auto_createrepo_status(front_url, username, projectname, opts=opts)
     if override_acr_flag or acr_flag:
         out_cr = createrepo_unsafe(path)
         out_ad = add_appdata(path, username, projectname)
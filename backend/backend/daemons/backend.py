@@ -21,7 +21,7 @@ from backend.frontend import FrontendClient
 
 from ..exceptions import CoprBackendError
 from ..helpers import BackendConfigReader, get_redis_logger
-from .dispatcher import Worker
+from .dispatcher import Worker, WorkerPool
 
 
 class CoprBackend(object):
@@ -91,6 +91,13 @@ class CoprBackend(object):
         """
         self.opts = self.config_reader.read()
 
+    def get_workers_count_by_group_id(self, group_id):
+        """
+        :return int: number of running workers, including threads in worker pools
+        """
+        return sum(w.workers_count if isinstance(w, WorkerPool) else 1
+                   for w in self.workers_by_group_id[group_id])
+
     def spin_up_workers_by_group(self, group):
         """
         Handles starting/growing the number of workers
@@ -100,21 +107,38 @@ class CoprBackend(object):
         Utilized keys:
             - **id**
             - **max_workers**
+            - **worker_threads** [optional] when > 1, workers are started
+              as threads of :py:class:`~backend.daemons.dispatcher.WorkerPool` processes
 
         """
         group_id = group["id"]
+        worker_threads = group.get("worker_threads", 1)
 
-        if len(self.workers_by_group_id[group_id]) < group["max_workers"]:
+        missing_count = group["max_workers"] - self.get_workers_count_by_group_id(group_id)
+        if missing_count > 0:
             self.log.info("Spinning up more workers")
-            for _ in range(group["max_workers"] - len(self.workers_by_group_id[group_id])):
-                self.max_worker_num_by_group_id[group_id] += 1
+            while missing_count > 0:
+                worker_nums = []
+                for _ in range(min(worker_threads, missing_count)):
+                    self.max_worker_num_by_group_id[group_id] += 1
+                    worker_nums.append(self.max_worker_num_by_group_id[group_id])
+                missing_count -= len(worker_nums)
+
                 try:
-                    w = Worker(
-                        opts=self.opts,
-                        frontend_client=self.frontend_client,
-                        worker_num=self.max_worker_num_by_group_id[group_id],
-                        group_id=group_id
-                    )
+                    if worker_threads > 1:
+                        w = WorkerPool(
+                            opts=self.opts,
+                            frontend_client=self.frontend_client,
+                            worker_nums=worker_nums,
+                            group_id=group_id
+                        )
+                    else:
+                        w = Worker(
+                            opts=self.opts,
+                            frontend_client=self.frontend_client,
+                            worker_num=worker_nums[0],
+                            group_id=group_id
+                        )
 
                     self.workers_by_group_id[group_id].append(w)
                     w.start()
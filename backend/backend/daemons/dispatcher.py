@@ -5,6 +5,7 @@ import time
 import gzip
 import shutil
 import multiprocessing
+from threading import Thread
 from setproctitle import setproctitle
 
 from retask.queue import Queue
@@ -16,6 +17,9 @@ from ..mockremote import MockRemote
 from ..constants import BuildStatus, JOB_GRAB_TASK_END_PUBSUB, build_log_format
 from ..helpers import register_build_result, get_redis_connection, get_redis_logger, \
     local_file_logger
+from ..dedup import link_results_dir
+from ..build_stats import add_phase_time, measure_phase, save_build_stats
+from ..metrics import Metrics
 
 
 # ansible_playbook = "ansible-playbook"
@@ -64,6 +68,7 @@ class Worker(multiprocessing.Process):
 
         self.rc = None
         self.vmm = VmManager(self.opts)
+        self.metrics = Metrics(self.opts, log=self.log)
 
     @property
     def logger_name(self):
@@ -131,6 +136,11 @@ class Worker(multiprocessing.Process):
         job.ended_on = time.time()
 
         self.return_results(job)
+        try:
+            save_build_stats(job)
+        except (OSError, IOError) as error:
+            self.log.exception("Failed to save build stats: {}".format(error))
+        self.record_build_metrics(job)
         self.log.info("worker finished build: {0}".format(self.vm_ip))
         template = "build end: user:{user} copr:{copr} build:{build}" \
             "  pkg: {pkg}  version: {version} ip:{ip}  pid:{pid} status:{status}"
@@ -142,6 +152,16 @@ class Worker(multiprocessing.Process):
                        status=job.status, chroot=job.chroot)
         self.fedmsg_notify("build.end", template, content)
 
+    def record_build_metrics(self, job):
+        status = BuildStatus.string(job.status)
+        self.metrics.inc("copr_builds_total", group=self.group_name, status=status)
+        if job.started_on and job.ended_on:
+            self.metrics.observe("copr_build_duration_seconds", job.ended_on - job.started_on,
+                                 group=self.group_name, status=status)
+        for phase, seconds in job.build_stats["phases"].items():
+            self.metrics.observe("copr_build_phase_seconds", seconds,
+                                 group=self.group_name, phase=phase)
+
     def mark_started(self, job):
         """
         Send data about started build to the frontend
@@ -153,7 +173,8 @@ class Worker(multiprocessing.Process):
 
         data = {"builds": [build]}
         try:
-            self.frontend_client.update(data)
+            with measure_phase(job, "frontend_update"):
+                self.frontend_client.update(data)
         except:
             raise CoprWorkerError(
                 "Could not communicate to front end to submit status info")
@@ -168,7 +189,9 @@ class Worker(multiprocessing.Process):
         data = {"builds": [job.to_dict()]}
 
         try:
-            self.frontend_client.update(data)
+            # time of this update is saved only into the build stats file
+            with measure_phase(job, "frontend_update"):
+                self.frontend_client.update(data)
         except Exception as err:
             raise CoprWorkerError(
                 "Could not communicate to front end to submit results: {}"
@@ -192,17 +215,19 @@ class Worker(multiprocessing.Process):
             raise CoprWorkerError(msg)
 
     @classmethod
-    def pkg_built_before(cls, pkg, chroot, destdir):
+    def pkg_built_before(cls, job):
         """
-        Check whether the package has already been built in this chroot.
+        Check whether the identical build has already been done in this chroot.
+
+        :return str: path to the results dir of the identical build or None
         """
-        s_pkg = os.path.basename(pkg)
-        pdn = s_pkg.replace(".src.rpm", "")
-        resdir = "{0}/{1}/{2}".format(destdir, chroot, pdn)
-        resdir = os.path.normpath(resdir)
+        if not job.cached_result_dir:
+            return None
+
+        resdir = os.path.normpath(os.path.join(job.chroot_dir, job.cached_result_dir))
         if os.path.exists(resdir) and os.path.exists(os.path.join(resdir, "success")):
-            return True
-        return False
+            return resdir
+        return None
 
     def init_fedmsg(self):
         """
@@ -218,16 +243,20 @@ class Worker(multiprocessing.Process):
         except Exception as e:
             self.log.exception("Failed to initialize fedmsg: {}".format(e))
 
-    # TODO: doing skip logic on fronted during @start_build query
-    # def on_pkg_skip(self, job):
-    #     """
-    #     Handle package skip
-    #     """
-    #     self._announce_start(job)
-    #     self.log.info("Skipping: package {} has been already built before.".format(job.pkg))
-    #     job.status = BuildStatus.SKIPPED
-    #     self.notify_job_grab_about_task_end(job)
-    #     self._announce_end(job)
+    def on_pkg_skip(self, job, cached_dir):
+        """
+        Handle package skip, results of the identical build are hardlinked
+        into the job results dir. Packages are already in the chroot repo,
+        so createrepo is not needed.
+        """
+        self.log.info("Skipping: package {} has been already built in {}"
+                      .format(job.package_name, cached_dir))
+        self.clean_result_directory(job)
+        link_results_dir(cached_dir, job.results_dir)
+
+        self._announce_start(job)
+        job.status = BuildStatus.SKIPPED
+        self._announce_end(job)
 
     def obtain_job(self):
         """
@@ -246,6 +275,9 @@ class Worker(multiprocessing.Process):
             return
 
         job = BuildJob(task.data, self.opts)
+        job.repo_proxy_url = self.opts.build_groups[self.group_id].get("repo_proxy_url")
+        if job.submitted_on:
+            add_phase_time(job, "queue_wait", time.time() - job.submitted_on)
         self.update_process_title(suffix="Task: {} chroot: {}, obtained at {}"
                                   .format(job.build_id, job.chroot, str(datetime.now())))
 
@@ -299,14 +331,8 @@ class Worker(multiprocessing.Process):
                     )
                     mr.check()
 
-                    build_details = mr.build_pkg_and_process_results()
+                    build_details = mr.build_pkg()
                     job.update(build_details)
-
-                    if self.opts.do_sign:
-                        mr.add_pubkey()
-
-                    register_build_result(self.opts)
-
                 except MockRemoteError as e:
                     # record and break
                     self.log.exception(
@@ -314,7 +340,26 @@ class Worker(multiprocessing.Process):
                         .format(self.vm_ip, job.build_id, job.chroot, e)
                     )
                     status = BuildStatus.FAILURE
-                    register_build_result(self.opts, failed=True)
+                finally:
+                    # results are already downloaded, signing and createrepo
+                    # don't need the builder, so let other workers use it
+                    self.release_vm()
+
+                if status == BuildStatus.SUCCEEDED:
+                    self.update_process_title(suffix="Task: {} chroot: {} post-processing"
+                                              .format(job.build_id, job.chroot))
+                    try:
+                        mr.on_success_build()
+                        if self.opts.do_sign:
+                            mr.add_pubkey()
+                    except MockRemoteError as e:
+                        self.log.exception(
+                            "Error during the build post-processing, build_id={}, chroot={}, error: {}"
+                            .format(job.build_id, job.chroot, e)
+                        )
+                        status = BuildStatus.FAILURE
+
+                register_build_result(self.opts, failed=(status == BuildStatus.FAILURE))
 
             self.log.info(
                 "Finished build: id={} builder={} timeout={} destdir={}"
@@ -401,6 +446,11 @@ class Worker(multiprocessing.Process):
         # TODO: replace acquire/release with context manager
 
         self.log.info("got job: {}, acquiring VM for build".format(str(job)))
+        try:
+            self.vmm.record_chroot_demand(self.group_id, job.chroot)
+        except Exception as error:
+            self.log.exception("Failed to record chroot demand: {}".format(error))
+
         start_vm_wait_time = time.time()
         vmd = None
         while vmd is None:
@@ -416,8 +466,21 @@ class Worker(multiprocessing.Process):
             except Exception as error:
                 self.log.exception("Unhandled exception during VM acquire :{}".format(error))
                 break
+
+        add_phase_time(job, "vm_acquire", time.time() - start_vm_wait_time)
         return vmd
 
+    def release_vm(self):
+        """
+        Returns acquired VM into the pool, does nothing when the VM was already released.
+        Builder IP is kept for the logs and notifications about the finished build.
+        """
+        if self.vm_name is None:
+            return
+
+        self.vmm.release_vm(self.vm_name)
+        self.vm_name = None
+
     def run_cycle(self):
         self.update_process_title(suffix="trying to acquire job")
 
@@ -435,6 +498,16 @@ class Worker(multiprocessing.Process):
             self.notify_job_grab_about_task_end(job)
             return
 
+        cached_dir = self.pkg_built_before(job)
+        if cached_dir:
+            try:
+                self.on_pkg_skip(job, cached_dir)
+                self.notify_job_grab_about_task_end(job)
+                return
+            except Exception as error:
+                self.log.exception("Failed to reuse results from {}, building again: {}"
+                                   .format(cached_dir, error))
+
         vmd = self.acquire_vm_for_job(job)
 
         if vmd is None:
@@ -456,9 +529,8 @@ class Worker(multiprocessing.Process):
                 self.notify_job_grab_about_task_end(job, do_reschedule=True)
             finally:
                 # clean up the instance
-                self.vmm.release_vm(vmd.vm_name)
+                self.release_vm()
                 self.vm_ip = None
-                self.vm_name = None
 
     def run(self):
         self.log.info("Starting worker")
@@ -469,3 +541,127 @@ class Worker(multiprocessing.Process):
         self.update_process_title(suffix="trying to acquire job")
         while not self.kill_received:
             self.run_cycle()
+
+
+class ThreadWorker(Worker):
+    """
+    Worker which runs as a thread inside of :py:class:`WorkerPool` process.
+    Build logic is the same as in :py:class:`Worker`, only process related
+    bits are adjusted.
+
+    Job being processed is kept in ``self.job``, so the pool could reschedule
+    it when the thread dies.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ThreadWorker, self).__init__(*args, **kwargs)
+        self.job = None
+
+    @property
+    def pid(self):
+        return os.getpid()
+
+    def update_process_title(self, suffix=None):
+        # process title is shared by all threads, WorkerPool sets it once
+        pass
+
+    def obtain_job(self):
+        self.job = super(ThreadWorker, self).obtain_job()
+        return self.job
+
+    def notify_job_grab_about_task_end(self, job, do_reschedule=False):
+        super(ThreadWorker, self).notify_job_grab_about_task_end(job, do_reschedule)
+        self.job = None
+
+    def clean_up_after_death(self):
+        """
+        Returns the resources of the died thread: reschedules the unfinished job
+        and releases the acquired VM.
+        """
+        if self.job is not None:
+            try:
+                self.notify_job_grab_about_task_end(self.job, do_reschedule=True)
+            except Exception as error:
+                self.log.exception("Failed to reschedule job {}: {}".format(self.job, error))
+        try:
+            self.release_vm()
+        except Exception as error:
+            self.log.exception("Failed to release VM {}: {}".format(self.vm_name, error))
+
+
+class WorkerPool(multiprocessing.Process):
+    """
+    Runs several workers of the same group as threads of one process.
+    Workers spend most of the time waiting for builder or frontend, so
+    a single process could drive many concurrent builds, avoiding memory
+    overhead of the process per build.
+
+    :param Munch opts: backend config
+    :param list worker_nums: numbers of the workers running in this pool
+    :param int group_id: group_id from the set of groups defined in config
+    """
+
+    def __init__(self, opts, frontend_client, worker_nums, group_id):
+        multiprocessing.Process.__init__(self, name="worker-pool")
+
+        self.opts = opts
+        self.frontend_client = frontend_client
+        self.worker_nums = list(worker_nums)
+        self.group_id = group_id
+
+        self.log = get_redis_logger(self.opts, self.logger_name, "worker")
+
+    @property
+    def workers_count(self):
+        return len(self.worker_nums)
+
+    @property
+    def worker_num(self):
+        return "{}-{}".format(self.worker_nums[0], self.worker_nums[-1])
+
+    @property
+    def logger_name(self):
+        return "backend.worker-pool-{}-{}".format(self.group_id, self.worker_num)
+
+    def start_worker(self, worker_num):
+        """
+        :return tuple: (ThreadWorker, Thread) running the worker
+        """
+        worker = ThreadWorker(
+            opts=self.opts,
+            frontend_client=self.frontend_client,
+            worker_num=worker_num,
+            group_id=self.group_id,
+        )
+        thread = Thread(target=worker.run, name="worker-{}".format(worker_num))
+        thread.daemon = True
+        thread.start()
+        return worker, thread
+
+    def restart_dead_workers(self, workers):
+        """
+        Replaces the died worker threads with new ones, the other workers
+        continue with their builds.
+
+        :param dict workers: worker_num -> (ThreadWorker, Thread), updated in place
+        """
+        for worker_num, (worker, thread) in list(workers.items()):
+            if thread.is_alive():
+                continue
+
+            self.log.error("Worker thread {} died unexpectedly, restarting it"
+                           .format(worker_num))
+            worker.clean_up_after_death()
+            workers[worker_num] = self.start_worker(worker_num)
+
+    def run(self):
+        setproctitle("worker-pool {} workers {}".format(self.group_id, self.worker_num))
+        self.log.info("Starting worker pool with {} workers".format(self.workers_count))
+
+        workers = dict((worker_num, self.start_worker(worker_num))
+                       for worker_num in self.worker_nums)
+
+        # the pool lives until backend terminates it, killing all the threads
+        while True:
+            time.sleep(self.opts.sleeptime)
+            self.restart_dead_workers(workers)
@@ -17,6 +17,7 @@ from ..actions import Action
 from ..constants import JOB_GRAB_TASK_END_PUBSUB
 from ..helpers import get_redis_connection, get_redis_logger
 from ..exceptions import CoprJobGrabError
+from ..metrics import Metrics
 
 
 # TODO: Replace entire model with asynchronous queue, so that frontend push task,
@@ -58,6 +59,7 @@ class CoprJobGrab(object):
         self.ps_thread = None
 
         self.log = get_redis_logger(self.opts, "backend.job_grab", "job_grab")
+        self.metrics = Metrics(self.opts, log=self.log)
 
     def connect_queues(self):
         """
@@ -118,6 +120,8 @@ class CoprJobGrab(object):
 
                 task_obj = Task(task)
                 self.task_queues_by_arch[arch].enqueue(task_obj)
+                self.metrics.inc("copr_jobgrab_tasks_total",
+                                 group=self.opts.build_groups[group_id]["name"])
                 count += 1
 
         else:
@@ -0,0 +1,224 @@
+# coding: utf-8
+
+"""
+Content addressed store for build results.
+
+Identical rpms (noarch subpackages, srpms) are produced byte-for-byte for every
+chroot of the build and for every rebuild of the same sources. Files from the
+result directories are hardlinked into the shared store located at
+``opts.content_store_dir``::
+
+    <content_store_dir>/<sha256[:2]>/<sha256>
+
+The store must live at the same filesystem as ``opts.destdir``. The link count
+of the store entry is used as a reference counter: entry with ``st_nlink == 1``
+is not referenced by any result directory and could be removed.
+
+Files in the result directories are never modified in place (rsync and
+createrepo_c write a new file and rename it over the old one, hardlinked rpms
+are signed as a copy, see :py:func:`backend.sign._sign_one`), so sharing
+inodes between directories is safe.
+
+Results are deduplicated after signing. Every signing adds its own signature,
+so signed rpms of different chroots differ and only the results reused by
+skipped builds share the store entries in the signed projects.
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+import errno
+import hashlib
+import os
+import shutil
+import stat
+
+DEDUP_EXTENSIONS = (".rpm",)
+CHECKSUM_BLOCK_SIZE = 1024 * 1024
+
+
+def file_checksum(path):
+    """
+    :return str: sha256 hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(CHECKSUM_BLOCK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_store_path(store_dir, checksum):
+    return os.path.join(store_dir, checksum[:2], checksum)
+
+
+def _iter_files(path):
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            if filename.endswith(DEDUP_EXTENSIONS):
+                yield os.path.join(root, filename)
+
+
+def _link_over(src, dst):
+    """
+    Atomically replaces ``dst`` with a hardlink to ``src``
+    """
+    tmp_path = "{}.dedup-{}".format(dst, os.getpid())
+    silent_unlink(tmp_path)
+    os.link(src, tmp_path)
+    os.rename(tmp_path, dst)
+
+
+def silent_unlink(path):
+    try:
+        os.unlink(path)
+    except OSError as error:
+        if error.errno != errno.ENOENT:
+            raise
+
+
+def dedup_file(file_path, store_dir):
+    """
+    Replaces file with a hardlink to the store entry with the same content,
+    or registers the file in the store when such entry doesn't exist yet.
+
+    :return int: number of reclaimed bytes
+    """
+    file_stat = os.lstat(file_path)
+    if not stat.S_ISREG(file_stat.st_mode):
+        return 0
+
+    store_path = get_store_path(store_dir, file_checksum(file_path))
+    store_subdir = os.path.dirname(store_path)
+    if not os.path.exists(store_subdir):
+        try:
+            os.makedirs(store_subdir)
+        except OSError as error:
+            if error.errno != errno.EEXIST:
+                raise
+
+    try:
+        os.link(file_path, store_path)
+        return 0
+    except OSError as error:
+        if error.errno != errno.EEXIST:
+            raise
+
+    store_stat = os.stat(store_path)
+    if store_stat.st_ino == file_stat.st_ino and store_stat.st_dev == file_stat.st_dev:
+        return 0
+
+    _link_over(store_path, file_path)
+    # the old inode is freed only when nothing else references it
+    return file_stat.st_size if file_stat.st_nlink == 1 else 0
+
+
+def dedup_results_dir(results_dir, store_dir, log):
+    """
+    Hardlinks identical files from ``results_dir`` into the content store.
+
+    :type log: logging.Logger
+    :return int: number of reclaimed bytes
+    """
+    reclaimed = 0
+    for file_path in _iter_files(results_dir):
+        try:
+            reclaimed += dedup_file(file_path, store_dir)
+        except (OSError, IOError) as error:
+            log.exception("Failed to deduplicate {}: {}".format(file_path, error))
+
+    log.info("Deduplicated {}, reclaimed {} bytes".format(results_dir, reclaimed))
+    return reclaimed
+
+
+def link_results_dir(src_dir, dst_dir):
+    """
+    Hardlinks the packages and the ``success`` mark of ``src_dir`` into
+    ``dst_dir``, used to reuse results of an identical build. Files already
+    present in the content store stay referenced by the new directory as well.
+
+    Logs, build.info, build-stats.json and backups of the previous builds
+    describe the original build, so they are not linked.
+    """
+    if not os.path.isdir(dst_dir):
+        os.makedirs(dst_dir)
+
+    for filename in os.listdir(src_dir):
+        src_path = os.path.join(src_dir, filename)
+        if not os.path.isfile(src_path):
+            continue
+        if not (filename.endswith(".rpm") or filename == "success"):
+            continue
+
+        target_path = os.path.join(dst_dir, filename)
+        silent_unlink(target_path)
+        os.link(src_path, target_path)
+
+
+def release_tree(path, store_dir, log):
+    """
+    Drops store entries referenced only by files from ``path``,
+    should be called before the directory removal.
+
+    :type log: logging.Logger
+    """
+    for file_path in _iter_files(path):
+        try:
+            file_stat = os.lstat(file_path)
+            # the file itself and the store entry
+            if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_nlink != 2:
+                continue
+
+            store_path = get_store_path(store_dir, file_checksum(file_path))
+            try:
+                store_stat = os.stat(store_path)
+            except OSError:
+                continue
+
+            if store_stat.st_ino == file_stat.st_ino and store_stat.st_dev == file_stat.st_dev:
+                log.debug("Releasing content store entry {}".format(store_path))
+                silent_unlink(store_path)
+        except (OSError, IOError) as error:
+            log.exception("Failed to release {} from the content store: {}".format(file_path, error))
+
+
+def remove_tree(path, store_dir, log):
+    """
+    Removes directory with results, releasing entries in the content store.
+    When ``store_dir`` is None it behaves like ``shutil.rmtree``.
+
+    :type log: logging.Logger
+    """
+    if store_dir:
+        release_tree(path, store_dir, log)
+    shutil.rmtree(path)
+
+
+def prune_content_store(store_dir, log):
+    """
+    Removes store entries which are not referenced by any results directory.
+
+    :type log: logging.Logger
+    :return int: number of removed entries
+    """
+    removed = 0
+    if not os.path.isdir(store_dir):
+        return removed
+
+    for root, _, filenames in os.walk(store_dir):
+        for filename in filenames:
+            store_path = os.path.join(root, filename)
+            try:
+                if os.lstat(store_path).st_nlink == 1:
+                    silent_unlink(store_path)
+                    removed += 1
+            except OSError as error:
+                log.exception("Failed to prune content store entry {}: {}".format(store_path, error))
+
+    log.info("Removed {} unreferenced entries from the content store {}".format(removed, store_dir))
+    return removed
@@ -2,6 +2,8 @@ import json
 from requests import post, RequestException
 import time
 
+from .metrics import Metrics
+
 
 class FrontendClient(object):
     """
@@ -12,6 +14,7 @@ class FrontendClient(object):
         super(FrontendClient, self).__init__()
         self.frontend_url = "{}/backend".format(opts.frontend_base_url)
         self.frontend_auth = opts.frontend_auth
+        self.metrics = Metrics(opts)
 
         self.msg = None
 
@@ -26,6 +29,7 @@ class FrontendClient(object):
 
         self.msg = None
 
+        start = time.time()
         try:
             response = post(url, data=json.dumps(data), auth=auth, headers=headers)
             if response.status_code >= 400:
@@ -34,7 +38,10 @@ class FrontendClient(object):
                 raise RequestException(self.msg)
         except RequestException as e:
             self.msg = "Post request failed: {0}".format(e)
+            self.metrics.inc("copr_frontend_request_failures_total", endpoint=url_path)
             raise
+        finally:
+            self.metrics.observe("copr_frontend_request_seconds", time.time() - start, endpoint=url_path)
         return response
 
     def _post_to_frontend_repeatedly(self, data, url_path, max_repeats=10):
@@ -78,3 +85,14 @@ class FrontendClient(object):
         response = self._post_to_frontend({}, "reschedule_all_running")
         if response.status_code != 200:
             raise RequestException("Failed to reschedule all running jobs")
+
+    def get_projects_settings(self, full_names):
+        """
+        Fetch settings of many projects in a single request
+
+        :param list full_names: of "<owner>/<project>", group projects use "@<group>"
+        :return dict: full name -> dict with keys auto_createrepo, chroots, repos
+            and buildroot_pkgs, projects which don't exist are omitted
+        """
+        response = self._post_to_frontend({"projects": full_names}, "projects_settings")
+        return response.json()["projects"]
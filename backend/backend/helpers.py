@@ -149,6 +149,18 @@ class BackendConfigReader(object):
                 "max_workers": _get_conf(
                     cp, "backend", "group{0}_max_workers".format(group_id),
                     default=32, mode="int"),
+                "worker_threads": _get_conf(
+                    cp, "backend", "group{0}_worker_threads".format(group_id),
+                    default=1, mode="int"),
+                "warm_up_chroots": _get_conf(
+                    cp, "backend", "group{0}_warm_up_chroots".format(group_id),
+                    default=0, mode="int"),
+                "warm_up_timeout": _get_conf(
+                    cp, "backend", "group{0}_warm_up_timeout".format(group_id),
+                    default=600, mode="int"),
+                "repo_proxy_url": _get_conf(
+                    cp, "backend", "group{0}_repo_proxy_url".format(group_id),
+                    default=None),
                 "max_vm_total": _get_conf(
                     cp, "backend", "group{}_max_vm_total".format(group_id),
                     # default=16, mode="int"),
@@ -192,10 +204,19 @@ class BackendConfigReader(object):
 
         opts.destdir = _get_conf(cp, "backend", "destdir", None, mode="path")
 
+        opts.content_store_dir = _get_conf(
+            cp, "backend", "content_store_dir", None, mode="path")
+
         opts.exit_on_worker = _get_conf(
             cp, "backend", "exit_on_worker", False, mode="bool")
         opts.fedmsg_enabled = _get_conf(
             cp, "backend", "fedmsg_enabled", False, mode="bool")
+        opts.metrics_enabled = _get_conf(
+            cp, "backend", "metrics_enabled", False, mode="bool")
+        opts.metrics_host = _get_conf(
+            cp, "backend", "metrics_host", "127.0.0.1")
+        opts.metrics_port = _get_conf(
+            cp, "backend", "metrics_port", 9612, mode="int")
         opts.sleeptime = _get_conf(
             cp, "backend", "sleeptime", 10, mode="int")
         opts.timeout = _get_conf(
@@ -212,6 +233,9 @@ class BackendConfigReader(object):
 
         opts.prune_days = _get_conf(cp, "backend", "prune_days", None, mode="int")
 
+        opts.project_settings_ttl = _get_conf(
+            cp, "backend", "project_settings_ttl", 300, mode="int")
+
         # ssh options
         opts.ssh = Munch()
         # TODO: ansible Runner show some magic bugs with transport "ssh", using paramiko
@@ -225,7 +249,16 @@ class BackendConfigReader(object):
         return opts
 
 
-def get_auto_createrepo_status(front_url, username, projectname):
+def get_auto_createrepo_status(front_url, username, projectname, opts=None):
+    """
+    :param Munch opts: backend config, when given the cached project settings
+        are used instead of querying the project details
+    """
+    if opts is not None:
+        # project_settings imports this module through frontend and metrics
+        from .project_settings import get_project_settings
+        return bool(get_project_settings(opts, username, projectname)["auto_createrepo"])
+
     client = CoprClient(copr_url=front_url)
     result = client.get_project_details(projectname, username)
 
@@ -16,6 +16,8 @@ class BuildJob(object):
                 - project_owner:
                 - project_name:
                 - submitter:
+                - cache_key: identifies sources and build environment
+                - cached_result_dir: results dir name of an identical finished build
 
             :param dict worker_opts: worker options, fields::
 
@@ -56,6 +58,16 @@ class BuildJob(object):
         self.pkg_epoch = None
         self.pkg_release = None
 
+        # build cache, see frontend BuildChrootsLogic.get_cache_key
+        self.cache_key = None
+        self.cached_result_dir = None
+
+        # set by worker from the build group config
+        self.repo_proxy_url = None
+
+        # see backend.build_stats
+        self.build_stats = {"phases": {}, "resources": {}}
+
 
         # TODO: validate update data, user marshmallow
         for key, val in task_data.items():
@@ -0,0 +1,184 @@
+# coding: utf-8
+
+"""
+Prometheus-style metrics of the backend daemons.
+
+Backend runs as a set of processes (job grabber, VM manager, workers), so
+samples are not kept in memory but aggregated in redis hash ``KEY_METRICS``,
+one field per sample, e.g.::
+
+    copr_frontend_request_seconds_count{endpoint="update"} -> "42"
+
+``copr_metrics_exporter.py`` serves the samples together with the gauges
+computed at the scrape time (queue lengths, VM counts) over HTTP in the
+Prometheus text exposition format.
+
+Recording is disabled unless ``metrics_enabled`` is set in the backend config,
+errors during recording are ignored, metrics must never break a build.
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+from collections import defaultdict
+
+from .helpers import get_redis_connection
+from .vm_manage import KEY_VM_POOL, KEY_VM_INSTANCE
+
+KEY_METRICS = "copr:backend:metrics:hset::"
+
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PHASE_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+BUILD_BUCKETS = (60, 300, 600, 1800, 3600, 7200, 14400, 36000)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    "copr_builds_total": (
+        "counter", "Finished builds", None),
+    "copr_build_duration_seconds": (
+        "histogram", "Duration of the build from the start to the end announcement", BUILD_BUCKETS),
+    "copr_build_phase_seconds": (
+        "histogram", "Duration of the build phases, see backend.build_stats", PHASE_BUCKETS),
+    "copr_frontend_request_seconds": (
+        "histogram", "Latency of the requests to the frontend", REQUEST_BUCKETS),
+    "copr_frontend_request_failures_total": (
+        "counter", "Failed requests to the frontend", None),
+    "copr_jobgrab_tasks_total": (
+        "counter", "Build tasks routed into the builder group queues", None),
+    "copr_vmm_events_total": (
+        "counter", "Events processed by the VM manager", None),
+    "copr_build_queue_length": (
+        "gauge", "Build tasks waiting in the builder group queue", None),
+    "copr_vms": (
+        "gauge", "VMs in the builder group pool by state", None),
+}
+
+
+def format_sample(name, labels=None):
+    """
+    :return str: sample name in the exposition format, labels are sorted by name
+    """
+    if not labels:
+        return name
+    return "{}{{{}}}".format(name, ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in sorted(labels.items())))
+
+
+def _family_name(sample):
+    name = sample.split("{", 1)[0]
+    for suffix in ["_bucket", "_sum", "_count"]:
+        if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+            return name[:-len(suffix)]
+    return name
+
+
+def _format_le(bound):
+    return "{:g}".format(bound)
+
+
+class Metrics(object):
+    """
+    Records counters and histograms defined in :py:data:`METRICS`
+
+    :param Munch opts: backend config
+    :param log: optional logger for the recording errors
+    """
+
+    def __init__(self, opts, log=None):
+        self.opts = opts
+        self.log = log
+        self.enabled = getattr(opts, "metrics_enabled", False)
+        self._rc = None
+
+    @property
+    def rc(self):
+        if self._rc is None:
+            self._rc = get_redis_connection(self.opts)
+        return self._rc
+
+    def _record(self, fill_pipe):
+        if not self.enabled:
+            return
+        try:
+            pipe = self.rc.pipeline()
+            fill_pipe(pipe)
+            pipe.execute()
+        except Exception as error:
+            if self.log:
+                self.log.warning("Failed to record metrics: {}".format(error))
+
+    def inc(self, name, value=1, **labels):
+        """
+        Increments counter ``name``
+        """
+        def fill_pipe(pipe):
+            pipe.hincrbyfloat(KEY_METRICS, format_sample(name, labels), value)
+
+        self._record(fill_pipe)
+
+    def observe(self, name, value, **labels):
+        """
+        Records ``value`` into histogram ``name``
+        """
+        def fill_pipe(pipe):
+            for bound in METRICS[name][2]:
+                if value <= bound:
+                    bucket_labels = dict(labels, le=_format_le(bound))
+                    pipe.hincrby(KEY_METRICS, format_sample(name + "_bucket", bucket_labels), 1)
+            pipe.hincrby(KEY_METRICS, format_sample(name + "_bucket", dict(labels, le="+Inf")), 1)
+            pipe.hincrbyfloat(KEY_METRICS, format_sample(name + "_sum", labels), value)
+            pipe.hincrby(KEY_METRICS, format_sample(name + "_count", labels), 1)
+
+        self._record(fill_pipe)
+
+
+def collect_pool_gauges(opts, rc):
+    """
+    Computes gauges which describe the current state of the backend:
+    queue length and VM count by state for each builder group.
+
+    :return dict: sample name -> value
+    """
+    gauges = {}
+    for group in opts.build_groups:
+        labels = {"group": group["name"]}
+        queue_key = "retaskqueue-copr-be-{}".format(group["id"])
+        gauges[format_sample("copr_build_queue_length", labels)] = rc.llen(queue_key)
+
+        vm_names = rc.smembers(KEY_VM_POOL.format(group=group["id"]))
+        pipe = rc.pipeline()
+        for vm_name in vm_names:
+            pipe.hget(KEY_VM_INSTANCE.format(vm_name=vm_name), "state")
+
+        counts = defaultdict(int)
+        for state in pipe.execute():
+            if state is not None:
+                counts[state] += 1
+        for state, count in counts.items():
+            gauges[format_sample("copr_vms", dict(labels, state=state))] = count
+
+    return gauges
+
+
+def render_metrics(samples):
+    """
+    :param dict samples: sample name -> value
+    :return str: samples in the Prometheus text exposition format
+    """
+    families = defaultdict(list)
+    for sample, value in samples.items():
+        families[_family_name(sample)].append((sample, value))
+
+    lines = []
+    for family in sorted(families):
+        if family in METRICS:
+            metric_type, help_text, _ = METRICS[family]
+            lines.append("# HELP {} {}".format(family, help_text))
+            lines.append("# TYPE {} {}".format(family, metric_type))
+        for sample, value in sorted(families[family]):
+            lines.append("{} {}".format(sample, value))
+
+    return "\n".join(lines) + "\n"
@@ -39,6 +39,9 @@ import os
 from munch import Munch
 import time
 
+from copr.exceptions import RpmHeaderError
+from copr.rpm_header import read_header
+
 from ..constants import DEF_REMOTE_BASEDIR, DEF_BUILD_TIMEOUT, DEF_REPOS, \
     DEF_BUILD_USER, DEF_MACROS
 from ..exceptions import MockRemoteError, BuilderError, CreateRepoError
@@ -47,6 +50,8 @@ from ..exceptions import MockRemoteError, BuilderError, CreateRepoError
 # TODO: replace sign & createrepo with dependency injection
 from ..sign import sign_rpms_in_dir, get_pubkey
 from ..createrepo import createrepo
+from ..dedup import dedup_results_dir
+from ..build_stats import measure_phase, add_mock_phases
 
 from .builder import Builder
 
@@ -110,6 +115,8 @@ class MockRemote(object):
             :ivar results_baseurl: base url for the built results
             :ivar remote_basedir: basedir on builder
             :ivar remote_tempdir: tempdir on builder
+            :ivar content_store_dir: [optional] shared store to deduplicate
+                identical rpms, see :py:mod:`backend.dedup`
 
         # Removed:
         # :param cont: if a pkg fails to build, continue to the next one--
@@ -123,6 +130,7 @@ class MockRemote(object):
             build_user=DEF_BUILD_USER,
             remote_basedir=DEF_REMOTE_BASEDIR,
             remote_tempdir=None,
+            content_store_dir=None,
         )
         if opts:
             self.opts.update(opts)
@@ -235,6 +243,7 @@ class MockRemote(object):
                 base_url=base_url,
                 username=self.job.project_owner,
                 projectname=self.job.project_name,
+                opts=self.opts,
             )
         except CreateRepoError:
             self.log.exception("Error making local repo: {}".format(self.chroot_dir))
@@ -242,14 +251,32 @@ class MockRemote(object):
             # FIXME - maybe clean up .repodata and .olddata
             # here?
 
+    def dedup_results(self):
+        """
+            Hardlinks identical rpms from the job results dir into the content store.
+            Should be done after signing, since signed rpms differ between projects
+            and signing replaces the hardlinked rpms by signed copies anyway.
+        """
+        try:
+            dedup_results_dir(self.job.results_dir, self.opts.content_store_dir, self.log)
+        except Exception as error:
+            self.log.exception("Failed to deduplicate results of {}: {}"
+                               .format(self.job, error))
+
     def on_success_build(self):
         self.log.info("Success building {0}".format(self.job.package_name))
 
         if self.opts.do_sign:
-            self.sign_built_packages()
+            with measure_phase(self.job, "sign"):
+                self.sign_built_packages()
+
+        if self.opts.content_store_dir:
+            with measure_phase(self.job, "dedup"):
+                self.dedup_results()
 
         # createrepo with the new pkgs
-        self.do_createrepo()
+        with measure_phase(self.job, "createrepo"):
+            self.do_createrepo()
 
     def prepare_build_dir(self):
         p_path = self.job.results_dir
@@ -279,8 +306,11 @@ class MockRemote(object):
     #     except Exception as err:
     #         self.log.exception(err)
 
-    def build_pkg_and_process_results(self):
+    def build_pkg(self):
         """
+        Builds package on the builder and downloads results, after this step
+        builder VM is no longer needed.
+
         :return: dict with build_details
         :raises MockRemoteError: Something happened with build itself
         :raises VmError: Something happened with builder VM
@@ -292,23 +322,54 @@ class MockRemote(object):
 
         try:
             build_stdout = self.builder.build()
-            build_details = {"built_packages": self.builder.collect_built_packages()}
-
-            self.log.info("builder.build finished; details: {}\n stdout: {}"
-                          .format(build_details, build_stdout))
+            self.log.info("builder.build finished; stdout: {}".format(build_stdout))
         except BuilderError as error:
             self.log.exception("builder.build error building pkg `{}`: {}"
                                .format(self.job.package_name, error))
             raise MockRemoteError("Error occurred during build {}: {}"
                                   .format(self.job, error))
         finally:
-            self.builder.download(self.job.results_dir)
+            self.collect_resource_usage()
+            with measure_phase(self.job, "download"):
+                self.builder.download(self.job.results_dir)
+            add_mock_phases(self.job, self.job.results_dir)
             # self.add_log_symlinks()  # todo: add config option, need this for nginx
             self.log.info("End Build: {0}".format(self.job))
 
-        self.on_success_build()
+        build_details = {"built_packages": self.collect_built_packages()}
+        self.log.info("Build details: {}".format(build_details))
         return build_details
 
+    def collect_built_packages(self):
+        """
+        Lists binary packages in the downloaded results, headers are read
+        locally instead of running `rpm -qp` for each package at the builder
+
+        :return str: "name version" line for each package
+        """
+        self.log.info("Listing built binary packages")
+        built_packages = []
+        for name in sorted(os.listdir(self.job.results_dir)):
+            if not name.endswith(".rpm") or name.endswith(".src.rpm"):
+                continue
+            try:
+                header = read_header(os.path.join(self.job.results_dir, name))
+            except (IOError, RpmHeaderError) as error:
+                self.log.error("Failed to read header of {}: {}".format(name, error))
+                continue
+            built_packages.append("{} {}".format(header.name, header.version))
+        return "\n".join(built_packages)
+
+    def collect_resource_usage(self):
+        """
+            Stores builder resource usage into the job build stats,
+            failure here shouldn't affect the build result.
+        """
+        try:
+            self.job.build_stats["resources"].update(self.builder.collect_resource_usage())
+        except Exception as error:
+            self.log.exception("Failed to collect resource usage from builder: {}".format(error))
+
     def mark_dir_with_build_id(self):
         """
             Places "build.info" which contains job build_id
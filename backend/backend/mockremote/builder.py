@@ -12,6 +12,7 @@ from ..helpers import get_redis_connection
 from ..exceptions import BuilderError, BuilderTimeOutError, AnsibleCallError, AnsibleResponseError, VmError
 
 from ..constants import mockchain, rsync, DEF_BUILD_TIMEOUT
+from ..build_stats import measure_phase
 
 
 class Builder(object):
@@ -40,6 +41,10 @@ class Builder(object):
     def remote_build_dir(self):
         return self.tempdir + "/build/"
 
+    @property
+    def resource_usage_path(self):
+        return self.tempdir + "/resource_usage"
+
     @property
     def tempdir(self):
         if self._remote_tempdir:
@@ -166,18 +171,41 @@ class Builder(object):
             self.log.exception(err)
             raise
 
-    def collect_built_packages(self):
-        self.log.info("Listing built binary packages")
+    def wrap_with_resource_usage(self, buildcmd):
+        """
+        Runs build command under GNU time when it is available at the builder,
+        see :py:meth:`collect_resource_usage`
+        """
+        return "$(test -x /usr/bin/time && echo /usr/bin/time -o {} -f %e,%U,%S,%M) {}".format(
+            pipes.quote(self.resource_usage_path), buildcmd)
+
+    def collect_resource_usage(self):
+        """
+        :return dict: cpu time and peak memory of the build command,
+            disk space used by /var/lib/mock after the build (not the
+            whole filesystem, it is shared with the rest of the builder)
+        """
         results = self._run_ansible(
-            "cd {0} && "
-            "for f in `ls *.rpm |grep -v \"src.rpm$\"`; do"
-            "   rpm -qp --qf \"%{{NAME}} %{{VERSION}}\n\" $f; "
-            "done".format(pipes.quote(self._get_remote_results_dir()))
-        )
+            "cat {}; du -sk /var/lib/mock 2>/dev/null".format(pipes.quote(self.resource_usage_path)))
+        stdout = list(results["contacted"].values())[0][u"stdout"]
 
-        built_packages = list(results["contacted"].values())[0][u"stdout"]
-        self.log.info("Built packages:\n{}".format(built_packages))
-        return built_packages
+        usage = {}
+        for line in stdout.splitlines():
+            try:
+                time_fields = line.strip().split(",")
+                if len(time_fields) == 4:
+                    usage["wall_time"], usage["cpu_user"], usage["cpu_system"] = \
+                        [float(value) for value in time_fields[:3]]
+                    usage["max_rss_kb"] = int(time_fields[3])
+
+                # <size in KiB> <path>
+                du_fields = line.split()
+                if len(du_fields) == 2 and du_fields[1] == "/var/lib/mock":
+                    usage["disk_used_kb"] = int(du_fields[0])
+            except ValueError:
+                self.log.debug("Unexpected resource usage line: {}".format(line))
+
+        return usage
 
     def check_build_success(self):
         successfile = os.path.join(self._get_remote_results_dir(), "success")
@@ -214,6 +242,23 @@ class Builder(object):
 
         self.log.info("Got srpm to build: {}".format(self.remote_pkg_path))
 
+    def proxy_repo_url(self, repo_url):
+        """
+            Rewrites repo url to be fetched through the caching proxy of the build group::
+
+                http://example.com/repo/ -> <repo_proxy_url>/http/example.com/repo/
+        """
+        proxy_url = self.job.repo_proxy_url
+        if not proxy_url:
+            return repo_url
+
+        parsed_url = urlparse(repo_url)
+        if parsed_url.scheme not in ["http", "https"]:
+            return repo_url
+
+        return "/".join([proxy_url.rstrip("/"), parsed_url.scheme,
+                         repo_url.split("://", 1)[1]])
+
     def pre_process_repo_url(self, repo_url):
         """
             Expands variables and sanitize repo url to be used for mock config
@@ -232,7 +277,7 @@ class Builder(object):
                 repo_url = repo_url.replace("$chroot", self.job.chroot)
                 repo_url = repo_url.replace("$distname", self.job.chroot.split("-")[0])
 
-            return pipes.quote(repo_url)
+            return pipes.quote(self.proxy_repo_url(repo_url))
         except Exception as err:
             self.log.exception("Failed to pre-process repo url: {}".format(err))
             return None
@@ -314,12 +359,14 @@ class Builder(object):
         self.modify_mock_chroot_config()
 
         # download the package to the builder
-        self.download_job_pkg_to_builder()
+        with measure_phase(self.job, "srpm_fetch"):
+            self.download_job_pkg_to_builder()
 
         # construct the mockchain command
-        buildcmd = self.gen_mockchain_command()
+        buildcmd = self.wrap_with_resource_usage(self.gen_mockchain_command())
         # run the mockchain command async
-        ansible_build_results = self.run_build_and_wait(buildcmd)  # now raises BuildTimeoutError
+        with measure_phase(self.job, "mockchain"):
+            ansible_build_results = self.run_build_and_wait(buildcmd)  # now raises BuildTimeoutError
         check_for_ans_error(ansible_build_results, self.hostname)  # on error raises AnsibleResponseError
 
         # we know the command ended successfully but not if the pkg built
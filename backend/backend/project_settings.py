@@ -0,0 +1,118 @@
+# coding: utf-8
+
+"""
+Cache of project settings (auto_createrepo, chroots, repos, buildroot_pkgs)
+fetched from the frontend.
+
+Settings are fetched in bulk through ``/backend/projects_settings/`` and kept
+in redis for ``opts.project_settings_ttl`` seconds under::
+
+    copr:backend:project_settings::<owner>/<project>
+
+Frontend queues ``update_project_settings`` action whenever the settings
+change, the action drops the cached entry. The TTL only bounds staleness when
+an invalidation gets lost. When redis is unavailable settings are fetched
+directly.
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+import json
+import logging
+
+from redis.exceptions import RedisError
+from requests import RequestException
+
+from copr.exceptions import CoprRequestException
+
+from .frontend import FrontendClient
+from .helpers import get_redis_connection
+
+log = logging.getLogger(__name__)
+
+KEY_PROJECT_SETTINGS = "copr:backend:project_settings::{}"
+DEF_PROJECT_SETTINGS_TTL = 300
+# same as the frontend limit of a single request
+FETCH_CHUNK_SIZE = 500
+
+
+def _full_name(username, projectname):
+    return "{}/{}".format(username, projectname)
+
+
+def _fetch(opts, full_names):
+    client = FrontendClient(opts)
+    settings = {}
+    for start in range(0, len(full_names), FETCH_CHUNK_SIZE):
+        chunk = full_names[start:start + FETCH_CHUNK_SIZE]
+        try:
+            settings.update(client.get_projects_settings(chunk))
+        except (RequestException, ValueError, KeyError) as err:
+            raise CoprRequestException(
+                "Failed to get settings of projects from frontend: {}".format(err))
+    return settings
+
+
+def get_projects_settings(opts, full_names):
+    """
+    :param Munch opts: backend config
+    :param list full_names: of "<owner>/<project>", group projects use "@<group>"
+    :return dict: full name -> settings dict, projects which don't exist are omitted
+    :raises CoprRequestException: when the frontend can't be reached
+    """
+    full_names = list(set(full_names))
+    settings = {}
+    try:
+        rc = get_redis_connection(opts)
+        cached = rc.mget([KEY_PROJECT_SETTINGS.format(name) for name in full_names])
+    except RedisError as err:
+        log.warning("Project settings cache unavailable: {}".format(err))
+        rc, cached = None, []
+
+    for full_name, value in zip(full_names, cached):
+        if value is not None:
+            settings[full_name] = json.loads(value)
+
+    missing = [name for name in full_names if name not in settings]
+    if not missing:
+        return settings
+
+    fetched = _fetch(opts, missing)
+    settings.update(fetched)
+    if rc is not None and fetched:
+        ttl = getattr(opts, "project_settings_ttl", DEF_PROJECT_SETTINGS_TTL)
+        try:
+            pipe = rc.pipeline()
+            for full_name, value in fetched.items():
+                pipe.setex(KEY_PROJECT_SETTINGS.format(full_name), ttl, json.dumps(value))
+            pipe.execute()
+        except RedisError as err:
+            log.warning("Failed to cache project settings: {}".format(err))
+    return settings
+
+
+def get_project_settings(opts, username, projectname):
+    """
+    :return dict: settings of a single project
+    :raises CoprRequestException: when the project doesn't exist
+        or the frontend can't be reached
+    """
+    full_name = _full_name(username, projectname)
+    settings = get_projects_settings(opts, [full_name])
+    if full_name not in settings:
+        raise CoprRequestException("Project {} does not exists".format(full_name))
+    return settings[full_name]
+
+
+def invalidate_project_settings(opts, username, projectname):
+    """
+    Drops the cached settings, next access fetches them from frontend
+    """
+    try:
+        get_redis_connection(opts).delete(
+            KEY_PROJECT_SETTINGS.format(_full_name(username, projectname)))
+    except RedisError as err:
+        log.warning("Failed to invalidate project settings: {}".format(err))
@@ -9,6 +9,7 @@ from subprocess import Popen, PIPE
 import json
 
 import os
+import shutil
 from requests import request
 
 from .exceptions import CoprSignError, CoprSignNoKeyError, \
@@ -66,7 +67,7 @@ def get_pubkey(username, projectname, outfile=None):
     return stdout
 
 
-def _sign_one(path, email):
+def _run_sign(path, email):
     cmd = ["sudo", SIGN_BINARY, "-u", email, "-r", path]
 
     try:
@@ -90,6 +91,40 @@ def _sign_one(path, email):
     return stdout, stderr
 
 
+def _sign_one(path, email):
+    """
+    Rpm hardlinked to other results (e.g. through the content store) is
+    signed as a private copy which then replaces it, /bin/sign would
+    otherwise change the packages of the other builds as well.
+    """
+    try:
+        hardlinked = os.stat(path).st_nlink > 1
+    except OSError:
+        hardlinked = False
+
+    if not hardlinked:
+        return _run_sign(path, email)
+
+    sign_path = "{}.signing".format(path)
+    shutil.copy2(path, sign_path)
+    try:
+        result = _run_sign(sign_path, email)
+        os.rename(sign_path, path)
+        return result
+    finally:
+        if os.path.exists(sign_path):
+            os.unlink(sign_path)
+
+
+def sign_rpm(username, projectname, path):
+    """
+    Signs one rpm by the project key, the key must exist
+
+    :raises: :py:class:`backend.exceptions.CoprSignError`
+    """
+    return _sign_one(path, create_gpg_email(username, projectname))
+
+
 def sign_rpms_in_dir(username, projectname, path, opts, log):
     """
     Signs rpms using obs-signd.
@@ -135,20 +170,24 @@ def sign_rpms_in_dir(username, projectname, path, opts, log):
                             .format([err[0] for err in errors]))
 
 
-def create_user_keys(username, projectname, opts):
+def create_user_keys(username, projectname, opts, wait=True):
     """
     Generate a new key-pair at sign host
 
     :param username:
     :param projectname:
     :param opts: backend config
+    :param wait: when False keygen only starts generation in background
 
     :return: None
     """
-    data = json.dumps({
+    query_data = {
         "name_real": "{}_{}".format(username, projectname),
         "name_email": create_gpg_email(username, projectname)
-    })
+    }
+    if not wait:
+        query_data["async"] = True
+    data = json.dumps(query_data)
 
     keygen_url = "http://{}/gen_key".format(opts.keygen_host)
     query = dict(url=keygen_url, data=data, method="post")
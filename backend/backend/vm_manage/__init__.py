@@ -37,3 +37,7 @@ KEY_SERVER_INFO = "copr:backend:server_info:hset::"
 
 KEY_VM_INSTANCE = "copr:backend:vm_instance:hset::{vm_name}"
 # hset to store VmDescriptor
+
+KEY_CHROOT_DEMAND = "copr:backend:chroot_demand:hset::{group}"
+# hset chroot -> number of builds requested for `group`, used to select chroots
+# initialized on the newly spawned VM
@@ -7,6 +7,7 @@ import time
 
 from backend.exceptions import VmDescriptorNotFound
 from backend.helpers import get_redis_logger
+from backend.metrics import Metrics
 from backend.vm_manage import VmStates, PUBSUB_MB, EventTopics
 
 
@@ -84,6 +85,7 @@ class EventHandler(Process):
 
         self.log = get_redis_logger(self.vmm.opts, "vmm.event_handler", "vmm")
         self.vmm.set_logger(self.log)
+        self.metrics = Metrics(self.opts, log=self.log)
 
     def post_init(self):
         # todo: move to manager.py, wrap call into VmManager methods
@@ -113,7 +115,8 @@ class EventHandler(Process):
                 self.vmm.start_vm_termination(vmd.vm_name)
 
     def on_vm_spawned(self, msg):
-        self.vmm.add_vm_to_pool(vm_ip=msg["vm_ip"], vm_name=msg["vm_name"], group=msg["group"])
+        self.vmm.add_vm_to_pool(vm_ip=msg["vm_ip"], vm_name=msg["vm_name"], group=msg["group"],
+                                warm_chroots=msg.get("warm_chroots"))
 
     def on_vm_termination_request(self, msg):
         self.terminator.terminate_vm(vm_ip=msg["vm_ip"], vm_name=msg["vm_name"], group=msg["group"])
@@ -172,6 +175,7 @@ class EventHandler(Process):
                         raise Exception("Handler received msg with unknown `topic` field, msg: {}".format(msg))
 
                     self.handlers_map[topic](msg)
+                    self.metrics.inc("copr_vmm_events_total", topic=topic)
 
                 except Exception as err:
                     self.log.exception("Handler error: raw msg: {}, {}".format(raw, err))
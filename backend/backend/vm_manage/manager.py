@@ -16,7 +16,7 @@ from backend.exceptions import VmError, NoVmAvailable, VmDescriptorNotFound
 from backend.helpers import get_redis_connection
 from .models import VmDescriptor
 from . import VmStates, KEY_VM_INSTANCE, KEY_VM_POOL, EventTopics, PUBSUB_MB, KEY_SERVER_INFO, \
-    KEY_VM_POOL_INFO
+    KEY_VM_POOL_INFO, KEY_CHROOT_DEMAND
 from ..helpers import get_redis_logger
 
 # KEYS[1]: VMD key
@@ -67,9 +67,23 @@ if old_state ~= "in_use" then
     return nil
 else
     redis.call("HMSET", KEYS[1], "state", "ready", "last_release", ARGV[1])
-    redis.call("HDEL", KEYS[1], "in_use_since", "used_by_pid", "task_id", "build_id", "chroot")
     redis.call("HINCRBY", KEYS[1], "builds_count", 1)
 
+    -- mock caches for the chroot are present on the VM now
+    local chroot = redis.call("HGET", KEYS[1], "chroot")
+    if chroot and chroot ~= "None" then
+        local warm_chroots = redis.call("HGET", KEYS[1], "warm_chroots") or ""
+        if not string.find(" " .. warm_chroots .. " ", " " .. chroot .. " ", 1, true) then
+            if warm_chroots == "" then
+                warm_chroots = chroot
+            else
+                warm_chroots = warm_chroots .. " " .. chroot
+            end
+            redis.call("HSET", KEYS[1], "warm_chroots", warm_chroots)
+        end
+    end
+    redis.call("HDEL", KEYS[1], "in_use_since", "used_by_pid", "task_id", "build_id", "chroot")
+
     local check_fails = tonumber(redis.call("HGET", KEYS[1], "check_fails"))
     if check_fails > 0 then
         redis.call("HSET", KEYS[1], "state", "check_health_failed")
@@ -107,6 +121,23 @@ if old_state == "check_health" then
 end
 """
 
+# KEYS[1]: chroot demand key
+# ARGV[1]: chroot
+# ARGV[2]: CHROOT_DEMAND_MAX
+record_chroot_demand_lua = """
+local count = redis.call("HINCRBY", KEYS[1], ARGV[1], 1)
+if count >= tonumber(ARGV[2]) then
+    local demand = redis.call("HGETALL", KEYS[1])
+    for i = 1, #demand, 2 do
+        redis.call("HSET", KEYS[1], demand[i], math.floor(tonumber(demand[i + 1]) / 2))
+    end
+end
+return count
+"""
+
+
+CHROOT_DEMAND_MAX = 1000
+
 
 class VmManager(object):
     """
@@ -141,6 +172,7 @@ class VmManager(object):
         self.lua_scripts["release_vm"] = self.rc.register_script(release_vm_lua)
         self.lua_scripts["terminate_vm"] = self.rc.register_script(terminate_vm_lua)
         self.lua_scripts["mark_vm_check_failed"] = self.rc.register_script(mark_vm_check_failed_lua)
+        self.lua_scripts["record_chroot_demand"] = self.rc.register_script(record_chroot_demand_lua)
 
     def set_logger(self, logger):
         """
@@ -157,7 +189,7 @@ class VmManager(object):
         """
         return range(self.opts.build_groups_count)
 
-    def add_vm_to_pool(self, vm_ip, vm_name, group):
+    def add_vm_to_pool(self, vm_ip, vm_name, group, warm_chroots=None):
         """
         Adds newly spawned VM into the pool of available builders
 
@@ -165,6 +197,7 @@ class VmManager(object):
         :param str vm_name: VM name
         :param group: builder group
         :type group: int
+        :param list warm_chroots: chroots initialized during the VM warm-up
         :rtype: VmDescriptor
         """
         # print("\n ADD VM TO POOL")
@@ -172,6 +205,8 @@ class VmManager(object):
             raise VmError("Can't add VM `{}` to the pool, such name already used".format(vm_name))
 
         vmd = VmDescriptor(vm_ip, vm_name, group, VmStates.GOT_IP)
+        if warm_chroots:
+            vmd.warm_chroots = " ".join(warm_chroots)
         # print("VMD: {}".format(vmd))
         pipe = self.rc.pipeline()
         pipe.sadd(KEY_VM_POOL.format(group=group), vm_name)
@@ -242,6 +277,8 @@ class VmManager(object):
         dirtied_by_user = [vmd for vmd in ready_vmd_list if vmd.bound_to_user == username]
         clean_list = [vmd for vmd in ready_vmd_list if vmd.bound_to_user is None]
         all_vms = list(chain(dirtied_by_user, clean_list))
+        # VMs with mock caches for the chroot go first, sort is stable
+        all_vms.sort(key=lambda vmd: chroot not in vmd.warm_chroot_list)
 
         for vmd in all_vms:
             if vmd.get_field(self.rc, "check_fails") != "0":
@@ -255,6 +292,22 @@ class VmManager(object):
         else:
             raise NoVmAvailable("No VM are available, please wait in queue. Group: {}".format(group))
 
+    def record_chroot_demand(self, group, chroot):
+        """
+        Counts builds requested for the chroot, counters are halved
+        once any of them reaches CHROOT_DEMAND_MAX to prefer recent demand.
+        """
+        self.lua_scripts["record_chroot_demand"](
+            keys=[KEY_CHROOT_DEMAND.format(group=group)], args=[chroot, CHROOT_DEMAND_MAX])
+
+    def get_most_demanded_chroots(self, group, count):
+        """
+        :return list: at most ``count`` chroot names ordered by the demand
+        """
+        demand = self.rc.hgetall(KEY_CHROOT_DEMAND.format(group=group))
+        ordered = sorted(demand.items(), key=lambda item: int(item[1]), reverse=True)
+        return [chroot for chroot, _ in ordered[:count]]
+
     def release_vm(self, vm_name):
         """
         Return VM into the pool.
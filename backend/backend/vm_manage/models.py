@@ -22,10 +22,17 @@ class VmDescriptor(object):
         self.bound_to_user = None
         # self.used_by_pid = None
 
+        # space separated list of chroots with mock caches present on the VM
+        self.warm_chroots = None
+
     @property
     def vm_key(self):
         return KEY_VM_INSTANCE.format(vm_name=self.vm_name)
 
+    @property
+    def warm_chroot_list(self):
+        return (self.warm_chroots or "").split()
+
     def __str__(self):
         return pformat(self.__dict__)
 
@@ -2,15 +2,18 @@
 
 import json
 import os
+import pipes
 import re
 import time
 
+from ansible.runner import Runner
 from IPy import IP
 
 from ..ans_utils import run_ansible_playbook_cli
 from backend.helpers import get_redis_connection
 from backend.vm_manage import PUBSUB_MB, EventTopics
 from backend.vm_manage.executor import Executor
+from backend.vm_manage.manager import VmManager
 from ..exceptions import CoprSpawnFailError
 from ..helpers import get_redis_logger
 
@@ -66,6 +69,61 @@ def spawn_instance(spawn_playbook, log):
     return {"vm_ip": ipaddr, "vm_name": vm_name}
 
 
+def warm_up_instance(opts, vm_ip, chroots, log, timeout):
+    """
+    Initializes mock root and package caches for the given chroots on the new VM,
+    so the first build of each chroot doesn't wait for the buildroot setup.
+
+    Initialization of all the chroots together is limited by `timeout` seconds,
+    mock is killed on the builder when it runs out (e.g. on a stalled mirror)
+    and the rest of the chroots are skipped.
+
+    :type log: logging.Logger
+    :param int timeout: overall time budget in seconds
+    :return list: chroots initialized successfully
+    """
+    warm_chroots = []
+    deadline = time.time() + timeout
+    for index, chroot in enumerate(chroots):
+        start = time.time()
+        remaining = int(deadline - start)
+        if remaining <= 0:
+            log.warning("Warm up time of VM {} ran out, skipping chroots: {}"
+                        .format(vm_ip, chroots[index:]))
+            break
+
+        connection = Runner(
+            remote_user=opts.build_user,
+            host_list="{},".format(vm_ip),
+            pattern=vm_ip,
+            forks=1,
+            transport=opts.ssh.transport,
+            timeout=opts.vm_ssh_check_timeout
+        )
+        connection.module_name = "shell"
+        # ssh timeout doesn't limit the command itself
+        connection.module_args = "timeout {} /usr/bin/mock -r {} --init".format(
+            remaining, pipes.quote(chroot))
+        try:
+            result = connection.run().get("contacted", {}).get(vm_ip)
+        except Exception as err:
+            log.exception("Failed to warm up chroot {} on VM {}: {}".format(chroot, vm_ip, err))
+            continue
+
+        if result and result.get("rc") == 124:
+            log.error("Warm up of VM {} timed out on chroot {}".format(vm_ip, chroot))
+            break
+
+        if not result or result.get("rc") != 0:
+            log.error("Failed to warm up chroot {} on VM {}: {}".format(chroot, vm_ip, result))
+            continue
+
+        log.info("Chroot {} initialized on VM {} in {} sec".format(chroot, vm_ip, time.time() - start))
+        warm_chroots.append(chroot)
+
+    return warm_chroots
+
+
 def do_spawn_and_publish(opts, spawn_playbook, group):
 
     log = get_redis_logger(opts, "spawner.detached", "spawner")
@@ -81,6 +139,18 @@ def do_spawn_and_publish(opts, spawn_playbook, group):
         log.exception("[Unexpected] Failed to spawn builder: {}".format(err))
         return
 
+    warm_up_count = opts.build_groups[group].get("warm_up_chroots", 0)
+    if warm_up_count:
+        try:
+            vmm = VmManager(opts, logger=log)
+            vmm.post_init()
+            chroots = vmm.get_most_demanded_chroots(group, warm_up_count)
+            spawn_result["warm_chroots"] = warm_up_instance(
+                opts, spawn_result["vm_ip"], chroots, log,
+                opts.build_groups[group].get("warm_up_timeout", 600))
+        except Exception as err:
+            log.exception("Failed to warm up VM {}: {}".format(spawn_result, err))
+
     spawn_result["group"] = group
     spawn_result["topic"] = EventTopics.VM_SPAWNED
     try:
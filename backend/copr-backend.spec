@@ -24,7 +24,7 @@ BuildRequires: yum-utils
 BuildRequires: python-setuptools
 BuildRequires: python-requests
 BuildRequires: python2-devel
-BuildRequires: python-copr >= 1.60
+BuildRequires: python-copr >= 1.63
 BuildRequires: systemd
 BuildRequires: redis
 
@@ -40,7 +40,7 @@ BuildRequires: python-requests
 BuildRequires: python-setproctitle
 # missing python3
 BuildRequires: python-retask
-BuildRequires: python-copr >= 1.60
+BuildRequires: python-copr >= 1.63
 BuildRequires: ansible >= 1.2
 BuildRequires: python-IPy
 BuildRequires: python-paramiko
@@ -70,7 +70,7 @@ Requires:   python-lockfile
 Requires:   python-requests
 Requires:   python-setproctitle
 Requires:   python-retask
-Requires:   python-copr
+Requires:   python-copr >= 1.63
 Requires:   python-six
 Requires:   python-IPy
 Requires:   python-psutil
@@ -177,6 +177,9 @@ cp -a conf/playbooks %{buildroot}%{_pkgdocdir}/
 install -d %{buildroot}%{_pkgdocdir}/examples/%{_sysconfdir}/logstash.d
 cp -a conf/logstash/copr_backend.conf %{buildroot}%{_pkgdocdir}/examples/%{_sysconfdir}/logstash.d/copr_backend.conf
 
+install -d %{buildroot}%{_pkgdocdir}/examples/%{_sysconfdir}/nginx/conf.d
+cp -a conf/nginx/copr-repo-proxy.conf %{buildroot}%{_pkgdocdir}/examples/%{_sysconfdir}/nginx/conf.d/copr-repo-proxy.conf
+
 %if 0%{?fedora}
     cp -a docs/build/html %{buildroot}%{_pkgdocdir}/
 %endif
@@ -0,0 +1,70 @@
+#!/usr/bin/python2
+# coding: utf-8
+
+"""
+Serves backend metrics recorded in redis (see backend.metrics)
+in the Prometheus text format at http://metrics_host:metrics_port/metrics
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+from setproctitle import setproctitle
+
+from backend.helpers import get_backend_opts, get_redis_connection
+from backend.metrics import KEY_METRICS, collect_pool_gauges, render_metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def scrape(opts, rc):
+    """
+    :return str: recorded samples together with the current pool gauges
+    """
+    samples = rc.hgetall(KEY_METRICS)
+    samples.update(collect_pool_gauges(opts, rc))
+    return render_metrics(samples)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    opts = None
+    rc = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        try:
+            body = scrape(self.opts, self.rc).encode("utf-8")
+        except Exception as error:
+            self.send_error(500, str(error))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        # scrapes are periodic, don't flood the journal
+        pass
+
+
+def main():
+    opts = get_backend_opts()
+    MetricsHandler.opts = opts
+    MetricsHandler.rc = get_redis_connection(opts)
+
+    setproctitle("Copr metrics exporter")
+    server = HTTPServer((opts.metrics_host, opts.metrics_port), MetricsHandler)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
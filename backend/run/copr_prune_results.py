@@ -6,10 +6,8 @@ from __future__ import division
 from __future__ import absolute_import
 
 import os
-import shutil
 import sys
 import logging
-from subprocess import Popen, PIPE
 import time
 import pwd
 
@@ -17,17 +15,19 @@ import pwd
 log = logging.getLogger(__name__)
 
 
-from copr.exceptions import CoprException, CoprRequestException
+from copr.exceptions import CoprException, CoprRequestException, RpmHeaderError
+from copr.rpm_header import read_header, label_compare
 
 sys.path.append("/usr/share/copr/")
 
 from backend.helpers import BackendConfigReader, get_auto_createrepo_status
 from backend.createrepo import createrepo_unsafe
+from backend.project_settings import get_projects_settings
+from backend.dedup import remove_tree, prune_content_store
 from backend.exceptions import CreateRepoError
 
 
 DEF_DAYS = 14
-DEF_FIND_OBSOLETE_SCRIPT = "/usr/bin/copr_find_obsolete_builds.sh"
 
 
 def list_subdir(path):
@@ -39,7 +39,7 @@ class Pruner(object):
     def __init__(self, opts):
         self.opts = opts
         self.days = getattr(self.opts, "prune_days", DEF_DAYS)
-        self.find_obsolete_script = getattr(self.opts, "find_obsolete_script", DEF_FIND_OBSOLETE_SCRIPT)
+        self.content_store_dir = getattr(self.opts, "content_store_dir", None)
 
     def prune_failed_builds(self, chroot_path):
         """
@@ -58,34 +58,62 @@ class Pruner(object):
             if os.path.exists(fail_file_path) and not os.path.exists(os.path.join(build_path, "success")):
                 if time.time() - os.path.getmtime(fail_file_path) > self.days:
                     log.info("Removing failed build: {}".format(build_path))
-                    shutil.rmtree(build_path)
+                    remove_tree(build_path, self.content_store_dir, log)
 
-    def prune_obsolete_success_builds(self, chroot_path):
+    def find_obsolete_builds(self, chroot_path):
         """
-        Uses bash script which invokes repoquery to find obsolete build_dirs
+        Finds successful builds older than self.days days whose packages all
+        have a higher version in another build in the chroot. Headers of
+        the packages are read directly, without repoquery.
 
         :param chroot_path: path to the chroot directory
+        :return list: names of the obsolete build directories
         """
-        # import ipdb; ipdb.set_trace()
-        cmd = map(str, [self.find_obsolete_script, chroot_path, self.days])
-        handle = Popen(cmd, stdout=PIPE, stderr=PIPE)
-        stdout, stderr = handle.communicate()
-        if handle.returncode != 0:
-            log.error("Failed to prune old builds at: {} \n STDOUT: \n{}\n STDERR: \n{}\n"
-                      .format(chroot_path, stdout.decode(), stderr.decode()))
-            return
-        # log.debug("find obsolete returned:\n {}\n stderr: \n {}".format(stdout, stderr))
-        for line in stdout.split("\n"):
-            if not line.strip() or (len(line) > 0 and line[0] == "#"):
+        latest = {}
+        builds = {}
+        for build_dir in os.listdir(chroot_path):
+            build_path = os.path.join(chroot_path, build_dir)
+            if not os.path.isdir(build_path):
                 continue
-            to_delete = line.strip()
-            log.debug("Obsolete path, check for remove: {}".format(to_delete))
 
-            if to_delete in os.listdir(chroot_path):
-                to_delete_path = os.path.join(chroot_path, to_delete)
-                if os.path.isdir(to_delete_path):
-                    log.info("Removing obsolete build: {}".format(to_delete_path))
-                    shutil.rmtree(to_delete_path)
+            packages = []
+            for name in os.listdir(build_path):
+                if not name.endswith(".rpm"):
+                    continue
+                try:
+                    header = read_header(os.path.join(build_path, name))
+                except (IOError, RpmHeaderError) as error:
+                    log.warning("Skipping {}: {}".format(os.path.join(build_path, name), error))
+                    continue
+
+                key = (header.name, header.arch)
+                label = (header.epoch, header.version, header.release)
+                if key not in latest or label_compare(label, latest[key]) > 0:
+                    latest[key] = label
+                packages.append((key, label))
+            builds[build_dir] = packages
+
+        obsolete = []
+        for build_dir, packages in builds.items():
+            success_path = os.path.join(chroot_path, build_dir, "success")
+            if not os.path.exists(success_path):
+                continue
+            if time.time() - os.path.getmtime(success_path) <= self.days * 24 * 3600:
+                continue
+            if all(label_compare(label, latest[key]) < 0 for key, label in packages):
+                obsolete.append(build_dir)
+        return obsolete
+
+    def prune_obsolete_success_builds(self, chroot_path):
+        """
+        Deletes obsolete build directories, see :py:meth:`find_obsolete_builds`
+
+        :param chroot_path: path to the chroot directory
+        """
+        for to_delete in self.find_obsolete_builds(chroot_path):
+            to_delete_path = os.path.join(chroot_path, to_delete)
+            log.info("Removing obsolete build: {}".format(to_delete_path))
+            remove_tree(to_delete_path, self.content_store_dir, log)
 
     def run(self):
         results_dir = self.opts.destdir
@@ -97,21 +125,41 @@ class Pruner(object):
 
         counter = 0
         for username, subpath in zip(user_dir_names, user_dirs):
+            if self.content_store_dir and os.path.realpath(subpath) == os.path.realpath(self.content_store_dir):
+                continue
             log.debug("For user `{}` exploring path: {}".format(username, subpath))
-            for projectname, project_path in zip(*list_subdir(subpath)):
+            projectnames, project_paths = list_subdir(subpath)
+            self.prefetch_settings(username, projectnames)
+            for projectname, project_path in zip(projectnames, project_paths):
                 log.debug("Exploring project `{}` with path: {}".format(projectname, project_path))
                 self.prune_project(project_path, username, projectname)
 
                 counter += 1
                 log.info("Pruned {}. projects".format(counter))
 
+        if self.content_store_dir:
+            prune_content_store(self.content_store_dir, log)
+
         log.info("Pruning finished")
 
+    def prefetch_settings(self, username, projectnames):
+        """
+        Fetches settings of all user's projects in a single request,
+        `prune_project` then reads them from the cache
+        """
+        full_names = ["{}/{}".format(username, projectname) for projectname in projectnames]
+        try:
+            get_projects_settings(self.opts, full_names)
+        except CoprRequestException as exception:
+            log.debug("Failed to prefetch settings of projects of {}: {}".format(
+                username, exception))
+
     def prune_project(self, project_path, username, projectname):
         log.info("Going to prune {}/{}".format(username, projectname))
         # get ACR
         try:
-            if not get_auto_createrepo_status(self.opts.frontend_base_url, username, projectname):
+            if not get_auto_createrepo_status(self.opts.frontend_base_url, username, projectname,
+                                              opts=self.opts):
                 log.debug("Skipped {}/{} since auto createrepo option is disabled"
                           .format(username, projectname))
                 return
@@ -0,0 +1,89 @@
+#!/usr/bin/python -tt
+# coding: utf-8
+
+"""
+Prints hit rate of the builders repo caching proxy,
+computed from the nginx access log in the `copr_repo_proxy` format
+(see conf/nginx/copr-repo-proxy.conf).
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+import argparse
+import json
+import re
+import sys
+
+
+DEF_LOG_PATH = "/var/log/nginx/copr-repo-proxy.log"
+
+LINE_RE = re.compile(r'"(?P<request>[^"]*)" (?P<status>\d{3}) (?P<bytes>\d+) "(?P<cache>[^"]*)"\s*$')
+
+# $upstream_cache_status values, response served from the cache
+HIT_STATES = {"HIT", "STALE", "UPDATING", "REVALIDATED"}
+# response fetched from the upstream and stored into the cache
+MISS_STATES = {"MISS", "EXPIRED"}
+
+
+def parse_log(lines):
+    """
+    :return dict: counts of requests and bytes served from the cache,
+        from the upstream and not cacheable at all
+    """
+    stats = {
+        "hit_requests": 0, "hit_bytes": 0,
+        "miss_requests": 0, "miss_bytes": 0,
+        "uncached_requests": 0, "uncached_bytes": 0,
+    }
+    for line in lines:
+        match = LINE_RE.search(line)
+        if not match:
+            continue
+
+        cache_status = match.group("cache")
+        if cache_status in HIT_STATES:
+            kind = "hit"
+        elif cache_status in MISS_STATES:
+            kind = "miss"
+        else:
+            kind = "uncached"
+
+        stats["{}_requests".format(kind)] += 1
+        stats["{}_bytes".format(kind)] += int(match.group("bytes"))
+
+    cacheable_requests = stats["hit_requests"] + stats["miss_requests"]
+    cacheable_bytes = stats["hit_bytes"] + stats["miss_bytes"]
+    stats["hit_rate"] = stats["hit_requests"] / cacheable_requests if cacheable_requests else 0.0
+    stats["byte_hit_rate"] = stats["hit_bytes"] / cacheable_bytes if cacheable_bytes else 0.0
+    return stats
+
+
+def format_stats(stats):
+    return "\n".join([
+        "requests: {hit_requests} hits, {miss_requests} misses, {uncached_requests} not cached",
+        "bytes: {hit_bytes} hits, {miss_bytes} misses, {uncached_bytes} not cached",
+        "hit rate: {hit_rate:.1%}, byte hit rate: {byte_hit_rate:.1%}",
+    ]).format(**stats)
+
+
+def main(args):
+    parser = argparse.ArgumentParser(description="Hit rate of the builders repo caching proxy")
+    parser.add_argument("log_path", nargs="?", default=DEF_LOG_PATH,
+                        help="nginx access log, default: {}".format(DEF_LOG_PATH))
+    parser.add_argument("--json", action="store_true", help="print stats as json")
+    opts = parser.parse_args(args)
+
+    with open(opts.log_path) as handle:
+        stats = parse_log(handle)
+
+    if opts.json:
+        print(json.dumps(stats, sort_keys=True))
+    else:
+        print(format_stats(stats))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -2,166 +2,278 @@
 # coding: utf-8
 
 """
-One-time run script to sign unsigned rpms and  place pubkey gpg to the all projects.
+Signs unsigned rpms and places pubkey gpg into all projects, creates
+missing keys.
+
+Processed projects are recorded into a journal, an interrupted run continues
+with the first project which isn't in the journal. Packages of a project
+are signed in parallel, createrepo runs once per chroot after all its
+packages are signed. Already signed packages are skipped.
+
+    copr_sign_unsigned.py --dry-run       # only report the work to be done
+    copr_sign_unsigned.py --workers 8
 """
 from __future__ import print_function
 from __future__ import unicode_literals
 from __future__ import division
 from __future__ import absolute_import
-import shutil
 
+import argparse
 import sys
 import os
 import logging
 import pwd
+from multiprocessing import Pool
 
 
-logging.basicConfig(
-    filename="/var/log/copr/onetime_signer.log",
-    format='[%(asctime)s][%(levelname)6s]: %(message)s',
-    level=logging.DEBUG)
 log = logging.getLogger(__name__)
 
 
 sys.path.append("/usr/share/copr/")
-from backend.helpers import BackendConfigReader, create_file_logger
-from backend.sign import get_pubkey, sign_rpms_in_dir, create_user_keys
-from backend.exceptions import CoprSignNoKeyError
+from copr.exceptions import RpmHeaderError
+from copr.rpm_header import read_header
+from backend.helpers import BackendConfigReader
+from backend.sign import get_pubkey, sign_rpm, create_user_keys
+from backend.exceptions import CoprSignError, CoprSignNoKeyError
 from backend.createrepo import createrepo
 
+DEF_LOG_PATH = "/var/log/copr/onetime_signer.log"
+DEF_JOURNAL_PATH = "/var/lib/copr/sign_unsigned.journal"
+DEF_WORKERS = 4
 
-def check_signed_rpms_in_pkg_dir(pkg_dir, user, project, chroot, chroot_dir, opts):
-    success = True
+JOURNAL_DONE = "done"
+JOURNAL_FAILED = "failed"
 
-    logger = create_file_logger("run.check_signed_rpms_in_pkg_dir",
-                                "/tmp/copr_check_signed_rpms.log")
-    try:
-        sign_rpms_in_dir(user, project, pkg_dir, opts, log=logger)
 
-        log.info("running createrepo for {}".format(pkg_dir))
-        base_url = "/".join([opts.results_baseurl, user,
-                             project, chroot])
-        createrepo(
-            path=chroot_dir,
-            front_url=opts.frontend_base_url,
-            base_url=base_url,
-            username=user,
-            projectname=project,
-        )
-
-    except Exception as err:
-        success = False
-        log.error(">>> Failed to check/sign rpm in dir pkg_dir")
-        log.exception(err)
+def _sign_package(args):
+    """
+    Pool worker, exceptions don't cross process boundary nicely,
+    so the error is returned
 
-    return success
+    :return: (path, error message or None)
+    """
+    user, project, path = args
+    try:
+        sign_rpm(user, project, path)
+        return path, None
+    except CoprSignError as err:
+        return path, str(err)
 
 
-def check_signed_rpms(project_dir, user, project, opts):
+class BulkSigner(object):
     """
-    Ensure that all rpm files are signed
+    :param Munch opts: backend config
+    :param str journal_path: progress journal, one "<status> <user>/<project>" per line
+    :param int workers: number of signing processes, 1 signs in this process
     """
-    success = True
-    for chroot in os.listdir(project_dir):
-        if not (chroot.startswith("fedora") or chroot.startswith("epel")):
-            continue
-
-        chroot_path = os.path.join(project_dir, chroot)
-        if not os.path.isdir(chroot_path):
-            continue
-
-        log.debug("> Checking chroot `{}` in dir `{}`".format(chroot, project_dir))
-
-        for mb_pkg in os.listdir(chroot_path):
-            if mb_pkg in ["repodata", "devel"]:
+    def __init__(self, opts, journal_path, workers=DEF_WORKERS):
+        self.opts = opts
+        self.journal_path = journal_path
+        self.workers = workers
+
+    def load_journal(self):
+        """
+        :return set: "<user>/<project>" of successfully processed projects
+        """
+        done = set()
+        if not os.path.exists(self.journal_path):
+            return done
+        with open(self.journal_path) as handle:
+            for line in handle:
+                status, _, full_name = line.strip().partition(" ")
+                if status == JOURNAL_DONE:
+                    done.add(full_name)
+                else:
+                    # failed projects are retried
+                    done.discard(full_name)
+        return done
+
+    def record(self, user, project, status):
+        with open(self.journal_path, "a") as handle:
+            handle.write("{} {}/{}\n".format(status, user, project))
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def iter_projects(self):
+        """
+        :return: generator of (user, project, project_dir), sorted
+        """
+        for user in sorted(os.listdir(self.opts.destdir)):
+            user_dir = os.path.join(self.opts.destdir, user)
+            if not os.path.isdir(user_dir):
                 continue
-            mb_pkg_path = os.path.join(chroot_path, mb_pkg)
-            if not os.path.isdir(mb_pkg_path):
+            for project in sorted(os.listdir(user_dir)):
+                project_dir = os.path.join(user_dir, project)
+                if os.path.isdir(project_dir):
+                    yield user, project, project_dir
+
+    @staticmethod
+    def find_unsigned(project_dir):
+        """
+        :return dict: chroot name -> list of paths to unsigned rpms
+        """
+        unsigned = {}
+        for chroot in sorted(os.listdir(project_dir)):
+            if not (chroot.startswith("fedora") or chroot.startswith("epel")):
+                continue
+            chroot_path = os.path.join(project_dir, chroot)
+            if not os.path.isdir(chroot_path):
                 continue
 
-            log.debug(">> Stepping into package: {}".format(mb_pkg_path))
-
-            if not check_signed_rpms_in_pkg_dir(mb_pkg_path, user, project, chroot, chroot_path, opts):
-                success = False
-
-    return success
-
-
-def check_pubkey(pubkey_path, user, project, opts):
-    """
-    Ensure that pubkey.gpg presented in project/dir
-    """
-    if os.path.exists(pubkey_path):
-        log.info("Pubkey for {}/{} exists: {}".format(user, project, pubkey_path))
-        return True
-    else:
-        log.info("Missing pubkey for {}/{}".format(user, project))
+            for pkg_dir in sorted(os.listdir(chroot_path)):
+                if pkg_dir in ["repodata", "devel"]:
+                    continue
+                pkg_path = os.path.join(chroot_path, pkg_dir)
+                if not os.path.isdir(pkg_path):
+                    continue
+
+                for name in sorted(os.listdir(pkg_path)):
+                    if not name.endswith(".rpm"):
+                        continue
+                    path = os.path.join(pkg_path, name)
+                    try:
+                        if read_header(path).is_signed:
+                            continue
+                    except (IOError, RpmHeaderError) as err:
+                        log.warning("Skipping {}: {}".format(path, err))
+                        continue
+                    unsigned.setdefault(chroot, []).append(path)
+        return unsigned
+
+    def ensure_keys(self, user, project, project_dir):
+        """
+        Creates the key-pair when missing and places pubkey.gpg into the project dir
+        """
         try:
+            get_pubkey(user, project)
+            log.info("Key-pair exists for {}/{}".format(user, project))
+        except CoprSignNoKeyError:
+            create_user_keys(user, project, self.opts)
+            log.info("Created new key-pair for {}/{}".format(user, project))
+
+        pubkey_path = os.path.join(project_dir, "pubkey.gpg")
+        if not os.path.exists(pubkey_path):
+            log.info("Missing pubkey for {}/{}".format(user, project))
             get_pubkey(user, project, pubkey_path)
-            return True
+
+    def process_project(self, user, project, project_dir, pool=None):
+        """
+        :return bool: True when all packages were signed
+        """
+        try:
+            self.ensure_keys(user, project, project_dir)
         except Exception as err:
-            log.exception(err)
+            log.exception("Failed to get keys for {}/{}: {}".format(user, project, err))
             return False
 
-
-def main():
-    # shutil.rmtree("/tmp/users_failed.txt", ignore_errors=True)
-    # shutil.rmtree("/tmp/users_done.txt", ignore_errors=True)
-    users_done_old = set()
-    try:
-        with open("/tmp/users_done.txt") as handle:
-            for line in handle:
-                users_done_old.add(line.strip())
-    except Exception as err:
-        log.exception(err)
-        log.debug("error during read old users done")
-
-    opts = BackendConfigReader().read()
-    log.info("Starting pubkey fill, destdir: {}".format(opts.destdir))
-
-    log.debug("list dir: {}".format(os.listdir(opts.destdir)))
-    for user_name in os.listdir(opts.destdir):
-        if user_name in users_done_old:
-            log.info("skipping user: {}".format(user_name))
-            continue
-
-        failed = False
-        log.info("Started processing user dir: {}".format(user_name))
-        user_dir = os.path.join(opts.destdir, user_name)
-
-        for project_name in os.listdir(user_dir):
-            log.info("Checking project dir: {}".format(project_name))
+        success = True
+        for chroot, paths in sorted(self.find_unsigned(project_dir).items()):
+            log.info("Signing {} packages in {}/{}/{}".format(len(paths), user, project, chroot))
+            tasks = [(user, project, path) for path in paths]
+            if pool:
+                results = pool.map(_sign_package, tasks)
+            else:
+                results = [_sign_package(task) for task in tasks]
+
+            errors = [(path, error) for path, error in results if error]
+            for path, error in errors:
+                log.error("Failed to sign {}: {}".format(path, error))
+            if errors:
+                success = False
+            if len(errors) == len(paths):
+                continue
 
             try:
-                get_pubkey(user_name, project_name)
-                log.info("Key-pair exists for {}/{}".format(user_name, project_name))
-            except CoprSignNoKeyError:
-                create_user_keys(user_name, project_name, opts)
-                log.info("Created new key-pair for {}/{}".format(user_name, project_name))
+                createrepo(
+                    path=os.path.join(project_dir, chroot),
+                    front_url=self.opts.frontend_base_url,
+                    base_url="/".join([self.opts.results_baseurl, user, project, chroot]),
+                    username=user,
+                    projectname=project,
+                    opts=self.opts,
+                )
             except Exception as err:
-                log.error("Failed to get pubkey for {}/{}, mark as failed, skipping")
-                log.exception(err)
-                failed = True
+                log.exception("Failed to createrepo {}/{}/{}: {}".format(user, project, chroot, err))
+                success = False
+        return success
+
+    def estimate(self):
+        """
+        Walks the projects not processed yet, doesn't touch the signer
+
+        :return dict: numbers of projects, chroots, packages and bytes to sign
+        """
+        done = self.load_journal()
+        stats = dict(projects=0, chroots=0, packages=0, bytes=0, skipped_projects=0)
+        for user, project, project_dir in self.iter_projects():
+            if "{}/{}".format(user, project) in done:
+                stats["skipped_projects"] += 1
                 continue
+            unsigned = self.find_unsigned(project_dir)
+            stats["projects"] += 1
+            stats["chroots"] += len(unsigned)
+            for paths in unsigned.values():
+                stats["packages"] += len(paths)
+                stats["bytes"] += sum(os.path.getsize(path) for path in paths)
+        return stats
+
+    def run(self):
+        """
+        :return bool: True when all projects were processed successfully
+        """
+        done = self.load_journal()
+        pool = Pool(self.workers) if self.workers > 1 else None
+        success = True
+        try:
+            for user, project, project_dir in self.iter_projects():
+                if "{}/{}".format(user, project) in done:
+                    log.debug("Skipping already processed {}/{}".format(user, project))
+                    continue
+
+                log.info("Processing project {}/{}".format(user, project))
+                if self.process_project(user, project, project_dir, pool):
+                    self.record(user, project, JOURNAL_DONE)
+                else:
+                    self.record(user, project, JOURNAL_FAILED)
+                    success = False
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        return success
+
+
+def main(args):
+    parser = argparse.ArgumentParser(description="Sign unsigned rpms in all projects")
+    parser.add_argument("--journal", default=DEF_JOURNAL_PATH,
+                        help="progress journal to resume from, default: {}".format(DEF_JOURNAL_PATH))
+    parser.add_argument("--workers", type=int, default=DEF_WORKERS,
+                        help="number of parallel signing processes, default: {}".format(DEF_WORKERS))
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only report the work to be done")
+    cli_opts = parser.parse_args(args)
+
+    logging.basicConfig(
+        filename=DEF_LOG_PATH,
+        format='[%(asctime)s][%(levelname)6s]: %(message)s',
+        level=logging.DEBUG)
 
-            project_dir = os.path.join(user_dir, project_name)
-            pubkey_path = os.path.join(project_dir, "pubkey.gpg")
-            if not check_signed_rpms(project_dir, user_name, project_name, opts):
-                failed = False
+    opts = BackendConfigReader().read()
+    signer = BulkSigner(opts, cli_opts.journal, cli_opts.workers)
+    if cli_opts.dry_run:
+        stats = signer.estimate()
+        print("Projects to process: {projects} ({skipped_projects} already done)\n"
+              "Chroots to createrepo: {chroots}\n"
+              "Packages to sign: {packages} ({bytes} bytes)".format(**stats))
+        return 0
 
-            if not check_pubkey(pubkey_path, user_name, project_name, opts):
-                failed = False
+    log.info("Starting bulk signing, destdir: {}".format(opts.destdir))
+    return 0 if signer.run() else 1
 
-        if failed:
-            with open("/tmp/users_failed.txt", "a") as handle:
-                handle.write("{}\n".format(user_name))
-        else:
-            with open("/tmp/users_done.txt", "a") as handle:
-                handle.write("{}\n".format(user_name))
 
 if __name__ == "__main__":
     if pwd.getpwuid(os.getuid())[0] != "copr":
         print("This script should be executed under the `copr` user")
         sys.exit(1)
     else:
-        main()
+        sys.exit(main(sys.argv[1:]))
@@ -212,6 +212,18 @@ class TestBackend(object):
         assert len(worker.start.call_args_list) == group["max_workers"] - 1
         assert len(self.be.workers_by_group_id[1]) == group["max_workers"]
 
+    @mock.patch("{}.WorkerPool".format(MODULE_REF))
+    def test_spin_up_worker_pools_by_group(self, mc_worker_pool, mc_worker, init_be):
+        group = self.opts.build_groups[1]
+        group["worker_threads"] = 2
+
+        self.be.spin_up_workers_by_group(group)
+
+        assert not mc_worker.called
+        assert [call[1]["worker_nums"] for call in mc_worker_pool.call_args_list] == [[1, 2], [3]]
+        assert len(mc_worker_pool.return_value.start.call_args_list) == 2
+        assert len(self.be.workers_by_group_id[1]) == 2
+
     def test_prune_dead_workers_by_group(self, init_be):
         worker_alive = MagicMock()
         worker_alive.is_alive.return_value = True
@@ -9,6 +9,7 @@ from munch import Munch
 import pytest
 import tempfile
 import shutil
+import threading
 import time
 
 import six
@@ -26,7 +27,7 @@ else:
     from mock import MagicMock
 
 
-from backend.daemons.dispatcher import Worker
+from backend.daemons.dispatcher import Worker, ThreadWorker, WorkerPool
 
 STDOUT = "stdout"
 STDERR = "stderr"
@@ -207,17 +208,52 @@ class TestDispatcher(object):
         worker.vmm = MagicMock()
 
     def test_pkg_built_before(self):
-        assert not Worker.pkg_built_before(self.pkg_path, self.CHROOT, self.tmp_dir_path)
-        target_dir = os.path.join(self.tmp_dir_path, self.CHROOT, self.pkg_pdn)
+        assert not Worker.pkg_built_before(self.job)
+        self.job.cached_result_dir = "00000001-foobar"
+        assert not Worker.pkg_built_before(self.job)
+        target_dir = os.path.join(self.job.chroot_dir, self.job.cached_result_dir)
         os.makedirs(target_dir)
-        assert not Worker.pkg_built_before(self.pkg_path, self.CHROOT, self.tmp_dir_path)
+        assert not Worker.pkg_built_before(self.job)
         with open(os.path.join(target_dir, "fail"), "w") as handle:
             handle.write("undone")
-        assert not Worker.pkg_built_before(self.pkg_path, self.CHROOT, self.tmp_dir_path)
+        assert not Worker.pkg_built_before(self.job)
         os.remove(os.path.join(target_dir, "fail"))
         with open(os.path.join(target_dir, "success"), "w") as handle:
             handle.write("done")
-        assert Worker.pkg_built_before(self.pkg_path, self.CHROOT, self.tmp_dir_path)
+        assert Worker.pkg_built_before(self.job) == target_dir
+
+    def test_on_pkg_skip(self, init_worker):
+        cached_dir = os.path.join(self.job.chroot_dir, "00000001-foobar")
+        os.makedirs(cached_dir)
+        for name in ["success", "foobar-1.2.3-1.src.rpm"]:
+            with open(os.path.join(cached_dir, name), "w") as handle:
+                handle.write("done")
+
+        self.worker.on_pkg_skip(self.job, cached_dir)
+
+        assert self.job.status == BuildStatus.SKIPPED
+        linked = os.path.join(self.job.results_dir, "foobar-1.2.3-1.src.rpm")
+        assert os.stat(linked).st_ino == os.stat(os.path.join(cached_dir, "foobar-1.2.3-1.src.rpm")).st_ino
+        assert os.path.exists(os.path.join(self.job.results_dir, "success"))
+
+        sent = self.frontend_client.update.call_args[0][0]["builds"][0]
+        assert sent["status"] == BuildStatus.SKIPPED
+
+    def test_record_build_metrics(self, init_worker):
+        self.worker.metrics = MagicMock()
+        self.job.status = BuildStatus.SUCCEEDED
+        self.job.started_on = self.test_time
+        self.job.ended_on = self.test_time + 100
+        self.job.build_stats["phases"]["vm_acquire"] = 5
+
+        self.worker.record_build_metrics(self.job)
+
+        self.worker.metrics.inc.assert_called_once_with(
+            "copr_builds_total", group=self.worker.group_name, status="succeeded")
+        self.worker.metrics.observe.assert_any_call(
+            "copr_build_duration_seconds", 100, group=self.worker.group_name, status="succeeded")
+        self.worker.metrics.observe.assert_any_call(
+            "copr_build_phase_seconds", 5, group=self.worker.group_name, phase="vm_acquire")
 
     def test_mark_started(self, init_worker):
         self.worker.mark_started(self.job)
@@ -297,7 +333,7 @@ class TestDispatcher(object):
 
     def test_do_job_updates_details(self, mc_mr_class, init_worker, reg_vm, mc_register_build_result):
         assert not os.path.exists(self.DESTDIR_CHROOT)
-        mc_mr_class.return_value.build_pkg_and_process_results.return_value = {
+        mc_mr_class.return_value.build_pkg.return_value = {
             "results": self.test_time,
         }
 
@@ -308,10 +344,39 @@ class TestDispatcher(object):
 
     def test_do_job_mr_error(self, mc_mr_class, init_worker,
                              reg_vm, mc_register_build_result):
-        mc_mr_class.return_value.build_pkg_and_process_results.side_effect = MockRemoteError("foobar")
+        mc_mr_class.return_value.build_pkg.side_effect = MockRemoteError("foobar")
 
         self.worker.do_job(self.job)
         assert self.job.status == BuildStatus.FAILURE
+        assert not mc_mr_class.return_value.on_success_build.called
+        assert self.worker.vmm.release_vm.called
+
+    def test_do_job_releases_vm_before_post_processing(self, mc_mr_class, init_worker,
+                                                       reg_vm, mc_register_build_result):
+        def on_success_build():
+            assert self.worker.vmm.release_vm.call_args == mock.call(self.vm_name)
+            assert self.worker.vm_name is None
+
+        mc_mr = mc_mr_class.return_value
+        mc_mr.build_pkg.return_value = {}
+        mc_mr.on_success_build.side_effect = on_success_build
+
+        self.worker.do_job(self.job)
+        assert mc_mr.on_success_build.called
+        assert self.job.status == BuildStatus.SUCCEEDED
+
+        # second release is a no-op
+        self.worker.release_vm()
+        assert self.worker.vmm.release_vm.call_count == 1
+
+    def test_do_job_post_processing_error(self, mc_mr_class, init_worker,
+                                          reg_vm, mc_register_build_result):
+        mc_mr_class.return_value.build_pkg.return_value = {}
+        mc_mr_class.return_value.on_success_build.side_effect = MockRemoteError("foobar")
+
+        self.worker.do_job(self.job)
+        assert self.job.status == BuildStatus.FAILURE
+        assert mc_register_build_result.call_args == mock.call(self.opts, failed=True)
 
     def test_copy_mock_logs(self, mc_mr_class, init_worker, reg_vm, mc_register_build_result):
         os.makedirs(self.job.results_dir)
@@ -520,3 +585,114 @@ class TestDispatcher(object):
         self.worker.run_cycle()
         assert self.worker.starting_build.called
         assert not self.worker.acquire_vm_for_job.called
+
+    def test_run_cycle_skips_cached_build(self, init_worker, mc_time):
+        self.worker.notify_job_grab_about_task_end = MagicMock()
+        self.worker.obtain_job = MagicMock()
+        self.worker.obtain_job.return_value = self.job
+        self.worker.starting_build = MagicMock()
+        self.worker.starting_build.return_value = True
+        self.worker.pkg_built_before = MagicMock()
+        self.worker.pkg_built_before.return_value = "/some/results"
+        self.worker.on_pkg_skip = MagicMock()
+        self.worker.acquire_vm_for_job = MagicMock()
+
+        self.worker.run_cycle()
+        assert self.worker.on_pkg_skip.call_args == mock.call(self.job, "/some/results")
+        assert not self.worker.acquire_vm_for_job.called
+        assert not self.worker.notify_job_grab_about_task_end.call_args[1].get("do_reschedule")
+
+        # falls back to the regular build
+        self.worker.on_pkg_skip.side_effect = OSError()
+        self.worker.acquire_vm_for_job.return_value = None
+        self.worker.run_cycle()
+        assert self.worker.acquire_vm_for_job.called
+
+
+class TestWorkerPool(object):
+
+    def setup_method(self, method):
+        self.opts = Munch(
+            redis_db=9,
+            redis_port=7777,
+            sleeptime=0,
+            build_groups={
+                3: {
+                    "name": "3"
+                }
+            },
+        )
+        self.frontend_client = MagicMock()
+
+    def test_thread_worker(self, mc_setproctitle):
+        worker = ThreadWorker(self.opts, self.frontend_client, 1, 3)
+        assert worker.pid == os.getpid()
+        worker.update_process_title(suffix="foobar")
+        assert not mc_setproctitle.called
+
+    @mock.patch("{}.Thread".format(MODULE_REF))
+    @mock.patch("{}.ThreadWorker".format(MODULE_REF))
+    def test_run(self, mc_thread_worker, mc_thread, mc_time, mc_setproctitle):
+        mc_thread.return_value.is_alive.return_value = True
+        # stop the endless loop
+        mc_time.sleep.side_effect = [None, None, KeyboardInterrupt]
+        pool = WorkerPool(self.opts, self.frontend_client, [4, 5, 6], 3)
+        assert pool.workers_count == 3
+        assert pool.worker_num == "4-6"
+
+        with pytest.raises(KeyboardInterrupt):
+            pool.run()
+
+        assert [call[1]["worker_num"] for call in mc_thread_worker.call_args_list] == [4, 5, 6]
+        assert all(call[1]["target"] == mc_thread_worker.return_value.run
+                   for call in mc_thread.call_args_list)
+        assert mc_thread.return_value.start.call_count == 3
+
+    def test_restart_dead_worker(self, mc_setproctitle):
+        finish = threading.Event()
+        restarted = threading.Event()
+        job = MagicMock(build_id=1, task_id="1-fedora-23-x86_64", chroot="fedora-23-x86_64")
+        runs = []
+
+        def run(worker):
+            runs.append(worker.worker_num)
+            worker.rc = MagicMock()
+            worker.vmm = MagicMock()
+            if worker.worker_num == 5 and runs.count(5) == 1:
+                # dies in the middle of the build
+                worker.job = job
+                worker.vm_name = "vm_5"
+                raise RuntimeError("unexpected")
+            if worker.worker_num == 5:
+                restarted.set()
+            finish.wait()
+
+        pool = WorkerPool(self.opts, self.frontend_client, [4, 5, 6], 3)
+        with mock.patch.object(ThreadWorker, "run", run):
+            workers = dict((worker_num, pool.start_worker(worker_num))
+                           for worker_num in pool.worker_nums)
+            dead_worker, dead_thread = workers[5]
+            dead_thread.join(5)
+            siblings = dict((worker_num, workers[worker_num]) for worker_num in [4, 6])
+
+            pool.restart_dead_workers(workers)
+
+            try:
+                assert restarted.wait(5)
+                # siblings continue with their builds
+                assert all(workers[worker_num] == siblings[worker_num] for worker_num in [4, 6])
+                assert all(thread.is_alive() for _, thread in workers.values())
+                assert workers[5][0] is not dead_worker
+                assert runs.count(5) == 2
+            finally:
+                finish.set()
+                for _, thread in workers.values():
+                    thread.join(5)
+
+        # job is given back to the queue and VM returned to the pool
+        channel, message = dead_worker.rc.publish.call_args[0]
+        assert channel == JOB_GRAB_TASK_END_PUBSUB
+        assert json.loads(message)["action"] == "reschedule"
+        assert json.loads(message)["task_id"] == job.task_id
+        assert dead_worker.vmm.release_vm.call_args == mock.call("vm_5")
+        assert dead_worker.job is None
@@ -527,23 +527,6 @@ class TestBuilder(object):
             'regexp="^.*user_host_resolv.*$"')
         assert any([expected in r for r in storage])
 
-    def test_collect_build_packages(self):
-        builder = self.get_test_builder()
-        stdout = "stdout"
-
-        builder.conn.run.return_value = {
-            "contacted": {self.BUILDER_HOSTNAME: {"rc": 0, "stdout": stdout}},
-            "dark": {}
-        }
-        builder.collect_built_packages()
-        expected = (
-            "cd {} && "
-            "for f in `ls *.rpm |grep -v \"src.rpm$\"`; do"
-            "   rpm -qp --qf \"%{{NAME}} %{{VERSION}}\n\" $f; "
-            "done".format(builder._get_remote_results_dir())
-        )
-        assert builder.conn.module_args == expected
-
     @mock.patch("backend.mockremote.builder.check_for_ans_error")
     def test_run_ansible_with_check(self, mc_check_for_ans_errror):
         builder = self.get_test_builder()
@@ -749,15 +732,12 @@ class TestBuilder(object):
         builder.check_build_success = MagicMock()
         builder.check_build_success.return_value = (self.STDERR, False, self.STDOUT)
 
-        builder.collect_built_packages = MagicMock()
-
         stdout = builder.build()
         assert stdout == self.STDOUT
 
         assert builder.modify_mock_chroot_config.called
         assert builder.run_build_and_wait.called
         assert builder.check_build_success.called
-        assert builder.collect_built_packages
 
         # test providing version / obsolete
         builder.build()
@@ -821,6 +801,53 @@ class TestBuilder(object):
             for input_url, _ in cases:
                 assert builder.pre_process_repo_url(input_url) is None
 
+    def test_wrap_with_resource_usage(self):
+        builder = self.get_test_builder()
+        assert builder.wrap_with_resource_usage("mockchain -r foo") == (
+            "$(test -x /usr/bin/time && echo /usr/bin/time -o {}/resource_usage -f %e,%U,%S,%M) "
+            "mockchain -r foo".format(self.BUILDER_REMOTE_TMPDIR))
+
+    def test_collect_resource_usage(self):
+        builder = self.get_test_builder()
+        builder._run_ansible = MagicMock()
+        builder._run_ansible.return_value = {"contacted": {self.BUILDER_HOSTNAME: {"stdout": (
+            "312.50,280.10,20.42,524288\n"
+            "5234320\t/var/lib/mock"
+        )}}}
+        assert builder.collect_resource_usage() == {
+            "wall_time": 312.5,
+            "cpu_user": 280.1,
+            "cpu_system": 20.42,
+            "max_rss_kb": 524288,
+            "disk_used_kb": 5234320,
+        }
+
+        # GNU time is missing on the builder
+        builder._run_ansible.return_value = {"contacted": {self.BUILDER_HOSTNAME: {"stdout": (
+            "cat: /tmp/resource_usage: No such file or directory\n"
+            "5234320\t/var/lib/mock"
+        )}}}
+        assert builder.collect_resource_usage() == {"disk_used_kb": 5234320}
+        assert "du -sk /var/lib/mock" in builder._run_ansible.call_args[0][0]
+
+    def test_pre_process_repo_url_with_proxy(self):
+        builder = self.get_test_builder()
+        self.job.repo_proxy_url = "http://proxy.example.com:5000/"
+
+        cases = [
+            ("http://copr-be.c.fp.org/results/rhughes/f20-gnome-3-12/$chroot/",
+             "http://proxy.example.com:5000/http/copr-be.c.fp.org/results/rhughes/f20-gnome-3-12/{}/"
+             .format(self.job.chroot)),
+            ("https://example.com/repo/?arch=x86_64",
+             "'http://proxy.example.com:5000/https/example.com/repo/?arch=x86_64'"),
+            ("copr://foo/bar",
+             "http://proxy.example.com:5000/{}/foo/bar/fedora-20-i386"
+             .format(self.opts.results_baseurl.replace("://", "/"))),
+            ("file:///var/lib/repo/", "file:///var/lib/repo/"),
+        ]
+        for input_url, expected in cases:
+            assert builder.pre_process_repo_url(input_url) == expected
+
     def test_check_pubsub_build_interruption(self):
         builder = self.get_test_builder()
         builder.callback = MagicMock()
@@ -20,6 +20,7 @@ else:
 
 import pytest
 
+from copr.exceptions import RpmHeaderError
 from backend.mockremote import MockRemote
 from backend.job import BuildJob
 
@@ -146,6 +147,7 @@ class TestMockRemote(object):
             base_url=u"/".join([self.BASE_URL, COPR_OWNER, COPR_NAME, self.CHROOT]),
             username=COPR_OWNER,
             projectname=COPR_NAME,
+            opts=self.mr.opts,
         )
         assert mc_createrepo.call_args == expected_call
 
@@ -174,6 +176,39 @@ class TestMockRemote(object):
         assert self.mr.sign_built_packages.called
         assert self.mr.do_createrepo.called
 
+    def test_on_success_build_dedup(self, f_mock_remote):
+        self.mr.do_createrepo = MagicMock()
+        self.mr.dedup_results = MagicMock()
+
+        self.mr.on_success_build()
+        assert not self.mr.dedup_results.called
+
+        self.mr.opts.content_store_dir = os.path.join(self.test_root_path, "store")
+        self.mr.on_success_build()
+        assert self.mr.dedup_results.called
+
+    def test_on_success_build_signed_dedup(self, f_mock_remote):
+        self.mr.do_createrepo = MagicMock()
+        phases = []
+        self.mr.sign_built_packages = MagicMock(side_effect=lambda: phases.append("sign"))
+        self.mr.dedup_results = MagicMock(side_effect=lambda: phases.append("dedup"))
+
+        self.mr.opts.do_sign = True
+        self.mr.opts.content_store_dir = os.path.join(self.test_root_path, "store")
+        self.mr.on_success_build()
+        # the signed packages are deduplicated
+        assert phases == ["sign", "dedup"]
+
+    @mock.patch("backend.mockremote.dedup_results_dir")
+    def test_dedup_results(self, mc_dedup, f_mock_remote):
+        self.mr.opts.content_store_dir = os.path.join(self.test_root_path, "store")
+        self.mr.dedup_results()
+        assert mc_dedup.call_args[0][:2] == (self.mr.job.results_dir, self.mr.opts.content_store_dir)
+
+        mc_dedup.side_effect = OSError()
+        # doesn't raise an error
+        self.mr.dedup_results()
+
     def test_prepare_build_dir_erase_fail_file(self, f_mock_remote):
         target_dir = self.mr.job.results_dir
         os.makedirs(target_dir)
@@ -201,46 +236,57 @@ class TestMockRemote(object):
         self.mr.prepare_build_dir()
         assert os.path.exists(self.mr.job.results_dir)
 
-    def test_build_pkg_and_process_results(self, f_mock_remote):
+    def test_build_pkg(self, f_mock_remote):
         self.mr.on_success_build = MagicMock()
         self.mr.mark_dir_with_build_id = MagicMock()
+        self.mr.collect_built_packages = MagicMock(return_value="foo bar")
+        self.mr.builder.collect_resource_usage.return_value = {"max_rss_kb": 1024}
 
-        build_details = MagicMock()
-        self.mr.builder.build.return_value = STDOUT
-        self.mr.builder.collect_built_packages.return_value = "foo bar"
-
-        result = self.mr.build_pkg_and_process_results()
+        result = self.mr.build_pkg()
 
         assert result["built_packages"] == "foo bar"
-
         assert self.mr.builder.build.called
         assert self.mr.builder.download.called
         assert self.mr.mark_dir_with_build_id.called
-        assert self.mr.on_success_build.called
-
-    def test_build_pkg_and_process_results_error_on_download(self, f_mock_remote):
+        # signing and createrepo are up to the caller
+        assert not self.mr.on_success_build.called
+        assert self.mr.job.build_stats["resources"] == {"max_rss_kb": 1024}
+        assert "download" in self.mr.job.build_stats["phases"]
+
+    @mock.patch("{}.read_header".format(MODULE_REF))
+    def test_collect_built_packages(self, mc_read_header, f_mock_remote):
+        os.makedirs(self.mr.job.results_dir)
+        for name in ["foo-1.0-1.fc20.x86_64.rpm", "bar-2.0-1.fc20.noarch.rpm",
+                     "broken.rpm", "foo-1.0-1.fc20.src.rpm", "build.log.gz"]:
+            open(os.path.join(self.mr.job.results_dir, name), "w").close()
+
+        def read_header(path):
+            if path.endswith("broken.rpm"):
+                raise RpmHeaderError("not an rpm")
+            name, version = os.path.basename(path).split("-")[:2]
+            return Munch(name=name, version=version)
+        mc_read_header.side_effect = read_header
+
+        assert self.mr.collect_built_packages() == "bar 2.0\nfoo 1.0"
+        assert mc_read_header.call_count == 3
+
+    def test_build_pkg_error_on_download(self, f_mock_remote):
         self.mr.builder.build.return_value = ({}, STDOUT)
         self.mr.builder.download.side_effect = BuilderError(msg="STDERR")
 
         self.mr.mark_dir_with_build_id = MagicMock()
-        self.mr.on_success_build = MagicMock()
         with pytest.raises(MockRemoteError):
-            self.mr.build_pkg_and_process_results()
+            self.mr.build_pkg()
 
-        assert not self.mr.on_success_build.called
         assert self.mr.mark_dir_with_build_id.called
 
-    def test_build_pkg_and_process_results_error_on_build(self, f_mock_remote):
-        # self.mr.builder.build.return_value = ({}, STDOUT)
+    def test_build_pkg_error_on_build(self, f_mock_remote):
         self.mr.builder.build.side_effect = BuilderError(msg="STDERR")
-        # self.mr.builder.download.return_value = BuilderError(msg="STDERR")
 
         self.mr.mark_dir_with_build_id = MagicMock()
-        self.mr.on_success_build = MagicMock()
         with pytest.raises(MockRemoteError):
-            self.mr.build_pkg_and_process_results()
+            self.mr.build_pkg()
 
-        assert not self.mr.on_success_build.called
         assert self.mr.mark_dir_with_build_id.called
 
     def test_mark_dir_with_build_id(self, f_mock_remote):
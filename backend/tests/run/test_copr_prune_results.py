@@ -8,7 +8,7 @@ import tempfile
 import time
 from munch import Munch
 from subprocess import Popen, PIPE
-from copr.exceptions import CoprException
+from copr.exceptions import CoprException, CoprRequestException, RpmHeaderError
 
 import pytest
 
@@ -28,8 +28,8 @@ from backend.exceptions import CreateRepoError
 MODULE_REF = "copr_prune_results"
 
 @pytest.yield_fixture
-def mc_popen():
-    with mock.patch("{}.Popen".format(MODULE_REF)) as handle:
+def mc_read_header():
+    with mock.patch("{}.read_header".format(MODULE_REF)) as handle:
         yield handle
 
 @pytest.yield_fixture
@@ -47,6 +47,11 @@ def mc_gacs():
     with mock.patch("{}.get_auto_createrepo_status".format(MODULE_REF)) as handle:
         yield handle
 
+@pytest.yield_fixture
+def mc_gps():
+    with mock.patch("{}.get_projects_settings".format(MODULE_REF)) as handle:
+        yield handle
+
 @pytest.yield_fixture
 def mc_pruner():
     with mock.patch("{}.Pruner".format(MODULE_REF)) as handle:
@@ -81,10 +86,6 @@ class TestPruneResults(object):
         self.opts = Munch(
             prune_days=14,
 
-            find_obsolete_script=os.path.abspath(
-                os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
-                             "run", "copr_find_obsolete_builds.sh")),
-
             frontend_base_url="http://example.com",
             destdir=self.tmp_dir_name
 
@@ -193,21 +194,6 @@ class TestPruneResults(object):
             os.path.join(self.expect_dir_name, self.prj, self.chroots[0]),
         )
 
-    def test_prune_obsolete_builds_handle_script_error(self, test_pruner, mc_popen):
-        mc_handle = MagicMock()
-        mc_popen.return_value = mc_handle
-        mc_handle.returncode = 1
-        mc_handle.communicate.return_value = ("foo", "bar")
-
-        # doesn't touch FS if `find_obsolete_build` produce error return code
-        self.pruner.prune_obsolete_success_builds(os.path.join(self.tmp_dir_name, self.prj, self.chroots[0]))
-        assert mc_popen.called
-
-        assert_same_dirs(
-            os.path.join(self.tmp_dir_name, self.prj, self.chroots[0]),
-            os.path.join(self.expect_dir_name, self.prj, self.chroots[0]),
-        )
-
     def test_prune_project_ok(self, test_pruner, mc_cru, mc_gacs):
         self.pruner.prune_failed_builds = MagicMock()
         self.pruner.prune_obsolete_success_builds = MagicMock()
@@ -298,7 +284,7 @@ class TestPruneResults(object):
         assert not self.pruner.prune_failed_builds.called
         assert not self.pruner.prune_obsolete_success_builds.called
 
-    def test_run(self, test_pruner):
+    def test_run(self, test_pruner, mc_gps):
         self.pruner.prune_project = MagicMock()
 
         self.pruner.run()
@@ -314,3 +300,60 @@ class TestPruneResults(object):
         prune_main()
         assert mc_bcr.call_args[0][0] == "foobar"
 
+
+class TestFindObsoleteBuilds(object):
+    def setup_method(self, method):
+        self.chroot_path = tempfile.mkdtemp()
+        self.pruner = Pruner(Munch(prune_days=14, destdir=self.chroot_path))
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.chroot_path)
+
+    def make_build(self, build_dir, packages, old=True, state="success"):
+        os.mkdir(os.path.join(self.chroot_path, build_dir))
+        for package in packages + [state]:
+            open(os.path.join(self.chroot_path, build_dir, package), "w").close()
+        if old:
+            os.utime(os.path.join(self.chroot_path, build_dir, state), (0, 0))
+
+    @staticmethod
+    def read_header(path):
+        name = os.path.basename(path)
+        if name == "broken.rpm":
+            raise RpmHeaderError("not an rpm")
+        nvr, arch, _ = name.rsplit(".", 2)
+        name, version, release = nvr.rsplit("-", 2)
+        return Munch(name=name, epoch=None, version=version, release=release, arch=arch)
+
+    def test_find_obsolete_builds(self, mc_read_header):
+        mc_read_header.side_effect = self.read_header
+        self.make_build("01-hello", ["hello-1.0-1.x86_64.rpm", "hello-1.0-1.src.rpm"])
+        self.make_build("02-hello", ["hello-1.10-1.x86_64.rpm", "hello-1.10-1.src.rpm"])
+        # obsolete, but too recent
+        self.make_build("03-foo", ["foo-1.0-1.x86_64.rpm"], old=False)
+        self.make_build("04-foo", ["foo-2.0-1.x86_64.rpm", "broken.rpm"])
+        # only some of the packages are obsolete
+        self.make_build("05-bar", ["bar-1.0-1.x86_64.rpm", "bar-libs-1.0-1.x86_64.rpm"])
+        self.make_build("06-bar", ["bar-2.0-1.x86_64.rpm"])
+        self.make_build("07-baz", ["baz-1.0-1.x86_64.rpm"], state="fail")
+        self.make_build("08-baz", ["baz-2.0-1.x86_64.rpm"])
+
+        assert self.pruner.find_obsolete_builds(self.chroot_path) == ["01-hello"]
+
+        self.pruner.prune_obsolete_success_builds(self.chroot_path)
+        assert sorted(os.listdir(self.chroot_path)) == [
+            "02-hello", "03-foo", "04-foo", "05-bar", "06-bar", "07-baz", "08-baz"]
+
+
+class TestPrefetchSettings(object):
+    def setup_method(self, method):
+        self.opts = Munch(prune_days=14, destdir="/tmp")
+        self.pruner = Pruner(self.opts)
+
+    def test_prefetch_settings(self, mc_gps):
+        self.pruner.prefetch_settings("foo", ["bar", "baz"])
+        assert mc_gps.call_args == mock.call(self.opts, ["foo/bar", "foo/baz"])
+
+        # failure is only logged, projects are fetched one by one later
+        mc_gps.side_effect = CoprRequestException("foo")
+        self.pruner.prefetch_settings("foo", ["bar"])
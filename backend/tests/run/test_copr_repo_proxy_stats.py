@@ -0,0 +1,34 @@
+# coding: utf-8
+import sys
+
+sys.path.append("../../run")
+
+from copr_repo_proxy_stats import parse_log, format_stats
+
+
+LOG_LINES = [
+    '10.0.0.5 [10/Dec/2015:10:00:00 +0000] "GET /http/example.com/f23/foo.rpm HTTP/1.1" 200 1000 "MISS"',
+    '10.0.0.6 [10/Dec/2015:10:01:00 +0000] "GET /http/example.com/f23/foo.rpm HTTP/1.1" 200 1000 "HIT"',
+    '10.0.0.7 [10/Dec/2015:10:02:00 +0000] "GET /http/example.com/f23/foo.rpm HTTP/1.1" 200 1000 "HIT"',
+    '10.0.0.7 [10/Dec/2015:10:02:00 +0000] "GET /http/example.com/f23/repodata/repomd.xml HTTP/1.1" '
+    '200 100 "EXPIRED"',
+    '10.0.0.7 [10/Dec/2015:10:02:00 +0000] "GET /http/example.com/missing HTTP/1.1" 502 10 "-"',
+    'garbage',
+]
+
+
+def test_parse_log():
+    stats = parse_log(LOG_LINES)
+    assert stats["hit_requests"] == 2
+    assert stats["hit_bytes"] == 2000
+    assert stats["miss_requests"] == 2
+    assert stats["miss_bytes"] == 1100
+    assert stats["uncached_requests"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert abs(stats["byte_hit_rate"] - 2000 / 3100.0) < 1e-9
+
+
+def test_parse_empty_log():
+    stats = parse_log([])
+    assert stats["hit_rate"] == 0.0
+    assert "hit rate: 0.0%" in format_stats(stats)
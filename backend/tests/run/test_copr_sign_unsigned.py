@@ -0,0 +1,101 @@
+# coding: utf-8
+import os
+import shutil
+import sys
+import tempfile
+
+from munch import Munch
+import pytest
+
+import six
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+
+sys.path.append("../../run")
+
+from backend.exceptions import CoprSignError, CoprSignNoKeyError
+from copr_sign_unsigned import BulkSigner
+
+MODULE_REF = "copr_sign_unsigned"
+
+
+@pytest.yield_fixture
+def mc_sign():
+    with mock.patch("{}.get_pubkey".format(MODULE_REF)) as mc_get_pubkey, \
+            mock.patch("{}.create_user_keys".format(MODULE_REF)) as mc_create_user_keys, \
+            mock.patch("{}.sign_rpm".format(MODULE_REF)) as mc_sign_rpm, \
+            mock.patch("{}.createrepo".format(MODULE_REF)) as mc_createrepo, \
+            mock.patch("{}.read_header".format(MODULE_REF)) as mc_read_header:
+        mc_read_header.side_effect = lambda path: Munch(is_signed="signed" in path)
+        yield Munch(get_pubkey=mc_get_pubkey, create_user_keys=mc_create_user_keys,
+                    sign_rpm=mc_sign_rpm, createrepo=mc_createrepo)
+
+
+class TestBulkSigner(object):
+    def setup_method(self, method):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.destdir = os.path.join(self.tmp_dir, "results")
+        self.journal_path = os.path.join(self.tmp_dir, "journal")
+        self.opts = Munch(destdir=self.destdir, frontend_base_url="http://front.example.com",
+                          results_baseurl="http://example.com/results")
+        self.signer = BulkSigner(self.opts, self.journal_path, workers=1)
+
+        self.make_packages("foo", "bar", "fedora-23-x86_64", "00001-hello",
+                           ["hello-1.0-1.x86_64.rpm", "hello-1.0-1.src.rpm", "build.log.gz"])
+        self.make_packages("foo", "bar", "fedora-23-x86_64", "00002-world",
+                           ["world-1.0-1.x86_64.signed.rpm"])
+        self.make_packages("foo", "bar", "epel-7-x86_64", "00001-hello",
+                           ["hello-1.0-1.x86_64.rpm"])
+        self.make_packages("foo", "baz", "fedora-23-x86_64", "00003-baz",
+                           ["baz-1.0-1.x86_64.rpm"])
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tmp_dir)
+
+    def make_packages(self, user, project, chroot, build_dir, names):
+        path = os.path.join(self.destdir, user, project, chroot, build_dir)
+        os.makedirs(path)
+        for name in names:
+            with open(os.path.join(path, name), "w") as handle:
+                handle.write("rpm")
+
+    def test_estimate(self, mc_sign):
+        assert self.signer.estimate() == dict(
+            projects=2, chroots=3, packages=4, bytes=12, skipped_projects=0)
+        assert not mc_sign.get_pubkey.called
+
+        self.signer.record("foo", "bar", "done")
+        assert self.signer.estimate()["packages"] == 1
+
+    def test_run(self, mc_sign):
+        mc_sign.get_pubkey.side_effect = [CoprSignNoKeyError("no key"), None, None, None]
+        assert self.signer.run()
+
+        assert mc_sign.create_user_keys.call_count == 1
+        assert mc_sign.sign_rpm.call_count == 4
+        # batched per chroot
+        assert sorted(call[1]["path"] for call in mc_sign.createrepo.call_args_list) == [
+            os.path.join(self.destdir, "foo", "bar", "epel-7-x86_64"),
+            os.path.join(self.destdir, "foo", "bar", "fedora-23-x86_64"),
+            os.path.join(self.destdir, "foo", "baz", "fedora-23-x86_64"),
+        ]
+        assert self.signer.load_journal() == set(["foo/bar", "foo/baz"])
+
+    def test_resume(self, mc_sign):
+        def sign_rpm(user, project, path):
+            if project == "baz":
+                raise CoprSignError("sign failed")
+        mc_sign.sign_rpm.side_effect = sign_rpm
+
+        assert not self.signer.run()
+        assert self.signer.load_journal() == set(["foo/bar"])
+        assert mc_sign.createrepo.call_count == 2
+
+        # only the failed project is processed again
+        mc_sign.sign_rpm.reset_mock()
+        mc_sign.sign_rpm.side_effect = None
+        assert self.signer.run()
+        assert [call[0][1] for call in mc_sign.sign_rpm.call_args_list] == ["baz"]
+        assert self.signer.load_journal() == set(["foo/bar", "foo/baz"])
@@ -333,7 +333,8 @@ class TestAction(object):
             projectname=u'bar',
             base_url=u'http://example.com/results/foo/bar/fedora20',
             path='{}/old_dir/fedora20'.format(self.tmp_dir_name),
-            front_url=None
+            front_url=None,
+            opts=self.opts,
         )
         assert mc_createrepo.call_args == create_repo_expected_call
 
@@ -572,10 +573,10 @@ class TestAction(object):
 
         exp_call_1 = mock.call(path=tmp_dir + u'/foo/bar/epel-6-i386',
                                front_url=self.opts.frontend_base_url, override_acr_flag=True,
-                               username=u"foo", projectname=u"bar")
+                               username=u"foo", projectname=u"bar", opts=self.opts)
         exp_call_2 = mock.call(path=tmp_dir + u'/foo/bar/fedora-20-x86_64',
                                front_url=self.opts.frontend_base_url, override_acr_flag=True,
-                               username=u"foo", projectname=u"bar")
+                               username=u"foo", projectname=u"bar", opts=self.opts)
         assert exp_call_1 in mc_createrepo.call_args_list
         assert exp_call_2 in mc_createrepo.call_args_list
         assert len(mc_createrepo.call_args_list) == 2
@@ -649,7 +650,7 @@ class TestAction(object):
             "projectname": pname,
         })
 
-        expected_call = mock.call(uname, pname, self.opts)
+        expected_call = mock.call(uname, pname, self.opts, wait=False)
 
         mc_front_cb = MagicMock()
         test_action = Action(
@@ -690,3 +691,23 @@ class TestAction(object):
         result_dict = mc_front_cb.update.call_args[0][0]["actions"][0]
         assert result_dict["id"] == 11
         assert result_dict["result"] == ActionResult.SUCCESS
+
+    @mock.patch("backend.actions.invalidate_project_settings")
+    def test_handle_update_project_settings(self, mc_ips, mc_time):
+        mc_front_cb = MagicMock()
+        test_action = Action(
+            opts=self.opts,
+            action={
+                "action_type": ActionType.UPDATE_PROJECT_SETTINGS,
+                "data": json.dumps({"username": "@foo", "projectname": "bar"}),
+                "id": 12
+            },
+            frontend_client=mc_front_cb
+        )
+
+        test_action.run()
+
+        result_dict = mc_front_cb.update.call_args[0][0]["actions"][0]
+        assert result_dict["id"] == 12
+        assert result_dict["result"] == ActionResult.SUCCESS
+        assert mc_ips.call_args == mock.call(self.opts, "@foo", "bar")
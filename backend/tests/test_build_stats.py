@@ -0,0 +1,91 @@
+# coding: utf-8
+
+import json
+import os
+import shutil
+import tempfile
+
+from munch import Munch
+
+from backend.build_stats import add_phase_time, measure_phase, parse_mock_state_log, \
+    add_mock_phases, save_build_stats, STATS_FILE_NAME, MOCK_STATE_LOG_NAME
+from backend.job import BuildJob
+
+
+STATE_LOG = """\
+2015-11-26 12:00:00,000 - Start: run
+2015-11-26 12:00:00,500 - Start: chroot init
+2015-11-26 12:01:30,500 - Finish: chroot init
+2015-11-26 12:01:31,000 - Start: build phase for foo-1.0-1.src.rpm
+2015-11-26 12:03:31,250 - Finish: build phase for foo-1.0-1.src.rpm
+2015-11-26 12:03:32,000 - Finish: run
+garbage
+"""
+
+
+class TestBuildStats(object):
+
+    def setup_method(self, method):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.job = BuildJob({
+            "project_owner": "foo",
+            "project_name": "bar",
+            "repos": "",
+            "build_id": 12345,
+            "chroot": "fedora-23-x86_64",
+            "package_name": "foo",
+        }, Munch(timeout=1800, destdir=self.tmp_dir, results_baseurl="/tmp"))
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_measure_phase(self):
+        with measure_phase(self.job, "sign"):
+            pass
+        add_phase_time(self.job, "sign", 10)
+        assert 10 <= self.job.build_stats["phases"]["sign"] < 11
+
+    def test_measure_phase_error(self):
+        try:
+            with measure_phase(self.job, "createrepo"):
+                raise IOError()
+        except IOError:
+            pass
+        assert "createrepo" in self.job.build_stats["phases"]
+
+    def test_parse_mock_state_log(self):
+        durations = parse_mock_state_log(STATE_LOG.splitlines())
+        assert durations == {
+            "run": 212.0,
+            "chroot init": 90.0,
+            "build phase for foo-1.0-1.src.rpm": 120.25,
+        }
+
+    def test_add_mock_phases(self):
+        os.makedirs(self.job.results_dir)
+        with open(os.path.join(self.job.results_dir, MOCK_STATE_LOG_NAME), "w") as handle:
+            handle.write(STATE_LOG)
+
+        add_phase_time(self.job, "mockchain", 220)
+        add_mock_phases(self.job, self.job.results_dir)
+        assert self.job.build_stats["phases"]["compile"] == 120.25
+        assert self.job.build_stats["phases"]["buildroot_install"] == 99.75
+
+    def test_add_mock_phases_no_log(self):
+        add_mock_phases(self.job, self.job.results_dir)
+        assert self.job.build_stats["phases"] == {}
+
+    def test_save_build_stats(self):
+        assert save_build_stats(self.job) is None
+
+        os.makedirs(self.job.results_dir)
+        add_phase_time(self.job, "vm_acquire", 5)
+        self.job.build_stats["resources"]["max_rss_kb"] = 1024
+
+        path = save_build_stats(self.job)
+        assert path == os.path.join(self.job.results_dir, STATS_FILE_NAME)
+        with open(path) as handle:
+            assert json.load(handle) == {
+                "phases": {"vm_acquire": 5},
+                "resources": {"max_rss_kb": 1024},
+            }
@@ -0,0 +1,133 @@
+# coding: utf-8
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import six
+
+if six.PY3:
+    from unittest.mock import MagicMock
+else:
+    from mock import MagicMock
+
+from backend.dedup import dedup_results_dir, file_checksum, get_store_path, \
+    remove_tree, prune_content_store, link_results_dir
+
+
+class TestDedup(object):
+
+    def setup_method(self, method):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.tmp_dir, "store")
+        self.results_dir = os.path.join(self.tmp_dir, "results")
+        self.log = MagicMock()
+
+        self.chroots = ["fedora-22-i386", "fedora-22-x86_64"]
+        for chroot in self.chroots:
+            build_dir = self.build_dir(chroot)
+            os.makedirs(build_dir)
+            self.write(os.path.join(build_dir, "foo-1.0-1.src.rpm"), "srpm")
+            self.write(os.path.join(build_dir, "foo-doc-1.0-1.noarch.rpm"), "noarch")
+            self.write(os.path.join(build_dir, "foo-1.0-1.{}.rpm".format(chroot)), chroot)
+            self.write(os.path.join(build_dir, "build.log"), "log")
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tmp_dir)
+
+    def build_dir(self, chroot):
+        return os.path.join(self.results_dir, chroot, "00000001-foo")
+
+    @staticmethod
+    def write(path, content):
+        with open(path, "w") as handle:
+            handle.write(content)
+
+    def test_file_checksum(self):
+        path = os.path.join(self.build_dir(self.chroots[0]), "foo-1.0-1.src.rpm")
+        assert file_checksum(path) == hashlib.sha256(b"srpm").hexdigest()
+
+    def test_dedup_results_dir(self):
+        reclaimed = 0
+        for chroot in self.chroots:
+            reclaimed += dedup_results_dir(self.build_dir(chroot), self.store_dir, self.log)
+
+        assert reclaimed == len("srpm") + len("noarch")
+
+        first, second = [self.build_dir(chroot) for chroot in self.chroots]
+        for name in ["foo-1.0-1.src.rpm", "foo-doc-1.0-1.noarch.rpm"]:
+            first_stat = os.stat(os.path.join(first, name))
+            assert first_stat.st_ino == os.stat(os.path.join(second, name)).st_ino
+            assert first_stat.st_nlink == 3
+
+        # arch specific rpms are only registered in the store
+        for chroot in self.chroots:
+            path = os.path.join(self.build_dir(chroot), "foo-1.0-1.{}.rpm".format(chroot))
+            assert os.stat(path).st_nlink == 2
+
+        # logs are ignored
+        assert os.stat(os.path.join(first, "build.log")).st_nlink == 1
+
+    def test_dedup_twice_is_noop(self):
+        build_dir = self.build_dir(self.chroots[0])
+        dedup_results_dir(build_dir, self.store_dir, self.log)
+        assert dedup_results_dir(build_dir, self.store_dir, self.log) == 0
+
+    def test_remove_tree_releases_entries(self):
+        for chroot in self.chroots:
+            dedup_results_dir(self.build_dir(chroot), self.store_dir, self.log)
+
+        srpm_store_path = get_store_path(self.store_dir, file_checksum(
+            os.path.join(self.build_dir(self.chroots[0]), "foo-1.0-1.src.rpm")))
+        arch_store_path = get_store_path(self.store_dir, file_checksum(
+            os.path.join(self.build_dir(self.chroots[0]), "foo-1.0-1.{}.rpm".format(self.chroots[0]))))
+
+        remove_tree(self.build_dir(self.chroots[0]), self.store_dir, self.log)
+
+        assert not os.path.exists(self.build_dir(self.chroots[0]))
+        # still referenced from the second chroot
+        assert os.path.exists(srpm_store_path)
+        assert not os.path.exists(arch_store_path)
+
+        remove_tree(self.build_dir(self.chroots[1]), self.store_dir, self.log)
+        assert not os.path.exists(srpm_store_path)
+
+    def test_remove_tree_without_store(self):
+        remove_tree(self.build_dir(self.chroots[0]), None, self.log)
+        assert not os.path.exists(self.build_dir(self.chroots[0]))
+
+    def test_prune_content_store(self):
+        for chroot in self.chroots:
+            dedup_results_dir(self.build_dir(chroot), self.store_dir, self.log)
+
+        assert prune_content_store(self.store_dir, self.log) == 0
+        shutil.rmtree(self.results_dir)
+        # 1 srpm, 1 noarch and 2 arch specific rpms
+        assert prune_content_store(self.store_dir, self.log) == 4
+
+    def test_prune_missing_content_store(self):
+        assert prune_content_store(os.path.join(self.tmp_dir, "missing"), self.log) == 0
+
+    def test_link_results_dir(self):
+        src = self.build_dir(self.chroots[0])
+        dedup_results_dir(src, self.store_dir, self.log)
+        os.makedirs(os.path.join(src, "prev_build_backup"))
+        self.write(os.path.join(src, "prev_build_backup", "build.log"), "old log")
+        for name in ["success", "build.info", "build-stats.json"]:
+            self.write(os.path.join(src, name), name)
+
+        dst = os.path.join(self.results_dir, self.chroots[0], "00000002-foo")
+        link_results_dir(src, dst)
+
+        srpm = os.path.join(dst, "foo-1.0-1.src.rpm")
+        assert os.stat(srpm).st_ino == os.stat(os.path.join(src, "foo-1.0-1.src.rpm")).st_ino
+        # only the packages and the success mark, the rest belongs to the old build
+        assert sorted(os.listdir(dst)) == sorted([
+            "foo-1.0-1.src.rpm", "foo-doc-1.0-1.noarch.rpm",
+            "foo-1.0-1.{}.rpm".format(self.chroots[0]), "success"])
+
+        # the store entry is kept until both directories are removed
+        store_path = get_store_path(self.store_dir, file_checksum(srpm))
+        remove_tree(src, self.store_dir, self.log)
+        assert os.path.exists(store_path)
@@ -128,6 +128,12 @@ class TestFrontendClient(object):
         with pytest.raises(RequestException):
             self.fc.starting_build(self.build_id, self.chroot_name)
 
+    def test_get_projects_settings(self, mask_post_to_fe):
+        self.ptf.return_value.json.return_value = {"projects": {"foo/bar": {}}}
+        assert self.fc.get_projects_settings(["foo/bar", "foo/baz"]) == {"foo/bar": {}}
+        expected = mock.call({"projects": ["foo/bar", "foo/baz"]}, "projects_settings")
+        assert self.ptf.call_args == expected
+
     def test_reschedule_build(self):
         ptfr = MagicMock()
         self.fc._post_to_frontend_repeatedly = ptfr
@@ -0,0 +1,106 @@
+# coding: utf-8
+
+from munch import Munch
+import six
+
+if six.PY3:
+    from unittest.mock import MagicMock
+else:
+    from mock import MagicMock
+
+from redis import RedisError
+
+from backend.metrics import Metrics, KEY_METRICS, format_sample, collect_pool_gauges, render_metrics
+
+
+class FakePipeline(object):
+
+    def __init__(self, hashes, fail=False):
+        self.hashes = hashes
+        self.fail = fail
+        self.commands = []
+
+    def hincrby(self, key, field, value):
+        self.commands.append((key, field, value))
+
+    hincrbyfloat = hincrby
+
+    def execute(self):
+        if self.fail:
+            raise RedisError("connection refused")
+        for key, field, value in self.commands:
+            fields = self.hashes.setdefault(key, {})
+            fields[field] = fields.get(field, 0) + value
+
+
+class TestMetrics(object):
+
+    def setup_method(self, method):
+        self.hashes = {}
+        self.opts = Munch(metrics_enabled=True)
+        self.metrics = Metrics(self.opts, log=MagicMock())
+        self.metrics._rc = MagicMock()
+        self.metrics._rc.pipeline.side_effect = lambda: FakePipeline(self.hashes)
+
+    def test_format_sample(self):
+        assert format_sample("foo") == "foo"
+        assert format_sample("foo", {"b": 1, "a": 'x"y'}) == 'foo{a="x\\"y",b="1"}'
+
+    def test_inc(self):
+        self.metrics.inc("copr_vmm_events_total", topic="vm_spawned")
+        self.metrics.inc("copr_vmm_events_total", topic="vm_spawned")
+        assert self.hashes[KEY_METRICS] == {'copr_vmm_events_total{topic="vm_spawned"}': 2}
+
+    def test_observe(self):
+        self.metrics.observe("copr_frontend_request_seconds", 0.3, endpoint="update")
+        self.metrics.observe("copr_frontend_request_seconds", 7, endpoint="update")
+        samples = self.hashes[KEY_METRICS]
+        bucket = 'copr_frontend_request_seconds_bucket{{endpoint="update",le="{}"}}'
+        assert bucket.format("0.25") not in samples
+        assert samples[bucket.format("0.5")] == 1
+        assert samples[bucket.format("10")] == 2
+        assert samples[bucket.format("+Inf")] == 2
+        assert samples['copr_frontend_request_seconds_sum{endpoint="update"}'] == 7.3
+        assert samples['copr_frontend_request_seconds_count{endpoint="update"}'] == 2
+
+    def test_disabled(self):
+        self.metrics.enabled = False
+        self.metrics.inc("copr_vmm_events_total", topic="vm_spawned")
+        assert not self.metrics._rc.pipeline.called
+        assert not Metrics(Munch()).enabled
+
+    def test_redis_error_is_ignored(self):
+        self.metrics._rc.pipeline.side_effect = lambda: FakePipeline(self.hashes, fail=True)
+        self.metrics.observe("copr_build_phase_seconds", 10, group="PC", phase="sign")
+        assert self.metrics.log.warning.called
+
+    def test_collect_pool_gauges(self):
+        rc = MagicMock()
+        rc.llen.return_value = 3
+        rc.smembers.return_value = {"vm1", "vm2", "vm3"}
+        rc.pipeline.return_value.execute.return_value = ["ready", "in_use", "ready"]
+
+        opts = Munch(build_groups=[{"id": 0, "name": "PC"}])
+        gauges = collect_pool_gauges(opts, rc)
+        rc.llen.assert_called_once_with("retaskqueue-copr-be-0")
+        assert gauges == {
+            'copr_build_queue_length{group="PC"}': 3,
+            'copr_vms{group="PC",state="ready"}': 2,
+            'copr_vms{group="PC",state="in_use"}': 1,
+        }
+
+    def test_render_metrics(self):
+        text = render_metrics({
+            'copr_frontend_request_seconds_count{endpoint="update"}': "2",
+            'copr_frontend_request_seconds_sum{endpoint="update"}': "7.3",
+            'copr_vms{group="PC",state="ready"}': 2,
+        })
+        assert text == "\n".join([
+            "# HELP copr_frontend_request_seconds Latency of the requests to the frontend",
+            "# TYPE copr_frontend_request_seconds histogram",
+            'copr_frontend_request_seconds_count{endpoint="update"} 2',
+            'copr_frontend_request_seconds_sum{endpoint="update"} 7.3',
+            "# HELP copr_vms VMs in the builder group pool by state",
+            "# TYPE copr_vms gauge",
+            'copr_vms{group="PC",state="ready"} 2',
+        ]) + "\n"
@@ -0,0 +1,127 @@
+# coding: utf-8
+
+import json
+
+from munch import Munch
+from redis import RedisError
+from requests import RequestException
+import pytest
+import six
+
+if six.PY3:
+    from unittest import mock
+    from unittest.mock import MagicMock
+else:
+    import mock
+    from mock import MagicMock
+
+from copr.exceptions import CoprRequestException
+
+from backend.project_settings import (
+    get_projects_settings, get_project_settings, invalidate_project_settings,
+    KEY_PROJECT_SETTINGS,
+)
+
+MODULE_REF = "backend.project_settings"
+
+SETTINGS = {
+    "auto_createrepo": False,
+    "chroots": ["fedora-23-x86_64"],
+    "repos": [],
+    "buildroot_pkgs": {"fedora-23-x86_64": ""},
+}
+
+
+class FakeRedis(object):
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+        self.ttls[key] = ttl
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+@pytest.yield_fixture
+def mc_client():
+    with mock.patch("{}.FrontendClient".format(MODULE_REF)) as handle:
+        yield handle.return_value
+
+
+class TestProjectSettings(object):
+
+    def setup_method(self, method):
+        self.opts = Munch(frontend_base_url="http://example.com",
+                          frontend_auth="1234",
+                          project_settings_ttl=60)
+        self.redis = FakeRedis()
+        self.patcher = mock.patch("{}.get_redis_connection".format(MODULE_REF),
+                                  return_value=self.redis)
+        self.mc_grc = self.patcher.start()
+
+    def teardown_method(self, method):
+        self.patcher.stop()
+
+    def test_fetch_and_cache(self, mc_client):
+        mc_client.get_projects_settings.return_value = {"foo/bar": SETTINGS}
+
+        settings = get_projects_settings(self.opts, ["foo/bar", "foo/missing"])
+        assert settings == {"foo/bar": SETTINGS}
+        assert sorted(mc_client.get_projects_settings.call_args[0][0]) == [
+            "foo/bar", "foo/missing"]
+
+        key = KEY_PROJECT_SETTINGS.format("foo/bar")
+        assert json.loads(self.redis.values[key]) == SETTINGS
+        assert self.redis.ttls[key] == 60
+
+        # second call is served from the cache
+        mc_client.get_projects_settings.reset_mock()
+        assert get_project_settings(self.opts, "foo", "bar") == SETTINGS
+        assert not mc_client.get_projects_settings.called
+
+    def test_missing_project(self, mc_client):
+        mc_client.get_projects_settings.return_value = {}
+        with pytest.raises(CoprRequestException) as err:
+            get_project_settings(self.opts, "foo", "bar")
+        assert "does not exists" in str(err.value)
+
+    def test_invalidate(self, mc_client):
+        self.redis.values[KEY_PROJECT_SETTINGS.format("foo/bar")] = json.dumps(SETTINGS)
+        invalidate_project_settings(self.opts, "foo", "bar")
+
+        mc_client.get_projects_settings.return_value = {
+            "foo/bar": dict(SETTINGS, auto_createrepo=True)}
+        assert get_project_settings(self.opts, "foo", "bar")["auto_createrepo"]
+
+    def test_redis_unavailable(self, mc_client):
+        self.mc_grc.return_value = MagicMock()
+        self.mc_grc.return_value.mget.side_effect = RedisError()
+        self.mc_grc.return_value.delete.side_effect = RedisError()
+        mc_client.get_projects_settings.return_value = {"foo/bar": SETTINGS}
+
+        assert get_project_settings(self.opts, "foo", "bar") == SETTINGS
+        # doesn't raise an error
+        invalidate_project_settings(self.opts, "foo", "bar")
+
+    def test_frontend_error(self, mc_client):
+        mc_client.get_projects_settings.side_effect = RequestException()
+        with pytest.raises(CoprRequestException):
+            get_projects_settings(self.opts, ["foo/bar"])
+
+    def test_chunks(self, mc_client):
+        mc_client.get_projects_settings.return_value = {}
+        get_projects_settings(self.opts, ["foo/{}".format(i) for i in range(501)])
+        assert mc_client.get_projects_settings.call_count == 2
@@ -1,3 +1,4 @@
+import json
 import os
 import tempfile
 import shutil
@@ -128,6 +129,40 @@ class TestSign(object):
         expected_cmd = ['sudo', '/bin/sign', '-u', self.usermail, '-r', fake_path]
         assert mc_popen.call_args[0][0] == expected_cmd
 
+    @mock.patch("backend.sign.Popen")
+    def test_sign_one_hardlinked(self, mc_popen, tmp_dir):
+        path = os.path.join(self.tmp_dir_path, "pkg.rpm")
+        other_path = os.path.join(self.tmp_dir_path, "other.rpm")
+        with open(path, "w") as handle:
+            handle.write("unsigned")
+        # e.g. the same package in the content store
+        os.link(path, other_path)
+
+        def sign(cmd, **kwargs):
+            with open(cmd[-1], "w") as handle:
+                handle.write("signed")
+            return MagicMock(returncode=0, communicate=lambda: (STDOUT, STDERR))
+
+        mc_popen.side_effect = sign
+        _sign_one(path, self.usermail)
+
+        with open(path) as handle:
+            assert handle.read() == "signed"
+        with open(other_path) as handle:
+            assert handle.read() == "unsigned"
+        assert os.stat(other_path).st_nlink == 1
+        assert sorted(os.listdir(self.tmp_dir_path)) == ["other.rpm", "pkg.rpm"]
+
+        # failed signing leaves the package as it was
+        os.unlink(other_path)
+        os.link(path, other_path)
+        mc_popen.side_effect = None
+        mc_popen.return_value = MagicMock(returncode=1, communicate=lambda: (STDOUT, STDERR))
+        with pytest.raises(CoprSignError):
+            _sign_one(path, self.usermail)
+        assert os.path.samefile(path, other_path)
+        assert sorted(os.listdir(self.tmp_dir_path)) == ["other.rpm", "pkg.rpm"]
+
     @mock.patch("backend.sign.Popen")
     def test_sign_one_popen_error(self, mc_popen):
         mc_popen.side_effect = IOError()
@@ -160,6 +195,16 @@ class TestSign(object):
         )
         assert mc_request.call_args == expected_call
 
+    @mock.patch("backend.sign.request")
+    def test_create_user_keys_async(self, mc_request):
+        mc_request.return_value.status_code = 202
+        create_user_keys(self.username, self.projectname, self.opts, wait=False)
+        assert json.loads(mc_request.call_args[1]["data"]) == {
+            "name_real": "foo_bar",
+            "name_email": "foo#bar@copr.fedorahosted.org",
+            "async": True,
+        }
+
     @mock.patch("backend.sign.request")
     def test_create_user_keys_error_1(self, mc_request):
         mc_request.side_effect = IOError()
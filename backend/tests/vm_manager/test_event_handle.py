@@ -158,10 +158,14 @@ class TestEventHandle(object):
         assert len(self.terminator.recycle.call_args_list) == 3
 
     def test_on_vm_spawned(self):
-        expected_call = mock.call(**self.msg)
+        expected_call = mock.call(warm_chroots=None, **self.msg)
         self.eh.on_vm_spawned(self.msg)
         assert self.vmm.add_vm_to_pool.call_args == expected_call
 
+        self.msg["warm_chroots"] = ["fedora-20-x86_64"]
+        self.eh.on_vm_spawned(self.msg)
+        assert self.vmm.add_vm_to_pool.call_args == mock.call(**self.msg)
+
     def test_on_vm_termination_request(self):
         expected_call = mock.call(**self.msg)
         self.eh.on_vm_termination_request(self.msg)
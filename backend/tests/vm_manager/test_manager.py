@@ -11,8 +11,9 @@ import six
 
 from backend import exceptions
 from backend.exceptions import VmError, NoVmAvailable
-from backend.vm_manage import VmStates, KEY_VM_POOL, PUBSUB_MB, EventTopics, KEY_SERVER_INFO
-from backend.vm_manage.manager import VmManager
+from backend.vm_manage import VmStates, KEY_VM_POOL, PUBSUB_MB, EventTopics, KEY_SERVER_INFO, \
+    KEY_CHROOT_DEMAND
+from backend.vm_manage.manager import VmManager, CHROOT_DEMAND_MAX
 from backend.daemons.vm_master import VmMaster
 from backend.helpers import get_redis_connection
 
@@ -199,6 +200,55 @@ class TestManager(object):
         with pytest.raises(NoVmAvailable):
             self.vmm.acquire_vm(group=self.group, username=self.username, pid=self.pid)
 
+    def test_acquire_vm_prefers_warm_chroot(self, mc_time):
+        mc_time.time.return_value = 0
+        self.vmm.mark_server_start()
+
+        vmd_cold = self.vmm.add_vm_to_pool(self.vm_ip, self.vm_name, self.group)
+        vmd_warm = self.vmm.add_vm_to_pool(self.vm_ip, "warm", self.group,
+                                           warm_chroots=["fedora-20-x86_64"])
+        assert vmd_warm.warm_chroot_list == ["fedora-20-x86_64"]
+        for vmd in [vmd_cold, vmd_warm]:
+            vmd.store_field(self.rc, "state", VmStates.READY)
+            vmd.store_field(self.rc, "last_health_check", 2)
+
+        vmd_got = self.vmm.acquire_vm(group=self.group, username=self.username, pid=self.pid,
+                                      chroot="fedora-20-x86_64")
+        assert vmd_got.vm_name == "warm"
+
+    def test_release_vm_marks_chroot_warm(self, mc_time):
+        mc_time.time.return_value = 0
+        self.vmm.mark_server_start()
+
+        vmd = self.vmm.add_vm_to_pool(self.vm_ip, self.vm_name, self.group)
+        vmd.store_field(self.rc, "state", VmStates.READY)
+        vmd.store_field(self.rc, "last_health_check", 2)
+
+        for _ in range(2):
+            self.vmm.acquire_vm(self.group, self.username, self.pid, chroot="fedora-20-x86_64")
+            assert self.vmm.release_vm(self.vm_name)
+
+        self.vmm.acquire_vm(self.group, self.username, self.pid)
+        assert self.vmm.release_vm(self.vm_name)
+
+        assert self.vmm.get_vm_by_name(self.vm_name).warm_chroot_list == ["fedora-20-x86_64"]
+
+    def test_chroot_demand(self):
+        for chroot, count in [("fedora-20-x86_64", 3), ("epel-7-x86_64", 5), ("fedora-21-i386", 1)]:
+            for _ in range(count):
+                self.vmm.record_chroot_demand(self.group, chroot)
+
+        assert self.vmm.get_most_demanded_chroots(self.group, 2) == ["epel-7-x86_64", "fedora-20-x86_64"]
+        assert self.vmm.get_most_demanded_chroots(self.group + 1, 2) == []
+
+    def test_chroot_demand_halved(self):
+        key = KEY_CHROOT_DEMAND.format(group=self.group)
+        self.rc.hmset(key, {"fedora-20-x86_64": CHROOT_DEMAND_MAX - 1, "epel-7-x86_64": 11})
+
+        self.vmm.record_chroot_demand(self.group, "fedora-20-x86_64")
+        assert self.rc.hgetall(key) == {"fedora-20-x86_64": str(CHROOT_DEMAND_MAX // 2),
+                                        "epel-7-x86_64": "5"}
+
     def test_acquire_vm_per_user_limit(self, mc_time):
         mc_time.time.return_value = 0
         self.vmm.mark_server_start()
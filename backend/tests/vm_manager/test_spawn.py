@@ -1,5 +1,6 @@
 # coding: utf-8
 from Queue import Empty
+import json
 import shutil
 import tempfile
 import time
@@ -12,7 +13,7 @@ import six
 from backend.exceptions import CoprSpawnFailError
 
 from backend.helpers import get_redis_connection
-from backend.vm_manage.spawn import Spawner, spawn_instance, do_spawn_and_publish
+from backend.vm_manage.spawn import Spawner, spawn_instance, do_spawn_and_publish, warm_up_instance
 
 if six.PY3:
     from unittest import mock
@@ -59,6 +60,18 @@ def mc_spawn_instance():
         yield handle
 
 
+@pytest.yield_fixture
+def mc_runner():
+    with mock.patch("{}.Runner".format(MODULE_REF)) as handle:
+        yield handle
+
+
+@pytest.yield_fixture
+def mc_vmm_class():
+    with mock.patch("{}.VmManager".format(MODULE_REF)) as handle:
+        yield handle
+
+
 @pytest.yield_fixture
 def mc_grc():
     with mock.patch("{}.get_redis_connection".format(MODULE_REF)) as handle:
@@ -222,6 +235,81 @@ class TestSpawner(object):
             'copr:backend:vm:pubsub::',
             '{"topic": "vm_spawned", "group": 0, "result": "foobar"}')
 
+    def test_do_spawn_and_publish_warm_up(self, mc_spawn_instance, mc_grc, mc_vmm_class, mc_runner):
+        self.opts.build_user = "mockbuilder"
+        self.opts.vm_ssh_check_timeout = 5
+        self.opts.build_groups[0]["warm_up_chroots"] = 2
+        mc_rc = mock.MagicMock()
+        mc_grc.return_value = mc_rc
+        mc_spawn_instance.return_value = {"vm_ip": self.vm_ip, "vm_name": self.vm_name}
+        mc_vmm_class.return_value.get_most_demanded_chroots.return_value = \
+            ["fedora-20-x86_64", "epel-7-x86_64"]
+        mc_runner.return_value.run.side_effect = [
+            {"contacted": {self.vm_ip: {"rc": 0}}},
+            {"contacted": {self.vm_ip: {"rc": 1}}},
+        ]
+
+        do_spawn_and_publish(self.opts, self.spawn_pb_path, self.group)
+        assert mc_vmm_class.return_value.get_most_demanded_chroots.call_args == mock.call(self.group, 2)
+        msg = json.loads(mc_rc.publish.call_args[0][1])
+        assert msg["warm_chroots"] == ["fedora-20-x86_64"]
+
+    def test_warm_up_instance_error(self, mc_runner):
+        self.opts.build_user = "mockbuilder"
+        self.opts.vm_ssh_check_timeout = 5
+        mc_runner.return_value.run.side_effect = [IOError(), {"dark": {self.vm_ip: {}}}]
+
+        assert warm_up_instance(self.opts, self.vm_ip, ["fedora-20-x86_64", "epel-7-x86_64"],
+                                self.logger, 600) == []
+
+    def test_warm_up_instance_time_budget(self, mc_runner, mc_time):
+        self.opts.build_user = "mockbuilder"
+        self.opts.vm_ssh_check_timeout = 5
+        # deadline, start and end of the first chroot, start of the second one
+        mc_time.time.side_effect = [0, 100, 500, 650]
+        mc_runner.return_value.run.return_value = {"contacted": {self.vm_ip: {"rc": 0}}}
+
+        assert warm_up_instance(self.opts, self.vm_ip, ["fedora-20-x86_64", "epel-7-x86_64"],
+                                self.logger, 600) == ["fedora-20-x86_64"]
+        assert mc_runner.return_value.run.call_count == 1
+        assert mc_runner.return_value.module_args == \
+            "timeout 500 /usr/bin/mock -r fedora-20-x86_64 --init"
+
+    def test_warm_up_instance_time_budget_after_failure(self, mc_runner, mc_time):
+        self.opts.build_user = "mockbuilder"
+        self.opts.vm_ssh_check_timeout = 5
+        mc_time.time.side_effect = [0, 100, 650]
+        mc_runner.return_value.run.return_value = {"contacted": {self.vm_ip: {"rc": 1}}}
+
+        chroots = ["fedora-20-x86_64", "epel-7-x86_64", "fedora-21-i386"]
+        assert warm_up_instance(self.opts, self.vm_ip, chroots, self.logger, 600) == []
+        # the failed chroot is not reported as skipped
+        assert self.logger.warning.call_args == mock.call(
+            "Warm up time of VM {} ran out, skipping chroots: {}".format(self.vm_ip, chroots[1:]))
+
+    def test_do_spawn_and_publish_warm_up_timeout(self, mc_spawn_instance, mc_grc, mc_vmm_class,
+                                                  mc_runner):
+        self.opts.build_user = "mockbuilder"
+        self.opts.vm_ssh_check_timeout = 5
+        self.opts.build_groups[0]["warm_up_chroots"] = 2
+        self.opts.build_groups[0]["warm_up_timeout"] = 300
+        mc_rc = mock.MagicMock()
+        mc_grc.return_value = mc_rc
+        mc_spawn_instance.return_value = {"vm_ip": self.vm_ip, "vm_name": self.vm_name}
+        mc_vmm_class.return_value.get_most_demanded_chroots.return_value = \
+            ["fedora-20-x86_64", "epel-7-x86_64"]
+        # killed by `timeout` on the builder, e.g. mirror stalled
+        mc_runner.return_value.run.return_value = {"contacted": {self.vm_ip: {"rc": 124}}}
+
+        do_spawn_and_publish(self.opts, self.spawn_pb_path, self.group)
+        assert mc_runner.return_value.run.call_count == 1
+        timeout = mc_runner.return_value.module_args.split()[1]
+        assert 0 < int(timeout) <= 300
+        # VM is used anyway, just without the warm chroots
+        msg = json.loads(mc_rc.publish.call_args[0][1])
+        assert msg["vm_name"] == self.vm_name
+        assert msg["warm_chroots"] == []
+
     def test_do_spawn_and_publish_publish_error(self, mc_spawn_instance, mc_grc):
         mc_spawn_instance.return_value = {"result": "foobar"}
         mc_grc.side_effect = ConnectionError()
@@ -2,7 +2,6 @@
 # -*- coding: UTF-8 -*-
 import os
 import re
-import subprocess
 
 import argparse
 from urlparse import urlparse
@@ -24,10 +23,14 @@ log = logging.getLogger(__name__)
 log.addHandler(NullHandler())
 
 from copr import CoprClient
+from copr.client.client import BUILD_STATUS_MAX_IDS
 import copr.exceptions as copr_exceptions
 
 from .util import ProgressBar
 
+# seconds between status requests when the server doesn't say otherwise
+WATCH_INTERVAL = 30
+
 
 no_config_warning = """
 |================ WARNING: =======================|
@@ -98,42 +101,59 @@ class Commands(object):
         prevstatus = defaultdict(lambda: None)
         failed_ids = []
 
-        watched = set([bw.build_id for bw in builds_list])
+        watched = sorted(set([bw.build_id for bw in builds_list]))
+        # the statuses are requested in chunks, each chunk has its own etag
+        chunks = [watched[i:i + BUILD_STATUS_MAX_IDS]
+                  for i in range(0, len(watched), BUILD_STATUS_MAX_IDS)]
+        etags = {}
         done = set()
 
         try:
-            while watched != done:
-                for build_id in watched:
-                    if build_id in done:
+            while len(done) < len(watched):
+                retry_after = None
+                for index, chunk in enumerate(chunks):
+                    pending = [build_id for build_id in chunk if build_id not in done]
+                    if not pending:
                         continue
 
-                    build_details = self.client.get_build_details(build_id)
+                    result = self.client.get_build_statuses(
+                        [int(build_id) for build_id in pending], etag=etags.get(index))
 
-                    if build_details.output != "ok":
-                        errmsg = "  Build {1}: Unable to get build status: {0}". \
-                            format(build_details.error, build_id)
+                    if result.output != "ok":
+                        errmsg = "  Unable to get build status: {0}".format(result.error)
                         raise copr_exceptions.CoprRequestException(errmsg)
 
+                    etags[index] = result.etag
+                    retry_after = result.retry_after
+                    if result.builds is None:
+                        # nothing changed since the last request
+                        continue
+
                     now = datetime.datetime.now()
-                    if prevstatus[build_id] != build_details.status:
-                        prevstatus[build_id] = build_details.status
-                        print("  {0} Build {2}: {1}".format(
-                            now.strftime("%H:%M:%S"),
-                            build_details.status, build_id))
-
-                    if build_details.status in ["failed"]:
-                        failed_ids.append(build_id)
-                    if build_details.status in ["succeeded", "skipped",
-                                                "failed", "canceled"]:
-                        done.add(build_id)
-                    if build_details.status == "unknown":
-                        raise copr_exceptions.CoprBuildException(
-                            "Unknown status.")
-
-                if watched == done:
-                    break
-
-                time.sleep(30)
+                    for build_id in pending:
+                        status = result.builds.get(int(build_id))
+                        if status is None:
+                            errmsg = "  Build {0}: Unable to get build status: build not found". \
+                                format(build_id)
+                            raise copr_exceptions.CoprRequestException(errmsg)
+
+                        if prevstatus[build_id] != status:
+                            prevstatus[build_id] = status
+                            print("  {0} Build {2}: {1}".format(
+                                now.strftime("%H:%M:%S"),
+                                status, build_id))
+
+                        if status in ["failed"]:
+                            failed_ids.append(build_id)
+                        if status in ["succeeded", "skipped",
+                                      "failed", "canceled"]:
+                            done.add(build_id)
+                        if status == "unknown":
+                            raise copr_exceptions.CoprBuildException(
+                                "Unknown status.")
+
+                if len(done) < len(watched):
+                    time.sleep(retry_after or WATCH_INTERVAL)
 
             if failed_ids:
                 raise copr_exceptions.CoprBuildException(
@@ -167,14 +187,17 @@ class Commands(object):
 
             print('Uploading package {}'.format(args.pkgs[0]))
         else:
+            bar = None
             progress_callback = None
 
         result = self.client.create_new_build(
             projectname=copr, chroots=args.chroots, pkgs=args.pkgs,
             memory=args.memory, timeout=args.timeout,
-            username=username, progress_callback=progress_callback)
+            username=username, progress_callback=progress_callback,
+            force_rebuild=args.force_rebuild)
 
-        bar.finish()
+        if bar:
+            bar.finish()
 
         if result.output != "ok":
             print(result.error)
@@ -260,20 +283,18 @@ class Commands(object):
         assert pkgs_name.endswith(".src.rpm")
 
         base_url = result.results
-        base_len = len(os.path.split(base_url))
 
         pkg_dir = pkgs_name[:-8]
+        targets = []
         for chroot, status in result.data["chroots"].items():
             if args.chroots and chroot not in args.chroots:
                 continue
 
-            cmd = "wget -r -nH --no-parent --reject 'index.html*'".split(' ')
-
-            cmd.extend(['-P', os.path.join(args.dest, chroot)])
-            cmd.extend(['--cut-dirs', str(base_len + 4)])
-            cmd.append("{}{}/{}/".format(base_url, chroot, pkg_dir))
+            targets.append(("{}{}/{}/".format(base_url, chroot, pkg_dir),
+                            os.path.join(args.dest, chroot)))
 
-            subprocess.call(cmd)
+        for path in self.client.download_results(targets):
+            print(path)
 
     @requires_api_auth
     def action_cancel(self, args):
@@ -371,6 +392,8 @@ def setup_parser():
                               help="")
     parser_build.add_argument("--nowait", action="store_true", default=False,
                               help="Don't wait for build")
+    parser_build.add_argument("--force-rebuild", dest="force_rebuild", action="store_true", default=False,
+                              help="Build again even if results of an identical build could be reused")
     parser_build.set_defaults(func="action_build")
 
     # create the parser for the "status" command
@@ -330,9 +330,8 @@ def test_delete_project(mock_cc, capsys):
     assert "{}\n".format(response_message) in out
 
 
-@mock.patch('copr_cli.main.subprocess')
 @mock.patch('copr_cli.main.CoprClient')
-def test_download_build(mock_cc, mock_sp, capsys):
+def test_download_build(mock_cc, capsys):
     mock_client = MagicMock(no_config=False)
     mock_client.get_build_details.return_value = \
         MagicMock(
@@ -342,31 +341,23 @@ def test_download_build(mock_cc, mock_sp, capsys):
             src_pkg="http://example/python/python-copr-1.50-1.fc20.src.rpm",
             results="http://example.com/results/",
         )
+    mock_client.download_results.return_value = [
+        "./epel-6-x86_64/python-copr-1.50-1.fc20.noarch.rpm"]
     mock_cc.create_from_file_config.return_value = mock_client
 
-    mock_sp.call.return_value = None
     main.main(argv=["download-build", "foo"])
     stdout, stderr = capsys.readouterr()
 
-    expected_sp_call_args = [
-        mock.call([
-            'wget', '-r', '-nH', '--no-parent', '--reject', "'index.html*'",
-            '-P', u'./epel-6-x86_64', '--cut-dirs', '6',
-            'http://example.com/results/epel-6-x86_64/python-copr-1.50-1.fc20/'
-        ]),
-        mock.call([
-            'wget', '-r', '-nH', '--no-parent', '--reject', "'index.html*'",
-            '-P', u'./epel-6-i386', '--cut-dirs', '6',
-            'http://example.com/results/epel-6-i386/python-copr-1.50-1.fc20/'
-        ])
+    targets = mock_client.download_results.call_args[0][0]
+    assert sorted(targets) == [
+        ('http://example.com/results/epel-6-i386/python-copr-1.50-1.fc20/', u'./epel-6-i386'),
+        ('http://example.com/results/epel-6-x86_64/python-copr-1.50-1.fc20/', u'./epel-6-x86_64'),
     ]
-
-    assert mock_sp.call.call_args_list == expected_sp_call_args
+    assert "python-copr-1.50-1.fc20.noarch.rpm" in stdout
 
 
-@mock.patch('copr_cli.main.subprocess')
 @mock.patch('copr_cli.main.CoprClient')
-def test_download_build_select_chroot(mock_cc, mock_sp, capsys):
+def test_download_build_select_chroot(mock_cc, capsys):
     mock_client = MagicMock(no_config=False)
     mock_client.get_build_details.return_value = \
         MagicMock(
@@ -376,20 +367,15 @@ def test_download_build_select_chroot(mock_cc, mock_sp, capsys):
             src_pkg="http://example/python/python-copr-1.50-1.fc20.src.rpm",
             results="http://example.com/results/",
         )
+    mock_client.download_results.return_value = []
     mock_cc.create_from_file_config.return_value = mock_client
 
-    mock_sp.call.return_value = None
     main.main(argv=["download-build", "foo", "-r", "epel-6-x86_64"])
     stdout, stderr = capsys.readouterr()
-    expected_sp_call_args = [
-        mock.call([
-            'wget', '-r', '-nH', '--no-parent', '--reject', "'index.html*'",
-            '-P', u'./epel-6-x86_64', '--cut-dirs', '6',
-            'http://example.com/results/epel-6-x86_64/python-copr-1.50-1.fc20/'
-        ]),
-    ]
 
-    assert mock_sp.call.call_args_list == expected_sp_call_args
+    mock_client.download_results.assert_called_once_with([
+        ('http://example.com/results/epel-6-x86_64/python-copr-1.50-1.fc20/', u'./epel-6-x86_64'),
+    ])
 
 
 @mock.patch('copr_cli.main.CoprClient')
@@ -474,8 +460,8 @@ def test_create_build_wait_succeeded_no_sleep(mock_cc, mock_time, capsys):
             MagicMock(build_id=x)
             for x in range(3)
         ])
-    mock_client.get_build_details.return_value = MagicMock(
-        status="succeeded", output="ok"
+    mock_client.get_build_statuses.return_value = MagicMock(
+        builds=dict((x, "succeeded") for x in range(3)), output="ok"
     )
     mock_cc.create_from_file_config.return_value = mock_client
     main.main(argv=[
@@ -503,7 +489,7 @@ def test_create_build_wait_error_status(mock_cc, capsys):
             MagicMock(build_id=x)
             for x in ["1", "2", "3"]
         ])
-    mock_client.get_build_details.return_value = MagicMock(
+    mock_client.get_build_statuses.return_value = MagicMock(
         output="notok"
     )
     mock_cc.create_from_file_config.return_value = mock_client
@@ -532,8 +518,8 @@ def test_create_build_wait_unknown_build_status(mock_cc, capsys):
             MagicMock(build_id=x)
             for x in ["1", "2", "3"]
         ])
-    mock_client.get_build_details.return_value = MagicMock(
-        output="ok", status="unknown"
+    mock_client.get_build_statuses.return_value = MagicMock(
+        output="ok", builds=dict((x, "unknown") for x in [1, 2, 3])
     )
     mock_cc.create_from_file_config.return_value = mock_client
     with pytest.raises(SystemExit) as err:
@@ -561,7 +547,7 @@ def test_create_build_wait_keyboard_interrupt(mock_cc, capsys):
             MagicMock(build_id=x)
             for x in ["1", "2", "3"]
         ])
-    mock_client.get_build_details.side_effect = KeyboardInterrupt
+    mock_client.get_build_statuses.side_effect = KeyboardInterrupt
 
     mock_cc.create_from_file_config.return_value = mock_client
 
@@ -593,25 +579,25 @@ class TestCreateBuild(object):
 
         self.stage = 0
 
-        def incr(*args, **kwargs):
+        def result_map(build_ids, *args, **kwargs):
             self.stage += 1
-
-        def result_map(build_id, *args, **kwargs):
-            if self.stage == 0:
-                return MagicMock(status="pending", output="ok")
-            elif self.stage == 1:
-                smap = {0: "pending", 1: "starting", 2: "running"}
-                return MagicMock(status=smap[build_id], output="ok")
+            if self.stage == 1:
+                smap = {0: "pending", 1: "pending", 2: "pending"}
             elif self.stage == 2:
-                smap = {0: "starting", 1: "running", 2: "succeeded"}
-                return MagicMock(status=smap[build_id], output="ok")
+                smap = {0: "pending", 1: "starting", 2: "running"}
             elif self.stage == 3:
+                # nothing changed while waiting
+                return MagicMock(builds=None, output="ok", etag=str(self.stage - 1),
+                                 retry_after=10)
+            elif self.stage == 4:
+                smap = {0: "starting", 1: "running", 2: "succeeded"}
+            elif self.stage == 5:
                 smap = {0: "skipped", 1: "succeeded", 2: "succeeded"}
-                return MagicMock(status=smap[build_id], output="ok")
-
-        mock_time.sleep.side_effect = incr
+            assert set(build_ids) <= set(smap)
+            return MagicMock(builds=smap, output="ok", etag=str(self.stage),
+                             retry_after=10)
 
-        mock_client.get_build_details.side_effect = result_map
+        mock_client.get_build_statuses.side_effect = result_map
         mock_cc.create_from_file_config.return_value = mock_client
 
         main.main(argv=[
@@ -624,7 +610,12 @@ class TestCreateBuild(object):
         assert response_message in stdout
         assert "Created builds" in stdout
         assert "Watching build" in stdout
-        assert len(mock_time.sleep.call_args_list) == 3
+        assert mock_client.get_build_statuses.call_count == 5
+        # the etag of the previous answer is sent back
+        assert [kwargs["etag"] for _, kwargs in
+                mock_client.get_build_statuses.call_args_list] == [None, "1", "2", "2", "4"]
+        # the client waits as told by the server between the requests
+        assert [args for args, _ in mock_time.sleep.call_args_list] == [(10,)] * 4
 
     def test_create_build_wait_failed_complex(self, mock_cc, mock_time, capsys):
         response_message = "foobar"
@@ -640,25 +631,25 @@ class TestCreateBuild(object):
 
         self.stage = 0
 
-        def incr(*args, **kwargs):
+        def result_map(build_ids, *args, **kwargs):
             self.stage += 1
-
-        def result_map(build_id, *args, **kwargs):
-            if self.stage == 0:
-                return MagicMock(status="pending", output="ok")
-            elif self.stage == 1:
-                smap = {0: "pending", 1: "starting", 2: "running"}
-                return MagicMock(status=smap[build_id], output="ok")
+            if self.stage == 1:
+                smap = {0: "pending", 1: "pending", 2: "pending"}
             elif self.stage == 2:
-                smap = {0: "failed", 1: "running", 2: "succeeded"}
-                return MagicMock(status=smap[build_id], output="ok")
+                smap = {0: "pending", 1: "starting", 2: "running"}
             elif self.stage == 3:
+                # nothing changed while waiting
+                return MagicMock(builds=None, output="ok", etag=str(self.stage - 1),
+                                 retry_after=10)
+            elif self.stage == 4:
+                smap = {0: "failed", 1: "running", 2: "succeeded"}
+            elif self.stage == 5:
                 smap = {0: "failed", 1: "failed", 2: "succeeded"}
-                return MagicMock(status=smap[build_id], output="ok")
+            assert set(build_ids) <= set(smap)
+            return MagicMock(builds=smap, output="ok", etag=str(self.stage),
+                             retry_after=10)
 
-        mock_time.sleep.side_effect = incr
-
-        mock_client.get_build_details.side_effect = result_map
+        mock_client.get_build_statuses.side_effect = result_map
         mock_cc.create_from_file_config.return_value = mock_client
 
         with pytest.raises(SystemExit) as err:
@@ -673,4 +664,49 @@ class TestCreateBuild(object):
         assert "Created builds" in stdout
         assert "Watching build" in stdout
         assert "Build(s) 0, 1 failed" in stderr
-        assert len(mock_time.sleep.call_args_list) == 3
+        assert mock_client.get_build_statuses.call_count == 5
+        # the etag of the previous answer is sent back
+        assert [kwargs["etag"] for _, kwargs in
+                mock_client.get_build_statuses.call_args_list] == [None, "1", "2", "2", "4"]
+        # the client waits as told by the server between the requests
+        assert [args for args, _ in mock_time.sleep.call_args_list] == [(10,)] * 4
+
+    def test_create_build_wait_many_builds(self, mock_cc, mock_time, capsys):
+        mock_client = MagicMock(no_config=False)
+        mock_client.create_new_build.return_value = MagicMock(
+            output="ok",
+            message="foobar",
+            builds_list=[
+                MagicMock(build_id=x)
+                for x in range(450)
+            ])
+
+        self.requests = []
+
+        def result_map(build_ids, etag=None):
+            self.requests.append((build_ids, etag))
+            chunk = build_ids[0] // 200
+            if etag:
+                # the first chunk is finished, the others didn't change
+                return MagicMock(builds=None, output="ok", etag=etag,
+                                 retry_after=10)
+            status = "succeeded" if chunk == 0 else "running"
+            return MagicMock(builds=dict((x, status) for x in build_ids),
+                             output="ok", etag="chunk{}".format(chunk),
+                             retry_after=10)
+
+        mock_client.get_build_statuses.side_effect = result_map
+        mock_cc.create_from_file_config.return_value = mock_client
+        mock_time.sleep.side_effect = [None, KeyboardInterrupt]
+
+        main.main(argv=[
+            "build",
+            "copr_name", "http://example.com/pkgs.srpm"
+        ])
+
+        assert [(len(ids), etag) for ids, etag in self.requests] == [
+            (200, None), (200, None), (50, None),
+            # finished builds are not asked for again
+            (200, "chunk1"), (50, "chunk2"),
+        ]
+        assert [args for args, _ in mock_time.sleep.call_args_list] == [(10,)] * 2
@@ -18,6 +18,7 @@ BuildRequires: systemd
 BuildRequires: dist-git
 BuildRequires: python-bunch
 BuildRequires: python-requests
+BuildRequires: python-copr >= 1.63
 BuildRequires: pyrpkg
 # check
 BuildRequires: python-six
@@ -32,6 +33,7 @@ Requires: systemd
 Requires: dist-git
 Requires: python-bunch
 Requires: python-requests
+Requires: python-copr >= 1.63
 Requires: pyrpkg
 Requires: mock-scm
 
@@ -0,0 +1,112 @@
+# coding: utf-8
+
+"""
+Repository listing for cgit (``project-list`` in cgitrc).
+
+Regenerating the whole listing scans all dist-git repositories, so after an
+import only the imported repository is appended to the listing when it is
+new. Full regeneration, which also drops deleted repositories, runs in
+background at most once per ``cgit_refresh_interval``. Repositories appended
+while it runs could be overwritten by the regenerated listing, so they are
+appended again once it finishes.
+"""
+
+import fcntl
+import logging
+import os
+import time
+from subprocess import Popen
+
+log = logging.getLogger(__name__)
+
+CGIT_PKG_LIST_SCRIPT = "/usr/share/dist-git/cgit_pkg_list.sh"
+
+
+class CgitPkgList(object):
+    """
+    :param str path: listing file, one ``<reponame>.git`` per line
+    :param int refresh_interval: min number of seconds between full regenerations
+    """
+    def __init__(self, path, refresh_interval):
+        self.path = path
+        self.refresh_interval = refresh_interval
+
+        self._repos = None
+        self._refresh_proc = None
+        self._last_refresh = 0
+        # entries appended while the regeneration runs
+        self._added_during_refresh = []
+
+    def _load(self):
+        self._repos = set()
+        if os.path.exists(self.path):
+            with open(self.path) as handle:
+                self._repos.update(line.strip() for line in handle)
+
+    def _append(self, entries):
+        with open(self.path, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            handle.write("".join("{}\n".format(entry) for entry in entries))
+        self._repos.update(entries)
+
+    def _check_refresh_finished(self):
+        """
+        :return bool: False when the regeneration is still running
+        """
+        if self._refresh_proc is None:
+            return True
+        if self._refresh_proc.poll() is None:
+            return False
+
+        self._refresh_proc = None
+        # the listing was rewritten
+        self._load()
+        missing = [entry for entry in self._added_during_refresh
+                   if entry not in self._repos]
+        self._added_during_refresh = []
+        if missing:
+            log.debug("adding {} into the regenerated cgit listing".format(", ".join(missing)))
+            self._append(missing)
+        return True
+
+    def add(self, reponame):
+        """
+        Appends the repository to the listing unless it is already there
+
+        :return bool: True when the repository was added
+        """
+        self._check_refresh_finished()
+        if self._repos is None:
+            self._load()
+
+        entry = "{}.git".format(reponame)
+        if entry in self._repos:
+            return False
+
+        log.debug("adding {} into the cgit listing".format(entry))
+        self._append([entry])
+        if self._refresh_proc is not None:
+            self._added_during_refresh.append(entry)
+        return True
+
+    def refresh_if_due(self):
+        """
+        Starts full regeneration of the listing in background unless
+        it is running or it was started less than `refresh_interval` ago
+
+        :return bool: True when the regeneration was started
+        """
+        if not self._check_refresh_finished():
+            return False
+
+        if time.time() - self._last_refresh < self.refresh_interval:
+            return False
+
+        log.debug("refreshing cgit listing")
+        self._last_refresh = time.time()
+        try:
+            self._refresh_proc = Popen([CGIT_PKG_LIST_SCRIPT, self.path])
+        except OSError:
+            log.exception("Failed to refresh cgit listing")
+            return False
+        return True
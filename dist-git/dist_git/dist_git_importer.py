@@ -10,14 +10,22 @@ from subprocess import PIPE, Popen, call
 
 from requests import get, post
 
+from copr.exceptions import RpmHeaderError
+from copr.rpm_header import read_header
+
 from .exceptions import PackageImportException, PackageDownloadException, PackageQueryException, GitAndTitoException, \
     SrpmBuilderException, GitException
 from .srpm_import import do_git_srpm_import
+from .git_cache import GitMirrorCache
+from .cgit_pkg_list import CgitPkgList
 
 from .helpers import FailTypeEnum
 
 log = logging.getLogger(__name__)
 
+# srpms have up to GBs, don't read them in small pieces
+COPY_BUFFER_SIZE = 1024 * 1024
+
 
 class SourceType:
     SRPM_LINK = 1
@@ -45,6 +53,9 @@ class ImportTask(object):
         # For SRPM_LINK and SRPM_UPLOAD
         self.package_url = None
 
+        # For SRPM_UPLOAD when the frontend srpm storage is mounted
+        self.package_path = None
+
         # For Git based providers (GIT_AND_TITO)
         self.git_url = None
         self.git_branch = None
@@ -86,6 +97,8 @@ class ImportTask(object):
             json_tmp = task.source_data["tmp"]
             json_pkg = task.source_data["pkg"]
             task.package_url = "{}/tmp/{}/{}".format(opts.frontend_base_url, json_tmp, json_pkg)
+            if getattr(opts, "srpm_storage_dir", None):
+                task.package_path = os.path.join(opts.srpm_storage_dir, json_tmp, json_pkg)
 
         elif task.source_type == SourceType.GIT_AND_TITO:
             task.git_url = task.source_data["git_url"]
@@ -118,19 +131,21 @@ class SourceProvider(object):
     """
     Proxy to download sources and save them as SRPM
     """
-    def __init__(self, task, target_path):
+    def __init__(self, task, target_path, git_cache=None):
         """
         :param ImportTask task:
         :param str target_path:
+        :param GitMirrorCache git_cache: mirrors of the git repositories, optional
         """
         self.task = task
         self.target_path = target_path
+        self.git_cache = git_cache
 
         if task.source_type == SourceType.SRPM_LINK:
             self.provider = SrpmUrlProvider
 
         elif task.source_type == SourceType.SRPM_UPLOAD:
-            self.provider = SrpmUrlProvider
+            self.provider = SrpmUploadProvider
 
         elif task.source_type == SourceType.GIT_AND_TITO:
             self.provider = GitAndTitoProvider
@@ -142,18 +157,19 @@ class SourceProvider(object):
             raise PackageImportException("Got unknown source type: {}".format(task.source_type))
 
     def get_srpm(self):
-        self.provider(self.task, self.target_path).get_srpm()
+        self.provider(self.task, self.target_path, self.git_cache).get_srpm()
 
 
 class BaseSourceProvider(object):
-    def __init__(self, task, target_path):
+    def __init__(self, task, target_path, git_cache=None):
         self.task = task
         self.target_path = target_path
+        self.git_cache = git_cache
 
 
 class SrpmBuilderProvider(BaseSourceProvider):
-    def __init__(self, task, target_path):
-        super(SrpmBuilderProvider, self).__init__(task, target_path)
+    def __init__(self, task, target_path, git_cache=None):
+        super(SrpmBuilderProvider, self).__init__(task, target_path, git_cache)
         self.tmp = tempfile.mkdtemp()
         self.tmp_dest = tempfile.mkdtemp()
 
@@ -176,14 +192,15 @@ class SrpmBuilderProvider(BaseSourceProvider):
 
 
 class GitProvider(SrpmBuilderProvider):
-    def __init__(self, task, target_path):
+    def __init__(self, task, target_path, git_cache=None):
         """
         :param ImportTask task:
         :param str target_path:
+        :param GitMirrorCache git_cache:
         """
         # task.git_url
         # task.git_branch
-        super(GitProvider, self).__init__(task, target_path)
+        super(GitProvider, self).__init__(task, target_path, git_cache)
         self.git_dir = None
 
     def get_srpm(self):
@@ -196,6 +213,11 @@ class GitProvider(SrpmBuilderProvider):
     def clone(self):
         # 1. clone the repo
         log.debug("GIT_BUILDER: 1. clone".format(self.task.source_type))
+        if self.git_cache:
+            self.git_dir = os.path.join(self.tmp, "repo")
+            self.git_cache.clone(self.task.git_url, self.git_dir)
+            return
+
         cmd = ['git', 'clone', self.task.git_url]
         try:
             proc = Popen(cmd, stdout=PIPE, stderr=PIPE, cwd=self.tmp)
@@ -298,10 +320,15 @@ class MockScmProvider(SrpmBuilderProvider):
         self.copy()
 
     def scm_option_get(self):
+        scm_url = self.task.mock_scm_url
+        if self.git_cache and self.task.mock_scm_type == "git":
+            # mock clones on the host, let it clone the local mirror
+            scm_url = self.git_cache.update(scm_url)
+
         return {
             "git": "git_get='git clone {}'",
             "svn": "git_get='git svn clone {}'"
-        }[self.task.mock_scm_type].format(self.task.mock_scm_url)
+        }[self.task.mock_scm_type].format(scm_url)
 
 
 class SrpmUrlProvider(BaseSourceProvider):
@@ -322,7 +349,7 @@ class SrpmUrlProvider(BaseSourceProvider):
         if 200 <= r.status_code < 400:
             try:
                 with open(self.target_path, 'wb') as f:
-                    for chunk in r.iter_content(1024):
+                    for chunk in r.iter_content(COPY_BUFFER_SIZE):
                         f.write(chunk)
             except Exception:
                 raise PackageDownloadException("Unexpected error during URL retrieval: {}"
@@ -332,6 +359,27 @@ class SrpmUrlProvider(BaseSourceProvider):
                                            .format(self.task.package_url, r.status_code))
 
 
+class SrpmUploadProvider(SrpmUrlProvider):
+    def get_srpm(self):
+        """
+        Used for SRPM_UPLOAD, reads the srpm directly from the frontend
+        storage when it is available, otherwise downloads it
+        :raises PackageDownloadException:
+        """
+        if self.task.package_path and os.path.exists(self.task.package_path):
+            log.debug("copy the package from the srpm storage")
+            try:
+                with open(self.task.package_path, "rb") as src, \
+                        open(self.target_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                return
+            except (IOError, OSError) as error:
+                log.warning("Failed to copy {}, downloading it instead: {}"
+                            .format(self.task.package_path, error))
+
+        super(SrpmUploadProvider, self).get_srpm()
+
+
 class DistGitImporter(object):
     def __init__(self, opts):
         self.is_running = False
@@ -344,6 +392,14 @@ class DistGitImporter(object):
 
         self.tmp_root = None
 
+        self.cgit_pkg_list = CgitPkgList(opts.cgit_pkg_list_location,
+                                         getattr(opts, "cgit_refresh_interval", 600))
+
+        self.git_cache = None
+        if getattr(opts, "git_cache_dir", None):
+            self.git_cache = GitMirrorCache(opts.git_cache_dir,
+                                            opts.git_cache_max_size * 1024 * 1024)
+
     def try_to_obtain_new_task(self):
         log.debug("1. Try to get task data")
         try:
@@ -381,31 +437,19 @@ class DistGitImporter(object):
         Queries a package for its name and evr (epoch:version-release)
         """
         log.debug("Verifying packagage, getting  name and version.")
-        cmd = ['rpm', '-qp', '--nosignature', '--qf', '%{NAME} %{EPOCH} %{VERSION} %{RELEASE}', srpm_path]
         try:
-            proc = Popen(cmd, stdout=PIPE, stderr=PIPE)
-            output, error = proc.communicate()
-        except OSError as e:
-            raise PackageQueryException(e)
-        if error:
-            raise PackageQueryException('Error querying srpm: %s' % error)
+            header = read_header(srpm_path)
+        except (IOError, RpmHeaderError) as e:
+            raise PackageQueryException('Error querying srpm: %s' % e)
 
-        try:
-            name, epoch, version, release = output.split(" ")
-        except ValueError as e:
-            raise PackageQueryException(e)
-
-        # Epoch is an integer or '(none)' if not set
-        if epoch.isdigit():
-            evr = "{}:{}-{}".format(epoch, version, release)
-        else:
-            evr = "{}-{}".format(version, release)
+        if not header.name or not header.version or not header.release:
+            raise PackageQueryException('Error querying srpm: missing name or version')
 
-        return name, evr
+        return header.name, header.evr
 
-    def after_git_import(self):
-        log.debug("refreshing cgit listing")
-        call(["/usr/share/dist-git/cgit_pkg_list.sh", self.opts.cgit_pkg_list_location])
+    def after_git_import(self, task):
+        self.cgit_pkg_list.add(task.reponame)
+        self.cgit_pkg_list.refresh_if_due()
 
     @staticmethod
     def before_git_import(task):
@@ -439,12 +483,12 @@ class DistGitImporter(object):
         fetched_srpm_path = os.path.join(tmp_root, "package.src.rpm")
 
         try:
-            SourceProvider(task, fetched_srpm_path).get_srpm()
+            SourceProvider(task, fetched_srpm_path, self.git_cache).get_srpm()
             task.package_name, task.package_version = self.pkg_name_evr(fetched_srpm_path)
 
             self.before_git_import(task)
             task.git_hash = self.git_import_srpm(task, fetched_srpm_path)
-            self.after_git_import()
+            self.after_git_import(task)
 
             log.debug("sending a response - success")
             self.post_back(task.get_dict_for_frontend())
@@ -480,6 +524,8 @@ class DistGitImporter(object):
         while self.is_running:
             mb_task = self.try_to_obtain_new_task()
             if mb_task is None:
+                # reaps the finished cgit listing refresh as well
+                self.cgit_pkg_list.refresh_if_due()
                 time.sleep(self.opts.sleep_time)
             else:
                 self.do_import(mb_task)
@@ -0,0 +1,146 @@
+# coding: utf-8
+
+"""
+Local mirrors of the upstream git repositories.
+
+Each upstream repository is mirrored once into ``<cache_dir>/<sha1 of url>.git``
+(branches and tags only) and updated by ``git fetch`` before each import,
+so only the new commits are downloaded. Imports then clone the mirror
+locally, which hardlinks the objects instead of copying them. Mirrors not
+used for the longest time are removed when the cache grows over the size limit.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+from subprocess import PIPE, Popen
+
+from .exceptions import GitException
+from .helpers import FailTypeEnum
+
+log = logging.getLogger(__name__)
+
+
+def _run_git(cmd, cwd=None):
+    """
+    :return bool: True when the git command succeeded
+    """
+    try:
+        proc = Popen(cmd, stdout=PIPE, stderr=PIPE, cwd=cwd)
+        output, error = proc.communicate()
+    except OSError as e:
+        log.error("Failed to run {}: {}".format(cmd, e))
+        return False
+    if proc.returncode:
+        log.error("Command {} failed: {}".format(cmd, error))
+        return False
+    return True
+
+
+def get_dir_size(path):
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+class GitMirrorCache(object):
+    """
+    :param str cache_dir: where the mirrors are kept
+    :param int max_size: size limit of the cache in bytes
+    """
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def get_mirror_path(self, url):
+        url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "{}.git".format(url_hash))
+
+    def _lock(self, mirror_path):
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        handle = open("{}.lock".format(mirror_path), "w")
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def update(self, url):
+        """
+        Creates or updates the mirror of the repository at `url`
+
+        :return str: path to the mirror
+        :raises GitException: when neither clone nor fetch succeeded
+        """
+        mirror_path = self.get_mirror_path(url)
+        lock = self._lock(mirror_path)
+        try:
+            if os.path.isdir(mirror_path):
+                log.debug("GIT_CACHE: fetch {} into {}".format(url, mirror_path))
+                if not _run_git(["git", "fetch", "--prune", "--tags", url,
+                                 "+refs/heads/*:refs/heads/*"], cwd=mirror_path):
+                    # the mirror might be broken, start over
+                    shutil.rmtree(mirror_path, ignore_errors=True)
+
+            if not os.path.isdir(mirror_path):
+                log.debug("GIT_CACHE: mirror {} into {}".format(url, mirror_path))
+                if not _run_git(["git", "clone", "--bare", url, mirror_path]):
+                    shutil.rmtree(mirror_path, ignore_errors=True)
+                    raise GitException(FailTypeEnum("git_clone_failed"))
+
+            # mtime of the mirror tells when it was used
+            os.utime(mirror_path, None)
+        finally:
+            lock.close()
+
+        return mirror_path
+
+    def clone(self, url, target_dir):
+        """
+        Clones repository at `url` into `target_dir` through the mirror,
+        origin of the clone points to `url`
+
+        :raises GitException:
+        """
+        mirror_path = self.update(url)
+        lock = self._lock(mirror_path)
+        try:
+            if not _run_git(["git", "clone", mirror_path, target_dir]):
+                raise GitException(FailTypeEnum("git_clone_failed"))
+        finally:
+            lock.close()
+
+        _run_git(["git", "remote", "set-url", "origin", url], cwd=target_dir)
+        self.evict(keep=mirror_path)
+
+    def evict(self, keep=None):
+        """
+        Removes the least recently used mirrors until the cache fits into `max_size`
+
+        :param str keep: path to the mirror which must not be removed
+        """
+        mirrors = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".git") and os.path.isdir(path):
+                mirrors.append((os.path.getmtime(path), get_dir_size(path), path))
+
+        total = sum(size for _, size, _ in mirrors)
+        for _, size, path in sorted(mirrors):
+            if total <= self.max_size:
+                break
+            if path == keep:
+                continue
+
+            lock = self._lock(path)
+            try:
+                log.info("GIT_CACHE: evicting {}, {} bytes".format(path, size))
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+            finally:
+                lock.close()
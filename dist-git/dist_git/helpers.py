@@ -110,8 +110,28 @@ class DistGitConfigReader(object):
             cp, "dist-git", "cgit_pkg_list_location", "/var/lib/copr-dist-git/cgit_pkg_list"
         )
 
+        opts.cgit_refresh_interval = _get_conf(
+            cp, "dist-git", "cgit_refresh_interval", 600, mode="int"
+        )
+
         opts.lookaside_location = _get_conf(
             cp, "dist-git", "lookaside_location", "/var/lib/dist-git/cache/lookaside/pkgs/"
         )
 
+        opts.lookaside_store_location = _get_conf(
+            cp, "dist-git", "lookaside_store_location", None, mode="path"
+        )
+
+        opts.srpm_storage_dir = _get_conf(
+            cp, "dist-git", "srpm_storage_dir", None, mode="path"
+        )
+
+        opts.git_cache_dir = _get_conf(
+            cp, "dist-git", "git_cache_dir", None, mode="path"
+        )
+
+        opts.git_cache_max_size = _get_conf(
+            cp, "dist-git", "git_cache_max_size", 10240, mode="int"
+        )
+
         return opts
@@ -0,0 +1,188 @@
+# coding: utf-8
+
+"""
+Content addressed store of the lookaside cache files.
+
+Source tarballs are often imported into many projects, so each content is
+stored only once as ``<store>/<sha256[:2]>/<sha256>`` and the lookaside
+cache paths ``<reponame>/<filename>/<md5>/<filename>`` are hardlinks to
+it, or symlinks when the lookaside cache is on another filesystem.
+Content is addressed by sha256 computed here, not by md5 coming from rpkg,
+so a crafted md5 collision can't replace sources of other projects.
+
+``<object>.refs`` lists the lookaside paths linked to the object,
+objects without any existing link are removed by :py:meth:`LookasideStore.gc`.
+The refs file is also the lock of the object, gc removes it together with
+the object, so it is opened again when it was removed while waiting
+for the lock.
+"""
+
+import errno
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+
+log = logging.getLogger(__name__)
+
+HASH_BUFFER_SIZE = 1024 * 1024
+OBJECT_MODE = 0o644
+
+
+def file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while True:
+            data = handle.read(HASH_BUFFER_SIZE)
+            if not data:
+                break
+            sha256.update(data)
+    return sha256.hexdigest()
+
+
+def _is_link_to(path, object_path):
+    try:
+        return os.path.samefile(path, object_path)
+    except OSError:
+        return False
+
+
+class LookasideStore(object):
+    """
+    :param str store_dir: where the objects are kept, should be on the same
+        filesystem as the lookaside cache
+    """
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+
+    def get_object_path(self, digest):
+        return os.path.join(self.store_dir, digest[:2], digest)
+
+    def _open_refs(self, object_path):
+        """
+        :return file: locked refs file of the object opened for reading and appending
+        """
+        refs_path = "{}.refs".format(object_path)
+        while True:
+            handle = open(refs_path, "a+")
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                if os.stat(refs_path).st_ino == os.fstat(handle.fileno()).st_ino:
+                    return handle
+            except OSError as error:
+                if error.errno != errno.ENOENT:
+                    handle.close()
+                    raise
+            # removed by gc meanwhile, nobody else would see what we write
+            handle.close()
+
+    def add(self, source, destination):
+        """
+        Makes `destination` a link to the stored content of `source`,
+        the content is stored only when it isn't in the store yet,
+        preferably by a hardlink of `source`.
+
+        :return str: path to the object
+        """
+        object_path = self.get_object_path(file_sha256(source))
+        if not os.path.isdir(os.path.dirname(object_path)):
+            try:
+                os.makedirs(os.path.dirname(object_path))
+            except OSError as error:
+                if error.errno != errno.EEXIST:
+                    raise
+
+        with self._open_refs(object_path) as refs:
+            if os.path.exists(object_path):
+                log.debug("LOOKASIDE: {} already stored as {}".format(source, object_path))
+            else:
+                tmp_path = "{}.tmp".format(object_path)
+                try:
+                    os.link(source, tmp_path)
+                except OSError:
+                    shutil.copyfile(source, tmp_path)
+                os.chmod(tmp_path, OBJECT_MODE)
+                os.rename(tmp_path, object_path)
+
+            self._link(object_path, destination)
+
+            refs.seek(0)
+            if destination not in refs.read().splitlines():
+                refs.write("{}\n".format(destination))
+
+        return object_path
+
+    @staticmethod
+    def _link(object_path, destination):
+        if _is_link_to(destination, object_path):
+            return
+
+        if not os.path.isdir(os.path.dirname(destination)):
+            os.makedirs(os.path.dirname(destination))
+
+        tmp_path = "{}.tmp".format(destination)
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            os.link(object_path, tmp_path)
+        except OSError as error:
+            if error.errno not in [errno.EXDEV, errno.EPERM, errno.EMLINK]:
+                raise
+            os.symlink(object_path, tmp_path)
+        # replaces an existing copy atomically
+        os.rename(tmp_path, destination)
+
+    def gc(self):
+        """
+        Removes objects which are not linked from the lookaside cache anymore
+
+        :return int: number of freed bytes
+        """
+        freed = 0
+        for root, _, files in os.walk(self.store_dir):
+            for name in files:
+                if name.endswith(".refs") or name.endswith(".tmp"):
+                    continue
+
+                object_path = os.path.join(root, name)
+                with self._open_refs(object_path) as refs:
+                    refs.seek(0)
+                    paths = refs.read().splitlines()
+                    alive = [path for path in paths if _is_link_to(path, object_path)]
+                    if alive:
+                        if alive != paths:
+                            refs.seek(0)
+                            refs.truncate()
+                            refs.write("".join("{}\n".format(path) for path in alive))
+                        continue
+
+                    log.info("LOOKASIDE: removing unused {}".format(object_path))
+                    freed += os.path.getsize(object_path)
+                    os.remove(object_path)
+                    os.remove("{}.refs".format(object_path))
+        return freed
+
+    def dedup(self, lookaside_dir):
+        """
+        Moves files of the existing lookaside cache into the store,
+        duplicates are replaced by links to one object
+
+        :return int: number of deduplicated files
+        """
+        count = 0
+        store_dir = os.path.abspath(self.store_dir)
+        for root, dirs, files in os.walk(lookaside_dir):
+            if os.path.abspath(root) == store_dir:
+                dirs[:] = []
+                continue
+            for name in files:
+                path = os.path.join(root, name)
+                if os.path.islink(path) or name.endswith(".tmp"):
+                    continue
+                if os.stat(path).st_nlink > 1:
+                    # already linked to the store
+                    continue
+                self.add(path, path)
+                count += 1
+        return count
@@ -11,6 +11,7 @@ from multiprocessing import Process, Manager
 # very dirty solution for now
 import pwd
 from dist_git.exceptions import PackageImportException
+from dist_git.lookaside import LookasideStore
 
 os.getlogin = lambda: pwd.getpwuid(os.getuid())[0]
 # monkey patch end
@@ -22,6 +23,10 @@ log = logging.getLogger(__name__)
 
 
 def my_upload_fabric(opts):
+    store = None
+    if getattr(opts, "lookaside_store_location", None):
+        store = LookasideStore(opts.lookaside_store_location)
+
     def my_upload(repo_dir, reponame, filename, filehash):
         """
         This is a replacement function for uploading sources.
@@ -31,7 +36,12 @@ def my_upload_fabric(opts):
         source = os.path.join(repo_dir, filename)
         destination = os.path.join(opts.lookaside_location, reponame,
                                    filename, filehash, filename)
-        if not os.path.exists(destination):
+        if os.path.exists(destination):
+            return
+
+        if store:
+            store.add(source, destination)
+        else:
             os.makedirs(os.path.dirname(destination))
             shutil.copyfile(source, destination)
     return my_upload
@@ -0,0 +1,44 @@
+#!/usr/bin/python2
+# coding: utf-8
+
+"""
+Maintenance of the deduplicated lookaside cache, see dist_git.lookaside
+
+    lookaside_maintenance.py dedup  # move the existing cache into the store
+    lookaside_maintenance.py gc     # remove sources not used by any package
+"""
+
+import argparse
+import logging
+import sys
+
+from dist_git.helpers import DistGitConfigReader
+from dist_git.lookaside import LookasideStore
+
+log = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lookaside cache maintenance")
+    parser.add_argument("action", choices=["dedup", "gc"])
+    parser.add_argument("--config", default=None, help="path to copr-dist-git.conf")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    opts = DistGitConfigReader(args.config).read()
+    if not opts.lookaside_store_location:
+        print("lookaside_store_location is not configured")
+        sys.exit(1)
+
+    store = LookasideStore(opts.lookaside_store_location)
+    if args.action == "dedup":
+        count = store.dedup(opts.lookaside_location)
+        print("Deduplicated {} files".format(count))
+    else:
+        freed = store.gc()
+        print("Freed {} bytes".format(freed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# coding: utf-8
+import os
+import shutil
+import tempfile
+
+import mock
+
+from dist_git.cgit_pkg_list import CgitPkgList, CGIT_PKG_LIST_SCRIPT
+
+MODULE_REF = "dist_git.cgit_pkg_list"
+
+
+class TestCgitPkgList(object):
+    def setup_method(self, method):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "cgit_pkg_list")
+        self.pkg_list = CgitPkgList(self.path, 600)
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tmp_dir)
+
+    def read(self):
+        with open(self.path) as handle:
+            return handle.read().splitlines()
+
+    def test_add(self):
+        with open(self.path, "w") as handle:
+            handle.write("foo/bar/baz.git\n")
+
+        assert not self.pkg_list.add("foo/bar/baz")
+        assert self.pkg_list.add("foo/bar/qux")
+        assert not self.pkg_list.add("foo/bar/qux")
+        assert self.read() == ["foo/bar/baz.git", "foo/bar/qux.git"]
+
+    @mock.patch("{}.time".format(MODULE_REF))
+    @mock.patch("{}.Popen".format(MODULE_REF))
+    def test_refresh_if_due(self, mc_popen, mc_time):
+        mc_time.time.return_value = 1000
+        mc_popen.return_value.poll.return_value = None
+        assert self.pkg_list.refresh_if_due()
+        mc_popen.assert_called_once_with([CGIT_PKG_LIST_SCRIPT, self.path])
+
+        # still running
+        mc_time.time.return_value = 2000
+        assert not self.pkg_list.refresh_if_due()
+
+        # finished, but the interval hasn't elapsed yet
+        mc_popen.return_value.poll.return_value = 0
+        mc_time.time.return_value = 1100
+        assert not self.pkg_list.refresh_if_due()
+        assert self.pkg_list._refresh_proc is None
+
+        mc_time.time.return_value = 1600
+        assert self.pkg_list.refresh_if_due()
+        assert mc_popen.call_count == 2
+
+    @mock.patch("{}.Popen".format(MODULE_REF))
+    def test_refresh_reloads_listing(self, mc_popen):
+        self.pkg_list.add("foo/bar/baz")
+        assert self.pkg_list.refresh_if_due()
+
+        # regenerated listing doesn't contain the deleted repository
+        with open(self.path, "w") as handle:
+            handle.write("")
+        mc_popen.return_value.poll.return_value = 0
+        self.pkg_list.refresh_if_due()
+        assert self.pkg_list.add("foo/bar/baz")
+
+    @mock.patch("{}.Popen".format(MODULE_REF))
+    def test_add_during_refresh(self, mc_popen):
+        self.pkg_list.add("foo/bar/baz")
+        mc_popen.return_value.poll.return_value = None
+        assert self.pkg_list.refresh_if_due()
+
+        assert self.pkg_list.add("foo/bar/qux")
+        # regenerated listing was written before qux was imported
+        with open(self.path, "w") as handle:
+            handle.write("foo/bar/baz.git\n")
+        mc_popen.return_value.poll.return_value = 0
+
+        assert self.pkg_list.add("foo/bar/quux")
+        assert self.read() == ["foo/bar/baz.git", "foo/bar/qux.git", "foo/bar/quux.git"]
+
+        # entries found by the regeneration are not duplicated
+        self.pkg_list._last_refresh = 0
+        mc_popen.return_value.poll.return_value = None
+        assert self.pkg_list.refresh_if_due()
+        assert self.pkg_list.add("foo/bar/xyz")
+        with open(self.path, "w") as handle:
+            handle.write("foo/bar/baz.git\nfoo/bar/xyz.git\n")
+        mc_popen.return_value.poll.return_value = 0
+        self.pkg_list.refresh_if_due()
+        assert self.read() == ["foo/bar/baz.git", "foo/bar/xyz.git"]
@@ -21,7 +21,11 @@ else:
     import mock
     from mock import MagicMock
 
-from dist_git.dist_git_importer import DistGitImporter, SourceType, ImportTask
+from copr.exceptions import RpmHeaderError
+from copr.rpm_header import RpmHeader, RPMTAG_NAME, RPMTAG_VERSION, RPMTAG_RELEASE, RPMTAG_EPOCH
+
+from dist_git.dist_git_importer import DistGitImporter, SourceType, ImportTask, SrpmUploadProvider, \
+    GitAndTitoProvider, MockScmProvider
 from dist_git.exceptions import PackageImportException, PackageDownloadException, PackageQueryException
 
 MODULE_REF = 'dist_git.dist_git_importer'
@@ -57,6 +61,12 @@ def mc_call():
         yield handle
 
 
+@pytest.yield_fixture
+def mc_read_header():
+    with mock.patch("{}.read_header".format(MODULE_REF)) as handle:
+        yield handle
+
+
 @pytest.yield_fixture
 def mc_get():
     with mock.patch("{}.get".format(MODULE_REF)) as handle:
@@ -99,7 +109,8 @@ class TestDistGitImporter(object):
 
             "lookaside_location": self.lookaside_location,
 
-            "cgit_pkg_list_location": self.tmp_dir_name,
+            "cgit_pkg_list_location": os.path.join(self.tmp_dir_name, "cgit_pkg_list"),
+            "cgit_refresh_interval": 600,
             "sleep_time": 10,
             "log_dir": self.tmp_dir_name
         })
@@ -177,6 +188,49 @@ class TestDistGitImporter(object):
         assert task.branch == self.BRANCH
         assert task.package_url == "http://front/tmp/tmp_2/pkg_2.src.rpm"
 
+    def test_srpm_upload_from_storage(self, mc_get):
+        self.opts.srpm_storage_dir = os.path.join(self.tmp_dir_name, "srpm_storage")
+        task = ImportTask.from_dict(self.task_data_2, self.opts)
+        assert task.package_path == os.path.join(
+            self.opts.srpm_storage_dir, "tmp_2", "pkg_2.src.rpm")
+
+        os.makedirs(os.path.dirname(task.package_path))
+        with open(task.package_path, "wb") as handle:
+            handle.write(b"srpm")
+
+        target_path = os.path.join(self.tmp_dir_name, "target.src.rpm")
+        SrpmUploadProvider(task, target_path).get_srpm()
+        with open(target_path, "rb") as handle:
+            assert handle.read() == b"srpm"
+        assert not mc_get.called
+
+    def test_srpm_upload_download_fallback(self, mc_get):
+        mc_get.return_value.status_code = 200
+        mc_get.return_value.iter_content.return_value = [b"sr", b"pm"]
+
+        target_path = os.path.join(self.tmp_dir_name, "target.src.rpm")
+        SrpmUploadProvider(self.task_2, target_path).get_srpm()
+        assert mc_get.call_args[0][0] == "http://front/tmp/tmp_2/pkg_2.src.rpm"
+        with open(target_path, "rb") as handle:
+            assert handle.read() == b"srpm"
+
+    def test_git_providers_use_cache(self):
+        git_cache = MagicMock()
+        git_cache.update.return_value = "/cache/abc.git"
+        task = ImportTask()
+        task.git_url = task.mock_scm_url = "https://example.com/foo.git"
+        task.mock_scm_type = "git"
+
+        provider = GitAndTitoProvider(task, "/tmp/none", git_cache)
+        provider.clone()
+        assert git_cache.clone.call_args == mock.call(task.git_url, provider.git_dir)
+        provider.clean()
+
+        provider = MockScmProvider(task, "/tmp/none", git_cache)
+        assert provider.scm_option_get() == "git_get='git clone /cache/abc.git'"
+        shutil.rmtree(provider.tmp)
+        shutil.rmtree(provider.tmp_dest)
+
     def test_try_to_obtain_new_task_unknown_source_type(self, mc_get):
         task_data = copy.deepcopy(self.task_data_1)
         task_data["source_type"] = 999999
@@ -224,51 +278,43 @@ class TestDistGitImporter(object):
     #         with pytest.raises(PackageImportException):
     #             self.dgi.git_import_srpm(self.task_1, source_path)
 
-    def test_pkg_name_evr(self, mc_popen):
-        mc_comm = MagicMock()
-        mc_popen.return_value.communicate = mc_comm
-
+    def test_pkg_name_evr(self, mc_read_header):
         test_plan = [
-            (("(none)", "0.1", "1.fc20"), "0.1-1.fc20"),
-            (("2", "0.1", "1.fc20"), "2:0.1-1.fc20")
+            ((None, "0.1", "1.fc20"), "0.1-1.fc20"),
+            ((2, "0.1", "1.fc20"), "2:0.1-1.fc20")
         ]
         for (e, v, r), expected in test_plan:
-            mc_comm.return_value = ("foo {} {} {}".format(e, v, r), None)
+            mc_read_header.return_value = RpmHeader({
+                RPMTAG_NAME: "foo", RPMTAG_VERSION: v, RPMTAG_RELEASE: r})
+            if e is not None:
+                mc_read_header.return_value.tags[RPMTAG_EPOCH] = [e]
             assert self.dgi.pkg_name_evr("/dev/null") == ("foo", expected)
 
-    def test_pkg_name_evr_error_handling(self, mc_popen):
-        mc_comm = MagicMock()
-        mc_popen.return_value.communicate = mc_comm
-
-        test_plan = [
-            (("(none)", "0.1", "1.fc20"), "0.1-1.fc20"),
-            (("2", "0.1", "1.fc20"), "2:0.1-1.fc20")
-        ]
-
-        mc_popen.side_effect = OSError
-        with pytest.raises(PackageQueryException):
-            self.dgi.pkg_name_evr("/dev/null")
-
-        mc_popen.side_effect = None
-        for (e, v, r), expected in test_plan:
-            mc_comm.return_value = ("foo {} {} {}".format(e, v, r), "err msg")
+    def test_pkg_name_evr_error_handling(self, mc_read_header):
+        for error in [IOError, RpmHeaderError]:
+            mc_read_header.side_effect = error
             with pytest.raises(PackageQueryException):
                 self.dgi.pkg_name_evr("/dev/null")
 
-        for (e, v, r), expected in test_plan:
-            mc_comm.return_value = ("", None)
-            with pytest.raises(PackageQueryException):
-                self.dgi.pkg_name_evr("/dev/null")
+        mc_read_header.side_effect = None
+        mc_read_header.return_value = RpmHeader({RPMTAG_NAME: "foo"})
+        with pytest.raises(PackageQueryException):
+            self.dgi.pkg_name_evr("/dev/null")
 
     def test_before_git_import(self, mc_call):
         # dummy test, just for coverage
         self.dgi.before_git_import(self.task_1)
         assert mc_call.called
 
-    def test_after_git_import(self, mc_call):
-        # dummy test, just for coverage
-        self.dgi.after_git_import()
-        assert mc_call.called
+    def test_after_git_import(self):
+        with mock.patch("dist_git.cgit_pkg_list.Popen") as mc_popen:
+            self.dgi.after_git_import(self.task_1)
+            self.dgi.after_git_import(self.task_1)
+
+        with open(self.opts.cgit_pkg_list_location) as handle:
+            assert handle.read() == "{}.git\n".format(self.task_1.reponame)
+        # the full refresh runs once per cgit_refresh_interval
+        assert mc_popen.call_count == 1
 
     def test_past_back(self, mc_post):
         dd = {"foo": "bar"}
@@ -0,0 +1,75 @@
+# coding: utf-8
+import os
+import shutil
+import tempfile
+from subprocess import check_output
+
+import pytest
+
+from dist_git.exceptions import GitException
+from dist_git.git_cache import GitMirrorCache
+
+
+def git(cwd, *args):
+    return check_output(["git", "-c", "user.name=t", "-c", "user.email=t@example.com"] + list(args),
+                        cwd=cwd).strip()
+
+
+class TestGitMirrorCache(object):
+    def setup_method(self, method):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = GitMirrorCache(os.path.join(self.tmp_dir, "cache"), 10 * 1024 * 1024)
+        self.upstream = self.make_upstream("upstream")
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tmp_dir)
+
+    def make_upstream(self, name):
+        path = os.path.join(self.tmp_dir, name)
+        os.makedirs(path)
+        git(path, "init", "-q")
+        self.commit(path, "first")
+        return path
+
+    def commit(self, path, message):
+        with open(os.path.join(path, "file"), "a") as handle:
+            handle.write(message)
+        git(path, "add", "file")
+        git(path, "commit", "-q", "-m", message)
+        return git(path, "rev-parse", "HEAD")
+
+    def test_clone(self):
+        target = os.path.join(self.tmp_dir, "clone_1")
+        self.cache.clone(self.upstream, target)
+        assert git(target, "log", "-1", "--format=%s") == b"first"
+        assert git(target, "remote", "get-url", "origin") == self.upstream.encode("utf-8")
+
+        # new commits are fetched into the existing mirror
+        mirror = self.cache.get_mirror_path(self.upstream)
+        git(self.upstream, "checkout", "-q", "-b", "devel")
+        head = self.commit(self.upstream, "second")
+
+        target = os.path.join(self.tmp_dir, "clone_2")
+        self.cache.clone(self.upstream, target)
+        git(target, "checkout", "-q", "devel")
+        assert git(target, "rev-parse", "HEAD") == head
+        assert sorted(os.listdir(self.cache.cache_dir)) == [
+            os.path.basename(mirror), os.path.basename(mirror) + ".lock"]
+
+    def test_clone_missing_repo(self):
+        with pytest.raises(GitException):
+            self.cache.clone(os.path.join(self.tmp_dir, "missing"),
+                             os.path.join(self.tmp_dir, "clone"))
+        assert not os.path.exists(self.cache.get_mirror_path(os.path.join(self.tmp_dir, "missing")))
+
+    def test_evict(self):
+        other = self.make_upstream("other")
+        self.cache.update(other)
+        os.utime(self.cache.get_mirror_path(other), (0, 0))
+
+        self.cache.max_size = 0
+        self.cache.clone(self.upstream, os.path.join(self.tmp_dir, "clone"))
+
+        # the least recently used mirror is evicted, the one just used is kept
+        assert not os.path.exists(self.cache.get_mirror_path(other))
+        assert os.path.exists(self.cache.get_mirror_path(self.upstream))
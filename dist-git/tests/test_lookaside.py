@@ -0,0 +1,111 @@
+# coding: utf-8
+import fcntl
+import os
+import shutil
+import tempfile
+
+import mock
+
+from dist_git.lookaside import LookasideStore, file_sha256
+
+
+class TestLookasideStore(object):
+    def setup_method(self, method):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.lookaside_dir = os.path.join(self.tmp_dir, "pkgs")
+        self.store = LookasideStore(os.path.join(self.tmp_dir, "objects"))
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tmp_dir)
+
+    def make_file(self, name, content):
+        path = os.path.join(self.tmp_dir, "src", name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "w") as handle:
+            handle.write(content)
+        return path
+
+    def lookaside_path(self, reponame, filename="foo.tar.gz", filehash="abc"):
+        return os.path.join(self.lookaside_dir, reponame, filename, filehash, filename)
+
+    def read(self, path):
+        with open(path) as handle:
+            return handle.read()
+
+    def test_add_stores_once(self):
+        dest_1 = self.lookaside_path("user1/proj/foo")
+        dest_2 = self.lookaside_path("user2/proj/foo")
+        object_1 = self.store.add(self.make_file("a", "content"), dest_1)
+        object_2 = self.store.add(self.make_file("b", "content"), dest_2)
+
+        assert object_1 == object_2 == self.store.get_object_path(file_sha256(dest_1))
+        assert os.path.samefile(dest_1, dest_2)
+        assert self.read(dest_2) == "content"
+        assert self.read(object_1 + ".refs").splitlines() == [dest_1, dest_2]
+
+    def test_add_different_content(self):
+        dest_1 = self.lookaside_path("user1/proj/foo")
+        dest_2 = self.lookaside_path("user2/proj/foo")
+        self.store.add(self.make_file("a", "content"), dest_1)
+        self.store.add(self.make_file("b", "other content"), dest_2)
+        assert not os.path.samefile(dest_1, dest_2)
+        assert self.read(dest_2) == "other content"
+
+    def test_gc(self):
+        dest_1 = self.lookaside_path("user1/proj/foo")
+        dest_2 = self.lookaside_path("user2/proj/foo")
+        dest_3 = self.lookaside_path("user3/proj/bar")
+        object_path = self.store.add(self.make_file("a", "content"), dest_1)
+        self.store.add(self.make_file("a", "content"), dest_2)
+        unused_path = self.store.add(self.make_file("b", "unused"), dest_3)
+
+        os.remove(dest_1)
+        os.remove(dest_3)
+        assert self.store.gc() == len("unused")
+
+        assert os.path.exists(object_path)
+        assert self.read(object_path + ".refs").splitlines() == [dest_2]
+        assert not os.path.exists(unused_path)
+        assert not os.path.exists(unused_path + ".refs")
+
+    def test_dedup(self):
+        paths = [self.lookaside_path("user{}/proj/foo".format(i)) for i in range(3)]
+        for path in paths:
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w") as handle:
+                handle.write("content")
+
+        assert self.store.dedup(self.lookaside_dir) == 3
+        assert os.path.samefile(paths[0], paths[1])
+        assert os.path.samefile(paths[0], paths[2])
+        assert self.read(paths[2]) == "content"
+        # second run has nothing to do
+        assert self.store.dedup(self.lookaside_dir) == 0
+
+    def test_add_while_gc_removes_object(self):
+        dest_1 = self.lookaside_path("user1/proj/foo")
+        dest_2 = self.lookaside_path("user2/proj/foo")
+        object_path = self.store.add(self.make_file("a", "content"), dest_1)
+        os.remove(dest_1)
+
+        real_flock = fcntl.flock
+        calls = []
+
+        def flock(handle, operation):
+            calls.append(handle)
+            if len(calls) == 1:
+                # gc held the lock and removed the object before add() got it
+                self.store.gc()
+                assert not os.path.exists(object_path + ".refs")
+            real_flock(handle, operation)
+
+        with mock.patch("dist_git.lookaside.fcntl.flock", side_effect=flock):
+            assert self.store.add(self.make_file("b", "content"), dest_2) == object_path
+
+        assert self.read(dest_2) == "content"
+        assert os.path.samefile(dest_2, object_path)
+        assert self.read(object_path + ".refs").splitlines() == [dest_2]
+        # a later gc keeps the object
+        assert self.store.gc() == 0
+        assert os.path.exists(object_path)
@@ -34,6 +34,7 @@ BuildRequires: python-argparse
 #BuildRequires: graphviz
 
 Requires:   httpd
+Requires:   crontabs
 Requires:   mod_wsgi
 Requires:   passwd
 Requires:   python-alembic
@@ -202,8 +203,10 @@ touch %{buildroot}%{_sharedstatedir}/copr/data/copr.db
 install -d %{buildroot}%{_var}/log/copr
 install -d %{buildroot}%{_sysconfdir}/logrotate.d
 install -d %{buildroot}%{_sysconfdir}/logstash.d
+install -d %{buildroot}%{_sysconfdir}/cron.hourly
 cp -a conf/logrotate %{buildroot}%{_sysconfdir}/logrotate.d/%{name}
 cp -a conf/logstash.conf %{buildroot}%{_sysconfdir}/logstash.d/copr_frontend.conf
+install -p -m 755 conf/crontab/copr-frontend %{buildroot}%{_sysconfdir}/cron.hourly/copr-frontend
 touch %{buildroot}%{_var}/log/copr/frontend.log
 
 %check
@@ -237,6 +240,7 @@ service logstash condrestart
 
 %config(noreplace) %{_sysconfdir}/logrotate.d/%{name}
 %config(noreplace) %{_sysconfdir}/logstash.d/copr_frontend.conf
+%config(noreplace) %{_sysconfdir}/cron.hourly/copr-frontend
 
 %defattr(-, copr-fe, copr-fe, -)
 %dir %{_sharedstatedir}/copr/data
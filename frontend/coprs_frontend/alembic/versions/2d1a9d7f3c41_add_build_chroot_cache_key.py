@@ -0,0 +1,24 @@
+"""add build_chroot.cache_key
+
+Revision ID: 2d1a9d7f3c41
+Revises: 573044986ee9
+Create Date: 2015-12-02 10:14:22.318412
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '2d1a9d7f3c41'
+down_revision = '573044986ee9'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column('build_chroot', sa.Column('cache_key', sa.String(length=64), nullable=True))
+    op.create_index('build_chroot_cache_key', 'build_chroot', ['cache_key'])
+
+
+def downgrade():
+    op.drop_index('build_chroot_cache_key', table_name='build_chroot')
+    op.drop_column('build_chroot', 'cache_key')
@@ -0,0 +1,54 @@
+"""add build summaries to copr and package
+
+Revision ID: 3b0851cb25fc
+Revises: e1f98bf3ecd3
+Create Date: 2016-01-18 14:05:41.719250
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '3b0851cb25fc'
+down_revision = 'e1f98bf3ecd3'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# succeeded = 1, skipped = 5, same as Build.status
+LAST_SUCCESSFUL_BUILD = """
+SELECT MAX(build.id) FROM build
+WHERE build.package_id = package.id
+    AND build.canceled IS NOT true
+    AND EXISTS (SELECT 1 FROM build_chroot
+                WHERE build_chroot.build_id = build.id AND build_chroot.status = 1)
+    AND NOT EXISTS (SELECT 1 FROM build_chroot
+                    WHERE build_chroot.build_id = build.id AND build_chroot.status NOT IN (1, 5))
+"""
+
+
+def upgrade():
+    op.add_column('copr', sa.Column('build_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('copr', sa.Column('last_build_id', sa.Integer(), nullable=True))
+    op.add_column('package', sa.Column('build_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('package', sa.Column('last_build_id', sa.Integer(), nullable=True))
+    op.add_column('package', sa.Column('last_successful_build_id', sa.Integer(), nullable=True))
+
+    op.execute("""
+UPDATE copr SET
+    build_count = (SELECT COUNT(*) FROM build WHERE build.copr_id = copr.id),
+    last_build_id = (SELECT MAX(build.id) FROM build WHERE build.copr_id = copr.id)
+""")
+    op.execute("""
+UPDATE package SET
+    build_count = (SELECT COUNT(*) FROM build WHERE build.package_id = package.id),
+    last_build_id = (SELECT MAX(build.id) FROM build WHERE build.package_id = package.id),
+    last_successful_build_id = ({})
+""".format(LAST_SUCCESSFUL_BUILD))
+
+
+def downgrade():
+    op.drop_column('package', 'last_successful_build_id')
+    op.drop_column('package', 'last_build_id')
+    op.drop_column('package', 'build_count')
+    op.drop_column('copr', 'last_build_id')
+    op.drop_column('copr', 'build_count')
@@ -0,0 +1,22 @@
+"""add build_chroot.build_stats
+
+Revision ID: 4c5f1f0b8e2d
+Revises: 2d1a9d7f3c41
+Create Date: 2015-12-07 14:02:51.503127
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '4c5f1f0b8e2d'
+down_revision = '2d1a9d7f3c41'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column('build_chroot', sa.Column('build_stats', sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('build_chroot', 'build_stats')
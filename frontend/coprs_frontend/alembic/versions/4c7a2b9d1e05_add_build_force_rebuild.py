@@ -0,0 +1,22 @@
+"""add build.force_rebuild
+
+Revision ID: 4c7a2b9d1e05
+Revises: 3b0851cb25fc
+Create Date: 2016-01-25 10:42:17.503914
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '4c7a2b9d1e05'
+down_revision = '3b0851cb25fc'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.add_column('build', sa.Column('force_rebuild', sa.Boolean(), server_default='0', nullable=False))
+
+
+def downgrade():
+    op.drop_column('build', 'force_rebuild')
@@ -0,0 +1,32 @@
+"""add indexes for build queues, monitor and project builds
+
+Revision ID: e1f98bf3ecd3
+Revises: 4c5f1f0b8e2d
+Create Date: 2016-01-11 10:32:18.402211
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'e1f98bf3ecd3'
+down_revision = '4c5f1f0b8e2d'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# running, pending, starting, importing; only a small fraction of build_chroot
+# rows is in these states, the partial index stays small
+UNFINISHED_STATUSES = "status IN (3, 4, 6, 7)"
+
+
+def upgrade():
+    op.create_index('build_chroot_unfinished_status_build_id', 'build_chroot', ['status', 'build_id'],
+                    postgresql_where=sa.text(UNFINISHED_STATUSES))
+    op.create_index('build_copr_id_id', 'build', ['copr_id', 'id'])
+    op.create_index('build_package_id_id', 'build', ['package_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('build_package_id_id', table_name='build')
+    op.drop_index('build_copr_id_id', table_name='build')
+    op.drop_index('build_chroot_unfinished_status_build_id', table_name='build_chroot')
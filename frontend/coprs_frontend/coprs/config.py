@@ -53,6 +53,18 @@ class Config(object):
 
     SRPM_STORAGE_DIR = "/var/lib/copr/data/srpm_storage/"
 
+    # resumable SRPM uploads: max size in bytes, max number of unfinished
+    # uploads of one user and the number of seconds after which an untouched
+    # upload is removed
+    UPLOAD_MAX_SIZE = 2 * 1024 ** 3
+    UPLOAD_MAX_OPEN_PER_USER = 10
+    UPLOAD_EXPIRATION = 24 * 3600
+
+    # bulk build status API: max number of builds in one request and
+    # the period (in seconds) of the checks suggested to the clients
+    BUILD_STATUS_MAX_IDS = 1000
+    BUILD_STATUS_POLL_INTERVAL = 10
+
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -16,6 +16,10 @@ CHROOTS = {
 # PAGINATION
 ITEMS_PER_PAGE = 10
 PAGES_URLS_COUNT = 5
+# builds listed on the package page
+RECENT_PACKAGE_BUILDS = 100
+# rows fetched at once for the streamed JSON responses
+STREAM_BATCH_SIZE = 100
 
 # Builds defaults
 # # memory in MB
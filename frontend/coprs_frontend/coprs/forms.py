@@ -310,6 +310,8 @@ class BuildFormFactory(object):
 
             enable_net = wtforms.BooleanField()
 
+            force_rebuild = wtforms.BooleanField()
+
         F.chroots_list = list(map(lambda x: x.name, active_chroots))
         F.chroots_list.sort()
         F.chroots_sets = {}
@@ -359,6 +361,8 @@ class BuildFormUploadFactory(object):
 
             enable_net = wtforms.BooleanField()
 
+            force_rebuild = wtforms.BooleanField()
+
         F.chroots_list = map(lambda x: x.name, active_chroots)
         F.chroots_list.sort()
         F.chroots_sets = {}
@@ -422,6 +426,8 @@ class BuildFormTitoFactory(object):
 
             enable_net = wtforms.BooleanField()
 
+            force_rebuild = wtforms.BooleanField()
+
         F.chroots_list = map(lambda x: x.name, active_chroots)
         F.chroots_list.sort()
         F.chroots_sets = {}
@@ -490,6 +496,8 @@ class BuildFormMockFactory(object):
 
             enable_net = wtforms.BooleanField()
 
+            force_rebuild = wtforms.BooleanField()
+
         F.chroots_list = map(lambda x: x.name, active_chroots)
         F.chroots_list.sort()
         F.chroots_sets = {}
@@ -533,6 +541,8 @@ class BuildFormRebuildFactory(object):
 
             enable_net = wtforms.BooleanField()
 
+            force_rebuild = wtforms.BooleanField()
+
         F.chroots_list = list(map(lambda x: x.name, active_chroots))
         F.chroots_list.sort()
         F.chroots_sets = {}
@@ -2,6 +2,11 @@ import math
 import random
 import string
 
+try:
+    from collections.abc import Iterator
+except ImportError:
+    from collections import Iterator
+
 from six import with_metaclass
 from six.moves.urllib.parse import urljoin
 
@@ -67,6 +72,7 @@ class ActionTypeEnum(with_metaclass(EnumType, object)):
         "createrepo": 3,
         "update_comps": 4,
         "gen_gpg_key": 5,
+        "update_project_settings": 6,
     }
 
 
@@ -192,6 +198,63 @@ class Paginator(object):
         return flask.url_for(request.endpoint, **args)
 
 
+def iter_json(value):
+    """
+    Encodes the value to JSON piece by piece. Iterators (generators,
+    `map` results, ...) anywhere in the value are encoded as arrays one item
+    at a time, so they are never held in memory as a whole. Other values
+    are encoded by `json.dumps`, with the same separators.
+    """
+    if isinstance(value, Iterator):
+        yield "["
+        for index, item in enumerate(value):
+            if index:
+                yield ", "
+            for chunk in iter_json(item):
+                yield chunk
+        yield "]"
+
+    elif isinstance(value, dict) and any(isinstance(item, Iterator) for item in value.values()):
+        yield "{"
+        for index, (key, item) in enumerate(value.items()):
+            yield (", " if index else "") + json.dumps(key) + ": "
+            for chunk in iter_json(item):
+                yield chunk
+        yield "}"
+
+    else:
+        yield json.dumps(value)
+
+
+def stream_json(value, status=200):
+    """
+    Response with the value encoded by `iter_json`, the encoding happens
+    while the response is being sent. Queries run in the iterators can't
+    change the status once the first bytes are out, errors only cut the
+    response short.
+    """
+    return flask.Response(flask.stream_with_context(iter_json(value)),
+                          status=status, mimetype="application/json")
+
+
+def iter_by_id(query, id_column, batch_size=500):
+    """
+    Iterates over the query results in batches of `batch_size` ordered by
+    `id_column` descending. Unlike `Query.yield_per` it works together with
+    eager loaded collections, each batch loads them on its own.
+    """
+    query = query.order_by(None).order_by(id_column.desc())
+    last_id = None
+    while True:
+        batch_query = query if last_id is None else query.filter(id_column < last_id)
+        batch = batch_query.limit(batch_size).all()
+        for obj in batch:
+            yield obj
+        if len(batch) < batch_size:
+            return
+        last_id = getattr(batch[-1], id_column.key)
+
+
 def chroot_to_branch(chroot):
     """
     Get a git branch name from chroot. Follow the fedora naming standard.
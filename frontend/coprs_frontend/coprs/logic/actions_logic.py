@@ -88,11 +88,9 @@ class ActionsLogic(object):
         """ Schedules build delete action
         :type build: models.Build
         """
-        # don't delete skipped chroots
-        chroots_to_delete = [
-            chroot.name for chroot in build.build_chroots
-            if chroot.state not in ["skipped"]
-        ]
+        # skipped chroots own a results dir too, the cached results
+        # are hardlinked into it
+        chroots_to_delete = [chroot.name for chroot in build.build_chroots]
         if len(chroots_to_delete) == 0:
             return
 
@@ -160,3 +158,34 @@ class ActionsLogic(object):
             created_on=int(time.time()),
         )
         db.session.add(action)
+
+    @classmethod
+    def send_update_project_settings(cls, copr):
+        """
+        Tells backend to drop its cached settings of the project,
+        at most one waiting action per project is queued, the cache
+        expires anyway so a missed invalidation is not fatal
+
+        :type copr: models.Copr
+        """
+        action_type = helpers.ActionTypeEnum("update_project_settings")
+        waiting = (cls.get_many(action_type, helpers.BackendResultEnum("waiting"))
+                   .filter(models.Action.object_type == "copr")
+                   .filter(models.Action.object_id == copr.id))
+        if waiting.first():
+            return
+
+        owner, projectname = copr.full_name.split("/")
+        data_dict = {
+            "username": owner,
+            "projectname": projectname,
+        }
+
+        action = models.Action(
+            action_type=action_type,
+            object_type="copr",
+            object_id=copr.id,
+            data=json.dumps(data_dict),
+            created_on=int(time.time()),
+        )
+        db.session.add(action)
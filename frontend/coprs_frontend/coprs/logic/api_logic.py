@@ -5,6 +5,12 @@
     to [de]serialize model instances for API views.
 """
 
+from sqlalchemy.orm import subqueryload
+
+from coprs import helpers
+from coprs import models
+from coprs.constants import STREAM_BATCH_SIZE
+
 
 class BuildWrapper(object):
     def __init__(self, build):
@@ -43,16 +49,24 @@ class MonitorWrapper(object):
         self.monitor_data = monitor_data
 
     def to_dict(self):
+        """
+        Builds and packages are generators, the result is meant
+        for `helpers.stream_json`
+        """
         out = {}
-        out["chroots"] = map(lambda x: x.name, self.copr.active_chroots_sorted)
-        out["builds"] = [
-            BuildWrapper(build).to_dict()
-            for build in self.copr.builds
-        ]
-
+        out["chroots"] = [ch.name for ch in self.copr.active_chroots_sorted]
+        out["builds"] = (BuildWrapper(build).to_dict() for build in self.iter_builds())
+        out["packages"] = self.iter_packages()
+        return out
 
-        packages = []
+    def iter_builds(self):
+        # state of the builds needs their build chroots
+        query = (models.Build.query
+                 .filter(models.Build.copr_id == self.copr.id)
+                 .options(subqueryload(models.Build.build_chroots)))
+        return helpers.iter_by_id(query, models.Build.id, STREAM_BATCH_SIZE)
 
+    def iter_packages(self):
         for pkg in self.monitor_data:
             package = pkg["package"]
             chroots = pkg["build_chroots"]
@@ -66,9 +80,6 @@ class MonitorWrapper(object):
                 else:
                     results[ch.name] = None
 
-            packages.append({"pkg_name": package.name,
-                             "pkg_version": None,
-                             "results": results})
-
-        out["packages"] = packages
-        return out
+            yield {"pkg_name": package.name,
+                   "pkg_version": None,
+                   "results": results}
@@ -1,6 +1,7 @@
 from collections import defaultdict
 import tempfile
 import shutil
+import hashlib
 import json
 import os
 import pprint
@@ -10,6 +11,7 @@ import sqlite3
 from sqlalchemy.sql import text
 from sqlalchemy import or_
 from sqlalchemy import and_
+from sqlalchemy import case, func
 from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.sql import false
@@ -34,6 +36,14 @@ from .coprs_logic import MockChrootsLogic
 log = app.logger
 
 
+def _greatest(column, value):
+    """
+    SQL expression of the greater of a nullable column and the value,
+    concurrent updates of the build summaries don't overwrite each other
+    """
+    return case([(func.coalesce(column, 0) > value, column)], else_=value)
+
+
 class BuildsLogic(object):
     @classmethod
     def get(cls, build_id):
@@ -115,6 +125,14 @@ class BuildsLogic(object):
         """
         return cls.get_multiple().filter(models.Build.copr == copr)
 
+    @classmethod
+    def get_latest_with_results(cls, copr):
+        """ Get the most recent build in copr which has results or None
+        """
+        return (cls.get_multiple_by_copr(copr)
+                .filter(models.Build.results.isnot(None), models.Build.results != "")
+                .first())
+
     @classmethod
     def get_multiple_by_owner(cls, user):
         """ Get collection of builds in copr sorted by build_id descending
@@ -124,7 +142,16 @@ class BuildsLogic(object):
             models.Copr.owner == user)
 
     @classmethod
-    def get_copr_builds_list(cls, copr):
+    def get_copr_builds_list(cls, copr, package=None, limit=None):
+        """
+        :param package: only builds of the package
+        :param int limit: only the given number of the most recent builds
+        """
+        conditions = "build.copr_id = {}".format(int(copr.id))
+        if package is not None:
+            conditions += " AND build.package_id = {}".format(int(package.id))
+        limit_clause = "" if limit is None else "ORDER BY build.id DESC LIMIT {}".format(int(limit))
+
         query_select = """
 SELECT build.id, MAX(package.name) AS pkg_name, build.pkg_version, build.submitted_on,
     MIN(statuses.started_on) AS started_on, MAX(statuses.ended_on) AS ended_on, order_to_status(MIN(statuses.st)) AS status,
@@ -140,10 +167,11 @@ LEFT OUTER JOIN "user"
     ON copr.owner_id = "user".id
 LEFT OUTER JOIN "group"
     ON copr.group_id = "group".id
-WHERE build.copr_id = {copr_id}
+WHERE {conditions}
 GROUP BY
-    build.id;
-""".format(copr_id=copr.id)
+    build.id
+{limit_clause};
+""".format(conditions=conditions, limit_clause=limit_clause)
 
         if db.engine.url.drivername == "sqlite":
             def sqlite_status_to_order(x):
@@ -242,6 +270,16 @@ GROUP BY
     def get_by_ids(cls, ids):
         return models.Build.query.filter(models.Build.id.in_(ids))
 
+    @classmethod
+    def get_states(cls, build_ids):
+        """
+        :return dict: build id -> text representation of the build status,
+            non-existing builds are omitted
+        """
+        query = (cls.get_by_ids(build_ids)
+                 .options(joinedload(models.Build.build_chroots)))
+        return dict((build.id, build.state) for build in query)
+
     @classmethod
     def get_by_id(cls, build_id):
         return models.Build.query.filter(models.Build.id == build_id)
@@ -277,10 +315,12 @@ GROUP BY
             source_type=source_build.source_type,
             source_json=source_build.source_json,
             enable_net=build_options.get("enabled_net", source_build.enable_net),
+            force_rebuild=build_options.get("force_rebuild", False),
             git_hashes=git_hashes,
             skip_import=skip_import)
 
-        build.package_id = source_build.package_id
+        if source_build.package is not None:
+            cls.assign_package(build, source_build.package)
         build.pkg_version = source_build.pkg_version
 
         if user.proven:
@@ -319,7 +359,8 @@ GROUP BY
             chroots=chroots,
             source_type=source_type,
             source_json=source_json,
-            enable_net=build_options.get("enabled_net", copr.build_enable_net))
+            enable_net=build_options.get("enabled_net", copr.build_enable_net),
+            force_rebuild=build_options.get("force_rebuild", False))
 
         if user.proven:
             if "timeout" in build_options:
@@ -360,7 +401,8 @@ GROUP BY
             chroots=chroots,
             source_type=source_type,
             source_json=source_json,
-            enable_net=build_options.get("enabled_net", copr.build_enable_net))
+            enable_net=build_options.get("enabled_net", copr.build_enable_net),
+            force_rebuild=build_options.get("force_rebuild", False))
 
         if user.proven:
             if "timeout" in build_options:
@@ -401,7 +443,8 @@ GROUP BY
             chroots=chroots,
             source_type=source_type,
             source_json=source_json,
-            enable_net=build_options.get("enabled_net", copr.build_enable_net))
+            enable_net=build_options.get("enabled_net", copr.build_enable_net),
+            force_rebuild=build_options.get("force_rebuild", False))
 
         if user.proven:
             if "timeout" in build_options:
@@ -447,7 +490,8 @@ GROUP BY
                 chroots=chroots,
                 source_type=source_type,
                 source_json=source_json,
-                enable_net=build_options.get("enabled_net", copr.build_enable_net))
+                enable_net=build_options.get("enabled_net", copr.build_enable_net),
+            force_rebuild=build_options.get("force_rebuild", False))
 
             if user.proven:
                 if "timeout" in build_options:
@@ -462,7 +506,7 @@ GROUP BY
     @classmethod
     def add(cls, user, pkgs, copr, source_type=None, source_json=None,
             repos=None, chroots=None, timeout=None, enable_net=True,
-            git_hashes=None, skip_import=False):
+            git_hashes=None, skip_import=False, force_rebuild=False):
         if chroots is None:
             chroots = []
 
@@ -494,6 +538,7 @@ GROUP BY
             source_json=source_json,
             submitted_on=int(time.time()),
             enable_net=bool(enable_net),
+            force_rebuild=bool(force_rebuild),
         )
 
         if timeout:
@@ -523,6 +568,7 @@ GROUP BY
 
             db.session.add(buildchroot)
 
+        cls.count_new_build(build)
         return build
 
     @classmethod
@@ -530,7 +576,6 @@ GROUP BY
         build = models.Build(
             user=None,
             pkgs=None,
-            package_id=package.id,
             copr=package.copr,
             repos=package.copr.repos,
             source_type=package.source_type,
@@ -556,8 +601,79 @@ GROUP BY
 
             db.session.add(buildchroot)
 
+        cls.count_new_build(build)
+        cls.assign_package(build, package)
         return build
 
+    @classmethod
+    def count_new_build(cls, build):
+        """
+        Counts the new build into the build summary of its copr
+        """
+        # the id is needed and an already pending update of the summary
+        # would be overwritten
+        db.session.flush()
+        copr = build.copr
+        copr.build_count = models.Copr.build_count + 1
+        copr.last_build_id = _greatest(models.Copr.last_build_id, build.id)
+
+    @classmethod
+    def assign_package(cls, build, package):
+        """
+        Assigns the build to the package and counts it into the build summary
+        of the package
+        """
+        if build.package_id == package.id:
+            return
+        db.session.flush()
+        build.package_id = package.id
+        package.build_count = models.Package.build_count + 1
+        package.last_build_id = _greatest(models.Package.last_build_id, build.id)
+
+    @classmethod
+    def count_successful_build(cls, build):
+        """
+        Updates the last successful build of the package of the build
+        """
+        db.session.flush()
+        build.package.last_successful_build_id = _greatest(
+            models.Package.last_successful_build_id, build.id)
+
+    @classmethod
+    def uncount_build(cls, build):
+        """
+        Removes the build being deleted from the build summaries of its copr
+        and package, only the summaries pointing to the build are searched for
+        a replacement
+        """
+        others = models.Build.query.with_entities(func.max(models.Build.id)).filter(models.Build.id != build.id)
+
+        copr = build.copr
+        copr.build_count = models.Copr.build_count - 1
+        if copr.last_build_id == build.id:
+            copr.last_build_id = others.filter(models.Build.copr_id == copr.id).scalar()
+
+        package = build.package
+        if package is None:
+            return
+        package.build_count = models.Package.build_count - 1
+        if package.last_build_id == build.id:
+            package.last_build_id = others.filter(models.Build.package_id == package.id).scalar()
+        if package.last_successful_build_id == build.id:
+            package.last_successful_build_id = cls.filter_succeeded(
+                others.filter(models.Build.package_id == package.id)).scalar()
+
+    @classmethod
+    def filter_succeeded(cls, query):
+        """
+        Same condition as `Build.status == "succeeded"`, in SQL
+        """
+        succeeded = StatusEnum("succeeded")
+        return query.filter(
+            models.Build.canceled.isnot(True),
+            models.Build.build_chroots.any(BuildChroot.status == succeeded),
+            ~models.Build.build_chroots.any(BuildChroot.status.notin_([succeeded, StatusEnum("skipped")])))
+
 
     terminal_states = {StatusEnum("failed"), StatusEnum("succeeded"), StatusEnum("canceled")}
 
@@ -625,14 +741,24 @@ GROUP BY
                     if "status" in upd_dict and build_chroot.status not in BuildsLogic.terminal_states:
                         build_chroot.status = upd_dict["status"]
 
-                    if upd_dict.get("status") in BuildsLogic.terminal_states:
+                    if upd_dict.get("status") in BuildsLogic.terminal_states | {StatusEnum("skipped")}:
                         build_chroot.ended_on = upd_dict.get("ended_on") or time.time()
 
+                    if upd_dict.get("status") in BuildChrootsLogic.cacheable_states:
+                        # key of the environment the results were really built in
+                        build_chroot.cache_key = upd_dict.get("cache_key")
+
                     if upd_dict.get("status") == StatusEnum("starting"):
                         build_chroot.started_on = upd_dict.get("started_on") or time.time()
 
+                    if upd_dict.get("build_stats"):
+                        build_chroot.build_stats = json.dumps(upd_dict["build_stats"])
+
                     db.session.add(build_chroot)
 
+            if build.package is not None and build.status == StatusEnum("succeeded"):
+                cls.count_successful_build(build)
+
         for attr in ["results", "built_packages"]:
             value = upd_dict.get(attr, None)
             if value:
@@ -677,6 +803,7 @@ GROUP BY
         if build.state not in ["cancelled"]:  # has nothing in backend to delete
             ActionsLogic.send_delete_build(build)
 
+        cls.uncount_build(build)
         for build_chroot in build.build_chroots:
             db.session.delete(build_chroot)
         db.session.delete(build)
@@ -716,6 +843,14 @@ GROUP BY
 
 
 class BuildChrootsLogic(object):
+    # build chroots whose results could be reused by identical builds
+    cacheable_states = {StatusEnum("succeeded"), StatusEnum("skipped")}
+
+    # task fields which affect build results, mock macros are derived
+    # from project_owner and project_name
+    cache_key_fields = ["git_hash", "chroot", "buildroot_pkgs", "repos",
+                        "project_owner", "project_name", "enable_net"]
+
     @classmethod
     def get_by_build_id_and_name(cls, build_id, name):
         mc = MockChrootsLogic.get_from_name(name).one()
@@ -726,6 +861,40 @@ class BuildChrootsLogic(object):
             .filter(BuildChroot.mock_chroot_id == mc.id)
         )
 
+    @classmethod
+    def get_cache_key(cls, task):
+        """
+        Build cache key of the task prepared for backend.
+
+        :param dict task: build task as returned by the `/waiting/` view
+        :return str: sha256 hexdigest or None when the sources are not imported yet
+        """
+        if not task.get("git_hash"):
+            return None
+
+        data = [task.get(field) or "" for field in cls.cache_key_fields]
+        return hashlib.sha256(json.dumps(data).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def get_cached_results(cls, cache_keys):
+        """
+        Finds the most recent finished build chroots for the given cache keys.
+
+        :return dict: cache_key -> models.BuildChroot
+        """
+        cache_keys = [key for key in cache_keys if key]
+        if not cache_keys:
+            return {}
+
+        query = (
+            models.BuildChroot.query
+            .filter(models.BuildChroot.cache_key.in_(cache_keys))
+            .filter(models.BuildChroot.status.in_(list(cls.cacheable_states)))
+            .order_by(models.BuildChroot.build_id.asc())
+        )
+        # newer builds override older ones
+        return {build_chroot.cache_key: build_chroot for build_chroot in query}
+
     @classmethod
     def get_multiply(cls):
         query = (
@@ -768,12 +937,18 @@ class BuildsMonitorLogic(object):
             chroots = {}
             for ch in copr.active_chroots:
                 # todo: move to ComplexLogic
-                query = (
-                    models.BuildChroot.query.join(models.Build)
-                    .filter(models.Build.package_id == pkg.id)
-                    .filter(models.BuildChroot.mock_chroot_id == ch.id)
-                    .filter(models.BuildChroot.status != helpers.StatusEnum("canceled")))
-                build = query.order_by(models.BuildChroot.build_id.desc()).first()
+                build = cls.get_package_chroot_builds(pkg.id, ch.id).first()
                 chroots[ch.name] = build
             packages.append({"package": pkg, "build_chroots": chroots})
         return packages
+
+    @classmethod
+    def get_package_chroot_builds(cls, package_id, mock_chroot_id):
+        """
+        Not canceled BuildChroots of the package in the chroot, the newest first
+        """
+        return (models.BuildChroot.query.join(models.Build)
+                .filter(models.Build.package_id == package_id)
+                .filter(models.BuildChroot.mock_chroot_id == mock_chroot_id)
+                .filter(models.BuildChroot.status != helpers.StatusEnum("canceled"))
+                .order_by(models.BuildChroot.build_id.desc()))
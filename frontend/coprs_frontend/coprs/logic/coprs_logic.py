@@ -1,6 +1,6 @@
 import time
 
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, func
 from sqlalchemy.event import listen
 from sqlalchemy.orm.attributes import NEVER_SET
 from sqlalchemy.orm.exc import NoResultFound
@@ -112,6 +112,28 @@ class CoprsLogic(object):
 
         return query
 
+    @classmethod
+    def get_multiple_by_full_names(cls, full_names):
+        """
+        :param list full_names: of "<username>/<coprname>", group projects
+            as "@<groupname>/<coprname>"
+        """
+        conditions = []
+        for full_name in full_names:
+            owner, _, name = full_name.partition("/")
+            if owner.startswith("@"):
+                conditions.append(and_(models.Group.name == owner[1:],
+                                       models.Copr.name == name))
+            else:
+                conditions.append(and_(models.User.username == owner,
+                                       models.Copr.group_id.is_(None),
+                                       models.Copr.name == name))
+
+        return (cls.get_multiple()
+                .filter(or_(*conditions))
+                .options(db.joinedload(models.Copr.copr_chroots)
+                         .joinedload(models.CoprChroot.mock_chroot)))
+
     @classmethod
     def set_query_order(cls, query, desc=False):
         if desc:
@@ -150,6 +172,59 @@ class CoprsLogic(object):
                 .options(db.contains_eager(models.Copr.builds))
                 .order_by(models.Build.submitted_on.desc()))
 
+    @classmethod
+    def get_latest_results(cls, copr_ids):
+        """
+        Finds results of the most recently submitted build with results
+        for each of the given projects with a single aggregated query.
+
+        :return dict: copr id -> build results url
+        """
+        if not copr_ids:
+            return {}
+
+        has_results = and_(models.Build.results.isnot(None), models.Build.results != "")
+        latest = (
+            db.session.query(models.Build.copr_id,
+                             func.max(models.Build.submitted_on).label("submitted_on"))
+            .filter(models.Build.copr_id.in_(copr_ids))
+            .filter(has_results)
+            .group_by(models.Build.copr_id)
+            .subquery()
+        )
+        query = (
+            db.session.query(models.Build.copr_id, models.Build.results)
+            .join(latest, and_(models.Build.copr_id == latest.c.copr_id,
+                               models.Build.submitted_on == latest.c.submitted_on))
+            .filter(has_results)
+        )
+
+        results = {}
+        for copr_id, build_results in query:
+            # builds submitted at the same time, any of them will do
+            results.setdefault(copr_id, build_results)
+        return results
+
+    @classmethod
+    def get_active_chroots(cls, copr_ids):
+        """
+        :return dict: copr id -> list of active mock chroots of the project
+        """
+        if not copr_ids:
+            return {}
+
+        query = (
+            db.session.query(models.CoprChroot.copr_id, models.MockChroot)
+            .join(models.CoprChroot.mock_chroot)
+            .filter(models.CoprChroot.copr_id.in_(copr_ids))
+            .filter(models.MockChroot.is_active == True)
+        )
+
+        chroots = {}
+        for copr_id, mock_chroot in query:
+            chroots.setdefault(copr_id, []).append(mock_chroot)
+        return chroots
+
     @classmethod
     def join_mock_chroots(cls, query):
         return (query.outerjoin(*models.Copr.mock_chroots.attr)
@@ -229,6 +304,7 @@ class CoprsLogic(object):
             user, copr, "Only owners and admins may update their projects.")
 
         db.session.add(copr)
+        ActionsLogic.send_update_project_settings(copr)
 
     @classmethod
     def delete_unsafe(cls, user, copr):
@@ -455,6 +531,7 @@ class CoprChrootsLogic(object):
 
         chroot = models.CoprChroot(copr=copr, mock_chroot=mock_chroot)
         cls._update_chroot(buildroot_pkgs, comps, comps_name, chroot)
+        ActionsLogic.send_update_project_settings(copr)
         return chroot
 
     @classmethod
@@ -470,6 +547,7 @@ class CoprChrootsLogic(object):
 
         cls._update_chroot(buildroot_pkgs, comps, comps_name, copr_chroot)
         db.session.add(copr_chroot)
+        ActionsLogic.send_update_project_settings(copr_chroot.copr)
 
         return copr_chroot
 
@@ -505,6 +583,8 @@ class CoprChrootsLogic(object):
         for mc in to_remove:
             copr.mock_chroots.remove(mc)
 
+        ActionsLogic.send_update_project_settings(copr)
+
     @classmethod
     def remove_comps(cls, user, copr_chroot):
         UsersLogic.raise_if_cant_update_copr(
@@ -525,6 +605,7 @@ class CoprChrootsLogic(object):
             user, copr_chroot.copr,
             "Only owners and admins may update their projects.")
 
+        ActionsLogic.send_update_project_settings(copr_chroot.copr)
         db.session.delete(copr_chroot)
 
 
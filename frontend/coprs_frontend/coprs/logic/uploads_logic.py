@@ -0,0 +1,227 @@
+"""
+Resumable chunked upload of SRPMs.
+
+Upload in progress is stored in
+``SRPM_STORAGE_DIR/uploads/<user id>/<upload id>/`` as ``upload.json`` with metadata and ``data`` growing with each chunk,
+number of received bytes is the size of ``data``. Client sends chunks
+one by one with their checksum, after a failure it asks for the
+received size and continues from there. Completed upload is moved into
+the SRPM storage when the build is created.
+
+Size of the uploads and the number of unfinished uploads of one user
+are limited, uploads untouched for ``UPLOAD_EXPIRATION`` seconds are
+removed by :py:meth:`UploadsLogic.remove_expired`, which is run
+periodically by ``manage.py clean_expired_uploads``.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+
+from werkzeug.utils import secure_filename
+
+from coprs import app
+from coprs.exceptions import ObjectNotFound, BadRequest
+
+UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+META_FILE_NAME = "upload.json"
+DATA_FILE_NAME = "data"
+
+# chunk is written into the storage in pieces of this size
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class UploadsLogic(object):
+
+    @classmethod
+    def get_storage_dir(cls):
+        return os.path.join(app.config["SRPM_STORAGE_DIR"], "uploads")
+
+    @classmethod
+    def get_user_dir(cls, user):
+        return os.path.join(cls.get_storage_dir(), str(user.id))
+
+    @classmethod
+    def get_upload_dir(cls, user, upload_id):
+        """
+        Uploads of other users are not found
+        """
+        if not UPLOAD_ID_RE.match(upload_id or ""):
+            raise ObjectNotFound("Upload {} doesn't exist".format(upload_id))
+        return os.path.join(cls.get_user_dir(user), upload_id)
+
+    @classmethod
+    def _load_meta(cls, user, upload_id):
+        upload_dir = cls.get_upload_dir(user, upload_id)
+        try:
+            with open(os.path.join(upload_dir, META_FILE_NAME)) as handle:
+                meta = json.load(handle)
+        except (IOError, OSError, ValueError):
+            raise ObjectNotFound("Upload {} doesn't exist".format(upload_id))
+        return upload_dir, meta
+
+    @classmethod
+    def _list_upload_ids(cls, user_dir):
+        try:
+            return [upload_id for upload_id in os.listdir(user_dir)
+                    if UPLOAD_ID_RE.match(upload_id)]
+        except OSError:
+            # no uploads yet
+            return []
+
+    @classmethod
+    def count_user_uploads(cls, user):
+        """
+        :return int: number of unfinished uploads of the user
+        """
+        return len(cls._list_upload_ids(cls.get_user_dir(user)))
+
+    @classmethod
+    def _render(cls, upload_id, meta, offset):
+        return {
+            "id": upload_id,
+            "file_name": meta["file_name"],
+            "size": meta["size"],
+            "offset": offset,
+        }
+
+    @classmethod
+    def create(cls, user, file_name, size):
+        """
+        Starts a new upload
+
+        :param int size: size of the whole file in bytes
+        :return dict: upload info, see :py:meth:`get`
+        """
+        file_name = secure_filename(file_name or "")
+        if not file_name.endswith(".src.rpm"):
+            raise BadRequest("Only .src.rpm files can be uploaded")
+        if size is None or size <= 0:
+            raise BadRequest("Size of the uploaded file must be positive")
+        if size > app.config["UPLOAD_MAX_SIZE"]:
+            raise BadRequest("File is too large, max size is {} bytes"
+                             .format(app.config["UPLOAD_MAX_SIZE"]))
+        if cls.count_user_uploads(user) >= app.config["UPLOAD_MAX_OPEN_PER_USER"]:
+            raise BadRequest("Too many unfinished uploads, max is {}, finish or delete "
+                             "some of them".format(app.config["UPLOAD_MAX_OPEN_PER_USER"]))
+
+        upload_id = uuid.uuid4().hex
+        upload_dir = cls.get_upload_dir(user, upload_id)
+        os.makedirs(upload_dir)
+        open(os.path.join(upload_dir, DATA_FILE_NAME), "wb").close()
+
+        meta = {"user_id": user.id, "file_name": file_name, "size": size}
+        with open(os.path.join(upload_dir, META_FILE_NAME), "w") as handle:
+            json.dump(meta, handle)
+
+        return cls._render(upload_id, meta, 0)
+
+    @classmethod
+    def get(cls, user, upload_id):
+        """
+        :return dict: upload info: id, file_name, size and offset,
+            the number of already received bytes
+        """
+        upload_dir, meta = cls._load_meta(user, upload_id)
+        offset = os.path.getsize(os.path.join(upload_dir, DATA_FILE_NAME))
+        return cls._render(upload_id, meta, offset)
+
+    @classmethod
+    def write_chunk(cls, user, upload_id, offset, stream, checksum):
+        """
+        Appends data read from the `stream` to the upload. Chunk is accepted
+        only when it starts at the number of already received bytes and its
+        sha256 matches `checksum`, otherwise the upload stays as it was.
+
+        :return dict: updated upload info, see :py:meth:`get`
+        """
+        upload_dir, meta = cls._load_meta(user, upload_id)
+
+        with open(os.path.join(upload_dir, DATA_FILE_NAME), "r+b") as handle:
+            # concurrent retries of the same chunk must not interleave
+            fcntl.flock(handle, fcntl.LOCK_EX)
+
+            handle.seek(0, os.SEEK_END)
+            received = handle.tell()
+            if offset != received:
+                raise BadRequest("Chunk starts at {}, but {} bytes were received so far"
+                                 .format(offset, received), offset=received)
+
+            sha256 = hashlib.sha256()
+            while True:
+                data = stream.read(WRITE_BUFFER_SIZE)
+                if not data:
+                    break
+                sha256.update(data)
+                handle.write(data)
+
+            error = None
+            if sha256.hexdigest() != checksum:
+                error = "Checksum of the chunk doesn't match"
+            elif handle.tell() > meta["size"]:
+                error = "Upload is larger than the announced size {}".format(meta["size"])
+
+            if error:
+                handle.truncate(received)
+                raise BadRequest(error, offset=received)
+
+            handle.flush()
+            os.fsync(handle.fileno())
+            return cls._render(upload_id, meta, handle.tell())
+
+    @classmethod
+    def delete(cls, user, upload_id):
+        upload_dir, _ = cls._load_meta(user, upload_id)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    @classmethod
+    def move_completed(cls, user, upload_id, target_path):
+        """
+        Moves the completed upload into `target_path`, which has to be in
+        the SRPM storage as well, and removes the upload
+        """
+        upload = cls.get(user, upload_id)
+        if upload["offset"] != upload["size"]:
+            raise BadRequest("Upload {} is not complete, received {} of {} bytes"
+                             .format(upload_id, upload["offset"], upload["size"]))
+
+        upload_dir = cls.get_upload_dir(user, upload_id)
+        os.rename(os.path.join(upload_dir, DATA_FILE_NAME), target_path)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    @classmethod
+    def remove_expired(cls):
+        """
+        Removes uploads whose data weren't changed for ``UPLOAD_EXPIRATION``
+        seconds
+
+        :return list: ids of the removed uploads
+        """
+        storage_dir = cls.get_storage_dir()
+        if not os.path.isdir(storage_dir):
+            return []
+
+        removed = []
+        deadline = time.time() - app.config["UPLOAD_EXPIRATION"]
+        for user_id in os.listdir(storage_dir):
+            user_dir = os.path.join(storage_dir, user_id)
+            for upload_id in cls._list_upload_ids(user_dir):
+                upload_dir = os.path.join(user_dir, upload_id)
+                try:
+                    # data are appended in place, the dir mtime doesn't change
+                    mtime = os.path.getmtime(os.path.join(upload_dir, DATA_FILE_NAME))
+                except OSError:
+                    try:
+                        mtime = os.path.getmtime(upload_dir)
+                    except OSError:
+                        # removed meanwhile
+                        continue
+                if mtime < deadline:
+                    shutil.rmtree(upload_dir, ignore_errors=True)
+                    removed.append(upload_id)
+        return removed
@@ -203,6 +203,14 @@ class Copr(db.Model, helpers.Serializer):
     build_enable_net = db.Column(db.Boolean, default=True,
                                  server_default="1", nullable=False)
 
+    # summary of the builds maintained by BuildsLogic, so pages don't need
+    # to load the whole build history
+    build_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    last_build_id = db.Column(db.Integer)
+    last_build = db.relationship(
+        "Build", primaryjoin="foreign(Copr.last_build_id) == Build.id",
+        uselist=False, viewonly=True)
+
     __mapper_args__ = {
         "order_by": created_on.desc()
     }
@@ -224,6 +232,8 @@ class Copr(db.Model, helpers.Serializer):
         """
         Return repos of this copr as a list of strings
         """
+        if self.repos is None:
+            return list()
         return self.repos.split()
 
     @property
@@ -262,14 +272,6 @@ class Copr(db.Model, helpers.Serializer):
 
         return output
 
-    @property
-    def build_count(self):
-        """
-        Return number of builds in this copr
-        """
-
-        return len(self.builds)
-
     @property
     def disable_createrepo(self):
 
@@ -361,9 +363,20 @@ class Package(db.Model, helpers.Serializer):
     enable_net = db.Column(db.Boolean, default=False,
                            server_default="0", nullable=False)
 
+    # summary of the builds maintained by BuildsLogic
+    build_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    last_build_id = db.Column(db.Integer)
+    last_successful_build_id = db.Column(db.Integer)
+
     # relations
     copr_id = db.Column(db.Integer, db.ForeignKey("copr.id"))
     copr = db.relationship("Copr", backref=db.backref("packages"))
+    last_build = db.relationship(
+        "Build", primaryjoin="foreign(Package.last_build_id) == Build.id",
+        uselist=False, viewonly=True)
+    last_successful_build = db.relationship(
+        "Build", primaryjoin="foreign(Package.last_successful_build_id) == Build.id",
+        uselist=False, viewonly=True)
 
     @property
     def dist_git_repo(self):
@@ -424,6 +437,10 @@ class Build(db.Model, helpers.Serializer):
     # enable networking during a build process
     enable_net = db.Column(db.Boolean, default=False,
                            server_default="0", nullable=False)
+    # build even when results of an identical build could be reused,
+    # e.g. to pick up updated dependencies
+    force_rebuild = db.Column(db.Boolean, default=False,
+                              server_default="0", nullable=False)
     # Source of the build: type identifier
     source_type = db.Column(db.Integer, default=helpers.BuildSourceEnum("unset"))
     # Source of the build: description in json, example: git link, srpm url, etc.
@@ -441,6 +458,12 @@ class Build(db.Model, helpers.Serializer):
 
     chroots = association_proxy("build_chroots", "mock_chroot")
 
+    # see alembic revision e1f98bf3ecd3
+    __table_args__ = (
+        db.Index("build_copr_id_id", copr_id, id),
+        db.Index("build_package_id_id", package_id, id),
+    )
+
     @property
     def user_name(self):
         return self.user.name
@@ -759,10 +782,23 @@ class BuildChroot(db.Model, helpers.Serializer):
     build = db.relationship("Build", backref=db.backref("build_chroots"))
     git_hash = db.Column(db.String(40))
     status = db.Column(db.Integer, default=StatusEnum("importing"))
+    # identifies sources and build environment, see BuildChrootsLogic.get_cache_key
+    cache_key = db.Column(db.String(64), index=True)
+    # json with timing of the build phases and builder resource usage
+    build_stats = db.Column(db.Text)
 
     started_on = db.Column(db.Integer)
     ended_on = db.Column(db.Integer)
 
+    # build queues only look for unfinished chroots, which are a small
+    # fraction of all rows, see alembic revision e1f98bf3ecd3
+    __table_args__ = (
+        db.Index("build_chroot_unfinished_status_build_id", status, build_id,
+                 postgresql_where=status.in_([
+                     StatusEnum("running"), StatusEnum("pending"),
+                     StatusEnum("starting"), StatusEnum("importing")])),
+    )
+
     @property
     def name(self):
         """
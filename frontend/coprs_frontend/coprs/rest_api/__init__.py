@@ -11,6 +11,7 @@ from coprs.rest_api.resources.build_task import BuildTaskListR, BuildTaskR
 from coprs.rest_api.resources.mock_chroot import MockChrootListR, MockChrootR
 from coprs.rest_api.resources.project import ProjectListR, ProjectR
 from coprs.rest_api.resources.project_chroot import ProjectChrootListR, ProjectChrootR
+from coprs.rest_api.resources.upload import UploadListR, UploadR
 
 URL_PREFIX = "/api_2"
 
@@ -34,6 +35,7 @@ class RootR(Resource):
                 "mock_chroots": {"href": url_for(".mockchrootlistr")},
                 "builds": {"href": url_for(".buildlistr")},
                 "build_tasks": {"href": url_for(".buildtasklistr")},
+                "uploads": {"href": url_for(".uploadlistr")},
             }
         }
 
@@ -67,6 +69,9 @@ api.add_resource(MockChrootR, "/mock_chroots/<name>")
 api.add_resource(BuildListR, "/builds")
 api.add_resource(BuildR, "/builds/<int:build_id>")
 
+api.add_resource(UploadListR, "/uploads")
+api.add_resource(UploadR, "/uploads/<upload_id>")
+
 api.add_resource(ProjectChrootListR, "/projects/<int:project_id>/chroots")
 api.add_resource(ProjectChrootR, "/projects/<int:project_id>/chroots/<name>")
 
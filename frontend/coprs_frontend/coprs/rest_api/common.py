@@ -6,6 +6,7 @@ from logging import getLogger
 
 from flask import url_for
 import flask
+from sqlalchemy.orm import contains_eager, joinedload, subqueryload
 
 from ..models import User, Copr, BuildChroot, Build
 from ..logic.users_logic import UsersLogic
@@ -33,11 +34,34 @@ def render_copr_chroot(chroot):
     }
 
 
-def render_build(build, self_params=None):
+def build_load_options(fields=None):
+    """
+    Loader options for a query of builds passed to `render_build`, so a page
+    of builds is loaded by a constant number of queries
+
+    :param fields: names of the serialized build fields, all when None
+    :type fields: list of str
+    """
+    options = []
+    if fields is None or "state" in fields:
+        options.append(subqueryload(Build.build_chroots))
+    if fields is None or "submitter" in fields:
+        options.append(joinedload(Build.user))
+    if fields is None or "package_name" in fields:
+        options.append(joinedload(Build.package))
+    return options
+
+
+def render_build(build, self_params=None, fields=None):
+    """
+    :param fields: names of the serialized build fields, all when None
+    :type fields: list of str
+    """
     if self_params is None:
         self_params = {}
+    schema = BuildSchema(only=fields) if fields else BuildSchema()
     return {
-        "build": BuildSchema().dump(build)[0],
+        "build": schema.dump(build)[0],
         "_links": {
             "self": {"href": url_for(".buildr", build_id=build.id, **self_params)},
             "project": {"href": url_for(".projectr", project_id=build.copr_id)},
@@ -46,6 +70,14 @@ def render_build(build, self_params=None):
     }
 
 
+def project_load_options():
+    """
+    Loader options for a query of projects passed to `render_project`,
+    the owner is expected to be loaded by the query itself
+    """
+    return [joinedload(Copr.group)]
+
+
 def render_project(project, self_params=None):
     """
     :param Copr project:
@@ -64,6 +96,22 @@ def render_project(project, self_params=None):
     }
 
 
+def build_task_load_options():
+    """
+    Loader options for a query of build chroots passed to `render_build_task`,
+    the query has to join the build, mock chroot, project, owner and group
+    like `BuildChrootsLogic.get_multiply` does
+    """
+    return [
+        contains_eager(BuildChroot.build),
+        contains_eager(BuildChroot.mock_chroot),
+        contains_eager("build.copr"),
+        contains_eager("build.copr.owner"),
+        contains_eager("build.copr.group"),
+        joinedload("build.package"),
+    ]
+
+
 def render_build_task(chroot):
     """
     :type chroot: BuildChroot
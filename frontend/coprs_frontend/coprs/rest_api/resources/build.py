@@ -7,11 +7,15 @@ from flask_restful import Resource
 from ... import db
 from ...exceptions import ActionInProgressException, InsufficientRightsException, RequestCannotBeExecuted
 from ...logic.builds_logic import BuildsLogic
+from ...logic.uploads_logic import UploadsLogic
+from ...models import Build
 from ..common import get_project_safe
 from ..exceptions import MalformedRequest, CannotProcessRequest, AccessForbidden
-from ..common import render_build, rest_api_auth_required, render_build_task, get_build_safe, get_user_safe
-from ..schemas import BuildSchema, BuildCreateSchema, BuildCreateFromUrlSchema
-from ..util import mm_deserialize, get_request_parser, arg_bool
+from ..common import render_build, rest_api_auth_required, render_build_task, get_build_safe, get_user_safe, \
+    build_load_options
+from ..schemas import BuildSchema, BuildCreateSchema, BuildCreateFromUrlSchema, BuildCreateFromUploadSchema
+from ..util import mm_deserialize, get_request_parser, arg_bool, json_loads_safe
+from .upload import call_uploads_logic
 
 
 class BuildListR(Resource):
@@ -27,12 +31,24 @@ class BuildListR(Resource):
 
         parser.add_argument('limit', type=int)
         parser.add_argument('offset', type=int)
+        parser.add_argument('before_id', type=int)
+        parser.add_argument('fields', type=str)
 
         parser.add_argument('is_finished', type=arg_bool)
         # parser.add_argument('package', type=str)
 
         req_args = parser.parse_args()
 
+        fields = None
+        if req_args["fields"]:
+            fields = req_args["fields"].split(",")
+            unknown = set(fields) - set(BuildSchema._declared_fields.keys())
+            if unknown:
+                raise MalformedRequest("Unknown build fields: {}".format(
+                    ", ".join(sorted(unknown))))
+            # id is needed to continue with the next page
+            fields = sorted(set(fields) | {"id"})
+
         if req_args["project_id"] is not None:
             project = get_project_safe(req_args["project_id"])
             query = BuildsLogic.get_multiple_by_copr(project)
@@ -49,6 +65,10 @@ class BuildListR(Resource):
             is_finished = req_args["is_finished"]
             query = BuildsLogic.filter_is_finished(query, is_finished)
 
+        if req_args["before_id"] is not None:
+            # keyset pagination, builds are sorted by id descending
+            query = query.filter(Build.id < req_args["before_id"])
+
         if req_args["limit"] is not None:
             limit = req_args["limit"]
             if limit <= 0 or limit > 100:
@@ -56,7 +76,7 @@ class BuildListR(Resource):
         else:
             limit = 100
 
-        query = query.limit(limit)
+        query = query.limit(limit).options(*build_load_options(fields))
 
         if req_args["offset"] is not None:
             query = query.offset(req_args["offset"])
@@ -65,13 +85,18 @@ class BuildListR(Resource):
 
         self_params = dict(req_args)
         self_params["limit"] = limit
+        links = {
+            "self": {"href": url_for(".buildlistr", **self_params)},
+        }
+        if len(builds) == limit:
+            next_params = dict(self_params, before_id=builds[-1].id, offset=None)
+            links["next"] = {"href": url_for(".buildlistr", **next_params)}
+
         return {
             "builds": [
-                render_build(build) for build in builds
+                render_build(build, fields=fields) for build in builds
             ],
-            "_links": {
-                "self": {"href": url_for(".buildlistr", **self_params)},
-            },
+            "_links": links,
         }
 
     @staticmethod
@@ -79,7 +104,11 @@ class BuildListR(Resource):
         """
         :return: if of the created build or raise Exception
         """
-        build_params = mm_deserialize(BuildCreateFromUrlSchema(), req.data.decode("utf-8")).data
+        raw = req.data.decode("utf-8")
+        if "upload_id" in json_loads_safe(raw):
+            return BuildListR.handle_post_upload(raw)
+
+        build_params = mm_deserialize(BuildCreateFromUrlSchema(), raw).data
         project = get_project_safe(build_params["project_id"])
 
         chroot_names = build_params.pop("chroots")
@@ -103,6 +132,41 @@ class BuildListR(Resource):
                                           project.full_name, err))
         return build.id
 
+    @staticmethod
+    def handle_post_upload(raw):
+        """
+        Creates build from the completed chunked upload, see UploadListR
+
+        :return: if of the created build or raise Exception
+        """
+        build_params = mm_deserialize(BuildCreateFromUploadSchema(), raw).data
+        project = get_project_safe(build_params["project_id"])
+
+        upload_id = build_params.pop("upload_id")
+        upload = call_uploads_logic(UploadsLogic.get, flask.g.user, upload_id)
+
+        chroot_names = build_params.pop("chroots")
+        try:
+            build = BuildsLogic.create_new_from_upload(
+                flask.g.user, project,
+                f_uploader=lambda path: call_uploads_logic(
+                    UploadsLogic.move_completed, flask.g.user, upload_id, path),
+                orig_filename=upload["file_name"],
+                chroot_names=chroot_names,
+                **build_params
+            )
+            db.session.commit()
+        except ActionInProgressException as err:
+            db.session.rollback()
+            raise CannotProcessRequest("Cannot create new build due to: {}"
+                                       .format(err))
+        except InsufficientRightsException as err:
+            db.session.rollback()
+            raise AccessForbidden("User {} cannot create build in project {}: {}"
+                                  .format(flask.g.user.username,
+                                          project.full_name, err))
+        return build.id
+
     @staticmethod
     def handle_post_multipart(req):
         """
@@ -10,7 +10,7 @@ from marshmallow import Schema, fields
 from marshmallow import Schema, fields, validates_schema, ValidationError, validate
 
 from coprs.helpers import StatusEnum
-from coprs.rest_api.common import render_build_task
+from coprs.rest_api.common import render_build_task, build_task_load_options
 from ...exceptions import MalformedArgumentException
 from ...logic.builds_logic import BuildsLogic, BuildChrootsLogic
 from ..exceptions import MalformedRequest
@@ -47,7 +47,7 @@ class BuildTaskListR(Resource):
 
         self_params = dict(req_args)
 
-        query = BuildChrootsLogic.get_multiply()
+        query = BuildChrootsLogic.get_multiply().options(*build_task_load_options())
         if self_params.get("build_id") is not None:
             query = BuildChrootsLogic.filter_by_build_id(
                 query, self_params["build_id"])
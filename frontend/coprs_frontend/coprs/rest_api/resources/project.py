@@ -12,8 +12,10 @@ from ...logic.coprs_logic import CoprsLogic
 from ...exceptions import ActionInProgressException, InsufficientRightsException
 
 from ...exceptions import DuplicateException
+from ...models import Copr
 
-from ..common import rest_api_auth_required, render_copr_chroot, render_build, render_project, get_project_safe
+from ..common import rest_api_auth_required, render_copr_chroot, render_build, render_project, get_project_safe, \
+    project_load_options
 from ..schemas import ProjectSchema, ProjectCreateSchema
 from ..exceptions import ObjectAlreadyExists, CannotProcessRequest, AccessForbidden
 from ..util import mm_deserialize, get_request_parser, arg_bool
@@ -72,6 +74,7 @@ class ProjectListR(Resource):
 
         if req_args["search_query"]:
             query = CoprsLogic.get_multiple_fulltext(req_args["search_query"])
+            query = query.options(db.contains_eager(Copr.owner))
         else:
             query = CoprsLogic.get_multiple(flask.g.user)
 
@@ -93,7 +96,7 @@ class ProjectListR(Resource):
         if req_args["offset"]:
             offset = req_args["offset"]
 
-        query = slice_query(query, limit, offset)
+        query = slice_query(query, limit, offset).options(*project_load_options())
         coprs_list = query.all()
 
         result_dict = {
@@ -0,0 +1,77 @@
+# coding: utf-8
+
+import flask
+from flask import url_for, make_response
+from flask_restful import Resource
+
+from ...exceptions import ObjectNotFound, BadRequest
+from ...logic.uploads_logic import UploadsLogic
+from ..common import rest_api_auth_required
+from ..exceptions import MalformedRequest, ObjectNotFoundError
+from ..schemas import UploadCreateSchema
+from ..util import mm_deserialize, get_request_parser
+
+
+def call_uploads_logic(func, *args, **kwargs):
+    """
+    Converts errors of the UploadsLogic into API errors
+    """
+    try:
+        return func(*args, **kwargs)
+    except ObjectNotFound as err:
+        raise ObjectNotFoundError(msg=err.message)
+    except BadRequest as err:
+        raise MalformedRequest(msg=err.message, data=err.kwargs or None)
+
+
+def render_upload(upload):
+    return {
+        "upload": upload,
+        "_links": {
+            "self": {"href": url_for(".uploadr", upload_id=upload["id"])},
+        }
+    }
+
+
+class UploadListR(Resource):
+
+    @rest_api_auth_required
+    def post(self):
+        params = mm_deserialize(UploadCreateSchema(),
+                                flask.request.data.decode("utf-8")).data
+
+        upload = call_uploads_logic(UploadsLogic.create, flask.g.user,
+                                    params["file_name"], params["size"])
+
+        resp = make_response(flask.json.dumps(render_upload(upload)), 201)
+        resp.headers["Location"] = url_for(".uploadr", upload_id=upload["id"])
+        resp.headers["Content-Type"] = "application/json"
+        return resp
+
+
+class UploadR(Resource):
+
+    @rest_api_auth_required
+    def get(self, upload_id):
+        return render_upload(call_uploads_logic(
+            UploadsLogic.get, flask.g.user, upload_id))
+
+    @rest_api_auth_required
+    def put(self, upload_id):
+        """
+        Appends a chunk sent as the request body
+        """
+        parser = get_request_parser()
+        # the body is the chunk, arguments can't be looked up there
+        parser.add_argument("offset", type=int, required=True, location="args")
+        parser.add_argument("sha256", type=str, required=True, location="args")
+        req_args = parser.parse_args()
+
+        return render_upload(call_uploads_logic(
+            UploadsLogic.write_chunk, flask.g.user, upload_id,
+            req_args["offset"], flask.request.stream, req_args["sha256"]))
+
+    @rest_api_auth_required
+    def delete(self, upload_id):
+        call_uploads_logic(UploadsLogic.delete, flask.g.user, upload_id)
+        return None, 204
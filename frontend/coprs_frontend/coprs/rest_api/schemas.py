@@ -173,9 +173,19 @@ class BuildCreateSchema(BuildSchema):
     project_id = fields.Int(required=True)
     chroots = fields.List(fields.Str())
     enable_net = fields.Bool()
+    force_rebuild = fields.Bool()
 
     state = fields.Str(dump_only=True)
 
 
 class BuildCreateFromUrlSchema(BuildCreateSchema):
     srpm_url = fields.Url(required=True, validate=lambda u: u.startswith("http"))
+
+
+class BuildCreateFromUploadSchema(BuildCreateSchema):
+    upload_id = fields.Str(required=True)
+
+
+class UploadCreateSchema(Schema):
+    file_name = fields.Str(required=True)
+    size = fields.Int(required=True)
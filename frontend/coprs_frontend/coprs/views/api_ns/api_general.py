@@ -1,11 +1,14 @@
 import base64
 import datetime
+import hashlib
+import json
 from functools import wraps
 import os
 import flask
 
 from werkzeug import secure_filename
 
+from coprs import app
 from coprs import db
 from coprs import exceptions
 from coprs import forms
@@ -197,28 +200,34 @@ def api_coprs_by_owner(username=None):
     else:
         query = CoprsLogic.get_multiple_owned_by_username(username)
 
-    query = CoprsLogic.join_builds(query)
     query = CoprsLogic.set_query_order(query)
 
+    # don't load all the builds of all the projects, the latest results
+    # and active chroots of the listed projects take one query each
     repos = query.all()
-    output = {"output": "ok", "repos": []}
-    for repo in repos:
-        yum_repos = {}
-        for build in repo.builds:
-            if build.results:
-                for chroot in repo.active_chroots:
+    copr_ids = [repo.id for repo in repos]
+    latest_results = CoprsLogic.get_latest_results(copr_ids)
+    active_chroots = CoprsLogic.get_active_chroots(copr_ids)
+
+    def iter_repos():
+        for repo in repos:
+            yum_repos = {}
+            results = latest_results.get(repo.id)
+            if results:
+                for chroot in active_chroots.get(repo.id, []):
                     release = release_tmpl.format(chroot=chroot)
                     yum_repos[release] = fix_protocol_for_backend(
-                        os.path.join(build.results, release + '/'))
-                break
+                        os.path.join(results, release + '/'))
 
-        output["repos"].append({"name": repo.name,
-                                "additional_repos": repo.repos,
-                                "yum_repos": yum_repos,
-                                "description": repo.description,
-                                "instructions": repo.instructions})
+            yield {
+                "name": repo.name,
+                "additional_repos": repo.repos,
+                "yum_repos": yum_repos,
+                "description": repo.description,
+                "instructions": repo.instructions,
+            }
 
-    return  flask.jsonify(output)
+    return helpers.stream_json({"output": "ok", "repos": iter_repos()})
 
 
 @api_ns.route("/coprs/<username>/<coprname>/detail/")
@@ -235,13 +244,12 @@ def api_coprs_by_owner_detail(copr):
 
     output = {"output": "ok", "detail": {}}
     yum_repos = {}
-    for build in copr.builds:
-        if build.results:
-            for chroot in copr.active_chroots:
-                release = release_tmpl.format(chroot=chroot)
-                yum_repos[release] = fix_protocol_for_backend(
-                    os.path.join(build.results, release + '/'))
-            break
+    build = BuildsLogic.get_latest_with_results(copr)
+    if build:
+        for chroot in copr.active_chroots:
+            release = release_tmpl.format(chroot=chroot)
+            yum_repos[release] = fix_protocol_for_backend(
+                os.path.join(build.results, release + '/'))
     output["detail"] = {
         "name": copr.name,
         "additional_repos": copr.repos,
@@ -285,6 +293,7 @@ def copr_new_build(copr):
                 flask.g.user, copr,
                 srpm_url=pkg,
                 chroot_names=form.selected_chroots,
+                force_rebuild=form.force_rebuild.data,
             )
             db.session.commit()
         except ActionInProgressException as err:
@@ -330,6 +339,7 @@ def copr_new_build_upload(copr):
             f_uploader=lambda path: form.pkgs.data.save(path),
             orig_filename=filename,
             chroot_names=form.selected_chroots,
+            force_rebuild=form.force_rebuild.data,
         )
 
         db.session.commit()
@@ -344,6 +354,48 @@ def copr_new_build_upload(copr):
     return flask.jsonify(output)
 
 
+@api_ns.route("/coprs/build_status/", methods=["GET"])
+@api_login_required
+def build_statuses():
+    """ Return statuses of many builds at once.
+
+    :arg ids: comma separated build ids, non-existing builds are omitted
+        from the output
+
+    When the request has `If-None-Match` header with the etag of the statuses
+    known to the client and nothing changed, "304 Not Modified" is returned.
+    The request is never held on the server, `Retry-After` header tells
+    the client when to ask again.
+
+    """
+    try:
+        build_ids = [int(build_id) for build_id
+                     in flask.request.args.get("ids", "").split(",") if build_id]
+    except ValueError:
+        raise LegacyApiError("Invalid request: `ids` should be comma separated "
+                             "build ids")
+
+    if not build_ids:
+        raise LegacyApiError("Invalid request: missing `ids`")
+    if len(build_ids) > app.config["BUILD_STATUS_MAX_IDS"]:
+        raise LegacyApiError("Invalid request: too many builds, max is {}"
+                             .format(app.config["BUILD_STATUS_MAX_IDS"]))
+
+    states = dict((str(build_id), state) for build_id, state
+                  in BuildsLogic.get_states(build_ids).items())
+    etag = hashlib.sha1(json.dumps(states, sort_keys=True).encode("utf-8")).hexdigest()
+
+    retry_after = app.config["BUILD_STATUS_POLL_INTERVAL"]
+    if flask.request.if_none_match.contains(etag):
+        response = flask.Response(status=304)
+    else:
+        response = flask.jsonify({"output": "ok", "builds": states, "etag": etag,
+                                  "retry_after": retry_after})
+    response.set_etag(etag)
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
 @api_ns.route("/coprs/build_status/<build_id>/", methods=["GET"])
 @api_login_required
 def build_status(build_id):
@@ -515,4 +567,4 @@ def playground_list():
 def monitor(copr):
     monitor_data = builds_logic.BuildsMonitorLogic.get_monitor_data(copr)
     output = MonitorWrapper(copr, monitor_data).to_dict()
-    return flask.jsonify(output)
+    return helpers.stream_json(output)
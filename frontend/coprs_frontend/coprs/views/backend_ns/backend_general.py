@@ -4,11 +4,12 @@ import time
 
 from coprs import db, app
 from coprs import helpers
+from coprs.constants import STREAM_BATCH_SIZE
 from coprs.helpers import StatusEnum
 from coprs.logic import actions_logic
-from coprs.logic.builds_logic import BuildsLogic
+from coprs.logic.builds_logic import BuildsLogic, BuildChrootsLogic
 from coprs.logic.complex_logic import ComplexLogic
-from coprs.logic.coprs_logic import CoprChrootsLogic
+from coprs.logic.coprs_logic import CoprsLogic, CoprChrootsLogic
 from coprs.logic.packages_logic import PackagesLogic
 
 from coprs.views import misc
@@ -18,6 +19,9 @@ from whoosh.index import LockError
 import logging
 log = logging.getLogger(__name__)
 
+# max number of projects in a single /projects_settings/ request
+PROJECTS_SETTINGS_LIMIT = 500
+
 
 @backend_ns.route("/importing/")
 # FIXME I'm commented
@@ -26,30 +30,33 @@ def dist_git_importing_queue():
     """
     Return list of builds that are waiting for dist git to import the sources.
     """
-    builds_list = []
-    for task in BuildsLogic.get_build_importing_queue().limit(200):
-        copr = task.build.copr
-
-        # we are using fake username's here
-        if copr.is_a_group_project:
-            user_name = u"@{}".format(copr.group.name)
-        else:
-            user_name = copr.owner.name
-        task_dict = {
-            "task_id": "{}-{}".format(task.build.id, helpers.chroot_to_branch(task.mock_chroot.name)),
-            "user": user_name,
-            "project": task.build.copr.name,
-
-            "branch": helpers.chroot_to_branch(task.mock_chroot.name),
-            "source_type": task.build.source_type,
-            "source_json": task.build.source_json,
-        }
-        if task_dict not in builds_list:
-            builds_list.append(task_dict)
+    def iter_builds():
+        # chroots of the same branch share the import task
+        task_ids = set()
+        for task in BuildsLogic.get_build_importing_queue().limit(200).yield_per(STREAM_BATCH_SIZE):
+            copr = task.build.copr
 
-    response_dict = {"builds": builds_list}
+            # we are using fake username's here
+            if copr.is_a_group_project:
+                user_name = u"@{}".format(copr.group.name)
+            else:
+                user_name = copr.owner.name
+            task_id = "{}-{}".format(task.build.id, helpers.chroot_to_branch(task.mock_chroot.name))
+            if task_id in task_ids:
+                continue
+            task_ids.add(task_id)
+
+            yield {
+                "task_id": task_id,
+                "user": user_name,
+                "project": task.build.copr.name,
+
+                "branch": helpers.chroot_to_branch(task.mock_chroot.name),
+                "source_type": task.build.source_type,
+                "source_json": task.build.source_json,
+            }
 
-    return flask.jsonify(response_dict)
+    return helpers.stream_json({"builds": iter_builds()})
 
 
 @backend_ns.route("/import-completed/", methods=["POST", "PUT"])
@@ -85,7 +92,7 @@ def dist_git_upload_completed():
                 db.session.add(package)
                 db.session.flush()
 
-            build.package_id = package.id
+            BuildsLogic.assign_package(build, package)
             build.pkg_version = pkg_version
 
             for ch in build_chroots:
@@ -122,13 +129,13 @@ def waiting():
     Return list of waiting actions and builds.
     """
 
-    # models.Actions
-    actions_list = [
+    # models.Actions, there may be lots of them after a mass operation
+    actions = (
         action.to_dict(options={
             "__columns_except__": ["result", "message", "ended_on"]
         })
-        for action in actions_logic.ActionsLogic.get_waiting()
-    ]
+        for action in actions_logic.ActionsLogic.get_waiting().yield_per(STREAM_BATCH_SIZE)
+    )
 
     # tasks represented by models.BuildChroot with some other stuff
     builds_list = []
@@ -148,6 +155,7 @@ def waiting():
                 "project_owner": user_name,
                 "project_name": task.build.copr.name,
                 "submitter": task.build.user.name,
+                "submitted_on": task.build.submitted_on,
                 "pkgs": task.build.pkgs,  # TODO to be removed
                 "chroot": task.mock_chroot.name,
 
@@ -155,6 +163,7 @@ def waiting():
                 "memory_reqs": task.build.memory_reqs,
                 "timeout": task.build.timeout,
                 "enable_net": task.build.enable_net,
+                "force_rebuild": task.build.force_rebuild,
                 "git_repo": task.build.package.dist_git_repo,
                 "git_hash": task.git_hash,
                 "git_branch": helpers.chroot_to_branch(task.mock_chroot.name),
@@ -167,13 +176,53 @@ def waiting():
             else:
                 record["buildroot_pkgs"] = ""
 
+            record["cache_key"] = BuildChrootsLogic.get_cache_key(record)
+
             builds_list.append(record)
 
         except Exception as err:
             app.logger.exception(err)
 
-    response_dict = {"actions": actions_list, "builds": builds_list}
-    return flask.jsonify(response_dict)
+    # identical build was already done, backend reuses its results unless
+    # the user asked for a new build, the new results are then reused instead
+    cached_results = BuildChrootsLogic.get_cached_results(
+        [record["cache_key"] for record in builds_list if not record["force_rebuild"]])
+    for record in builds_list:
+        if record["force_rebuild"]:
+            continue
+        cached = cached_results.get(record["cache_key"])
+        if cached and cached.build_id != record["build_id"]:
+            record["cached_result_dir"] = cached.build.result_dir_name
+
+    return helpers.stream_json({"actions": actions, "builds": iter(builds_list)})
+
+
+@backend_ns.route("/projects_settings/", methods=["POST"])
+@misc.backend_authenticated
+def projects_settings():
+    """
+    Return settings the backend needs for createrepo and builds of many
+    projects at once, projects are identified by their full names.
+    Projects which don't exist are omitted from the response.
+    """
+    full_names = (flask.request.json or {}).get("projects", [])
+    if len(full_names) > PROJECTS_SETTINGS_LIMIT:
+        return flask.jsonify({"error": "At most {} projects can be requested"
+                                       .format(PROJECTS_SETTINGS_LIMIT)}), 400
+
+    projects = {}
+    if full_names:
+        for copr in CoprsLogic.get_multiple_by_full_names(full_names):
+            copr_chroots = copr.active_copr_chroots
+            projects[copr.full_name] = {
+                "auto_createrepo": copr.auto_createrepo,
+                "chroots": [copr_chroot.name for copr_chroot in copr_chroots],
+                "repos": copr.repos_list,
+                "buildroot_pkgs": {copr_chroot.name: copr_chroot.buildroot_pkgs or ""
+                                   for copr_chroot in copr_chroots},
+            }
+
+    return flask.jsonify({"projects": projects})
 
 
 @backend_ns.route("/update/", methods=["POST", "PUT"])
@@ -12,6 +12,7 @@ from coprs import app
 from coprs import db
 from coprs import forms
 from coprs import helpers
+from coprs.constants import RECENT_PACKAGE_BUILDS
 
 from coprs.logic import builds_logic
 from coprs.logic import coprs_logic
@@ -103,7 +104,9 @@ def group_copr_package(copr, package_name):
 
 def render_package(copr, package_name):
     package = ComplexLogic.get_package_safe(copr, package_name)
-    return flask.render_template("coprs/detail/package.html", package=package, copr=copr)
+    builds = builds_logic.BuildsLogic.get_copr_builds_list(
+        copr, package=package, limit=RECENT_PACKAGE_BUILDS)
+    return flask.render_template("coprs/detail/package.html", package=package, copr=copr, builds=builds)
 
 
 @coprs_ns.route("/<username>/<coprname>/package/<package_name>/edit")
@@ -283,6 +286,7 @@ def process_new_build_tito(copr, add_view, url_on_success):
         build_options = {
             "enable_net": form.enable_net.data,
             "timeout": form.timeout.data,
+            "force_rebuild": form.force_rebuild.data,
         }
 
         try:
@@ -372,6 +376,7 @@ def process_new_build_mock(copr, add_view, url_on_success):
         build_options = {
             "enable_net": form.enable_net.data,
             "timeout": form.timeout.data,
+            "force_rebuild": form.force_rebuild.data,
         }
 
         try:
@@ -397,6 +402,7 @@ def process_new_build_upload(copr, add_view, url_on_success):
         build_options = {
             "enable_net": form.enable_net.data,
             "timeout": form.timeout.data,
+            "force_rebuild": form.force_rebuild.data,
         }
 
         try:
@@ -460,6 +466,7 @@ def process_new_build_url(copr, add_view, url_on_success):
                     build_options = {
                         "enable_net": form.enable_net.data,
                         "timeout": form.timeout.data,
+                        "force_rebuild": form.force_rebuild.data,
                     }
                     BuildsLogic.create_new_from_url(
                         flask.g.user, copr, pkg,
@@ -514,6 +521,7 @@ def process_rebuild(copr, build_id, view, url_on_success):
             build_options = {
                 "enable_net": form.enable_net.data,
                 "timeout": form.timeout.data,
+                "force_rebuild": form.force_rebuild.data,
             }
 
             BuildsLogic.create_new_from_other_build(
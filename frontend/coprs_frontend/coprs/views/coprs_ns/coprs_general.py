@@ -741,11 +741,8 @@ def render_generate_repo_file(copr, name_release, repofile):
     if not mock_chroot:
         raise ObjectNotFound("Chroot {} does not exist".format(name_release))
 
-    url = ""
-    for build in copr.builds:
-        if build.results:
-            url = build.results
-            break
+    build = builds_logic.BuildsLogic.get_latest_with_results(copr)
+    url = build.results if build else ""
     if not url:
         raise ObjectNotFound(
             "Repository not initialized: No finished builds in {}/{}."
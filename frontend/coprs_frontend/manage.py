@@ -13,6 +13,7 @@ from coprs import db
 from coprs import exceptions
 from coprs import models
 from coprs.logic import coprs_logic
+from coprs.logic.uploads_logic import UploadsLogic
 from coprs.views.misc import create_user_wrapper
 from coprs.whoosheers import CoprUserWhoosheer
 from run import generate_repo_packages
@@ -305,6 +306,16 @@ class GenerateRepoPackagesCommand(Command):
         generate_repo_packages.main()
 
 
+class CleanExpiredUploadsCommand(Command):
+    """
+    removes SRPM uploads which weren't finished in time
+    """
+
+    def run(self):
+        for upload_id in UploadsLogic.remove_expired():
+            print("Removed expired upload {}".format(upload_id))
+
+
 manager = Manager(app)
 manager.add_command("test", TestCommand())
 manager.add_command("create_sqlite_file", CreateSqliteFileCommand())
@@ -318,6 +329,7 @@ manager.add_command("alter_user", AlterUserCommand())
 manager.add_command("add_debug_user", AddDebugUserCommand())
 manager.add_command("update_indexes", UpdateIndexesCommand())
 manager.add_command("generate_repo_packages", GenerateRepoPackagesCommand())
+manager.add_command("clean_expired_uploads", CleanExpiredUploadsCommand())
 
 if __name__ == "__main__":
     manager.run()
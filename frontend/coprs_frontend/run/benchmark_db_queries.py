@@ -0,0 +1,238 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Benchmark of the hot build queue queries, run against a local PostgreSQL
+# database created only for this purpose, never against a production one.
+#
+# RUN
+#     createdb copr_bench
+#     cd frontend/coprs_frontend
+#     # config with SQLALCHEMY_DATABASE_URI = "postgresql://localhost/copr_bench"
+#     export COPR_CONFIG=/path/to/copr_bench.conf
+#     python manage.py create_db --alembic alembic.ini
+#     python run/benchmark_db_queries.py generate --builds 1000000
+#     python run/benchmark_db_queries.py run
+#
+# `generate` fills the empty database with deterministic data, so the numbers
+# are comparable across runs. `run` checks that the plan of every query uses
+# the expected index and prints timings, it exits with 1 when some plan doesn't.
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+import argparse
+import json
+import os
+import sys
+import time
+
+here = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.dirname(here))
+
+from coprs import db
+from coprs import models
+from coprs.helpers import StatusEnum
+from coprs.logic.builds_logic import BuildsLogic, BuildChrootsLogic, BuildsMonitorLogic
+
+
+UNFINISHED_INDEX = "build_chroot_unfinished_status_build_id"
+
+MOCK_CHROOTS = [
+    ("fedora", "22", "x86_64"), ("fedora", "22", "i386"),
+    ("fedora", "23", "x86_64"), ("fedora", "23", "i386"),
+    ("fedora", "rawhide", "x86_64"), ("fedora", "rawhide", "i386"),
+    ("epel", "6", "x86_64"), ("epel", "6", "i386"),
+    ("epel", "7", "x86_64"),
+]
+
+# statements are run in order, parameters:
+# users, coprs, packages_per_copr, builds, chroots, unfinished
+GENERATE_SQL = [
+    """
+INSERT INTO "user" (id, username, mail, proven, admin, api_login, api_token, api_token_expiration)
+SELECT i, 'user' || i, 'user' || i || '@example.com', false, false, 'abc', 'abc', '2000-01-01'
+FROM generate_series(1, %(users)s) AS i
+""",
+    """
+INSERT INTO copr (id, name, owner_id, created_on, deleted, playground, auto_createrepo, build_enable_net)
+SELECT i, 'copr' || i, 1 + i %% %(users)s, i, false, false, true, true
+FROM generate_series(1, %(coprs)s) AS i
+""",
+    """
+INSERT INTO copr_chroot (copr_id, mock_chroot_id)
+SELECT c, m
+FROM generate_series(1, %(coprs)s) AS c, generate_series(1, %(chroots)s) AS m
+""",
+    """
+INSERT INTO package (id, name, copr_id, enable_net)
+SELECT i, 'package' || i, 1 + (i - 1) / %(packages_per_copr)s, false
+FROM generate_series(1, %(coprs)s * %(packages_per_copr)s) AS i
+""",
+    # a package is picked pseudo-randomly for every build, the build belongs
+    # to the copr of the package
+    """
+INSERT INTO build (id, package_id, copr_id, user_id, submitted_on, started_on, ended_on,
+                   canceled, enable_net, pkg_version)
+SELECT i, p, 1 + (p - 1) / %(packages_per_copr)s, 1 + (1 + (p - 1) / %(packages_per_copr)s) %% %(users)s,
+       i, i + 60, CASE WHEN i > %(builds)s - %(unfinished)s THEN NULL ELSE i + 600 END,
+       i %% 97 = 0, false, '1.0-' || i
+FROM (SELECT i, 1 + (i * 7919) %% (%(coprs)s * %(packages_per_copr)s) AS p
+      FROM generate_series(1, %(builds)s) AS i) AS builds
+""",
+    # the most recent builds are unfinished, like in the real queue
+    """
+INSERT INTO build_chroot (build_id, mock_chroot_id, status, started_on, ended_on, git_hash)
+SELECT i, m,
+       CASE WHEN i > %(builds)s - %(unfinished)s THEN (ARRAY[3, 4, 6, 7])[1 + (i + m) %% 4]
+            WHEN i %% 97 = 0 THEN 2
+            WHEN (i * 31 + m) %% 10 = 0 THEN 0
+            ELSE 1 END,
+       i + 60, CASE WHEN i > %(builds)s - %(unfinished)s THEN NULL ELSE i + 600 END,
+       md5(i::text)
+FROM generate_series(1, %(builds)s) AS i, generate_series(1, %(chroots)s) AS m
+""",
+    "SELECT setval('user_id_seq', %(users)s)",
+    "SELECT setval('copr_id_seq', %(coprs)s)",
+    "SELECT setval('package_id_seq', %(coprs)s * %(packages_per_copr)s)",
+    "SELECT setval('build_id_seq', %(builds)s)",
+]
+
+
+def generate(args):
+    if db.engine.dialect.name != "postgresql":
+        print("Benchmark needs PostgreSQL database, got {}".format(db.engine.dialect.name))
+        return 1
+    if models.Build.query.first() is not None:
+        print("Database isn't empty, create a new one with `manage.py create_db`")
+        return 1
+
+    params = {
+        "users": max(1, args.coprs // 10),
+        "coprs": args.coprs,
+        "packages_per_copr": args.packages_per_copr,
+        "builds": args.builds,
+        "chroots": args.chroots,
+        "unfinished": args.unfinished,
+    }
+
+    for os_release, os_version, arch in MOCK_CHROOTS[:args.chroots]:
+        db.session.add(models.MockChroot(os_release=os_release, os_version=os_version,
+                                         arch=arch, is_active=True))
+    db.session.commit()
+
+    connection = db.engine.connect()
+    with connection.begin():
+        for statement in GENERATE_SQL:
+            start = time.time()
+            connection.execute(statement, params)
+            print("{:8.1f}s {}".format(time.time() - start, " ".join(statement.split())[:70]))
+
+    # planner needs fresh statistics, VACUUM can't run inside a transaction
+    connection.execution_options(isolation_level="AUTOCOMMIT").execute("VACUUM ANALYZE")
+    connection.close()
+    print("Generated {builds} builds in {chroots} chroots, {unfinished} unfinished".format(**params))
+    return 0
+
+
+def hot_queries():
+    """
+    :return list: of (name, SQLAlchemy query, expected index name)
+    """
+    copr = models.Copr.query.get(1)
+    package = models.Package.query.filter(models.Package.copr_id == copr.id).first()
+    mock_chroot = models.MockChroot.query.first()
+
+    return [
+        ("build_task_queue", BuildsLogic.get_build_task_queue().limit(200), UNFINISHED_INDEX),
+        ("build_importing_queue", BuildsLogic.get_build_importing_queue().limit(200), UNFINISHED_INDEX),
+        ("build_tasks_running", BuildsLogic.get_build_tasks(StatusEnum("running")), UNFINISHED_INDEX),
+        ("filter_by_state_pending",
+         BuildChrootsLogic.filter_by_state(BuildChrootsLogic.get_multiply(), "pending"), UNFINISHED_INDEX),
+        ("monitor_package_chroot",
+         BuildsMonitorLogic.get_package_chroot_builds(package.id, mock_chroot.id).limit(1),
+         "build_package_id_id"),
+        ("copr_builds", BuildsLogic.get_multiple_by_copr(copr).limit(100), "build_copr_id_id"),
+    ]
+
+
+def plan_index_names(plan):
+    """
+    :param dict plan: node of the EXPLAIN (FORMAT JSON) output
+    :return set: names of indexes used by the node and its children
+    """
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= plan_index_names(child)
+    return names
+
+
+def explain(statement, params):
+    result = db.engine.execute("EXPLAIN (FORMAT JSON) " + statement, params).scalar()
+    if not isinstance(result, list):
+        result = json.loads(result)
+    return result[0]["Plan"]
+
+
+def run(args):
+    if db.engine.dialect.name != "postgresql":
+        print("Benchmark needs PostgreSQL database, got {}".format(db.engine.dialect.name))
+        return 1
+
+    failed = []
+    print("{:<26} {:>6} {:>10} {:>10}  {}".format("query", "rows", "min [ms]", "med [ms]", "plan"))
+    for name, query, index_name in hot_queries():
+        compiled = query.statement.compile(dialect=db.engine.dialect)
+        statement, params = str(compiled), compiled.params
+
+        plan = explain(statement, params)
+        plan_ok = index_name in plan_index_names(plan)
+        if not plan_ok:
+            failed.append((name, index_name, plan))
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.time()
+            rows = len(db.engine.execute(statement, params).fetchall())
+            timings.append((time.time() - start) * 1000)
+        timings.sort()
+
+        print("{:<26} {:>6} {:>10.2f} {:>10.2f}  {}".format(
+            name, rows, timings[0], timings[len(timings) // 2],
+            "ok" if plan_ok else "MISSING {}".format(index_name)))
+
+    for name, index_name, plan in failed:
+        print("\n{} doesn't use {}:\n{}".format(name, index_name, json.dumps(plan, indent=2)))
+    return 1 if failed else 0
+
+
+def main(args):
+    parser = argparse.ArgumentParser(description="Benchmark of the build queue queries")
+    subparsers = parser.add_subparsers()
+
+    parser_generate = subparsers.add_parser("generate", help="fill empty database with builds")
+    parser_generate.add_argument("--builds", type=int, default=1000000)
+    parser_generate.add_argument("--chroots", type=int, default=4,
+                                 help="chroots per build, at most {}".format(len(MOCK_CHROOTS)))
+    parser_generate.add_argument("--coprs", type=int, default=10000)
+    parser_generate.add_argument("--packages-per-copr", type=int, default=20)
+    parser_generate.add_argument("--unfinished", type=int, default=500,
+                                 help="number of the newest builds which are still in the queue")
+    parser_generate.set_defaults(func=generate)
+
+    parser_run = subparsers.add_parser("run", help="check query plans and time the queries")
+    parser_run.add_argument("--repeat", type=int, default=5)
+    parser_run.set_defaults(func=run)
+
+    cli_args = parser.parse_args(args)
+    if getattr(cli_args, "chroots", 0) > len(MOCK_CHROOTS):
+        parser.error("at most {} chroots are supported".format(len(MOCK_CHROOTS)))
+    return cli_args.func(cli_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,5 +1,6 @@
 import base64
 from collections import defaultdict
+from contextlib import contextmanager
 import json
 import os
 import time
@@ -10,6 +11,7 @@ import datetime
 import pytest
 import decorator
 import shutil
+from sqlalchemy import event
 
 import coprs
 
@@ -422,6 +424,29 @@ class CoprsTestCase(object):
 
         return self.tc.open(url, **kwargs)
 
+    @contextmanager
+    def assert_max_queries(self, count):
+        """
+        Fails when the block executes more than `count` SQL statements,
+        yields the list of the executed statements
+        """
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        # start with an empty session, objects in the identity map would hide lazy loads
+        self.db.session.remove()
+        event.listen(self.db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(self.db.engine, "before_cursor_execute", before_cursor_execute)
+
+        assert len(statements) <= count, \
+            "{} SQL statements executed, at most {} expected:\n{}".format(
+                len(statements), count, "\n".join(statements))
+
     def _get_auth_string(self, login, token):
         userstring = "{}:{}".format(login, token).encode("utf-8")
         base64string_user = base64.b64encode(userstring)
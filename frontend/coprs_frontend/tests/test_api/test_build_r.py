@@ -5,6 +5,7 @@ import math
 import random
 from marshmallow import pprint
 
+from coprs import models
 from coprs.helpers import BuildSourceEnum, StatusEnum
 from coprs.logic.coprs_logic import CoprsLogic
 from coprs.logic.builds_logic import BuildsLogic
@@ -134,6 +135,57 @@ class TestBuildResource(CoprsTestCase):
         r = self.tc.get(href)
         assert r.status_code == 200
 
+    def test_build_collection_before_id(
+            self, f_users, f_mock_chroots, f_coprs, f_builds, f_db):
+
+        self.db.session.commit()
+        expected_ids = [b.id for b in BuildsLogic.get_multiple().all()]
+
+        seen_ids = []
+        href = "/api_2/builds?limit=2"
+        while href:
+            r = self.tc.get(href)
+            assert r.status_code == 200
+            obj = json.loads(r.data.decode("utf-8"))
+            seen_ids.extend(b_dict["build"]["id"] for b_dict in obj["builds"])
+            href = obj["_links"].get("next", {}).get("href")
+
+        assert seen_ids == expected_ids
+
+        r = self.tc.get("/api_2/builds?before_id={}".format(expected_ids[1]))
+        obj = json.loads(r.data.decode("utf-8"))
+        assert self.extract_build_ids(obj) == set(expected_ids[2:])
+
+    def test_build_collection_query_count(
+            self, f_users, f_mock_chroots, f_coprs, f_builds, f_db):
+
+        for _ in range(10):
+            build = models.Build(copr=self.c2, package=self.p2, user=self.u2, submitted_on=10)
+            for chroot in self.c2.active_chroots:
+                self.db.session.add(models.BuildChroot(
+                    build=build, mock_chroot=chroot, git_hash="12345"))
+        self.db.session.commit()
+
+        # state needs build chroots, submitter the user and package_name the package
+        with self.assert_max_queries(3):
+            r = self.tc.get("/api_2/builds")
+        assert r.status_code == 200
+        obj = json.loads(r.data.decode("utf-8"))
+        assert len(obj["builds"]) == 14
+
+    def test_build_collection_fields(
+            self, f_users, f_mock_chroots, f_coprs, f_builds, f_db):
+
+        self.db.session.commit()
+        r = self.tc.get("/api_2/builds?fields=state,submitted_on")
+        assert r.status_code == 200
+        obj = json.loads(r.data.decode("utf-8"))
+        for b_dict in obj["builds"]:
+            assert set(b_dict["build"].keys()) == set(["id", "state", "submitted_on"])
+
+        r = self.tc.get("/api_2/builds?fields=state,foo")
+        assert r.status_code == 400
+
     def test_build_post_bad_content_type(
             self, f_users, f_coprs, f_db, f_mock_chroots,
             f_mock_chroots_many, f_build_many_chroots,
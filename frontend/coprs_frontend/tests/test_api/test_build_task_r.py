@@ -7,6 +7,7 @@ from six.moves.urllib.parse import urlparse, parse_qs
 
 import pytest
 import sqlalchemy
+from coprs import models
 from coprs.helpers import StatusEnum
 
 from coprs.logic.users_logic import UsersLogic
@@ -45,6 +46,21 @@ class TestBuildTaskResource(CoprsTestCase):
             obj = json.loads(r0.data.decode("utf-8"))
             assert obj["_links"]["self"]["href"] == expected
 
+    def test_collection_query_count(self, f_users, f_coprs, f_mock_chroots, f_builds, f_db):
+        for _ in range(10):
+            build = models.Build(copr=self.c2, package=self.p2, user=self.u2, submitted_on=10)
+            for chroot in self.c2.active_chroots:
+                self.db.session.add(models.BuildChroot(
+                    build=build, mock_chroot=chroot, git_hash="12345"))
+        self.db.session.commit()
+
+        # relations of the build tasks are loaded together with them
+        with self.assert_max_queries(3):
+            r0 = self.tc.get("/api_2/build_tasks")
+        assert r0.status_code == 200
+        obj = json.loads(r0.data.decode("utf-8"))
+        assert len(obj["build_tasks"]) == 26
+
     def test_collection_ok_by_state(
             self, f_users, f_coprs,
             f_mock_chroots_many,
@@ -47,6 +47,17 @@ class TestProjectResource(CoprsTestCase):
         assert set(p["project"]["id"] for p in obj["projects"]) == \
             expected_id_set
 
+    def test_project_list_query_count(self, f_users, f_mock_chroots, f_coprs, f_db):
+        for i in range(10):
+            self.db.session.add(Copr(name=u"copr{}".format(i), owner=self.u1))
+        self.db.session.commit()
+
+        with self.assert_max_queries(2):
+            r = self.tc.get("/api_2/projects")
+        assert r.status_code == 200
+        obj = json.loads(r.data.decode("utf-8"))
+        assert len(obj["projects"]) == 13
+
     def test_project_list_by_user(self, f_users, f_mock_chroots, f_coprs, f_db):
         expected_id_set = set(
             c.id for c in self.basic_coprs_list
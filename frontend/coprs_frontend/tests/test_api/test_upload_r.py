@@ -0,0 +1,205 @@
+# coding: utf-8
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from coprs.logic.uploads_logic import UploadsLogic, DATA_FILE_NAME
+from tests.coprs_test_case import CoprsTestCase
+
+
+class TestUploadResource(CoprsTestCase):
+    content = b"my srpm contents" * 100
+
+    def setup_method(self, method):
+        super(TestUploadResource, self).setup_method(method)
+        # open uploads are counted per user, don't share them among the tests
+        self.orig_storage_dir = self.app.config["SRPM_STORAGE_DIR"]
+        self.app.config["SRPM_STORAGE_DIR"] = tempfile.mkdtemp()
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.app.config["SRPM_STORAGE_DIR"])
+        self.app.config["SRPM_STORAGE_DIR"] = self.orig_storage_dir
+        super(TestUploadResource, self).teardown_method(method)
+
+    def create_upload(self, size=None):
+        r0 = self.request_rest_api_with_auth(
+            "/api_2/uploads",
+            method="post",
+            content={"file_name": "foo-1.0-1.src.rpm",
+                     "size": size or len(self.content)},
+        )
+        assert r0.status_code == 201
+        return r0.headers["Location"]
+
+    def put_chunk(self, href, offset, chunk, checksum=None):
+        return self.request_rest_api_with_auth(
+            "{}?offset={}&sha256={}".format(
+                href, offset, checksum or hashlib.sha256(chunk).hexdigest()),
+            method="put",
+            content_type="application/octet-stream",
+            data=chunk,
+        )
+
+    def get_offset(self, href):
+        r = self.request_rest_api_with_auth(href)
+        assert r.status_code == 200
+        return json.loads(r.data.decode("utf-8"))["upload"]["offset"]
+
+    def test_upload_chunks(self, f_users, f_users_api, f_db):
+        self.db.session.commit()
+        href = self.create_upload()
+        assert self.get_offset(href) == 0
+
+        r1 = self.put_chunk(href, 0, self.content[:1000])
+        assert r1.status_code == 200
+        assert json.loads(r1.data.decode("utf-8"))["upload"]["offset"] == 1000
+
+        # chunk was sent again after a lost response
+        r2 = self.put_chunk(href, 0, self.content[:1000])
+        assert r2.status_code == 400
+        assert json.loads(r2.data.decode("utf-8"))["data"]["offset"] == 1000
+
+        r3 = self.put_chunk(href, 1000, self.content[1000:])
+        assert r3.status_code == 200
+        assert self.get_offset(href) == len(self.content)
+
+    def test_upload_bad_checksum(self, f_users, f_users_api, f_db):
+        self.db.session.commit()
+        href = self.create_upload()
+
+        r = self.put_chunk(href, 0, self.content[:1000], checksum="0" * 64)
+        assert r.status_code == 400
+        assert self.get_offset(href) == 0
+
+    def test_upload_larger_than_size(self, f_users, f_users_api, f_db):
+        self.db.session.commit()
+        href = self.create_upload(size=10)
+
+        r = self.put_chunk(href, 0, self.content[:11])
+        assert r.status_code == 400
+        assert self.get_offset(href) == 0
+
+    def test_upload_wrong_name(self, f_users, f_users_api, f_db):
+        self.db.session.commit()
+        r = self.request_rest_api_with_auth(
+            "/api_2/uploads",
+            method="post",
+            content={"file_name": "foo.tar.gz", "size": 10},
+        )
+        assert r.status_code == 400
+
+    def test_upload_too_large(self, f_users, f_users_api, f_db):
+        self.db.session.commit()
+        r = self.request_rest_api_with_auth(
+            "/api_2/uploads",
+            method="post",
+            content={"file_name": "foo-1.0-1.src.rpm",
+                     "size": self.app.config["UPLOAD_MAX_SIZE"] + 1},
+        )
+        assert r.status_code == 400
+        assert UploadsLogic.count_user_uploads(self.u1) == 0
+
+    def test_upload_open_limit(self, f_users, f_users_api, f_db):
+        self.db.session.commit()
+        orig_limit = self.app.config["UPLOAD_MAX_OPEN_PER_USER"]
+        self.app.config["UPLOAD_MAX_OPEN_PER_USER"] = 2
+        try:
+            href = self.create_upload()
+            self.create_upload()
+            r = self.request_rest_api_with_auth(
+                "/api_2/uploads",
+                method="post",
+                content={"file_name": "foo-1.0-1.src.rpm", "size": 10},
+            )
+            assert r.status_code == 400
+
+            # other users are not affected
+            login = self.user_api_creds["user2"]["login"]
+            token = self.user_api_creds["user2"]["token"]
+            r = self.request_rest_api_with_auth(
+                "/api_2/uploads",
+                method="post",
+                content={"file_name": "foo-1.0-1.src.rpm", "size": 10},
+                login=login, token=token,
+            )
+            assert r.status_code == 201
+
+            self.request_rest_api_with_auth(href, method="delete")
+            self.create_upload()
+        finally:
+            self.app.config["UPLOAD_MAX_OPEN_PER_USER"] = orig_limit
+
+    def test_remove_expired(self, f_users, f_users_api, f_db):
+        self.db.session.commit()
+        old_href = self.create_upload()
+        new_href = self.create_upload()
+
+        old = time.time() - self.app.config["UPLOAD_EXPIRATION"] - 60
+        old_id = old_href.rsplit("/", 1)[1]
+        old_dir = UploadsLogic.get_upload_dir(self.u1, old_id)
+        os.utime(os.path.join(old_dir, DATA_FILE_NAME), (old, old))
+        os.utime(old_dir, (old, old))
+
+        assert UploadsLogic.remove_expired() == [old_id]
+        assert self.request_rest_api_with_auth(old_href).status_code == 404
+        assert self.request_rest_api_with_auth(new_href).status_code == 200
+        assert UploadsLogic.count_user_uploads(self.u1) == 1
+
+    def test_upload_other_user(self, f_users, f_users_api, f_db):
+        self.db.session.commit()
+        href = self.create_upload()
+
+        login = self.user_api_creds["user2"]["login"]
+        token = self.user_api_creds["user2"]["token"]
+        # uploads are looked up only among the user's own ones
+        r = self.request_rest_api_with_auth(href, login=login, token=token)
+        assert r.status_code == 404
+
+        r = self.request_rest_api_with_auth("/api_2/uploads/../../etc")
+        assert r.status_code == 404
+
+    def test_upload_delete(self, f_users, f_users_api, f_db):
+        self.db.session.commit()
+        href = self.create_upload()
+
+        r = self.request_rest_api_with_auth(href, method="delete")
+        assert r.status_code == 204
+        r = self.request_rest_api_with_auth(href)
+        assert r.status_code == 404
+
+    def test_build_from_upload(
+            self, f_users, f_coprs, f_db, f_mock_chroots,
+            f_mock_chroots_many, f_build_many_chroots, f_users_api):
+
+        chroot_name_list = [c.name for c in self.c1.active_chroots]
+        self.db.session.commit()
+        href = self.create_upload()
+        upload_id = href.rsplit("/", 1)[1]
+        metadata = {
+            "project_id": 1,
+            "upload_id": upload_id,
+            "chroots": chroot_name_list,
+        }
+
+        self.put_chunk(href, 0, self.content[:1000])
+        r0 = self.request_rest_api_with_auth("/api_2/builds", method="post", content=metadata)
+        assert r0.status_code == 400
+
+        self.put_chunk(href, 1000, self.content[1000:])
+        r1 = self.request_rest_api_with_auth("/api_2/builds", method="post", content=metadata)
+        assert r1.status_code == 201
+
+        r2 = self.tc.get(r1.headers["Location"])
+        build_obj = json.loads(r2.data.decode("utf-8"))
+        assert build_obj["build"]["source_type"] == "srpm_upload"
+
+        build = self.models.Build.query.get(build_obj["build"]["id"])
+        source = json.loads(build.source_json)
+        srpm_path = os.path.join(self.app.config["SRPM_STORAGE_DIR"],
+                                 source["tmp"], source["pkg"])
+        with open(srpm_path, "rb") as handle:
+            assert handle.read() == self.content
+        assert not os.path.exists(UploadsLogic.get_upload_dir(self.u1, upload_id))
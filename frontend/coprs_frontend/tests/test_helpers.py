@@ -1,4 +1,5 @@
 from copy import deepcopy
+import json
 import six
 
 if six.PY3:
@@ -8,7 +9,7 @@ else:
 
 from coprs import app
 from coprs.helpers import parse_package_name, generate_repo_url, \
-    fix_protocol_for_frontend, fix_protocol_for_backend
+    fix_protocol_for_frontend, fix_protocol_for_backend, iter_json, iter_by_id
 
 from tests.coprs_test_case import CoprsTestCase
 
@@ -120,3 +121,24 @@ class TestHelpers(CoprsTestCase):
             app.config["ENFORCE_PROTOCOL_FOR_FRONTEND_URL"] = orig
             raise e
         app.config["ENFORCE_PROTOCOL_FOR_BACKEND_URL"] = orig
+
+    def test_iter_json(self):
+        value = {
+            "output": "ok",
+            "builds": ({"id": i, "chroots": ["a", "b"]} for i in range(3)),
+            "empty": iter([]),
+            "nested": {"items": iter([1, 2])},
+        }
+        chunks = list(iter_json(value))
+        assert len(chunks) > 1
+        assert json.loads("".join(chunks)) == {
+            "output": "ok",
+            "builds": [{"id": i, "chroots": ["a", "b"]} for i in range(3)],
+            "empty": [],
+            "nested": {"items": [1, 2]},
+        }
+
+    def test_iter_by_id(self, f_users, f_coprs, f_db):
+        query = self.models.Copr.query
+        ids = [copr.id for copr in iter_by_id(query, self.models.Copr.id, batch_size=2)]
+        assert ids == sorted([copr.id for copr in self.basic_coprs_list], reverse=True)
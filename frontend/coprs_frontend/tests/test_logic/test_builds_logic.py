@@ -61,6 +61,36 @@ class TestBuildsLogic(CoprsTestCase):
         with pytest.raises(MalformedArgumentException):
             BuildsLogic.add(**params)
 
+    def test_build_summary(self, f_users, f_coprs, f_mock_chroots, f_db):
+        package = self.models.Package(copr=self.c2, name="hello", source_type=0)
+        self.db.session.add(package)
+        self.db.session.commit()
+
+        b1 = BuildsLogic.add(self.u2, "http://example.com/hello-1.0-1.src.rpm", self.c2)
+        b2 = BuildsLogic.add(self.u2, "http://example.com/hello-1.1-1.src.rpm", self.c2)
+        for build in [b1, b2, b2]:
+            # a repeated import doesn't count the build twice
+            BuildsLogic.assign_package(build, package)
+        self.db.session.commit()
+
+        assert (self.c2.build_count, self.c2.last_build_id) == (2, b2.id)
+        assert (package.build_count, package.last_build_id) == (2, b2.id)
+        assert package.last_successful_build_id is None
+
+        for build in [b1, b2]:
+            for bc in build.build_chroots:
+                BuildsLogic.update_state_from_dict(build, {
+                    "chroot": bc.name, "status": StatusEnum("succeeded")})
+        self.db.session.commit()
+        assert package.last_successful_build_id == b2.id
+
+        BuildsLogic.delete_build(self.u2, b2)
+        self.db.session.commit()
+
+        assert (self.c2.build_count, self.c2.last_build_id) == (1, b1.id)
+        assert (package.build_count, package.last_build_id,
+                package.last_successful_build_id) == (1, b1.id, b1.id)
+
     def test_monitor_logic(self, f_users, f_coprs, f_builds, f_mock_chroots_many, f_build_few_chroots, f_db):
         copr = self.c1
         md = BuildsMonitorLogic.get_monitor_data(copr)
@@ -222,7 +252,7 @@ class TestBuildsLogic(CoprsTestCase):
         with pytest.raises(NoResultFound):
             BuildsLogic.get(self.b1.id).one()
 
-    def test_delete_build_no_chroots_to_clean(
+    def test_delete_build_skipped_chroots(
             self, f_users, f_coprs, f_mock_chroots, f_builds, f_db):
 
         for bchroot in self.b1_bc:
@@ -232,13 +262,16 @@ class TestBuildsLogic(CoprsTestCase):
         assert len(ActionsLogic.get_many().all()) == 0
         BuildsLogic.delete_build(self.u1, self.b1)
         self.db.session.commit()
-        assert len(ActionsLogic.get_many().all()) == 0
+
+        # results of the skipped chroots were linked from a cached build
+        action = ActionsLogic.get_many().one()
+        delete_data = json.loads(action.data)
+        assert set(delete_data["chroots"]) == set(bc.name for bc in self.b1_bc)
 
     def test_delete_build_some_chroots(
             self, f_users, f_coprs, f_mock_chroots, f_builds, f_db):
 
-        expected_chroots_to_delete = set([self.b1_bc[0].name,
-                                          self.b1_bc[-1].name])
+        expected_chroots_to_delete = set(bc.name for bc in self.b1_bc)
         for bchroot in self.b1_bc[1:-1]:
             bchroot.status = helpers.StatusEnum("skipped")
 
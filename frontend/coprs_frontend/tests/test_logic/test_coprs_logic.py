@@ -72,3 +72,17 @@ class TestCoprsLogic(CoprsTestCase):
         assert data["projectname"] == name
 
 
+
+    def test_copr_logic_update_sends_update_project_settings_action(
+            self, f_users, f_coprs, f_mock_chroots, f_db):
+        self.c1.repos = "http://example.com/repo/"
+        CoprsLogic.update(self.u1, self.c1)
+        CoprsLogic.update(self.u1, self.c1)
+        self.db.session.commit()
+
+        actions = ActionsLogic.get_many(ActionTypeEnum("update_project_settings")).all()
+        assert len(actions) == 1
+        assert actions[0].object_id == self.c1.id
+        data = json.loads(actions[0].data)
+        assert data["username"] == self.u1.name
+        assert data["projectname"] == self.c1.name
@@ -6,7 +6,7 @@ import sqlalchemy
 
 from coprs.logic.users_logic import UsersLogic
 from coprs.logic.coprs_logic import CoprsLogic
-from tests.coprs_test_case import CoprsTestCase, TransactionDecorator
+from tests.coprs_test_case import CoprsTestCase, TransactionDecorator, mock
 
 
 class TestCreateCopr(CoprsTestCase):
@@ -101,3 +101,100 @@ class TestCreateCopr(CoprsTestCase):
     #     self.db.session.add_all([self.u1, self.mc1])
     #
     #
+
+
+class TestListCoprs(CoprsTestCase):
+
+    def get_repos(self, username):
+        r = self.tc.get("/api/coprs/{}/".format(username))
+        data = json.loads(r.data.decode("utf-8"))
+        assert data["output"] == "ok"
+        return data["repos"]
+
+    def test_list_coprs_latest_results(self, f_users, f_coprs, f_mock_chroots, f_builds, f_db):
+        self.b3.results = "http://example.com/results/user2/foocopr/old/"
+        self.b4.results = "http://example.com/results/user2/foocopr/"
+        self.db.session.commit()
+
+        repos = self.get_repos(self.u2.name)
+        assert [repo["name"] for repo in repos] == ["foocopr", "barcopr"]
+        assert repos[0]["yum_repos"] == {
+            "fedora-17-x86_64": "http://example.com/results/user2/foocopr/fedora-17-x86_64/",
+            "fedora-17-i386": "http://example.com/results/user2/foocopr/fedora-17-i386/",
+        }
+        # no build
+        assert repos[1]["yum_repos"] == {}
+
+        # build without results
+        assert self.get_repos(self.u1.name)[0]["yum_repos"] == {}
+
+    def test_list_coprs_many_builds(self, f_users, f_mock_chroots, f_db):
+        projects_count, builds_count = 30, 20
+        for copr_num in range(projects_count):
+            copr = self.models.Copr(name="copr{}".format(copr_num), owner=self.u1)
+            copr.copr_chroots.append(self.models.CoprChroot(mock_chroot=self.mc1))
+            self.db.session.add(copr)
+            for build_num in range(builds_count):
+                self.db.session.add(self.models.Build(
+                    copr=copr, user=self.u1, submitted_on=build_num,
+                    results="http://example.com/results/copr{}/{}/".format(copr_num, build_num)))
+        self.db.session.commit()
+
+        statements = []
+
+        def count_statement(*args):
+            statements.append(args[2])
+
+        sqlalchemy.event.listen(self.db.engine, "before_cursor_execute", count_statement)
+        try:
+            repos = self.get_repos(self.u1.name)
+        finally:
+            sqlalchemy.event.remove(self.db.engine, "before_cursor_execute", count_statement)
+
+        assert len(repos) == projects_count
+        assert repos[-1]["yum_repos"] == {"fedora-18-x86_64": "http://example.com/results/copr{}/{}/fedora-18-x86_64/"
+                                          .format(projects_count - 1, builds_count - 1)}
+        # doesn't grow with the number of projects or builds
+        assert len(statements) <= 5
+
+
+class TestBuildStatuses(CoprsTestCase):
+
+    def get_statuses(self, query, etag=None, auth=True):
+        headers = {"If-None-Match": '"{}"'.format(etag)} if etag else {}
+        if auth:
+            headers["Authorization"] = self._get_auth_string(self.u1.api_login, self.u1.api_token)
+        return self.tc.get("/api/coprs/build_status/?{}".format(query), headers=headers)
+
+    def test_build_statuses(self, f_users, f_users_api, f_coprs, f_mock_chroots, f_builds, f_db):
+        r = self.get_statuses("ids={},{},123321".format(self.b1.id, self.b2.id))
+        data = json.loads(r.data.decode("utf-8"))
+        assert data["builds"] == {str(self.b1.id): "succeeded", str(self.b2.id): "unknown"}
+        assert r.headers["ETag"] == '"{}"'.format(data["etag"])
+        assert r.headers["Retry-After"] == str(data["retry_after"])
+
+    def test_build_statuses_not_modified(self, f_users, f_users_api, f_coprs, f_mock_chroots,
+                                         f_builds, f_db):
+        query = "ids={}".format(self.b2.id)
+        etag = json.loads(self.get_statuses(query).data.decode("utf-8"))["etag"]
+        r = self.get_statuses(query, etag=etag)
+        # answered right away, the client polls again later
+        assert r.status_code == 304
+        assert "Retry-After" in r.headers
+
+        self.models.BuildChroot.query.filter_by(build_id=self.b2.id).update({"status": 0})
+        self.db.session.commit()
+        r = self.get_statuses(query, etag=etag)
+        assert r.status_code == 200
+        assert json.loads(r.data.decode("utf-8"))["builds"] == {str(self.b2.id): "failed"}
+
+    def test_build_statuses_requires_auth(self, f_users, f_users_api, f_coprs, f_mock_chroots,
+                                          f_builds, f_db):
+        r = self.get_statuses("ids={}".format(self.b1.id), auth=False)
+        assert json.loads(r.data.decode("utf-8"))["output"] == "notok"
+
+    def test_build_statuses_bad_request(self, f_users, f_users_api, f_coprs, f_mock_chroots,
+                                        f_builds, f_db):
+        for query in ["", "ids=foo"]:
+            data = json.loads(self.get_statuses(query).data.decode("utf-8"))
+            assert data["output"] == "notok"
@@ -20,9 +20,109 @@ class TestWaitingBuilds(CoprsTestCase):
         r = self.tc.get("/backend/waiting/", headers=self.auth_header)
         assert len(json.loads(r.data.decode("utf-8"))["builds"]) == 5
 
+    def test_waiting_build_with_cached_result(
+            self, f_users, f_coprs, f_mock_chroots, f_builds, f_db):
+
+        for build_chroot in self.b1_bc + self.b2_bc:
+            build_chroot.status = 4 # pending
+        self.db.session.commit()
+
+        r = self.tc.get("/backend/waiting/", headers=self.auth_header)
+        builds = json.loads(r.data.decode("utf-8"))["builds"]
+        cache_keys = set(build["cache_key"] for build in builds)
+        # b1 and b2 are the same package in the same project
+        assert len(cache_keys) == 1
+        assert all("cached_result_dir" not in build for build in builds)
+
+        self.b1_bc[0].status = 1 # succeeded
+        self.b1_bc[0].cache_key = cache_keys.pop()
+        self.db.session.commit()
+
+        r = self.tc.get("/backend/waiting/", headers=self.auth_header)
+        builds = json.loads(r.data.decode("utf-8"))["builds"]
+        assert len(builds) == 1
+        assert builds[0]["build_id"] == self.b2.id
+        assert builds[0]["cached_result_dir"] == self.b1.result_dir_name
+
+    def test_waiting_build_forced_rebuild_is_not_cached(
+            self, f_users, f_coprs, f_mock_chroots, f_builds, f_db):
+
+        for build_chroot in self.b1_bc + self.b2_bc:
+            build_chroot.status = 4 # pending
+        self.db.session.commit()
+
+        r = self.tc.get("/backend/waiting/", headers=self.auth_header)
+        cache_key = json.loads(r.data.decode("utf-8"))["builds"][0]["cache_key"]
+
+        self.b1_bc[0].status = 1 # succeeded
+        self.b1_bc[0].cache_key = cache_key
+        self.b2.force_rebuild = True
+        self.db.session.commit()
+
+        r = self.tc.get("/backend/waiting/", headers=self.auth_header)
+        builds = json.loads(r.data.decode("utf-8"))["builds"]
+        assert len(builds) == 1
+        assert builds[0]["build_id"] == self.b2.id
+        assert builds[0]["cache_key"] == cache_key
+        assert "cached_result_dir" not in builds[0]
+
+    def test_waiting_build_cache_key_depends_on_buildroot(
+            self, f_users, f_coprs, f_mock_chroots, f_builds, f_db):
+
+        for build_chroot in self.b1_bc + self.b2_bc:
+            build_chroot.status = 4 # pending
+        self.b2.enable_net = not self.b1.enable_net
+        self.db.session.commit()
+
+        r = self.tc.get("/backend/waiting/", headers=self.auth_header)
+        builds = json.loads(r.data.decode("utf-8"))["builds"]
+        assert len(set(build["cache_key"] for build in builds)) == 2
+
 
 # status = 0 # failure
 # status = 1 # succeeded
+class TestProjectsSettings(CoprsTestCase):
+
+    def post(self, projects):
+        return self.tc.post("/backend/projects_settings/",
+                            content_type="application/json",
+                            headers=self.auth_header,
+                            data=json.dumps({"projects": projects}))
+
+    def test_projects_settings(self, f_users, f_coprs, f_mock_chroots, f_db):
+        self.c2.auto_createrepo = False
+        self.c2.repos = "http://example.com/repo/"
+        self.c2.copr_chroots[0].buildroot_pkgs = "foo bar"
+        self.mc3.is_active = False
+        self.db.session.commit()
+
+        r = self.post(["user2/foocopr", "user1/foocopr", "user1/nonexisting"])
+        projects = json.loads(r.data.decode("utf-8"))["projects"]
+        assert sorted(projects.keys()) == ["user1/foocopr", "user2/foocopr"]
+        assert projects["user1/foocopr"] == {
+            "auto_createrepo": True,
+            "chroots": ["fedora-18-x86_64"],
+            "repos": [],
+            "buildroot_pkgs": {"fedora-18-x86_64": ""},
+        }
+        assert projects["user2/foocopr"] == {
+            "auto_createrepo": False,
+            "chroots": ["fedora-17-x86_64"],
+            "repos": ["http://example.com/repo/"],
+            "buildroot_pkgs": {"fedora-17-x86_64": "foo bar"},
+        }
+
+    def test_projects_settings_too_many(self, f_users, f_db):
+        r = self.post(["user1/foocopr"] * 501)
+        assert r.status_code == 400
+
+    def test_projects_settings_requires_password(self, f_users, f_coprs, f_db):
+        r = self.tc.post("/backend/projects_settings/",
+                         content_type="application/json",
+                         data=json.dumps({"projects": ["user1/foocopr"]}))
+        assert b"You have to provide the correct password" in r.data
+
+
 class TestUpdateBuilds(CoprsTestCase):
     data1 = """
 {
@@ -108,6 +208,36 @@ class TestUpdateBuilds(CoprsTestCase):
         assert updated.status == 1
         assert updated.chroots_ended_on == {'fedora-18-x86_64': 149086644000}
 
+    def test_update_build_records_cache_key(self, f_users, f_coprs, f_mock_chroots,
+                                            f_builds, f_db):
+        self.b1_bc[0].status = 3 # running
+        self.db.session.commit()
+
+        data = json.loads(self.data2)
+        data["builds"][0]["cache_key"] = "a" * 64
+        self.tc.post("/backend/update/",
+                     content_type="application/json",
+                     headers=self.auth_header,
+                     data=json.dumps(data))
+
+        updated = self.models.BuildChroot.query.filter(
+            self.models.BuildChroot.build_id == 1).one()
+        assert updated.cache_key == "a" * 64
+
+    def test_update_build_stores_build_stats(self, f_users, f_coprs, f_mock_chroots,
+                                             f_builds, f_db):
+        build_stats = {"phases": {"vm_acquire": 12.5}, "resources": {"max_rss_kb": 1024}}
+        data = json.loads(self.data2)
+        data["builds"][0]["build_stats"] = build_stats
+        self.tc.post("/backend/update/",
+                     content_type="application/json",
+                     headers=self.auth_header,
+                     data=json.dumps(data))
+
+        updated = self.models.BuildChroot.query.filter(
+            self.models.BuildChroot.build_id == 1).one()
+        assert json.loads(updated.build_stats) == build_stats
+
     def test_update_more_existent_and_non_existent_builds(
             self, f_users, f_coprs, f_mock_chroots, f_builds, f_db):
 
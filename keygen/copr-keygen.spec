@@ -125,6 +125,8 @@ install -d %{buildroot}%{_sysconfdir}/logrotate.d/
 %{__install} -p -m 0755 run/gpg_copr.sh %{buildroot}/%{_bindir}/gpg_copr.sh
 
 %{__install} -p -m 0755 run/application.py %{buildroot}%{_datadir}/copr-keygen/
+%{__install} -p -m 0755 run/copr_keygen_pool.py %{buildroot}%{_datadir}/copr-keygen/
+%{__install} -p -m 0644 run/copr-keygen-pool.service %{buildroot}%{_datadir}/copr-keygen/
 %{__install} -p -m 0644 configs/httpd/copr-keygen.conf.example %{buildroot}%{_pkgdocdir}/httpd/
 %{__install} -p -m 0644 configs/logrotate %{buildroot}%{_sysconfdir}/logrotate.d/copr-keygen
 
@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+# coding: utf-8
+
+"""
+Keeps KEY_POOL_SIZE pre-generated keys in keyring, /gen_key binds them
+to new users instead of generating a key during the request
+"""
+
+import logging
+import os
+import sys
+import time
+
+logging.basicConfig(stream=sys.stderr, level=logging.INFO)
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from copr_keygen import app
+from copr_keygen.exceptions import KeygenServiceBaseException
+from copr_keygen.logic import fill_key_pool
+
+log = logging.getLogger("copr_keygen_pool")
+
+
+def main():
+    if not app.config["KEY_POOL_SIZE"]:
+        log.info("KEY_POOL_SIZE is 0, key pool is disabled")
+        return
+
+    while True:
+        try:
+            count = fill_key_pool(app)
+            if count:
+                log.info("Generated {} pool keys".format(count))
+        except KeygenServiceBaseException:
+            log.exception("Failed to fill key pool")
+        time.sleep(app.config["KEY_POOL_CHECK_INTERVAL"])
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from __future__ import absolute_import
 
 import json
 import logging
+import threading
 from logging import getLogger
 from logging import FileHandler
 
@@ -38,7 +39,12 @@ if not app.config["DEBUG"] or app.config["DEBUG_WITH_LOG"]:
 # end setup logger
 
 
-from .logic import create_new_key, user_exists, get_passphrase_location
+from .logic import create_new_key, user_exists, get_passphrase_location, \
+    ensure_passphrase_exist, key_index, assign_pool_key, get_pool_stats
+
+# emails of keys being generated in background
+keys_in_progress = set()
+keys_in_progress_lock = threading.Lock()
 
 log = logging.getLogger(__name__)
 
@@ -76,20 +82,18 @@ def gen_key():
         - **name_real, name_email, name_comment**: for key identification
         - **key_length**: now supports 1024 or 2048 bytes
         - **expire**: [optional] key expire in days, default 0  means never
+        - **async**: [optional] generate the key in background, don't wait for it
 
     :return: Http response with plain text content
 
     :status 201: on success, returns empty data
+    :status 202: key generation started in background
     :status 200: key already exists, nothing done
     :status 400: incorrect request
     :status 500: internal server error
 
     """
-    try:
-        charset = request.headers.get('charset', 'utf-8')
-        query = json.loads(request.data.decode(charset))
-    except Exception as e:
-        raise BadRequestException("Failed to parse request body: {}".format(e))
+    query = parse_query()
 
     log.info("received gen_key query: {}".format(query))
     if "name_real" not in query:
@@ -102,24 +106,144 @@ def gen_key():
 
     name_email = query["name_email"]
 
+    # most of the requests ask for an existing key, don't spawn gpg for them
+    if key_index.contains(app, name_email):
+        ensure_passphrase_exist(app, name_email)
+        return make_response(200)
+
+    if query.get("async"):
+        with keys_in_progress_lock:
+            if name_email not in keys_in_progress:
+                keys_in_progress.add(name_email)
+                thread = threading.Thread(target=generate_key_in_background, args=(query,))
+                thread.daemon = True
+                thread.start()
+        return make_response(202)
+
+    return make_response(generate_key(query))
+
+
+@app.route('/keys_exist', methods=["post"])
+def keys_exist():
+    """
+    Checks which of the users have a key-pair
+
+     **Example request**:
+
+    .. sourcecode:: http
+
+      POST /keys_exist HTTP 1.1
+      Content-Type: application/json
+
+      {
+        "name_emails": ["foo_bar@example.com", "foo_baz@example.com"]
+      }
+
+     **Example response**:
+
+    .. sourcecode:: http
+
+      HTTP/1.1 200 OK
+      Content-Type: application/json
+
+      {
+        "keys": {"foo_bar@example.com": true, "foo_baz@example.com": false}
+      }
+
+    :status 200: on success
+    :status 400: incorrect request
+    :status 500: internal server error
+    """
+    query = parse_query()
+    name_emails = query.get("name_emails")
+    if not isinstance(name_emails, list):
+        raise BadRequestException("Request query missing required "
+                                  "parameter `name_emails`")
+
+    emails = key_index.get_emails(app)
+    keys = dict((name_email, name_email in emails) for name_email in name_emails)
+    return Response(json.dumps({"keys": keys}), content_type="application/json")
+
+
+@app.route('/pool_stats')
+def pool_stats():
+    """
+    Reports the number of pre-generated keys
+
+     **Example response**:
+
+    .. sourcecode:: http
+
+      HTTP/1.1 200 OK
+      Content-Type: application/json
+
+      {
+        "depth": 17,
+        "size": 20
+      }
+
+    :status 200: on success
+    :status 500: internal server error
+    """
+    return Response(json.dumps(get_pool_stats(app)), content_type="application/json")
+
+
+def parse_query():
+    try:
+        charset = request.headers.get('charset', 'utf-8')
+        return json.loads(request.data.decode(charset))
+    except Exception as e:
+        raise BadRequestException("Failed to parse request body: {}".format(e))
+
+
+def make_response(status_code):
+    response = Response("", content_type="text/plain;charset=UTF-8")
+    response.status_code = status_code
+    return response
+
+
+def generate_key(query):
+    """
+    :return: 200 when the key already exists, 201 when it was created
+    """
+    name_email = query["name_email"]
+    key_length = query.get("key_length", app.config["GPG_KEY_LENGTH"])
+    expire = query.get("expire", app.config["GPG_EXPIRE"])
     with file_lock(get_passphrase_location(app, name_email) + ".lock"):
         if user_exists(app, name_email):
-            response = Response("", content_type="text/plain;charset=UTF-8")
-            response.status_code = 200
-            return response
+            return 200
+
+        # pool keys are generated with the default parameters
+        if app.config["KEY_POOL_SIZE"] and key_length == app.config["GPG_KEY_LENGTH"] \
+                and expire == app.config["GPG_EXPIRE"]:
+            try:
+                if assign_pool_key(app, query["name_real"], name_email,
+                                   query.get("name_comment", None)):
+                    return 201
+            except KeygenServiceBaseException:
+                log.exception("Failed to assign pool key to {}".format(name_email))
+                if user_exists(app, name_email):
+                    return 201
 
         create_new_key(
             app,
             name_real=query["name_real"],
             name_email=name_email,
             name_comment=query.get("name_comment", None),
-            key_length=query.get("key_length", app.config["GPG_KEY_LENGTH"]),
-            expire=query.get("expire", app.config["GPG_EXPIRE"]),
+            key_length=key_length,
+            expire=expire,
         )
+        return 201
+
 
-        response = Response("", content_type="text/plain;charset=UTF-8")
-        response.status_code = 201
-        return response
+def generate_key_in_background(query):
+    try:
+        generate_key(query)
+    except Exception:
+        log.exception("Failed to generate key for {}".format(query["name_email"]))
+    finally:
+        with keys_in_progress_lock:
+            keys_in_progress.discard(query["name_email"])
 
 
 @app.errorhandler(500)
@@ -7,6 +7,12 @@ GNUPG_HOMEDIR = "/var/lib/copr-keygen/gnupg"
 GPG_KEY_LENGTH = 2048
 GPG_EXPIRE = "5y"
 
+# number of pre-generated keys kept by copr_keygen_pool.py, 0 disables the pool,
+# requires gpg >= 2.1.13
+KEY_POOL_SIZE = 0
+# seconds between pool checks
+KEY_POOL_CHECK_INTERVAL = 60
+
 LOG_DIR = "/var/log/copr-keygen"
 import logging
 LOG_LEVEL = logging.INFO
@@ -1,12 +1,16 @@
 import traceback
 import os
 import logging
+import re
+import threading
+import uuid
 
 from subprocess import PIPE, Popen
 import tempfile
 import sys
 
 from .exceptions import GpgErrorException, KeygenServiceBaseException
+from .util import file_lock
 
 log = logging.getLogger(__name__)
 
@@ -70,6 +74,132 @@ def user_exists(app, mail):
         raise err
 
 
+# files which gpg changes when a key is added or removed, gpg1 and gpg2 layouts
+KEYRING_FILES = ["pubring.gpg", "secring.gpg", "pubring.kbx", "private-keys-v1.d"]
+
+UID_EMAIL_RE = re.compile(r"<([^>]+)>")
+
+# uid of the pre-generated keys waiting in pool
+POOL_NAME_REAL = "copr pool key"
+POOL_EMAIL_DOMAIN = "pool.copr-keygen"
+
+
+def run_gpg(app, args):
+    """ Runs gpg with the keygen keyring
+
+    :return: stdout
+    :raises: GpgErrorException
+    """
+    cmd = [app.config["GPG_BINARY"], "--batch",
+           "--homedir", app.config["GNUPG_HOMEDIR"]] + args
+
+    try:
+        handle = Popen(cmd, stdout=PIPE, stderr=PIPE)
+        stdout, stderr = handle.communicate()
+    except Exception as e:
+        raise GpgErrorException(msg="unhandled exception during gpg call",
+                                cmd=" ".join(cmd), err=e)
+
+    if handle.returncode != 0:
+        raise GpgErrorException(msg="gpg call failed", cmd=cmd,
+                                stdout=stdout.decode(), stderr=stderr.decode())
+    return stdout.decode()
+
+
+def list_secret_keys(app):
+    """ Lists all secret keys in keyring by one gpg call
+
+    :return: list of dicts with `fingerprint` and `uids`, revoked uids are omitted
+    :raises: GpgErrorException
+    """
+    keys = []
+    for line in run_gpg(app, ["--list-secret-keys", "--with-colons", "--fingerprint"]).splitlines():
+        fields = line.split(":")
+        if fields[0] == "sec":
+            keys.append({"fingerprint": None, "uids": []})
+        elif not keys:
+            continue
+        elif fields[0] == "fpr" and keys[-1]["fingerprint"] is None and len(fields) > 9:
+            keys[-1]["fingerprint"] = fields[9]
+        elif fields[0] == "uid" and len(fields) > 9 and fields[1] != "r":
+            keys[-1]["uids"].append(fields[9].replace("\\x3a", ":"))
+    return keys
+
+
+def get_uid_email(uid):
+    match = UID_EMAIL_RE.search(uid)
+    return match.group(1) if match else None
+
+
+def list_key_emails(app):
+    """ Lists emails of all secret keys in keyring by one gpg call
+
+    :return: set of emails
+    :raises: GpgErrorException
+    """
+    emails = set()
+    for key in list_secret_keys(app):
+        for uid in key["uids"]:
+            if get_uid_email(uid):
+                emails.add(get_uid_email(uid))
+    return emails
+
+
+class KeyIndex(object):
+    """ In-memory index of emails with a key in keyring
+
+    The index is loaded by one gpg call and reloaded only when
+    the keyring files change, so lookups don't spawn gpg.
+    """
+    def __init__(self):
+        self.emails = None
+        self.keyring_state = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_keyring_state(app):
+        state = []
+        for name in KEYRING_FILES:
+            try:
+                stat = os.stat(os.path.join(app.config["GNUPG_HOMEDIR"], name))
+                state.append((name, stat.st_mtime, stat.st_size))
+            except OSError:
+                pass
+        return tuple(state)
+
+    def get_emails(self, app):
+        """
+        :raises: GpgErrorException
+        """
+        with self.lock:
+            state = self.get_keyring_state(app)
+            if self.emails is None or state != self.keyring_state:
+                log.debug("reloading key index")
+                self.emails = list_key_emails(app)
+                self.keyring_state = state
+            return self.emails
+
+    def add(self, mail):
+        with self.lock:
+            if self.emails is not None:
+                self.emails.add(mail)
+
+    def contains(self, app, mail):
+        """ Fast check whether the user has a key, False means `unknown`,
+        use :py:func:`user_exists` to be sure
+
+        :return: bool True when user present
+        """
+        try:
+            return mail in self.get_emails(app)
+        except GpgErrorException as err:
+            log.warning("key index not available: {}".format(err))
+            return False
+
+
+key_index = KeyIndex()
+
+
 template = """
 %no-ask-passphrase
 Key-Type: {key_type}
@@ -147,6 +277,7 @@ def create_new_key(
                 msg="Key was created, but not found in keyring"
                     "this shouldn't be possible")
         log.info("Created key-pair for: {} ".format(name_email))
+        key_index.add(name_email)
     else:
         raise GpgErrorException(msg=stderr.decode())
 
@@ -154,3 +285,75 @@ def create_new_key(
         os.remove(out.name)
     except Exception as e:
         log.error(e)
+
+
+def is_pool_uid(uid):
+    email = get_uid_email(uid)
+    return bool(email) and email.endswith("@" + POOL_EMAIL_DOMAIN)
+
+
+def list_pool_keys(app):
+    """
+    :return: list of pre-generated keys not assigned to any user yet
+    """
+    return [key for key in list_secret_keys(app)
+            if key["uids"] and all(is_pool_uid(uid) for uid in key["uids"])]
+
+
+def get_pool_stats(app):
+    return {
+        "depth": len(list_pool_keys(app)),
+        "size": app.config["KEY_POOL_SIZE"],
+    }
+
+
+def add_pool_key(app):
+    """ Generates one key into the pool
+    """
+    name_email = "{}@{}".format(uuid.uuid4().hex, POOL_EMAIL_DOMAIN)
+    create_new_key(app, POOL_NAME_REAL, name_email,
+                   key_length=app.config["GPG_KEY_LENGTH"],
+                   expire=app.config["GPG_EXPIRE"])
+    # pool keys are never used for signing
+    os.remove(get_passphrase_location(app, name_email))
+
+
+def fill_key_pool(app):
+    """ Generates keys until the pool has KEY_POOL_SIZE keys
+
+    :return: number of generated keys
+    """
+    count = 0
+    while len(list_pool_keys(app)) < app.config["KEY_POOL_SIZE"]:
+        add_pool_key(app)
+        count += 1
+    return count
+
+
+def assign_pool_key(app, name_real, name_email, name_comment=None):
+    """ Binds a pre-generated key to the user, the pool uid is revoked
+
+    :return: bool False when the pool is empty
+    :raises: GpgErrorException
+    """
+    if name_comment:
+        new_uid = "{} ({}) <{}>".format(name_real, name_comment, name_email)
+    else:
+        new_uid = "{} <{}>".format(name_real, name_email)
+
+    with file_lock(os.path.join(app.config["PHRASES_DIR"], "pool.lock")):
+        pool = list_pool_keys(app)
+        if not pool:
+            log.info("key pool is empty")
+            return False
+
+        key = pool[0]
+        run_gpg(app, ["--quick-add-uid", key["fingerprint"], new_uid])
+        for uid in key["uids"]:
+            run_gpg(app, ["--yes", "--quick-revoke-uid", key["fingerprint"], uid])
+
+    ensure_passphrase_exist(app, name_email)
+    key_index.add(name_email)
+    log.info("Assigned pool key {} to: {}".format(key["fingerprint"], name_email))
+    return True
+
@@ -93,3 +93,90 @@ class TestGenKey(object):
         with app.test_client() as c:
             rv = c.post('/gen_key', data=json_data)
             assert rv.status_code == 500
+
+
+@mock.patch("copr_keygen.key_index")
+class TestKeyIndexUsage(object):
+    def test_gen_key_existing_in_index(self, key_index):
+        key_index.contains.return_value = True
+        with mock.patch("copr_keygen.user_exists") as user_exists:
+            with app.test_client() as c:
+                rv = c.post('/gen_key', data=json_data)
+                assert rv.status_code == 200
+        assert not user_exists.called
+
+    @mock.patch("copr_keygen.threading.Thread")
+    def test_gen_key_async(self, thread, key_index):
+        key_index.contains.return_value = False
+        async_data = json.dumps(dict(json.loads(json_data), **{"async": True}))
+        with app.test_client() as c:
+            rv = c.post('/gen_key', data=async_data)
+            assert rv.status_code == 202
+            # already in progress
+            rv = c.post('/gen_key', data=async_data)
+            assert rv.status_code == 202
+        assert thread.call_count == 1
+
+        with mock.patch("copr_keygen.generate_key") as generate_key:
+            thread.call_args[1]["target"](*thread.call_args[1]["args"])
+            assert generate_key.called
+
+        with app.test_client() as c:
+            c.post('/gen_key', data=async_data)
+        assert thread.call_count == 2
+
+    def test_keys_exist(self, key_index):
+        key_index.get_emails.return_value = set(["foo_bar@example.com"])
+        with app.test_client() as c:
+            rv = c.post('/keys_exist', data=json.dumps(
+                {"name_emails": ["foo_bar@example.com", "foo_baz@example.com"]}))
+            assert rv.status_code == 200
+            assert json.loads(rv.data.decode("utf-8")) == {"keys": {
+                "foo_bar@example.com": True, "foo_baz@example.com": False}}
+
+            rv = c.post('/keys_exist', data=json.dumps({}))
+            assert rv.status_code == 400
+
+
+@mock.patch("copr_keygen.create_new_key")
+@mock.patch("copr_keygen.assign_pool_key")
+@mock.patch("copr_keygen.user_exists")
+class TestKeyPoolUsage(object):
+    def setup_method(self, method):
+        app.config["KEY_POOL_SIZE"] = 5
+
+    def teardown_method(self, method):
+        app.config["KEY_POOL_SIZE"] = 0
+
+    def test_gen_key_from_pool(self, user_exists, assign_pool_key, create_new_key):
+        user_exists.return_value = False
+        assign_pool_key.return_value = True
+        with app.test_client() as c:
+            rv = c.post('/gen_key', data=json_data)
+            assert rv.status_code == 201
+        assert assign_pool_key.called
+        assert not create_new_key.called
+
+    def test_gen_key_empty_pool(self, user_exists, assign_pool_key, create_new_key):
+        user_exists.return_value = False
+        assign_pool_key.return_value = False
+        with app.test_client() as c:
+            rv = c.post('/gen_key', data=json_data)
+            assert rv.status_code == 201
+        assert create_new_key.called
+
+    def test_gen_key_custom_length(self, user_exists, assign_pool_key, create_new_key):
+        user_exists.return_value = False
+        with app.test_client() as c:
+            rv = c.post('/gen_key', data=json.dumps(dict(json.loads(json_data), key_length=1024)))
+            assert rv.status_code == 201
+        assert not assign_pool_key.called
+        assert create_new_key.called
+
+    def test_pool_stats(self, *args):
+        with mock.patch("copr_keygen.get_pool_stats") as get_pool_stats:
+            get_pool_stats.return_value = {"depth": 3, "size": 5}
+            with app.test_client() as c:
+                rv = c.get('/pool_stats')
+                assert json.loads(rv.data.decode("utf-8")) == {"depth": 3, "size": 5}
+
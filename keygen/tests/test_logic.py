@@ -181,3 +181,107 @@ class TestGenKey(TestCase):
                 logic.create_new_key(app, TEST_NAME, TEST_EMAIL, TEST_KEYLENGTH)
 
             assert not popen.called
+
+
+GPG_LIST_OUTPUT = """sec::2048:1:AAAA:1450000000:::u:::scESC:
+uid:u::::1450000000::HASH1::foo_bar (comment) <foo_bar@example.com>:
+ssb::2048:1:BBBB:1450000000::::::e:
+sec::2048:1:CCCC:1450000000:::u:::scESC:
+uid:u::::1450000000::HASH2::foo_baz <foo_baz@example.com>:
+"""
+
+
+@mock.patch("copr_keygen.logic.Popen")
+class TestKeyIndex(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        app.config["GNUPG_HOMEDIR"] = self.path
+        self.index = logic.KeyIndex()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_list_key_emails(self, popen):
+        popen.return_value = MockPopenHandle(0, stdout=GPG_LIST_OUTPUT)
+        assert logic.list_key_emails(app) == set(["foo_bar@example.com", "foo_baz@example.com"])
+
+        popen.return_value = MockPopenHandle(2)
+        with pytest.raises(GpgErrorException):
+            logic.list_key_emails(app)
+
+    def test_reload_on_keyring_change(self, popen):
+        popen.return_value = MockPopenHandle(0, stdout=GPG_LIST_OUTPUT)
+        assert self.index.contains(app, "foo_bar@example.com")
+        assert not self.index.contains(app, TEST_EMAIL)
+        assert popen.call_count == 1
+
+        with open(os.path.join(self.path, "pubring.gpg"), "w") as handle:
+            handle.write("changed")
+        assert not self.index.contains(app, TEST_EMAIL)
+        assert popen.call_count == 2
+
+        self.index.add(TEST_EMAIL)
+        assert self.index.contains(app, TEST_EMAIL)
+        assert popen.call_count == 2
+
+    def test_gpg_error(self, popen):
+        popen.side_effect = OSError()
+        assert not self.index.contains(app, TEST_EMAIL)
+
+
+GPG_POOL_OUTPUT = """sec::2048:1:AAAA:1450000000:::u:::scESC:
+fpr:::::::::FPR1:
+uid:u::::1450000000::HASH1::copr pool key <abc@pool.copr-keygen>:
+ssb::2048:1:BBBB:1450000000::::::e:
+fpr:::::::::SUBFPR1:
+sec::2048:1:CCCC:1450000000:::u:::scESC:
+fpr:::::::::FPR2:
+uid:r::::1450000000::HASH2::copr pool key <def@pool.copr-keygen>:
+uid:u::::1450000000::HASH3::foo_bar <foo_bar@example.com>:
+"""
+
+
+class TestKeyPool(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        app.config["PHRASES_DIR"] = self.path
+        app.config["KEY_POOL_SIZE"] = 2
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    @mock.patch("copr_keygen.logic.Popen")
+    def test_list_pool_keys(self, popen):
+        popen.return_value = MockPopenHandle(0, stdout=GPG_POOL_OUTPUT)
+        assert logic.list_secret_keys(app) == [
+            {"fingerprint": "FPR1", "uids": ["copr pool key <abc@pool.copr-keygen>"]},
+            {"fingerprint": "FPR2", "uids": ["foo_bar <foo_bar@example.com>"]},
+        ]
+        assert [key["fingerprint"] for key in logic.list_pool_keys(app)] == ["FPR1"]
+        assert logic.get_pool_stats(app) == {"depth": 1, "size": 2}
+
+    @mock.patch("copr_keygen.logic.run_gpg")
+    @mock.patch("copr_keygen.logic.list_pool_keys")
+    def test_assign_pool_key(self, list_pool_keys, run_gpg):
+        list_pool_keys.return_value = [
+            {"fingerprint": "FPR1", "uids": ["copr pool key <abc@pool.copr-keygen>"]}]
+
+        assert logic.assign_pool_key(app, TEST_NAME, TEST_EMAIL)
+        assert run_gpg.call_args_list == [
+            mock.call(app, ["--quick-add-uid", "FPR1", "foobar <foobar@example.com>"]),
+            mock.call(app, ["--yes", "--quick-revoke-uid", "FPR1",
+                            "copr pool key <abc@pool.copr-keygen>"]),
+        ]
+        assert os.path.exists(os.path.join(self.path, TEST_EMAIL))
+
+        run_gpg.reset_mock()
+        list_pool_keys.return_value = []
+        assert not logic.assign_pool_key(app, TEST_NAME, TEST_EMAIL)
+        assert not run_gpg.called
+
+    @mock.patch("copr_keygen.logic.add_pool_key")
+    @mock.patch("copr_keygen.logic.list_pool_keys")
+    def test_fill_key_pool(self, list_pool_keys, add_pool_key):
+        list_pool_keys.side_effect = [[], [{}], [{}, {}]]
+        assert logic.fill_key_pool(app) == 2
+        assert add_pool_key.call_count == 2
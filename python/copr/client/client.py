@@ -22,8 +22,9 @@ from requests_toolbelt.multipart.encoder import (MultipartEncoder,
 # because it requires at least python-six-1.4.1
 if sys.version_info[0] == 2:
     from urlparse import urlparse
+    from urllib import urlencode
 else:
-    from urllib.parse import urlparse
+    from urllib.parse import urlparse, urlencode
 
 if sys.version_info < (2, 7):
     class NullHandler(logging.Handler):
@@ -47,6 +48,12 @@ from .parsers import fabric_simple_fields_parser, ProjectListParser, \
     ProjectDetailsFieldsParser
 
 from ..util import UnicodeMixin
+from ..session import make_session, map_concurrently, DEFAULT_RETRIES, DEFAULT_POOL_SIZE
+from ..download import download_directories
+
+# max number of build ids in one get_build_statuses() request, the ids are
+# sent in the query string which has to fit the usual 8 KB request line limit
+BUILD_STATUS_MAX_IDS = 200
 
 # TODO: add deco to check that login/token are provided
 # and  raise correct error
@@ -75,13 +82,16 @@ class CoprClient(UnicodeMixin):
     """
 
     def __init__(self, username=None, login=None, token=None, copr_url=None,
-                 no_config=False):
+                 no_config=False, retries=DEFAULT_RETRIES, pool_size=DEFAULT_POOL_SIZE):
         """
             :param unicode username: username used by default for all requests
             :param unicode login: user login, used for identification
             :param unicode token: copr api token
             :param unicode copr_url: used as copr projects root
             :param bool no_config: helper flag to indicate that no config was provided
+            :param int retries: how many times to retry failed idempotent requests
+            :param int pool_size: connections kept alive to the server,
+                also the default number of threads of the bulk methods
         """
 
         self.token = token
@@ -91,6 +101,10 @@ class CoprClient(UnicodeMixin):
 
         self.no_config = no_config
 
+        # keep connections to the server alive between the requests
+        self.pool_size = pool_size
+        self.session = make_session(retries=retries, pool_size=pool_size)
+
     def __unicode__(self):
         return (
             u"<Copr client. username: {}, api url: {}, login presents: {}, token presents: {}>"
@@ -182,13 +196,13 @@ class CoprClient(UnicodeMixin):
             raise Exception("Method {0} not allowed".format(method))
 
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method.upper(),
                 url=url,
                 **kwargs
             )
             log.debug("raw response: {0}".format(response.text))
-        except requests.ConnectionError as e:
+        except requests.RequestException as e:
             raise CoprRequestException(e)
 
         if "<title>Sign in Copr</title>" in response.text:
@@ -266,6 +280,80 @@ class CoprClient(UnicodeMixin):
         )
         return response
 
+    def get_builds_details(self, build_ids, workers=None):
+        """ Returns details of many builds, requested concurrently.
+
+            :param build_ids: Build identifiers
+            :param workers: [optional] max number of concurrent requests,
+                default is the connection pool size
+
+            :return: list of :py:class:`~.responses.CoprResponse` as returned
+                by :py:meth:`get_build_details`, in the order of `build_ids`
+        """
+        return map_concurrently(self.get_build_details, build_ids,
+                                workers or self.pool_size)
+
+    def get_build_statuses(self, build_ids, etag=None):
+        """ Returns statuses of many builds with one request.
+
+            :param build_ids: Build identifiers, at most
+                :py:data:`BUILD_STATUS_MAX_IDS`; split longer lists into
+                chunks and keep a separate etag for each of them
+            :type build_ids: list of int
+
+            :param etag: [optional] etag of the statuses known to the caller,
+                see the `etag` field of the response
+
+            :return: :py:class:`~.responses.CoprResponse` with additional fields:
+
+                - **builds:** dict build id -> status, builds which don't exist
+                  are omitted; None when nothing changed since `etag`
+                - **etag:** identifies the current statuses
+                - **retry_after:** seconds to wait before asking again
+
+        """
+        if len(build_ids) > BUILD_STATUS_MAX_IDS:
+            raise CoprRequestException(
+                "Too many builds, ask for at most {0} at once"
+                .format(BUILD_STATUS_MAX_IDS))
+
+        url = "{0}/coprs/build_status/".format(self.api_url)
+        params = {"ids": ",".join(str(build_id) for build_id in build_ids)}
+        url = "{0}?{1}".format(url, urlencode(params))
+
+        headers = None
+        if etag:
+            headers = {"If-None-Match": '"{0}"'.format(etag)}
+
+        def on_error_response(response):
+            if response.status_code == 304:
+                return {"output": "ok", "builds": None, "etag": etag,
+                        "retry_after": int(response.headers.get("Retry-After", 0))}
+            try:
+                raise CoprRequestException(json.loads(response.text)["error"])
+            except (ValueError, KeyError):
+                raise CoprUnknownResponseException(
+                    "Unknown response from the server. Code: {}, raw response:"
+                    " \n {}".format(response.status_code, response.text))
+
+        data = self._fetch(url, headers=headers,
+                           on_error_response=on_error_response)
+        if data.get("builds") is not None:
+            # json object keys are always strings
+            data["builds"] = dict((int(build_id), status)
+                                  for build_id, status in data["builds"].items())
+
+        return CoprResponse(
+            client=self,
+            method="get_build_statuses",
+            data=data,
+            parsers=[
+                CommonMsgErrorOutParser,
+                fabric_simple_fields_parser(["builds", "etag", "retry_after"],
+                                            "BuildStatusesParser"),
+            ]
+        )
+
     def cancel_build(self, build_id, projectname=None, username=None):
         """ Cancels build.
             Auth required.
@@ -303,7 +391,7 @@ class CoprClient(UnicodeMixin):
 
     def create_new_build(self, projectname, pkgs, username=None,
                          timeout=None, memory=None, chroots=None,
-                         progress_callback=None):
+                         progress_callback=None, force_rebuild=False):
         """ Creates new build
 
             :param projectname: name of Copr project (without user namespace)
@@ -314,6 +402,8 @@ class CoprClient(UnicodeMixin):
             :param chroots: [optional] build only with given chroots
             :param progress_callback: [optional] a function that received a
             MultipartEncoderMonitor instance for each chunck of uploaded data
+            :param force_rebuild: [optional] build the packages again even when
+                results of an identical build could be reused
 
             :return: :py:class:`~.responses.CoprResponse` with additional fields:
 
@@ -344,6 +434,9 @@ class CoprClient(UnicodeMixin):
         for chroot in chroots or []:
             data[chroot] = "y"
 
+        if force_rebuild:
+            data["force_rebuild"] = "y"
+
         m = MultipartEncoder(data)
 
         callback = progress_callback or (lambda x: x)
@@ -371,6 +464,35 @@ class CoprClient(UnicodeMixin):
 
         return response
 
+    def create_new_builds(self, projectname, pkgs, workers=None, **kwargs):
+        """ Creates one build for each package, the builds are submitted
+            (and local packages uploaded) concurrently.
+
+            :param projectname: name of Copr project (without user namespace)
+            :param pkgs: list of package urls or paths to local packages
+            :param workers: [optional] max number of concurrent requests,
+                default is the connection pool size
+            :param kwargs: other arguments of :py:meth:`create_new_build`
+
+            :return: list of :py:class:`~.responses.CoprResponse` as returned
+                by :py:meth:`create_new_build`, in the order of `pkgs`
+        """
+        return map_concurrently(
+            lambda pkg: self.create_new_build(projectname, [pkg], **kwargs),
+            pkgs, workers or self.pool_size)
+
+    def download_results(self, targets, workers=None):
+        """ Downloads build results from the backend, up to `workers` files at once.
+
+            :param targets: list of pairs (url of results directory,
+                local destination directory), subdirectories are downloaded too
+            :param workers: [optional] max number of concurrent downloads,
+                default is the connection pool size
+
+            :return: list of paths to the downloaded files
+        """
+        return download_directories(self.session, targets, workers or self.pool_size)
+
     def get_project_details(self, projectname, username=None):
         """ Returns project details
 
@@ -240,9 +240,15 @@ class CoprClient(UnicodeMixin, HandlersProvider):
         self._project_chroots = ProjectChrootHandle(
             weakref.proxy(self), self.nc, root_url=self.root_url)
 
+        # older servers don't support chunked uploads
+        uploads_href = None
+        if u"uploads" in self.root._links:
+            uploads_href = self.root.get_href_by_name(u"uploads")
+
         self._builds = BuildHandle(
             weakref.proxy(self), self.nc, root_url=self.root_url,
-            builds_href=self.root.get_href_by_name(u"builds"),)
+            builds_href=self.root.get_href_by_name(u"builds"),
+            uploads_href=uploads_href,)
 
         self._build_tasks = BuildTaskHandle(
             weakref.proxy(self), self.nc, root_url=self.root_url,
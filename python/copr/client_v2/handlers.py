@@ -1,14 +1,23 @@
 # coding: utf-8
 from abc import abstractmethod, ABCMeta
+import hashlib
 import json
+from logging import getLogger
 import os
 
-from copr.client_v2.net_client import RequestError, MultiPartTuple
+from copr.client_v2.net_client import RequestError, AuthError, MultiPartTuple
 from copr.client_v2.schemas import ProjectCreateSchema
 from .entities import ProjectChrootEntity, ProjectEntity, ProjectCreateEntity
+from .paging import iterate_collection, DEFAULT_PAGE_SIZE
 from .resources import Project, OperationResult, ProjectList, ProjectChroot, ProjectChrootList, Build, BuildList, \
     MockChroot, MockChrootList, BuildTask, BuildTaskList
 
+log = getLogger(__name__)
+
+# chunked srpm upload, see BuildHandle.upload_srpm
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNK_ATTEMPTS = 5
+
 
 class AbstractHandle(object):
     """
@@ -29,10 +38,11 @@ class AbstractHandle(object):
 
 
 class BuildHandle(AbstractHandle):
-    def __init__(self, client, nc, root_url, builds_href):
+    def __init__(self, client, nc, root_url, builds_href, uploads_href=None):
         super(BuildHandle, self).__init__(client, nc, root_url)
         self.builds_href = builds_href
         self._base_url = "{}{}".format(self.root_url, builds_href)
+        self.uploads_href = uploads_href
 
     def get_base_url(self):
         return self._base_url
@@ -54,13 +64,18 @@ class BuildHandle(AbstractHandle):
             options=options,
         )
 
-    def get_list(self, project_id=None, owner=None, limit=None, offset=None):
+    def get_list(self, project_id=None, owner=None, limit=None, offset=None,
+                 before_id=None, fields=None):
         """ Retrieves builds object according to the given parameters
 
         :param owner: name of the project owner
         :param project_id: id of the project
         :param limit: limit number of builds
         :param offset: number of builds to skip
+        :param int before_id: get only builds with lower id, builds are sorted
+            by id descending so the id of the last build gives the next page
+        :param fields: names of the build fields to retrieve, other fields are None
+        :type fields: list of str
 
         :rtype: :py:class:`~.resources.BuildList`
         """
@@ -68,12 +83,35 @@ class BuildHandle(AbstractHandle):
             "project_id": project_id,
             "owner": owner,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "before_id": before_id,
+            "fields": fields,
         }
+        query_params = dict(options, fields=",".join(fields) if fields else None)
 
-        response = self.nc.request(self.get_base_url(), query_params=options)
+        response = self.nc.request(self.get_base_url(), query_params=query_params)
         return BuildList.from_response(self, response, options)
 
+    def iter_list(self, project_id=None, owner=None, fields=None,
+                  page_size=DEFAULT_PAGE_SIZE, prefetch=1):
+        """ Iterates over all builds matching the given parameters,
+        pages are retrieved lazily using ``before_id`` cursor
+
+        :param owner: name of the project owner
+        :param project_id: id of the project
+        :param fields: see :py:meth:`.get_list`
+        :param int page_size: number of builds retrieved in one request, max 100
+        :param int prefetch: retrieve the next page in background, 0 disables
+
+        :rtype: Iterable[:py:class:`~.resources.Build`]
+        """
+        def get_page(**params):
+            return self.get_list(project_id=project_id, owner=owner,
+                                 fields=fields, **params)
+
+        return iterate_collection(get_page, page_size=page_size,
+                                  cursor="before_id", prefetch=prefetch)
+
     def cancel(self, build_entity):
         """ Cancels the given build
 
@@ -148,7 +186,7 @@ class BuildHandle(AbstractHandle):
 
     def create_from_file(self, project_id, file_path=None,
                          file_obj=None, file_name=None,
-                         chroots=None, enable_net=True):
+                         chroots=None, enable_net=True, chunk_size=None):
         """
         Creates new build using srpm upload, please specify
         either ``file_path`` or (``file_obj``, ``file_name``    ).
@@ -163,9 +201,17 @@ class BuildHandle(AbstractHandle):
         :param list chroots: which chroots should be used during the build
         :param bool enable_net: allows to disable network access during the build, default: True
 
+        :param int chunk_size: upload ``file_path`` in chunks of this size using
+            :py:meth:`.upload_srpm`, which survives network failures,
+            by default the file is sent in one request
+
         :return: created build
         :rtype: :py:class:`~.resources.Build`
         """
+        if chunk_size and file_path is not None:
+            upload_id = self.upload_srpm(file_path, chunk_size=chunk_size)
+            return self.create_from_upload(project_id, upload_id,
+                                           chroots=chroots, enable_net=enable_net)
 
         chroots = map(str, chroots or list())
         content = {
@@ -201,6 +247,96 @@ class BuildHandle(AbstractHandle):
         )
         return parts, response
 
+    def get_uploads_url(self):
+        if self.uploads_href is None:
+            raise RequestError("Server doesn't support chunked uploads",
+                               self.get_base_url())
+        return "{}{}".format(self.root_url, self.uploads_href)
+
+    def upload_srpm(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE, upload_id=None):
+        """ Uploads srpm file in chunks, the upload continues from the last
+        received chunk after a failure.
+
+        :param str file_path: path to the srpm file
+        :param int chunk_size: size of the chunk sent in one request
+        :param str upload_id: continue the upload interrupted before, e.g.
+            by the end of the program
+
+        :return: upload id to be used with :py:meth:`.create_from_upload`
+        :rtype: str
+        :raises RequestError: when the upload fails ``CHUNK_ATTEMPTS`` times in a row
+        """
+        size = os.path.getsize(file_path)
+        offset = None
+        if upload_id is None:
+            response = self.nc.request(
+                self.get_uploads_url(), method="POST", do_auth=True,
+                data=json.dumps({"file_name": os.path.basename(file_path), "size": size}),
+            )
+            upload_id = response.json["upload"]["id"]
+            offset = 0
+
+        url = "{}/{}".format(self.get_uploads_url(), upload_id)
+        failures = 0
+        with open(file_path, "rb") as f_obj:
+            while True:
+                try:
+                    if offset is None:
+                        offset = self.nc.request(url, do_auth=True).json["upload"]["offset"]
+                    if offset >= size:
+                        return upload_id
+
+                    f_obj.seek(offset)
+                    chunk = f_obj.read(chunk_size)
+                    query_params = {
+                        "offset": offset,
+                        "sha256": hashlib.sha256(chunk).hexdigest(),
+                    }
+                    response = self.nc.request(
+                        url, method="PUT", do_auth=True, data=chunk,
+                        query_params=query_params,
+                        headers={"content-type": "application/octet-stream"},
+                    )
+                    offset = response.json["upload"]["offset"]
+                    failures = 0
+
+                except AuthError:
+                    raise
+                except RequestError as err:
+                    failures += 1
+                    if failures >= CHUNK_ATTEMPTS:
+                        raise
+                    log.warning("Failed to upload chunk of {} at {}, retrying: {}"
+                                .format(file_path, offset, err))
+                    # ask the server how much was received
+                    offset = None
+
+    def create_from_upload(self, project_id, upload_id, chroots=None, enable_net=True):
+        """
+        Creates new build from the srpm uploaded by :py:meth:`.upload_srpm`
+
+        :param int project_id: id of the project where we want to submit new build
+        :param str upload_id: id of the completed upload
+        :param list chroots: which chroots should be used during the build
+        :param bool enable_net: allows to disable network access during the build, default: True
+
+        :return: created build
+        :rtype: :py:class:`~.resources.Build`
+        """
+        content = {
+            "project_id": int(project_id),
+            "upload_id": str(upload_id),
+            "chroots": list(map(str, chroots or list())),
+            "enable_net": bool(enable_net)
+        }
+        data = json.dumps(content)
+        response = self.nc.request(
+            self.get_base_url(),
+            data=data, method="POST", do_auth=True,
+        )
+
+        return self._process_create_response(data, response)
+
     def get_build_tasks_handle(self):
         """
         :rtype: BuildTasksHandle
@@ -247,6 +383,26 @@ class BuildTaskHandle(AbstractHandle):
         response = self.nc.request(self.get_base_url(), query_params=options)
         return BuildTaskList.from_response(self, response, options)
 
+    def iter_list(self, owner=None, project_id=None, build_id=None, state=None,
+                  page_size=DEFAULT_PAGE_SIZE, prefetch=1):
+        """ Iterates over all build tasks matching the given parameters,
+        pages are retrieved lazily
+
+        :param str owner: see :py:meth:`.get_list`
+        :param int project_id: see :py:meth:`.get_list`
+        :param int build_id: see :py:meth:`.get_list`
+        :param str state: see :py:meth:`.get_list`
+        :param int page_size: number of build tasks retrieved in one request, max 100
+        :param int prefetch: number of pages retrieved ahead in background, 0 disables
+
+        :rtype: Iterable[:py:class:`~.resources.BuildTask`]
+        """
+        def get_page(**params):
+            return self.get_list(owner=owner, project_id=project_id,
+                                 build_id=build_id, state=state, **params)
+
+        return iterate_collection(get_page, page_size=page_size, prefetch=prefetch)
+
     def get_one(self, build_id, chroot_name):
         """ Retrieves single build task object
 
@@ -297,6 +453,25 @@ class ProjectHandle(AbstractHandle):
         response = self.nc.request(self.get_base_url(), query_params=options)
         return ProjectList.from_response(self, response, options)
 
+    def iter_list(self, search_query=None, owner=None, name=None,
+                  page_size=DEFAULT_PAGE_SIZE, prefetch=1):
+        """ Iterates over all projects matching the given parameters,
+        pages are retrieved lazily
+
+        :param str search_query: search projects with such string
+        :param str owner: owner username
+        :param str name: project name
+        :param int page_size: number of projects retrieved in one request, max 100
+        :param int prefetch: number of pages retrieved ahead in background, 0 disables
+
+        :rtype: Iterable[:py:class:`~.resources.Project`]
+        """
+        def get_page(**params):
+            return self.get_list(search_query=search_query, owner=owner,
+                                 name=name, **params)
+
+        return iterate_collection(get_page, page_size=page_size, prefetch=prefetch)
+
     def get_one(self, project_id):
         # todo: implement: , show_builds=False, show_chroots=False):
         """ Retrieves project object.
@@ -5,10 +5,11 @@ import json
 
 from logging import getLogger
 
-from requests import request, ConnectionError
+from requests import RequestException
 from requests_toolbelt.multipart.encoder import MultipartEncoder
 
 from ..util import UnicodeMixin
+from ..session import make_session, DEFAULT_RETRIES, DEFAULT_POOL_SIZE
 
 log = getLogger(__name__)
 
@@ -97,11 +98,15 @@ class NetClient(object):
 
     :param str login: login for BasicAuth
     :param str password: password for BasicAuth
+    :param int retries: how many times to retry failed idempotent requests
+    :param int pool_size: connections kept alive to the server
     """
 
-    def __init__(self, login=None, password=None):
+    def __init__(self, login=None, password=None,
+                 retries=DEFAULT_RETRIES, pool_size=DEFAULT_POOL_SIZE):
         self.login = login
         self.token = password
+        self.session = make_session(retries=retries, pool_size=pool_size)
 
     def request_multipart(self, url, method=None, query_params=None,
                           data_parts=None, do_auth=False):
@@ -152,14 +157,14 @@ class NetClient(object):
                 headers["content-type"] = "application/json"
 
         try:
-            response = request(
+            response = self.session.request(
                 method=method.upper(),
                 url=url,
                 headers=headers,
                 **kwargs
             )
             log.debug("raw response: {0}".format(response.text))
-        except ConnectionError as e:
+        except RequestException as e:
             raise NetworkError(url, kwargs, e)
 
         if response.status_code == 403:
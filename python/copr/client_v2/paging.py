@@ -0,0 +1,82 @@
+# coding: utf-8
+"""
+Lazy iteration over all pages of the collection resources
+"""
+
+from collections import deque
+from multiprocessing.pool import ThreadPool
+
+DEFAULT_PAGE_SIZE = 100
+
+# server returns at most this number of individuals in one page, no matter
+# the requested limit
+MAX_PAGE_SIZE = 100
+
+
+class _Deferred(object):
+    """ Mimics AsyncResult, the page is fetched when requested by get() """
+    def __init__(self, get_page, params):
+        self.get_page = get_page
+        self.params = params
+
+    def get(self):
+        return self.get_page(**self.params)
+
+
+def iterate_collection(get_page, page_size=DEFAULT_PAGE_SIZE, cursor=None, prefetch=1):
+    """
+    Yields individuals of all pages of the collection. Only the page being
+    consumed and the prefetched pages are kept in memory, so the whole
+    collection can be traversed regardless of its size.
+
+    :param get_page: callable(limit, offset, **cursor_param) returning
+        :py:class:`~.resources.CollectionResource`, usually bound `get_list` of a handle
+    :param int page_size: number of individuals requested in one request,
+        at most :py:data:`MAX_PAGE_SIZE`
+    :param str cursor: name of the keyset query parameter, next page is then
+        requested with ``cursor=<id of the last individual>`` instead of an offset,
+        which is stable when new individuals are added and cheap for the database
+    :param int prefetch: how many pages are fetched ahead in background threads while
+        the current page is consumed, 0 fetches pages only when needed.
+        With a keyset cursor the next page can't be requested before the current
+        one arrives, so at most one page is prefetched.
+
+    :rtype: Iterable[IndividualResource]
+    """
+    # a shorter page than requested means the end of the collection
+    page_size = min(page_size, MAX_PAGE_SIZE)
+    pool = ThreadPool(1 if cursor else prefetch) if prefetch > 0 else None
+
+    def request(**params):
+        params["limit"] = page_size
+        if pool is None:
+            return _Deferred(get_page, params)
+        return pool.apply_async(get_page, kwds=params)
+
+    pending = deque()
+    offset = 0
+    if cursor:
+        pending.append(request())
+    else:
+        for _ in range(max(prefetch, 0) + 1):
+            pending.append(request(offset=offset))
+            offset += page_size
+
+    try:
+        while pending:
+            individuals = list(pending.popleft().get())
+            last_page = len(individuals) < page_size
+            if last_page:
+                # prefetched pages are beyond the end of the collection
+                pending.clear()
+            elif cursor:
+                pending.append(request(**{cursor: individuals[-1].id}))
+            else:
+                pending.append(request(offset=offset))
+                offset += page_size
+
+            for individual in individuals:
+                yield individual
+    finally:
+        if pool is not None:
+            pool.terminate()
@@ -439,8 +439,14 @@ class CollectionResource(Iterable, UnicodeMixin):
         return self._links[name].href
 
     def next_page(self):
-        limit = self._options.get("limit", 100)
-        offset = self._options.get("offset", 0)
+        """ Retrieves the following page of the collection
+
+        To traverse the whole collection use `iter_list` of the handle instead.
+
+        :rtype: :py:class:`.CollectionResource`
+        """
+        limit = self._options.get("limit") or 100
+        offset = self._options.get("offset") or 0
 
         offset += limit
         params = {}
@@ -448,7 +454,7 @@ class CollectionResource(Iterable, UnicodeMixin):
         params["limit"] = limit
         params["offset"] = offset
 
-        return self._handle.get_list(self, **params)
+        return self._handle.get_list(**params)
 
     def __iter__(self):
         """
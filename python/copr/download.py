@@ -0,0 +1,90 @@
+# coding: utf-8
+"""
+Parallel download of build results from the backend directory listings
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+import errno
+import os
+import re
+import sys
+
+if sys.version_info[0] == 2:
+    from urlparse import urljoin
+    from urllib import unquote
+else:
+    from urllib.parse import urljoin, unquote
+
+from .session import map_concurrently, DEFAULT_POOL_SIZE
+
+HREF_RE = re.compile(r'href="([^"]+)"', re.IGNORECASE)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def list_files(session, url):
+    """
+    Lists files in the directory `url` and its subdirectories,
+    parent directory, sorting links and absolute links are skipped.
+
+    :param requests.Session session:
+    :param str url: directory url ending with slash
+    :return list: paths relative to `url`
+    """
+    response = session.get(url)
+    response.raise_for_status()
+
+    files = []
+    for href in sorted(set(HREF_RE.findall(response.text))):
+        if href.startswith(("/", "?", "#", ".")) or "://" in href:
+            continue
+        if href.endswith("/"):
+            files.extend(href + path for path in list_files(session, urljoin(url, href)))
+        else:
+            files.append(href)
+    return files
+
+
+def download_file(session, url, path):
+    """
+    Streams `url` into file `path`, creates the parent directories when needed
+    """
+    dir_name = os.path.dirname(path)
+    try:
+        os.makedirs(dir_name)
+    except OSError as error:
+        if error.errno != errno.EEXIST:
+            raise
+
+    response = session.get(url, stream=True)
+    response.raise_for_status()
+    with open(path, "wb") as handle:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            handle.write(chunk)
+    return path
+
+
+def download_directories(session, targets, workers=DEFAULT_POOL_SIZE):
+    """
+    Downloads content of the remote directories with up to `workers`
+    files transferred at once.
+
+    :param requests.Session session:
+    :param targets: list of pairs (directory url, local destination directory)
+    :return list: paths of the downloaded files
+    """
+    listings = map_concurrently(lambda target: list_files(session, target[0]),
+                                targets, workers)
+    files = []
+    for (url, dest), relative_paths in zip(targets, listings):
+        for relative_path in relative_paths:
+            parts = unquote(relative_path).split("/")
+            if ".." in parts:
+                continue
+            files.append((urljoin(url, relative_path), os.path.join(dest, *parts)))
+
+    return map_concurrently(lambda args: download_file(session, *args), files, workers)
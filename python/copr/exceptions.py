@@ -44,3 +44,9 @@ class CoprUnknownResponseException(CoprException):
     It usually means that something is broken.
     """
     pass
+
+
+class RpmHeaderError(CoprException):
+    """ Exception thrown when a file isn't a valid RPM package.
+    """
+    pass
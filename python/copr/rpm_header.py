@@ -0,0 +1,296 @@
+# coding: utf-8
+"""
+Reads metadata of local RPM files without the rpm library or subprocesses
+
+Only the lead, the signature header and the main header are read,
+the payload is never touched, so reading is cheap even for big packages.
+Signatures and digests are *not* verified.
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+import re
+import struct
+
+from .exceptions import RpmHeaderError
+
+LEAD_MAGIC = b"\xed\xab\xee\xdb"
+LEAD_SIZE = 96
+HEADER_MAGIC = b"\x8e\xad\xe8\x01"
+# same limits as rpm uses, protects against crafted files
+HEADER_TAGS_MAX = 0xffff
+HEADER_DATA_MAX = 0x0fffffff
+
+RPMSIGTAG_DSA = 267
+RPMSIGTAG_RSA = 268
+RPMSIGTAG_PGP = 1002
+RPMSIGTAG_GPG = 1005
+SIGNATURE_TAGS = [RPMSIGTAG_DSA, RPMSIGTAG_RSA, RPMSIGTAG_PGP, RPMSIGTAG_GPG]
+
+RPMTAG_NAME = 1000
+RPMTAG_VERSION = 1001
+RPMTAG_RELEASE = 1002
+RPMTAG_EPOCH = 1003
+RPMTAG_ARCH = 1022
+RPMTAG_SOURCERPM = 1044
+RPMTAG_PROVIDENAME = 1047
+RPMTAG_SOURCEPACKAGE = 1106
+RPMTAG_PROVIDEFLAGS = 1112
+RPMTAG_PROVIDEVERSION = 1113
+
+TYPE_CHAR = 1
+TYPE_INT8 = 2
+TYPE_INT16 = 3
+TYPE_INT32 = 4
+TYPE_INT64 = 5
+TYPE_STRING = 6
+TYPE_BIN = 7
+TYPE_STRING_ARRAY = 8
+TYPE_I18NSTRING = 9
+
+INT_FORMATS = {
+    TYPE_CHAR: "B",
+    TYPE_INT8: "B",
+    TYPE_INT16: ">H",
+    TYPE_INT32: ">I",
+    TYPE_INT64: ">Q",
+}
+
+SENSE_LESS = 0x02
+SENSE_GREATER = 0x04
+SENSE_EQUAL = 0x08
+
+
+def _read_exactly(handle, size):
+    data = handle.read(size)
+    if len(data) != size:
+        raise RpmHeaderError("Unexpected end of file")
+    return data
+
+
+def _read_header_structure(handle):
+    """
+    :return tuple: (index entries, data store) of the header at the current position
+    """
+    intro = _read_exactly(handle, 16)
+    if intro[:4] != HEADER_MAGIC:
+        raise RpmHeaderError("Bad header magic")
+
+    tags_count, data_size = struct.unpack(">II", intro[8:])
+    if tags_count > HEADER_TAGS_MAX or data_size > HEADER_DATA_MAX:
+        raise RpmHeaderError("Header is too big")
+
+    index = _read_exactly(handle, tags_count * 16)
+    entries = [struct.unpack(">iIiI", index[i:i + 16])
+               for i in range(0, len(index), 16)]
+    return entries, _read_exactly(handle, data_size)
+
+
+def _decode(value):
+    return value.decode("utf-8", "replace")
+
+
+def _parse_value(tag_type, offset, count, store):
+    if offset < 0 or offset > len(store):
+        raise RpmHeaderError("Tag data out of bounds")
+
+    if tag_type in INT_FORMATS:
+        item_format = INT_FORMATS[tag_type]
+        size = struct.calcsize(item_format)
+        if offset + size * count > len(store):
+            raise RpmHeaderError("Tag data out of bounds")
+        return [struct.unpack_from(item_format, store, offset + size * i)[0]
+                for i in range(count)]
+
+    if tag_type == TYPE_BIN:
+        if offset + count > len(store):
+            raise RpmHeaderError("Tag data out of bounds")
+        return store[offset:offset + count]
+
+    if tag_type in [TYPE_STRING, TYPE_STRING_ARRAY, TYPE_I18NSTRING]:
+        values = []
+        for _ in range(count):
+            end = store.find(b"\0", offset)
+            if end < 0:
+                raise RpmHeaderError("Unterminated string")
+            values.append(_decode(store[offset:end]))
+            offset = end + 1
+        return values[0] if tag_type == TYPE_STRING else values
+
+    # unknown types are skipped, like rpm does for tags it doesn't know
+    return None
+
+
+class RpmHeader(object):
+    """
+    Tags of the main header of an RPM file
+
+    :ivar dict tags: tag number -> value, integer and string array values
+        are lists, string values are strings, binary values are bytes
+    :ivar dict signature: tags of the signature header, in the same format
+    """
+    def __init__(self, tags, signature=None):
+        self.tags = tags
+        self.signature = signature or {}
+
+    def _get_string(self, tag):
+        value = self.tags.get(tag)
+        if isinstance(value, list):
+            # i18n strings are arrays, the first one is the C locale
+            return value[0] if value else None
+        return value
+
+    @property
+    def name(self):
+        return self._get_string(RPMTAG_NAME)
+
+    @property
+    def epoch(self):
+        """
+        :return int: epoch or None when the package doesn't set it
+        """
+        value = self.tags.get(RPMTAG_EPOCH)
+        return value[0] if value else None
+
+    @property
+    def version(self):
+        return self._get_string(RPMTAG_VERSION)
+
+    @property
+    def release(self):
+        return self._get_string(RPMTAG_RELEASE)
+
+    @property
+    def arch(self):
+        """
+        :return str: ``src`` for source packages, build arch otherwise
+        """
+        if self.is_source:
+            return "src"
+        return self._get_string(RPMTAG_ARCH)
+
+    @property
+    def is_source(self):
+        return RPMTAG_SOURCEPACKAGE in self.tags or RPMTAG_SOURCERPM not in self.tags
+
+    @property
+    def is_signed(self):
+        """
+        :return bool: True when the package has a PGP signature, not verified
+        """
+        return any(tag in self.signature for tag in SIGNATURE_TAGS)
+
+    @property
+    def evr(self):
+        """
+        :return str: ``[epoch:]version-release``
+        """
+        if self.epoch is None:
+            return "{}-{}".format(self.version, self.release)
+        return "{}:{}-{}".format(self.epoch, self.version, self.release)
+
+    @property
+    def provides(self):
+        """
+        :return list: of (name, flags, version) tuples
+        """
+        names = self.tags.get(RPMTAG_PROVIDENAME) or []
+        flags = self.tags.get(RPMTAG_PROVIDEFLAGS) or [0] * len(names)
+        versions = self.tags.get(RPMTAG_PROVIDEVERSION) or [""] * len(names)
+        return list(zip(names, flags, versions))
+
+
+def read_header(path):
+    """
+    :param str path: to the rpm or src.rpm file
+    :rtype: RpmHeader
+    :raises RpmHeaderError: when the file isn't a valid RPM package
+    :raises IOError: when the file can't be read
+    """
+    with open(path, "rb") as handle:
+        lead = _read_exactly(handle, LEAD_SIZE)
+        if lead[:4] != LEAD_MAGIC:
+            raise RpmHeaderError("{} is not an RPM package".format(path))
+
+        signature_entries, signature_store = _read_header_structure(handle)
+        # the signature header is padded to 8 bytes
+        handle.read((8 - len(signature_store) % 8) % 8)
+
+        entries, store = _read_header_structure(handle)
+
+    return RpmHeader(_parse_tags(entries, store),
+                     _parse_tags(signature_entries, signature_store))
+
+
+def _parse_tags(entries, store):
+    tags = {}
+    for tag, tag_type, offset, count in entries:
+        value = _parse_value(tag_type, offset, count, store)
+        if value is not None:
+            tags[tag] = value
+    return tags
+
+
+_SEGMENT_RE = re.compile(r"(\d+|[a-zA-Z]+|~|\^)")
+
+
+def rpmvercmp(first, second):
+    """
+    Compares two version or release strings the same way rpm does
+
+    :return int: -1, 0 or 1
+    """
+    if first == second:
+        return 0
+
+    first_segments = _SEGMENT_RE.findall(first)
+    second_segments = _SEGMENT_RE.findall(second)
+    while first_segments or second_segments:
+        one = first_segments.pop(0) if first_segments else None
+        two = second_segments.pop(0) if second_segments else None
+
+        # tilde sorts before anything, even the end of the string
+        if one == "~" or two == "~":
+            if one != two:
+                return -1 if one == "~" else 1
+            continue
+        # caret sorts after the end of the string but before anything else
+        if one == "^" or two == "^":
+            if one is None:
+                return -1
+            if two is None:
+                return 1
+            if one != two:
+                return -1 if one == "^" else 1
+            continue
+
+        if one is None or two is None:
+            return -1 if one is None else 1
+
+        if one.isdigit() != two.isdigit():
+            # numeric segments are newer than alphabetic ones
+            return 1 if one.isdigit() else -1
+        if one.isdigit():
+            one, two = int(one), int(two)
+        if one != two:
+            return -1 if one < two else 1
+    return 0
+
+
+def label_compare(first, second):
+    """
+    Compares (epoch, version, release) tuples, missing epoch is 0
+
+    :return int: -1, 0 or 1
+    """
+    first_epoch, second_epoch = int(first[0] or 0), int(second[0] or 0)
+    if first_epoch != second_epoch:
+        return -1 if first_epoch < second_epoch else 1
+    for one, two in zip(first[1:], second[1:]):
+        result = rpmvercmp(one or "", two or "")
+        if result:
+            return result
+    return 0
@@ -0,0 +1,67 @@
+# coding: utf-8
+"""
+HTTP session shared by the copr clients and helpers to run requests concurrently
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import division
+from __future__ import absolute_import
+
+from multiprocessing.pool import ThreadPool
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_POOL_SIZE = 10
+
+# gateway errors seen while the frontend restarts
+RETRY_STATUSES = (502, 503, 504)
+
+
+def make_session(retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                 pool_size=DEFAULT_POOL_SIZE):
+    """
+    Creates session which keeps up to `pool_size` connections to each host
+    alive and retries failed requests with exponential backoff.
+    Only idempotent requests are retried, POST never is.
+
+    :param int retries: how many times to retry a request, 0 disables retries
+    :param float backoff_factor: sleep between retries is
+        backoff_factor * 2 ** (retry number - 1) seconds
+    :param int pool_size: max number of connections kept to one host,
+        should be at least the number of threads using the session
+
+    :rtype: requests.Session
+    """
+    retry = Retry(total=retries, connect=retries, read=retries,
+                  backoff_factor=backoff_factor,
+                  status_forcelist=RETRY_STATUSES)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def map_concurrently(func, items, workers=DEFAULT_POOL_SIZE):
+    """
+    Calls `func` for each of `items` in up to `workers` threads.
+
+    :return list: results in the order of `items`
+    :raises: the first exception raised by `func`
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    pool = ThreadPool(min(workers, len(items)))
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.terminate()
@@ -1,7 +1,10 @@
 # coding: utf-8
 import six
+import hashlib
 import json
-from copr.client_v2.net_client import ResponseWrapper
+import os
+import tempfile
+from copr.client_v2.net_client import ResponseWrapper, NetworkError
 
 if six.PY3:
     from unittest.mock import MagicMock
@@ -10,7 +13,7 @@ else:
 
 import pytest
 
-from copr.client_v2.handlers import ProjectHandle
+from copr.client_v2.handlers import ProjectHandle, BuildHandle
 
 
 class TestHandleBase(object):
@@ -211,3 +214,67 @@ class TestProjectHandle(TestHandleBase):
 
         assert ca[1]["method"] == "delete"
         assert ca[0][0] == self.root_url + "/api_2/projects/{}".format(self.project_1_id)
+
+
+class TestBuildHandleUpload(TestHandleBase):
+    content = b"0123456789" * 5
+
+    def setup_method(self, method):
+        super(TestBuildHandleUpload, self).setup_method(method)
+        handle, self.srpm_path = tempfile.mkstemp(suffix=".src.rpm")
+        with os.fdopen(handle, "wb") as f_obj:
+            f_obj.write(self.content)
+
+    def teardown_method(self, method):
+        os.remove(self.srpm_path)
+
+    @pytest.fixture
+    def build_handle(self):
+        return BuildHandle(self.client, self.nc, self.root_url,
+                           self.get_href("builds"), uploads_href="/api_2/uploads")
+
+    def upload_response(self, offset):
+        return self.make_response(json.dumps({
+            "upload": {"id": "abc", "file_name": "foo.src.rpm",
+                       "size": len(self.content), "offset": offset},
+            "_links": {"self": {"href": "/api_2/uploads/abc"}},
+        }))
+
+    def put_calls(self):
+        return [ca for ca in self.nc.request.call_args_list
+                if ca[1].get("method") == "PUT"]
+
+    def test_upload_srpm(self, build_handle):
+        self.nc.request.side_effect = [self.upload_response(offset)
+                                       for offset in [0, 20, 40, 50]]
+
+        assert build_handle.upload_srpm(self.srpm_path, chunk_size=20) == "abc"
+
+        create_ca = self.nc.request.call_args_list[0]
+        assert json.loads(create_ca[1]["data"])["size"] == len(self.content)
+
+        puts = self.put_calls()
+        assert [ca[1]["query_params"]["offset"] for ca in puts] == [0, 20, 40]
+        for ca in puts:
+            assert ca[0][0] == self.root_url + "/api_2/uploads/abc"
+            assert ca[1]["query_params"]["sha256"] == hashlib.sha256(ca[1]["data"]).hexdigest()
+        assert b"".join(ca[1]["data"] for ca in puts) == self.content
+
+    def test_upload_srpm_resumes_after_failure(self, build_handle):
+        self.nc.request.side_effect = [
+            self.upload_response(20),  # GET of the resumed upload
+            NetworkError("url", {}, IOError()),  # PUT at 20
+            self.upload_response(30),  # GET, the chunk was partially received
+            self.upload_response(50),  # PUT at 30
+        ]
+
+        assert build_handle.upload_srpm(self.srpm_path, chunk_size=20, upload_id="abc") == "abc"
+        puts = self.put_calls()
+        assert [ca[1]["query_params"]["offset"] for ca in puts] == [20, 30]
+        assert puts[1][1]["data"] == self.content[30:]
+
+    def test_upload_srpm_gives_up(self, build_handle):
+        self.nc.request.side_effect = NetworkError("url", {}, IOError())
+
+        with pytest.raises(NetworkError):
+            build_handle.upload_srpm(self.srpm_path, upload_id="abc")
@@ -16,7 +16,7 @@ from copr.client_v2.net_client import NetClient, RequestError
 
 @pytest.yield_fixture
 def mc_request():
-    with mock.patch('copr.client_v2.net_client.request') as handle:
+    with mock.patch('requests.Session.request') as handle:
         yield handle
 
 
@@ -0,0 +1,78 @@
+# coding: utf-8
+from collections import namedtuple
+
+import pytest
+
+from copr.client_v2.paging import iterate_collection
+
+
+Item = namedtuple("Item", ["id"])
+
+
+class FakeCollection(object):
+    """ Collection of items with ids 100..1 sorted by id descending """
+    def __init__(self, total=100, max_limit=None):
+        self.ids = list(range(total, 0, -1))
+        self.max_limit = max_limit
+        self.calls = []
+
+    def get_page(self, limit, offset=None, before_id=None):
+        self.calls.append(dict(limit=limit, offset=offset, before_id=before_id))
+        if self.max_limit:
+            limit = min(limit, self.max_limit)
+        ids = self.ids
+        if before_id is not None:
+            ids = [id_ for id_ in ids if id_ < before_id]
+        offset = offset or 0
+        return [Item(id_) for id_ in ids[offset:offset + limit]]
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_iterate_offset(prefetch):
+    collection = FakeCollection(total=25)
+    items = list(iterate_collection(collection.get_page, page_size=10, prefetch=prefetch))
+    assert [item.id for item in items] == collection.ids
+    # prefetched pages beyond the end are at most `prefetch`
+    assert 3 <= len(collection.calls) <= 3 + prefetch
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_iterate_cursor(prefetch):
+    collection = FakeCollection(total=20)
+    items = list(iterate_collection(collection.get_page, page_size=10,
+                                    cursor="before_id", prefetch=prefetch))
+    assert [item.id for item in items] == collection.ids
+    assert [call["before_id"] for call in collection.calls] == [None, 11, 1]
+    assert all(call["offset"] is None for call in collection.calls)
+
+
+@pytest.mark.parametrize("cursor", [None, "before_id"])
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_iterate_server_limit(cursor, prefetch):
+    # server returns at most 100 individuals regardless of the limit
+    collection = FakeCollection(total=1000, max_limit=100)
+    items = list(iterate_collection(collection.get_page, page_size=500,
+                                    cursor=cursor, prefetch=prefetch))
+    assert [item.id for item in items] == collection.ids
+    assert all(call["limit"] == 100 for call in collection.calls)
+
+
+def test_iterate_is_lazy():
+    collection = FakeCollection(total=100)
+    items = iterate_collection(collection.get_page, page_size=10, prefetch=0)
+    assert collection.calls == []
+    assert next(items).id == 100
+    assert len(collection.calls) == 1
+
+
+def test_iterate_empty():
+    collection = FakeCollection(total=0)
+    assert list(iterate_collection(collection.get_page, cursor="before_id")) == []
+
+
+def test_iterate_error():
+    def get_page(**kwargs):
+        raise IOError("boom")
+
+    with pytest.raises(IOError):
+        list(iterate_collection(get_page, prefetch=2))
@@ -1,9 +1,12 @@
 import os
 
 import mock
+import pytest
 from requests.models import Response
 
 from copr import CoprClient
+from copr.client.client import BUILD_STATUS_MAX_IDS
+from copr.exceptions import CoprRequestException
 
 path = os.path.abspath(__file__)
 dir_path = os.path.dirname(path)
@@ -47,7 +50,7 @@ def make_mock_response(filename, status_code=None):
     return response
 
 
-@mock.patch('requests.request')
+@mock.patch('requests.Session.request')
 def test_projects_list(mock_request):
     mock_client = CoprClient.create_from_file_config(config_location)
     mock_request.return_value = make_mock_response("projects_list.200.json")
@@ -59,7 +62,7 @@ def test_projects_list(mock_request):
     assert test_project.description == "Test description"
 
 
-@mock.patch('requests.request')
+@mock.patch('requests.Session.request')
 def test_get_build_status(mock_request):
     mock_client = CoprClient.create_from_file_config(config_location)
 
@@ -71,3 +74,50 @@ def test_get_build_status(mock_request):
     assert test_resp.project == "atomic-next"
     assert test_resp.built_pkgs == [u'golang-github-stretchr-objx-devel 0']
     assert test_resp.submitted_on == 1408031345
+
+
+@mock.patch('requests.Session.request')
+def test_get_build_statuses(mock_request):
+    mock_client = CoprClient.create_from_file_config(config_location)
+
+    response = Response()
+    response.status_code = 200
+    response._content = (b'{"output": "ok", "builds": {"1": "running", "2": "failed"},'
+                         b' "etag": "abc", "retry_after": 10}')
+    mock_request.return_value = response
+
+    test_resp = mock_client.get_build_statuses([1, 2])
+    assert test_resp.builds == {1: "running", 2: "failed"}
+    assert test_resp.etag == "abc"
+    assert test_resp.retry_after == 10
+
+    response = Response()
+    response.status_code = 304
+    response.headers["Retry-After"] = "20"
+    response._content = b''
+    mock_request.return_value = response
+
+    test_resp = mock_client.get_build_statuses([1, 2], etag="abc")
+    assert test_resp.builds is None
+    assert test_resp.etag == "abc"
+    assert test_resp.retry_after == 20
+    kwargs = mock_request.call_args[1]
+    assert kwargs["headers"] == {"If-None-Match": '"abc"'}
+    assert kwargs["auth"] is not None
+
+    mock_request.reset_mock()
+    with pytest.raises(CoprRequestException):
+        mock_client.get_build_statuses(range(BUILD_STATUS_MAX_IDS + 1))
+    assert not mock_request.called
+
+
+@mock.patch('requests.Session.request')
+def test_get_builds_details(mock_request):
+    mock_client = CoprClient.create_from_file_config(config_location)
+
+    mock_request.side_effect = lambda **kwargs: make_mock_response("build_details.200.json")
+
+    responses = mock_client.get_builds_details([1, 2, 3])
+    assert [response.handle.build_id for response in responses] == [1, 2, 3]
+    assert all(response.status == "succeeded" for response in responses)
+    assert mock_request.call_count == 3
@@ -0,0 +1,69 @@
+# coding: utf-8
+import os
+import shutil
+import tempfile
+
+import six
+
+if six.PY3:
+    from unittest.mock import MagicMock
+else:
+    from mock import MagicMock
+
+from copr.download import list_files, download_directories
+
+
+BASE_URL = "http://example.com/results/foo/bar/fedora-23-x86_64/00001-foo/"
+
+LISTINGS = {
+    BASE_URL: """
+        <a href="../">Parent Directory</a>
+        <a href="?C=M;O=A">Last Modified</a>
+        <a href="/results/">results</a>
+        <a href="foo-1.0-1.fc23.x86_64.rpm">foo-1.0-1.fc23.x86_64.rpm</a>
+        <a href="build.log.gz">build.log.gz</a>
+        <a href="repodata/">repodata/</a>
+        <a href="http://example.org/">elsewhere</a>
+    """,
+    BASE_URL + "repodata/": """
+        <a href="../">Parent Directory</a>
+        <a href="repomd.xml">repomd.xml</a>
+    """,
+}
+
+
+def make_session():
+    def get(url, stream=False):
+        response = MagicMock()
+        if url in LISTINGS:
+            response.text = LISTINGS[url]
+        else:
+            response.iter_content.return_value = [b"content of ", url.encode("utf-8")]
+        return response
+
+    session = MagicMock()
+    session.get.side_effect = get
+    return session
+
+
+def test_list_files():
+    assert list_files(make_session(), BASE_URL) == [
+        "build.log.gz",
+        "foo-1.0-1.fc23.x86_64.rpm",
+        "repodata/repomd.xml",
+    ]
+
+
+def test_download_directories():
+    dest = tempfile.mkdtemp()
+    try:
+        paths = download_directories(make_session(), [(BASE_URL, dest)], workers=2)
+        assert sorted(paths) == [
+            os.path.join(dest, "build.log.gz"),
+            os.path.join(dest, "foo-1.0-1.fc23.x86_64.rpm"),
+            os.path.join(dest, "repodata", "repomd.xml"),
+        ]
+        with open(os.path.join(dest, "repodata", "repomd.xml"), "rb") as handle:
+            assert handle.read() == b"content of " + (BASE_URL + "repodata/repomd.xml").encode("utf-8")
+    finally:
+        shutil.rmtree(dest)
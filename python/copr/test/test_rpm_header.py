@@ -0,0 +1,158 @@
+# coding: utf-8
+import os
+import shutil
+import struct
+import tempfile
+
+import pytest
+
+from copr.exceptions import RpmHeaderError
+from copr.rpm_header import (
+    read_header, rpmvercmp, label_compare, LEAD_MAGIC, HEADER_MAGIC,
+    RPMTAG_NAME, RPMTAG_VERSION, RPMTAG_RELEASE, RPMTAG_EPOCH, RPMTAG_ARCH,
+    RPMTAG_SOURCERPM, RPMTAG_PROVIDENAME, RPMTAG_PROVIDEFLAGS, RPMTAG_PROVIDEVERSION,
+    RPMSIGTAG_RSA, SENSE_EQUAL, TYPE_INT32, TYPE_STRING, TYPE_STRING_ARRAY, TYPE_BIN,
+)
+
+
+def pack_header(tags):
+    """
+    :param list tags: of (tag, type, value) tuples
+    """
+    index, store = b"", b""
+    for tag, tag_type, value in tags:
+        if tag_type == TYPE_INT32:
+            while len(store) % 4:
+                store += b"\0"
+            data, count = b"".join(struct.pack(">I", item) for item in value), len(value)
+        elif tag_type == TYPE_STRING:
+            data, count = value.encode("utf-8") + b"\0", 1
+        elif tag_type == TYPE_STRING_ARRAY:
+            data, count = b"".join(item.encode("utf-8") + b"\0" for item in value), len(value)
+        else:
+            data, count = value, len(value)
+        index += struct.pack(">iIiI", tag, tag_type, len(store), count)
+        store += data
+    intro = HEADER_MAGIC + b"\0" * 4 + struct.pack(">II", len(tags), len(store))
+    return intro + index + store
+
+
+def make_rpm(path, tags, signature_tags=None):
+    signature = pack_header([(1000, TYPE_BIN, b"12345")] + (signature_tags or []))
+    with open(path, "wb") as handle:
+        handle.write(LEAD_MAGIC + b"\0" * 92)
+        handle.write(signature + b"\0" * ((8 - len(signature) % 8) % 8))
+        handle.write(pack_header(tags))
+        handle.write(b"payload")
+
+
+class TestReadHeader(object):
+    def setup_method(self, method):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tmp_dir)
+
+    def make_rpm(self, tags, signature_tags=None):
+        path = os.path.join(self.tmp_dir, "foo.rpm")
+        make_rpm(path, tags, signature_tags)
+        return path
+
+    def test_binary_package(self):
+        path = self.make_rpm([
+            (RPMTAG_NAME, TYPE_STRING, "foo"),
+            (RPMTAG_VERSION, TYPE_STRING, "1.0"),
+            (RPMTAG_RELEASE, TYPE_STRING, "1.fc23"),
+            (RPMTAG_EPOCH, TYPE_INT32, [2]),
+            (RPMTAG_ARCH, TYPE_STRING, "x86_64"),
+            (RPMTAG_SOURCERPM, TYPE_STRING, "foo-1.0-1.fc23.src.rpm"),
+            (RPMTAG_PROVIDENAME, TYPE_STRING_ARRAY, ["foo", "foo(x86-64)"]),
+            (RPMTAG_PROVIDEFLAGS, TYPE_INT32, [SENSE_EQUAL, SENSE_EQUAL]),
+            (RPMTAG_PROVIDEVERSION, TYPE_STRING_ARRAY, ["2:1.0-1.fc23", "2:1.0-1.fc23"]),
+        ])
+        header = read_header(path)
+        assert header.name == "foo"
+        assert header.epoch == 2
+        assert header.evr == "2:1.0-1.fc23"
+        assert header.arch == "x86_64"
+        assert not header.is_source
+        assert not header.is_signed
+        assert header.provides == [
+            ("foo", SENSE_EQUAL, "2:1.0-1.fc23"),
+            ("foo(x86-64)", SENSE_EQUAL, "2:1.0-1.fc23"),
+        ]
+
+    def test_source_package(self):
+        path = self.make_rpm([
+            (RPMTAG_NAME, TYPE_STRING, "foo"),
+            (RPMTAG_VERSION, TYPE_STRING, "1.0"),
+            (RPMTAG_RELEASE, TYPE_STRING, "1"),
+            (RPMTAG_ARCH, TYPE_STRING, "x86_64"),
+        ])
+        header = read_header(path)
+        assert header.epoch is None
+        assert header.evr == "1.0-1"
+        assert header.is_source
+        assert header.arch == "src"
+        assert header.provides == []
+
+    def test_signed_package(self):
+        path = self.make_rpm([(RPMTAG_NAME, TYPE_STRING, "foo")],
+                             [(RPMSIGTAG_RSA, TYPE_BIN, b"signature")])
+        header = read_header(path)
+        assert header.is_signed
+        assert header.signature[RPMSIGTAG_RSA] == b"signature"
+        assert header.name == "foo"
+
+    def test_not_rpm(self):
+        path = os.path.join(self.tmp_dir, "foo.rpm")
+        with open(path, "wb") as handle:
+            handle.write(b"#!/bin/sh\n" * 20)
+        with pytest.raises(RpmHeaderError):
+            read_header(path)
+
+    def test_truncated(self):
+        path = self.make_rpm([(RPMTAG_NAME, TYPE_STRING, "foo")])
+        with open(path, "rb") as handle:
+            data = handle.read()
+        with open(path, "wb") as handle:
+            handle.write(data[:-len(b"payload") - 2])
+        with pytest.raises(RpmHeaderError):
+            read_header(path)
+
+    def test_out_of_bounds(self):
+        path = os.path.join(self.tmp_dir, "foo.rpm")
+        header = pack_header([(RPMTAG_EPOCH, TYPE_INT32, [1])])
+        # points the epoch behind the data store
+        header = header[:16 + 8] + struct.pack(">i", 100) + header[16 + 12:]
+        signature = pack_header([])
+        with open(path, "wb") as handle:
+            handle.write(LEAD_MAGIC + b"\0" * 92 + signature + header)
+        with pytest.raises(RpmHeaderError):
+            read_header(path)
+
+
+@pytest.mark.parametrize("first, second, expected", [
+    ("1.0", "1.0", 0),
+    ("1.0", "2.0", -1),
+    ("2.0.1", "2.0", 1),
+    ("1.10", "1.9", 1),
+    ("1.001", "1.1", 0),
+    ("1.0a", "1.0", 1),
+    ("1.0", "1.0a", -1),
+    ("1a", "1.1", -1),
+    ("1.0~rc1", "1.0", -1),
+    ("1.0~rc1", "1.0~rc2", -1),
+    ("1.0^git1", "1.0", 1),
+    ("1.0^git1", "1.0.1", -1),
+    ("1_0", "1.0", 0),
+])
+def test_rpmvercmp(first, second, expected):
+    assert rpmvercmp(first, second) == expected
+    assert rpmvercmp(second, first) == -expected
+
+
+def test_label_compare():
+    assert label_compare((None, "2.0", "1"), (0, "2.0", "1")) == 0
+    assert label_compare((1, "1.0", "1"), (None, "2.0", "1")) == 1
+    assert label_compare((None, "1.0", "2"), (None, "1.0", "10")) == -1
@@ -0,0 +1,36 @@
+# coding: utf-8
+import threading
+
+import pytest
+
+from copr.session import make_session, map_concurrently
+
+
+def test_make_session():
+    session = make_session(retries=5, pool_size=4)
+    adapter = session.get_adapter("https://copr.fedoraproject.org/api/")
+    assert adapter.max_retries.total == 5
+    assert 503 in adapter.max_retries.status_forcelist
+    assert adapter._pool_maxsize == 4
+
+
+def test_map_concurrently():
+    threads = set()
+
+    def square(number):
+        threads.add(threading.current_thread().name)
+        return number * number
+
+    assert map_concurrently(square, range(20), workers=4) == [x * x for x in range(20)]
+    assert len(threads) <= 4
+    assert map_concurrently(square, []) == []
+
+
+def test_map_concurrently_error():
+    def fail(number):
+        if number == 3:
+            raise ValueError(number)
+        return number
+
+    with pytest.raises(ValueError):
+        map_concurrently(fail, range(5))